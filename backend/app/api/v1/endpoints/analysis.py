@@ -1,19 +1,35 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import json
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List
+from typing import Any, Callable, Iterator, List
+from pydantic import BaseModel
 from datetime import datetime, timedelta
 
-from app.core.database import get_db
+from app.core.database import get_db, SessionLocal
 from app.core.auth import get_current_user
 from app.models.game import (
     AnalysisRequest, AnalysisResponse, SimulationRequest, SimulationResponse,
-    CardOperationRequest, CardOperationResponse, GameAnalysis, User
+    CardOperationRequest, CardOperationResponse, CardTransfer, CardSelection, GameAnalysis, User,
+    StreamFormat, SimulationJobRequest, SimulationJobResponse, AnalysisBatchRequest, AnalysisBatchResponse,
+    TournamentRequest, TournamentResponse, GameState
 )
-from app.core.game_engine import MonopolyDealEngine
+from app.models.configuration import OFFICIAL_PRESETS
+from app.core.cards import lookup_card
+from app.core.compact_state import CompactGameState
+from app.core.game_engine import get_engine, engine_cache_info
+from app.core.analysis_cache import analyze_cached, iter_analyze_cached, analysis_cache
+from app.core.batch_analysis import analyze_batch
+from app.core.incremental import summarize_after
+from app.core.parallel_simulation import new_request_seed
+from app.core.simulation_jobs import (
+    Job, JobQueue, JobQueueFull, FINISHED_STATUSES, get_job_queue, simulation_response
+)
+from app.core.tournament import run_tournament
 from app.core.config import settings
 
 router = APIRouter()
-game_engine = MonopolyDealEngine()
 
 
 @router.post("/analyze-test", response_model=AnalysisResponse)
@@ -21,12 +37,13 @@ async def analyze_game_test(request: AnalysisRequest):
     """Test endpoint for game analysis without authentication"""
     
     try:
-        # Create game engine with edge rules from game state
-        game_engine_with_rules = MonopolyDealEngine(request.gameState.edgeRules)
-        
-        analysis_result = game_engine_with_rules.analyze_game_state(
-            request.gameState, 
-            request.strategy
+        # Memoized analysis through the shared engine for the edge rules
+        analysis_result = await run_in_threadpool(
+            analyze_cached,
+            request.gameState,
+            request.strategy,
+            request.timeBudgetMs,
+            deadline_ms=request.deadlineMs
         )
         
         return analysis_result
@@ -63,12 +80,13 @@ async def analyze_game(request: AnalysisRequest):
                     print(f"    Bank item {j}: {money} (type: {type(money)})")
         print("=== END DEBUGGING ===")
 
-        # Create game engine with edge rules from game state
-        game_engine_with_rules = MonopolyDealEngine(request.gameState.edgeRules)
-        
-        analysis_result = game_engine_with_rules.analyze_game_state(
-            request.gameState, 
-            request.strategy
+        # Memoized analysis through the shared engine for the edge rules
+        analysis_result = await run_in_threadpool(
+            analyze_cached,
+            request.gameState,
+            request.strategy,
+            request.timeBudgetMs,
+            deadline_ms=request.deadlineMs
         )
         
         return analysis_result
@@ -83,23 +101,146 @@ async def analyze_game(request: AnalysisRequest):
         )
 
 
-@router.post("/simulate", response_model=SimulationResponse)
-async def simulate_games(
-    request: SimulationRequest,
+@router.post("/analyze/batch", response_model=AnalysisBatchResponse)
+async def analyze_game_batch(
+    request: AnalysisBatchRequest,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Run multiple game simulations"""
-    
-    # Check access (same logic as analyze)
+    """
+    Analyze many AnalysisRequest bodies in one call. Items sharing EdgeRules share an engine,
+    identical positions are analyzed once and work is spread over the process pool.
+    Each item gets its own result or error, in request order; search time is capped
+    per batch (settings.ANALYSIS_BATCH_TIME_BUDGET_MS). Without a subscription, every
+    item that needs its own analysis costs one credit after the free daily allowance;
+    cached answers are free, and items beyond what the user can pay for fail alone.
+    """
+    free = max_analyses = None
     if current_user.subscription_status != "active":
-        today = datetime.utcnow().date()
-        today_analyses = db.query(GameAnalysis).filter(
-            GameAnalysis.user_id == current_user.id,
-            GameAnalysis.created_at >= today
-        ).count()
-        
-        if today_analyses >= settings.FREE_ANALYSES_PER_DAY:
+        free = _free_analyses_left(current_user, db)
+        max_analyses = free + max(current_user.credits, 0)
+        if max_analyses <= 0:
+            raise HTTPException(
+                status_code=status.HTTP_402_PAYMENT_REQUIRED,
+                detail="No credits remaining. Please purchase credits or subscribe."
+            )
+    try:
+        response = await run_in_threadpool(analyze_batch, request.items, max_analyses=max_analyses)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Batch analysis failed: {str(e)}"
+        )
+    if max_analyses is not None:
+        current_user.credits -= max(0, response.analyzed - free)
+    db.add(GameAnalysis(
+        user_id=current_user.id,
+        game_state=None,
+        analysis_result={
+            "type": "batch",
+            "items": len(response.items),
+            "analyzed": response.analyzed,
+            "succeeded": response.succeeded,
+            "failed": response.failed
+        },
+        strategy_used="batch"
+    ))
+    db.commit()
+    return response
+
+
+def _analysis_event(update: AnalysisResponse) -> str:
+    return "update" if update.debug and 'progress' in update.debug else "final"
+
+
+def _stream_updates(updates: Iterator[BaseModel], stream_format: StreamFormat,
+                    event: Callable[[Any], str] = _analysis_event) -> Iterator[str]:
+    """
+    Encode updates as Server-Sent Events or NDJSON lines. For analyses, interim updates
+    carry debug.progress (SSE event "update"); the last one is the final answer
+    (event "final"). A failure ends the stream with an error record (event "error").
+    """
+    try:
+        for update in updates:
+            body = update.model_dump_json()
+            if stream_format == StreamFormat.NDJSON:
+                yield body + "\n"
+            else:
+                yield f"event: {event(update)}\ndata: {body}\n\n"
+    except Exception as e:
+        body = json.dumps({"detail": f"Streaming failed: {str(e)}"})
+        yield body + "\n" if stream_format == StreamFormat.NDJSON else f"event: error\ndata: {body}\n\n"
+
+
+def _streaming_response(updates: Iterator[BaseModel], stream_format: StreamFormat,
+                        event: Callable[[Any], str] = _analysis_event) -> StreamingResponse:
+    media_type = "application/x-ndjson" if stream_format == StreamFormat.NDJSON else "text/event-stream"
+    # The sync generator is iterated in the threadpool, off the event loop
+    return StreamingResponse(
+        _stream_updates(updates, stream_format, event),
+        media_type=media_type,
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.post("/analyze/stream")
+async def analyze_game_stream(
+    request: AnalysisRequest,
+    stream_format: StreamFormat = Query(StreamFormat.SSE, alias="format")
+):
+    """
+    Streaming /analyze: the one-ply answer first, then the forward search's best line
+    every STREAM_REPORT_MS until timeBudgetMs (or deadlineMs) runs out, then the final answer
+    """
+    updates = iter_analyze_cached(
+        request.gameState,
+        request.strategy,
+        request.timeBudgetMs,
+        deadline_ms=request.deadlineMs,
+        report_ms=settings.STREAM_REPORT_MS
+    )
+    return _streaming_response(updates, stream_format)
+
+
+def _simulation_record(user_id: int, request: SimulationRequest, response: SimulationResponse) -> GameAnalysis:
+    return GameAnalysis(
+        user_id=user_id,
+        game_state=request.gameState.dict(),
+        analysis_result={
+            "type": "simulation",
+            "num_simulations": request.numSimulations,
+            "seed": response.seed,
+            "games_played": response.gamesPlayed,
+            "strategy": request.strategy.value,
+            "average_win_probability": response.averageWinProbability,
+            "strategy_performance": response.strategyPerformance
+        },
+        strategy_used=f"{request.strategy.value}_simulation"
+    )
+
+
+def _check_game_state(game_state: GameState) -> None:
+    """Reject (400) positions the simulator cannot deal, such as more hidden cards than unseen ones"""
+    try:
+        CompactGameState.from_game_state(game_state)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+def _free_analyses_left(current_user: User, db: Session) -> int:
+    """What is left of the user's free daily allowance"""
+    today = datetime.utcnow().date()
+    today_analyses = db.query(GameAnalysis).filter(
+        GameAnalysis.user_id == current_user.id,
+        GameAnalysis.created_at >= today
+    ).count()
+    return max(0, settings.FREE_ANALYSES_PER_DAY - today_analyses)
+
+
+def _check_simulation_access(current_user: User, db: Session) -> None:
+    """Free daily allowance, then one credit per simulation for users without a subscription"""
+    if current_user.subscription_status != "active":
+        if not _free_analyses_left(current_user, db):
             if current_user.credits <= 0:
                 raise HTTPException(
                     status_code=status.HTTP_402_PAYMENT_REQUIRED,
@@ -108,62 +249,43 @@ async def simulate_games(
             else:
                 current_user.credits -= 1
                 db.commit()
+
+
+@router.post("/simulate", response_model=SimulationResponse)
+async def simulate_games(
+    request: SimulationRequest,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Run multiple game simulations"""
     
-    # Limit simulation count for performance
-    if request.numSimulations > 100:
-        request.numSimulations = 100
+    # Check access (same logic as analyze)
+    _check_game_state(request.gameState)
+    _check_simulation_access(current_user, db)
     
     try:
-        # Run simulations
-        simulation_results = game_engine.simulate_game(
+        # Run Monte Carlo rollouts with the request's edge rules, off the event loop;
+        # rollouts are sharded across the simulation process pool
+        seed = request.seed if request.seed is not None else new_request_seed()
+        game_engine_with_rules = get_engine(request.gameState.edgeRules)
+        simulation_results = await run_in_threadpool(
+            game_engine_with_rules.simulate_game,
             request.gameState,
             request.strategy,
-            request.numSimulations
+            request.numSimulations,
+            seed,
+            None,
+            request.targetPrecision,
+            request.confidenceLevel,
+            request.intervalMethod
         )
-        
-        # Calculate averages
-        total_players = len(request.gameState.players)
-        player_wins = {player.name: 0 for player in request.gameState.players}
-        strategy_performance = {player.name: 0.0 for player in request.gameState.players}
-        
-        for result in simulation_results:
-            for player_name, prob in result.winProbability.items():
-                player_wins[player_name] += prob
-                strategy_performance[player_name] += prob
-        
-        # Calculate averages
-        num_sims = len(simulation_results)
-        average_win_probability = {
-            name: round(wins / num_sims, 2) 
-            for name, wins in player_wins.items()
-        }
-        
-        strategy_performance = {
-            name: round(perf / num_sims, 2) 
-            for name, perf in strategy_performance.items()
-        }
+        response = simulation_response(request.gameState, simulation_results, seed)
         
         # Store simulation in database
-        db_analysis = GameAnalysis(
-            user_id=current_user.id,
-            game_state=request.gameState.dict(),
-            analysis_result={
-                "type": "simulation",
-                "num_simulations": request.numSimulations,
-                "strategy": request.strategy.value,
-                "average_win_probability": average_win_probability,
-                "strategy_performance": strategy_performance
-            },
-            strategy_used=f"{request.strategy.value}_simulation"
-        )
-        db.add(db_analysis)
+        db.add(_simulation_record(current_user.id, request, response))
         db.commit()
         
-        return SimulationResponse(
-            results=simulation_results,
-            averageWinProbability=average_win_probability,
-            strategyPerformance=strategy_performance
-        )
+        return response
         
     except Exception as e:
         raise HTTPException(
@@ -172,6 +294,175 @@ async def simulate_games(
         )
 
 
+@router.post("/simulate/stream")
+async def simulate_games_stream(
+    request: SimulationRequest,
+    stream_format: StreamFormat = Query(StreamFormat.SSE, alias="format"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Streaming /simulate: win rates and intervals after every shard of rollouts,
+    then the final answer, which is stored like a /simulate result
+    """
+    _check_game_state(request.gameState)
+    _check_simulation_access(current_user, db)
+    seed = request.seed if request.seed is not None else new_request_seed()
+    game_engine_with_rules = get_engine(request.gameState.edgeRules)
+    user_id = current_user.id
+    
+    # The generator runs after the handler returns and its request session closes,
+    # so the result is stored through a session of its own
+    def updates():
+        final = None
+        for final in game_engine_with_rules.iter_simulation(
+            request.gameState,
+            request.strategy,
+            request.numSimulations,
+            seed,
+            None,
+            request.targetPrecision,
+            request.confidenceLevel,
+            request.intervalMethod
+        ):
+            if final.completed:
+                _store_simulation(user_id, request, simulation_response(request.gameState, [final], seed))
+            yield final
+    
+    return _streaming_response(updates(), stream_format)
+
+
+def _store_simulation(user_id: int, request: SimulationRequest, response: SimulationResponse) -> None:
+    """Store a /simulate result outside a request's session"""
+    db = SessionLocal()
+    try:
+        db.add(_simulation_record(user_id, request, response))
+        db.commit()
+    finally:
+        db.close()
+
+
+def _record_simulation_job(job: Job) -> None:
+    """Store a completed job like a /simulate result (runs on the job's worker thread)"""
+    if job.result is None or job.user_id is None:
+        return
+    _store_simulation(job.user_id, job.request, job.result)
+
+
+def _job_queue() -> JobQueue:
+    """The shared job queue; jobs it restores after a restart are stored when they finish"""
+    return get_job_queue(on_restore=_record_simulation_job)
+
+
+def _owned_job(job_id: str, current_user: User) -> Job:
+    job = _job_queue().get(job_id)
+    if job is None or job.user_id != current_user.id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Simulation job not found")
+    return job
+
+
+@router.post("/simulate/jobs", response_model=SimulationJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def submit_simulation_job(
+    request: SimulationJobRequest,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Queue a simulation (up to 100000 games) and return its job ID at once"""
+    _check_game_state(request.gameState)
+    _check_simulation_access(current_user, db)
+    try:
+        job = _job_queue().submit(request, current_user.id, on_finish=_record_simulation_job)
+    except JobQueueFull as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
+    return job.snapshot()
+
+
+@router.get("/simulate/jobs/{job_id}", response_model=SimulationJobResponse)
+async def get_simulation_job(job_id: str, current_user: User = Depends(get_current_user)):
+    """Status, progress and (once completed) the result of a simulation job"""
+    return _owned_job(job_id, current_user).snapshot()
+
+
+@router.get("/simulate/jobs/{job_id}/stream")
+async def stream_simulation_job(
+    job_id: str,
+    stream_format: StreamFormat = Query(StreamFormat.SSE, alias="format"),
+    current_user: User = Depends(get_current_user)
+):
+    """Job status on every change (event "update") until it finishes (event "final")"""
+    job = _owned_job(job_id, current_user)
+    jobs = _job_queue()
+    
+    def snapshots():
+        version = job.version
+        while True:
+            snapshot = job.snapshot()
+            yield snapshot
+            if snapshot.status in FINISHED_STATUSES:
+                return
+            version = jobs.wait(job, version, timeout=15.0)
+    
+    return _streaming_response(
+        snapshots(), stream_format,
+        event=lambda snapshot: "final" if snapshot.status in FINISHED_STATUSES else "update"
+    )
+
+
+@router.delete("/simulate/jobs/{job_id}", response_model=SimulationJobResponse)
+async def cancel_simulation_job(job_id: str, current_user: User = Depends(get_current_user)):
+    """Cancel a queued or running simulation job"""
+    job = _owned_job(job_id, current_user)
+    _job_queue().cancel(job.id)
+    return job.snapshot()
+
+
+@router.post("/tournament", response_model=TournamentResponse)
+async def run_strategy_tournament(
+    request: TournamentRequest,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Round-robin between character / asset-evaluation pairings from fresh deals under one rule set.
+    Reports measured win rates, Elo ratings and confidence intervals for each pairing.
+    At most TOURNAMENT_MAX_GAMES games are played per request (400 above that).
+    """
+    if request.presetId is not None and request.presetId not in OFFICIAL_PRESETS:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Preset not found")
+    edge_rules = OFFICIAL_PRESETS[request.presetId].rules if request.presetId else request.edgeRules
+
+    _check_simulation_access(current_user, db)
+
+    try:
+        return await run_in_threadpool(
+            run_tournament,
+            edge_rules,
+            request.characters,
+            request.assetEvaluations,
+            request.gamesPerPairing,
+            request.seed,
+            confidence=request.confidenceLevel,
+            method=request.intervalMethod,
+            max_games=settings.TOURNAMENT_MAX_GAMES
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Tournament failed: {str(e)}"
+        )
+
+
+@router.get("/cache-stats")
+async def get_cache_stats():
+    """Hit rates of the analysis result cache and the engine cache"""
+    return {
+        "analysisCache": analysis_cache.stats(),
+        "engineCache": engine_cache_info()
+    }
+
+
 @router.get("/history", response_model=List[dict])
 async def get_analysis_history(
     current_user: User = Depends(get_current_user),
@@ -221,11 +512,22 @@ async def perform_card_operation(
         # Perform the card operation
         new_game_state = execute_card_operation(request.operation, request.gameState)
         
+        # Carry the board summary forward from the previous operation's stateHash, so
+        # re-analysis only touches the players and colors the card moved between
+        summary, _ = summarize_after(request.gameState, new_game_state, request.operation, request.stateHash)
+        analysis = None
+        if request.strategy is not None:
+            analysis = get_engine(new_game_state.edgeRules).analyze_game_state(
+                new_game_state, request.strategy, summary=summary
+            )
+        
         return CardOperationResponse(
             success=True,
             newGameState=new_game_state,
             message="Card operation completed successfully",
-            validationErrors=None
+            validationErrors=None,
+            stateHash=summary.token,
+            analysis=analysis
         )
         
     except Exception as e:
@@ -271,6 +573,8 @@ def execute_card_operation(operation, game_state):
             player = next(p for p in new_state.players if p.id == operation.toPlayerId)
             if operation.cardId in player.hand:
                 player.hand.remove(operation.cardId)
+                if player.handCount is not None:
+                    player.handCount = max(0, player.handCount - 1)
                 if operation.propertySet not in player.properties:
                     player.properties[operation.propertySet] = []
                 player.properties[operation.propertySet].append(operation.cardId)
@@ -280,9 +584,11 @@ def execute_card_operation(operation, game_state):
             player = next(p for p in new_state.players if p.id == operation.toPlayerId)
             if operation.cardId in player.hand:
                 player.hand.remove(operation.cardId)
-                # Convert property card to money value
-                if hasattr(operation, 'cardValue'):
-                    player.bank.append(operation.cardValue)
+                if player.handCount is not None:
+                    player.handCount = max(0, player.handCount - 1)
+                # Bank the card at its cash value
+                record = lookup_card(operation.cardId)
+                player.bank.append(record.value if record is not None else 0)
     
     elif isinstance(operation, CardSelection):
         # Handle card selection
@@ -0,0 +1,211 @@
+"""
+Memoized game analysis keyed by a canonical form of the request.
+
+Clients re-post the same board on every UI tweak, so analyze results are cached
+under (normalized GameState, EdgeRules, strategy, time budget). Normalization
+sorts hands, banks, property lists and the discard pile, maps card spellings
+to catalog kinds and drops player names (when they are unique) - none of these
+change the analysis. A cached result is relabelled with the caller's names on
+the way out; an answer whose text names players (a target in the recommended
+move, the search line) is stored under its names as well and only serves
+callers using those names. Entries expire after a TTL and the table is bounded with LRU
+eviction; hit/miss counters are exposed for monitoring. Canonical first-turn
+openings found in the configured opening book skip both the cache and the engine.
+"""
+
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from app.core.cards import lookup_card
+from app.core.config import settings
+from app.core.game_engine import get_engine
+from app.core.opening_book import get_opening_book
+from app.models.game import GameState, AnalysisResponse, AIStrategy
+
+
+def _card_token(card) -> Any:
+    """Catalog kind for recognised card strings; the exact content otherwise"""
+    if isinstance(card, str):
+        record = lookup_card(card)
+        return record.kind if record is not None else card
+    data = card if isinstance(card, dict) else getattr(card, '__dict__', str(card))
+    return json.dumps(data, sort_keys=True, default=str)
+
+
+def _sorted_tokens(cards) -> tuple:
+    return tuple(sorted((_card_token(card) for card in cards or []), key=repr))
+
+
+def canonical_key(game_state: GameState, strategy: AIStrategy,
+                  time_budget_ms: Optional[float] = None) -> Tuple[tuple, List[str]]:
+    """
+    Canonical cache key for an analysis request plus the seat names it was made with.
+    Seat order is kept (seat 0 is the player to move); names are part of the key
+    only when they are not unique, because results are reported per name.
+    """
+    names = [player.name for player in game_state.players]
+    players = tuple(
+        (
+            _sorted_tokens(player.hand),
+            player.handCount,
+            tuple(sorted(player.bank or [], key=repr)),
+            tuple(sorted((color, _sorted_tokens(cards)) for color, cards in (player.properties or {}).items()))
+        )
+        for player in game_state.players
+    )
+    seat_names = () if len(set(names)) == len(names) else tuple(names)
+    strategy_key = strategy.value if hasattr(strategy, 'value') else str(strategy)
+    key = (players, seat_names, _sorted_tokens(game_state.discard), game_state.deckCount,
+           game_state.edgeRules.cache_key(), strategy_key, time_budget_ms)
+    return key, names
+
+
+def names_players(response: AnalysisResponse, names: List[str]) -> bool:
+    """True when the response's text or debug output mentions any of names"""
+    text = " ".join((response.recommendedMove, response.reasoning,
+                     json.dumps(response.debug, default=str) if response.debug else ""))
+    return any(name and name in text for name in names)
+
+
+def _relabel(response: AnalysisResponse, cached_names: List[str], names: List[str]) -> AnalysisResponse:
+    """
+    Copy of a cached response with seat names swapped for the caller's names.
+    Only strongestPlayer and the winProbability keys are relabelled, so the
+    response must not name players anywhere else (see names_players).
+    """
+    if cached_names == names:
+        return response.model_copy(deep=True)
+    mapping = dict(zip(cached_names, names))
+    return response.model_copy(deep=True, update={
+        'strongestPlayer': mapping.get(response.strongestPlayer, response.strongestPlayer),
+        'winProbability': {mapping.get(name, name): prob for name, prob in response.winProbability.items()}
+    })
+
+
+class AnalysisCache:
+    """
+    Thread-safe LRU + TTL cache of AnalysisResponse objects.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 300.0):
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[tuple, Tuple[float, List[str], AnalysisResponse]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _lookup(self, key: tuple) -> Optional[Tuple[float, List[str], AnalysisResponse]]:
+        entry = self._entries.get(key)
+        if entry is not None and time.monotonic() - entry[0] > self.ttl_seconds:
+            del self._entries[key]
+            self.expirations += 1
+            entry = None
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def get(self, key: tuple, names: List[str]) -> Optional[AnalysisResponse]:
+        with self._lock:
+            # Answers that name players are stored under the names they were made with
+            entry = self._lookup(key) or self._lookup((key, tuple(names)))
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return _relabel(entry[2], entry[1], names)
+
+    def put(self, key: tuple, names: List[str], response: AnalysisResponse) -> None:
+        if names_players(response, names):
+            key = (key, tuple(names))
+        with self._lock:
+            self._entries[key] = (time.monotonic(), list(names), response.model_copy(deep=True))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'maxEntries': self.max_entries,
+                'ttlSeconds': self.ttl_seconds,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'hitRate': self.hits / lookups if lookups else 0.0
+            }
+
+
+analysis_cache = AnalysisCache(settings.ANALYSIS_CACHE_SIZE, settings.ANALYSIS_CACHE_TTL_SECONDS)
+
+
+def analyze_cached(game_state: GameState, strategy: AIStrategy,
+                   time_budget_ms: Optional[float] = None,
+                   cache: Optional[AnalysisCache] = None,
+                   deadline_ms: Optional[float] = None) -> AnalysisResponse:
+    """
+    analyze_game_state through the shared engine for the state's rules, memoized.
+    A completed analysis does not depend on the deadline, so deadline_ms is not part
+    of the key; answers cut short by it are returned but not cached.
+    """
+    book = get_opening_book()
+    booked = book.lookup(game_state, strategy) if book is not None else None
+    if booked is not None:
+        return booked
+    cache = analysis_cache if cache is None else cache
+    key, names = canonical_key(game_state, strategy, time_budget_ms)
+    cached = cache.get(key, names)
+    if cached is not None:
+        return cached
+    response = get_engine(game_state.edgeRules).analyze_game_state(
+        game_state, strategy, time_budget_ms, deadline_ms=deadline_ms
+    )
+    # Failed and truncated analyses are reported but not remembered
+    if response.winProbability and response.completed:
+        cache.put(key, names, response)
+    return response
+
+
+def iter_analyze_cached(game_state: GameState, strategy: AIStrategy,
+                        time_budget_ms: Optional[float] = None,
+                        cache: Optional[AnalysisCache] = None,
+                        deadline_ms: Optional[float] = None,
+                        report_ms: Optional[float] = None) -> Iterator[AnalysisResponse]:
+    """
+    Streaming analyze_cached: a cached answer is yielded alone, otherwise the engine's
+    interim answers followed by the final one, which is cached like analyze_cached's.
+    """
+    book = get_opening_book()
+    booked = book.lookup(game_state, strategy) if book is not None else None
+    if booked is not None:
+        yield booked
+        return
+    cache = analysis_cache if cache is None else cache
+    key, names = canonical_key(game_state, strategy, time_budget_ms)
+    cached = cache.get(key, names)
+    if cached is not None:
+        yield cached
+        return
+    for response in get_engine(game_state.edgeRules).iter_analysis(
+        game_state, strategy, time_budget_ms, deadline_ms=deadline_ms, report_ms=report_ms
+    ):
+        # Interim answers are never complete; the final one is stored before it is sent
+        if response.winProbability and response.completed:
+            cache.put(key, names, response)
+        yield response
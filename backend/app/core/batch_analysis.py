@@ -0,0 +1,195 @@
+"""
+Bulk analysis of many game states in one call.
+
+Items are validated one at a time, so a malformed item gets its own error
+instead of failing the batch. Valid items are keyed with the analysis cache's
+canonical key: cached answers are served directly and identical items in the
+batch are analyzed once. The remaining positions are grouped by EdgeRules, so
+every group runs on one shared engine, and cut into chunks that run on the
+simulation process pool (in-process for small batches or a single worker).
+Answers are relabelled with each item's seat names and completed answers are
+cached for later requests. An answer whose text names players cannot be
+relabelled, so items sharing its position under other names are analyzed in a
+second pass.
+
+Search time is capped per batch: every item that may need its own analysis is
+charged its timeBudgetMs (or deadlineMs, when lower; an item with a deadline
+alone may still run the endgame solver), and items that no longer fit in the
+batch budget fail alone. The same goes for max_analyses, the number of new
+analyses a caller can pay for: cached answers and duplicates of an analyzed
+item are free, and the response counts the analyses made.
+"""
+
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from pydantic import ValidationError
+
+from app.core.config import settings
+from app.core.analysis_cache import AnalysisCache, analysis_cache, canonical_key, names_players, _relabel
+from app.core.game_engine import get_engine
+from app.core.parallel_simulation import get_process_pool, pool_size
+from app.models.game import (
+    AnalysisRequest, AnalysisResponse, AnalysisBatchItem, AnalysisBatchResponse, EdgeRules
+)
+
+
+DEFAULT_CHUNK_SIZE = 64
+
+
+def _validation_message(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in detail['loc']) or 'item'}: {detail['msg']}" for detail in error.errors()
+    )
+
+
+def _analyze_chunk(edge_rules: EdgeRules,
+                   requests: List[AnalysisRequest]) -> List[Tuple[Optional[AnalysisResponse], Optional[str]]]:
+    """Worker entry point: analyze requests sharing one rule set on one engine"""
+    engine = get_engine(edge_rules)
+    outcomes = []
+    for request in requests:
+        try:
+            response = engine.analyze_game_state(request.gameState, request.strategy, request.timeBudgetMs,
+                                                 deadline_ms=request.deadlineMs)
+        except Exception as e:
+            outcomes.append((None, str(e)))
+            continue
+        # The engine reports failures as an answer without win probabilities
+        outcomes.append((response, None) if response.winProbability else (None, response.reasoning))
+    return outcomes
+
+
+def _analyze_requests(requests: List[AnalysisRequest], max_workers: int,
+                      chunk_size: int) -> List[Tuple[Optional[AnalysisResponse], Optional[str]]]:
+    """Analyze requests in chunks grouped by rule set, on the process pool when there is more than one chunk"""
+    groups: Dict[tuple, List[int]] = {}
+    for position, request in enumerate(requests):
+        groups.setdefault(request.gameState.edgeRules.cache_key(), []).append(position)
+    chunks = [
+        positions[start:start + chunk_size]
+        for positions in groups.values()
+        for start in range(0, len(positions), chunk_size)
+    ]
+
+    def chunk_args(positions):
+        chunk = [requests[position] for position in positions]
+        return chunk[0].gameState.edgeRules, chunk
+
+    if max_workers <= 1 or len(chunks) <= 1:
+        chunk_outcomes = [_analyze_chunk(*chunk_args(positions)) for positions in chunks]
+    else:
+        pool = get_process_pool()
+        futures = [pool.submit(_analyze_chunk, *chunk_args(positions)) for positions in chunks]
+        chunk_outcomes = []
+        for positions, future in zip(chunks, futures):
+            try:
+                chunk_outcomes.append(future.result())
+            except Exception as e:
+                chunk_outcomes.append([(None, f"Analysis worker failed: {e}")] * len(positions))
+
+    outcomes: List[Tuple[Optional[AnalysisResponse], Optional[str]]] = [(None, None)] * len(requests)
+    for positions, chunk_outcome in zip(chunks, chunk_outcomes):
+        for position, outcome in zip(positions, chunk_outcome):
+            outcomes[position] = outcome
+    return outcomes
+
+
+def _search_cost(request: AnalysisRequest) -> int:
+    """
+    Search time an analysis may spend: its time budget (which the endgame solve is charged
+    to) bounded by its deadline; with a deadline alone, at most the endgame solve
+    """
+    if request.timeBudgetMs is None:
+        return min(request.deadlineMs, int(settings.ENDGAME_TIME_BUDGET_MS)) if request.deadlineMs else 0
+    return min(request.timeBudgetMs, request.deadlineMs or request.timeBudgetMs)
+
+
+def analyze_batch(items: Sequence[Dict[str, Any]], cache: Optional[AnalysisCache] = None,
+                  max_workers: Optional[int] = None, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                  time_budget_ms: Optional[int] = None,
+                  max_analyses: Optional[int] = None) -> AnalysisBatchResponse:
+    """
+    Analyze every AnalysisRequest body in items.
+
+    Args:
+        items: Raw AnalysisRequest bodies
+        cache: Analysis cache to read and fill (the shared one by default)
+        max_workers: Chunks run in parallel on the shared pool (its size by default); 1 analyzes in-process
+        chunk_size: Items per pool task
+        time_budget_ms: Search time the batch may spend across its items
+            (settings.ANALYSIS_BATCH_TIME_BUDGET_MS by default)
+        max_analyses: Most items that may need their own analysis (no limit when None)
+
+    Returns:
+        AnalysisBatchResponse with one result or error per item, in item order
+    """
+    started = time.perf_counter()
+    cache = analysis_cache if cache is None else cache
+    max_workers = max_workers or pool_size()
+    chunk_size = max(1, chunk_size)
+    budget_left = settings.ANALYSIS_BATCH_TIME_BUDGET_MS if time_budget_ms is None else time_budget_ms
+    results: List[AnalysisBatchItem] = [AnalysisBatchItem(index=index) for index in range(len(items))]
+
+    # Positions still to analyze: canonical key -> [(index, request, names), ...]; the first item is analyzed
+    pending: Dict[tuple, List[Tuple[int, AnalysisRequest, List[str]]]] = {}
+    # (key, names) pairs whose search time is already charged to budget_left
+    charged = set()
+    for index, item in enumerate(items):
+        try:
+            request = AnalysisRequest.model_validate(item)
+            key, names = canonical_key(request.gameState, request.strategy, request.timeBudgetMs)
+        except ValidationError as e:
+            results[index].error = _validation_message(e)
+            continue
+        except Exception as e:
+            results[index].error = str(e)
+            continue
+        if (key, tuple(names)) in charged:
+            pending[key].append((index, request, names))
+            continue
+        cached = cache.get(key, names)
+        if cached is not None:
+            results[index].result, results[index].cached = cached, True
+            continue
+        # A new position, or one that may need a second pass under other names
+        if max_analyses is not None and len(charged) >= max_analyses:
+            results[index].error = f"Analysis limit reached ({max_analyses} new analyses per batch)"
+            continue
+        cost = _search_cost(request)
+        if cost > budget_left:
+            results[index].error = f"Batch time budget used up ({cost} ms needed, {budget_left} ms left)"
+            continue
+        budget_left -= cost
+        charged.add((key, tuple(names)))
+        pending.setdefault(key, []).append((index, request, names))
+
+    groups = [(key, members) for key, members in pending.items()]
+    while groups:
+        outcomes = _analyze_requests([members[0][1] for _, members in groups], max_workers, chunk_size)
+        # Items whose answer names players under other seat names: (key, names) -> members
+        renamed: Dict[tuple, List[Tuple[int, AnalysisRequest, List[str]]]] = {}
+        for (key, members), (response, error) in zip(groups, outcomes):
+            names = members[0][2]
+            if response is not None and response.completed:
+                cache.put(key, names, response)
+            for position, (index, request, item_names) in enumerate(members):
+                if response is None:
+                    results[index].error = error
+                elif position == 0:
+                    results[index].result = response
+                elif item_names == names or not names_players(response, names):
+                    results[index].result = _relabel(response, names, item_names)
+                    results[index].cached = True
+                else:
+                    renamed.setdefault((key, tuple(item_names)), []).append((index, request, item_names))
+        groups = [(key, members) for (key, _), members in renamed.items()]
+
+    failed = sum(1 for item in results if item.error is not None)
+    return AnalysisBatchResponse(
+        items=results,
+        succeeded=len(results) - failed,
+        failed=failed,
+        analyzed=sum(1 for item in results if item.result is not None and not item.cached),
+        elapsedMs=(time.perf_counter() - started) * 1000.0
+    )
@@ -0,0 +1,129 @@
+"""
+Batched NumPy evaluation of many game states at once.
+
+States are packed into padded arrays of shape (states, players, ...) and the
+logical / value asset scores and research-based win probabilities are computed
+with array operations, matching MonopolyDealEngine.evaluate_compact_logical,
+evaluate_compact_value and _calculate_research_based_probabilities exactly.
+Padding seats (states with fewer players) are masked out and get probability 0.
+"""
+
+from itertools import chain
+from typing import Optional, Sequence, Union
+
+import numpy as np
+
+from app.core.cards import (
+    CardCategory, NUM_COLORS, NUM_KINDS, SET_SIZES, PROPERTY_VALUES, KIND_CATEGORY, KIND_VALUE
+)
+from app.core.compact_state import CompactGameState
+
+
+_SET_SIZES = np.array(SET_SIZES, dtype=np.float64)
+_PROPERTY_VALUES = np.array(PROPERTY_VALUES, dtype=np.float64)
+# Hand card worth counted by the value evaluation (action and building cards)
+_ACTION_VALUES = np.array([
+    KIND_VALUE[kind] if KIND_CATEGORY[kind] in (CardCategory.ACTION, CardCategory.BUILDING) else 0
+    for kind in range(NUM_KINDS)
+], dtype=np.float64)
+
+
+def _pack(rows, shape) -> np.ndarray:
+    """Flatten nested int lists into an array of the given shape"""
+    flat = rows if len(shape) == 2 else chain.from_iterable(rows)
+    return np.fromiter(flat, dtype=np.float64, count=int(np.prod(shape))).reshape(shape)
+
+
+class StateBatch:
+    """Padded feature arrays for N states: props/hands are (N, P, colors/kinds), banks and mask (N, P)"""
+
+    __slots__ = ('props', 'banks', 'hands', 'mask')
+
+    def __init__(self, props: np.ndarray, banks: np.ndarray, hands: np.ndarray,
+                 mask: Optional[np.ndarray] = None):
+        self.props = np.asarray(props, dtype=np.float64)
+        self.banks = np.asarray(banks, dtype=np.float64)
+        self.hands = np.asarray(hands, dtype=np.float64)
+        self.mask = np.ones(self.banks.shape, dtype=bool) if mask is None else np.asarray(mask, dtype=bool)
+
+    @classmethod
+    def from_states(cls, states: Sequence[CompactGameState]) -> "StateBatch":
+        """Pack compact states, padding to the largest player count"""
+        count = len(states)
+        players = max((state.num_players for state in states), default=0)
+        if all(state.num_players == players for state in states):
+            # Common case: one player count, stream the flat integers straight into arrays
+            return cls(
+                _pack(chain.from_iterable(state.props for state in states), (count, players, NUM_COLORS)),
+                _pack(chain.from_iterable(state.banks for state in states), (count, players)),
+                _pack(chain.from_iterable(state.hands for state in states), (count, players, NUM_KINDS))
+            )
+        props = np.zeros((count, players, NUM_COLORS))
+        banks = np.zeros((count, players))
+        hands = np.zeros((count, players, NUM_KINDS))
+        mask = np.zeros((count, players), dtype=bool)
+        for index, state in enumerate(states):
+            seats = state.num_players
+            if seats:
+                props[index, :seats] = state.props
+                banks[index, :seats] = state.banks
+                hands[index, :seats] = state.hands
+                mask[index, :seats] = True
+        return cls(props, banks, hands, mask)
+
+    def __len__(self) -> int:
+        return self.banks.shape[0]
+
+    def complete_sets(self) -> np.ndarray:
+        return (self.props >= _SET_SIZES).sum(axis=-1)
+
+
+def logical_scores(batch: StateBatch) -> np.ndarray:
+    """Set completion (50 per complete set, 30 x ratio otherwise) plus capped money"""
+    complete = batch.props >= _SET_SIZES
+    per_color = np.where(complete, 50.0, batch.props / _SET_SIZES * 30.0)
+    scores = per_color.sum(axis=-1) + np.minimum(batch.banks * 2.0, 20.0)
+    return np.where(batch.mask, scores, 0.0)
+
+
+def value_scores(batch: StateBatch) -> np.ndarray:
+    """Bank x3, property base value x2 and the worth of action cards in hand"""
+    scores = batch.banks * 3.0 + (batch.props @ _PROPERTY_VALUES) * 2.0 + batch.hands @ _ACTION_VALUES
+    return np.where(batch.mask, scores, 0.0)
+
+
+def asset_scores(batch: StateBatch, asset_type: str) -> np.ndarray:
+    """Scores for an AssetEvaluation value ('logical', 'value' or 'logical_value'), shape (N, P)"""
+    if asset_type == 'logical':
+        return logical_scores(batch)
+    if asset_type == 'value':
+        return value_scores(batch)
+    return (logical_scores(batch) + value_scores(batch)) / 2.0
+
+
+def win_probabilities(scores: np.ndarray, complete_sets: np.ndarray,
+                      phase_multiplier: Union[float, np.ndarray] = 1.0,
+                      risk_factor: float = 1.0, mask: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Research-based win probabilities for every state: evaluation share plus 25% per
+    complete set, scaled by game phase and risk, clipped to [0.05, 0.95] and normalized.
+
+    Args:
+        scores: (N, P) asset scores
+        complete_sets: (N, P) complete set counts
+        phase_multiplier: Scalar or (N,) per-state game phase multiplier
+        risk_factor: Character risk tolerance
+        mask: (N, P) seats that exist
+
+    Returns:
+        (N, P) probabilities; each row sums to 1 over its real seats
+    """
+    scores = np.asarray(scores, dtype=np.float64)
+    mask = np.ones(scores.shape, dtype=bool) if mask is None else mask
+    totals = scores.sum(axis=-1, keepdims=True)
+    base = np.divide(scores, totals, out=np.zeros_like(scores), where=totals > 0)
+    phase = np.asarray(phase_multiplier, dtype=np.float64).reshape(-1, 1) if np.ndim(phase_multiplier) else phase_multiplier
+    probabilities = np.clip((base + complete_sets * 0.25) * phase * risk_factor, 0.05, 0.95)
+    probabilities = np.where(mask, probabilities, 0.0)
+    norms = probabilities.sum(axis=-1, keepdims=True)
+    return np.divide(probabilities, norms, out=np.zeros_like(probabilities), where=norms > 0)
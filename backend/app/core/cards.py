@@ -0,0 +1,361 @@
+"""
+Card definitions for the standard 106-card Monopoly Deal deck.
+
+Every distinct card is identified by a small integer "kind" so that hands,
+decks and discard piles can be stored as plain integer lists and count vectors
+inside the simulation hot path.
+
+The card catalog maps every accepted client spelling of a card to one shared
+immutable Card record. It is built once at import; spellings seen for the
+first time are parsed once and interned, so later lookups are a dict hit.
+"""
+
+import re
+from enum import Enum
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+
+class CardCategory(str, Enum):
+    MONEY = "money"
+    PROPERTY = "property"
+    WILD = "wild"
+    ACTION = "action"
+    BUILDING = "building"
+    RENT = "rent"
+
+
+# Property colors in engine order (matches MonopolyDealEngine.complete_sets)
+COLORS = (
+    'brown', 'light-blue', 'pink', 'orange', 'red',
+    'yellow', 'green', 'dark-blue', 'railroad', 'utility'
+)
+NUM_COLORS = len(COLORS)
+COLOR_INDEX = {color: index for index, color in enumerate(COLORS)}
+
+SET_SIZES = (2, 3, 3, 3, 3, 3, 3, 2, 4, 2)
+PROPERTY_VALUES = (1, 1, 2, 2, 3, 3, 4, 4, 2, 2)
+RENT_TABLE = (
+    (1, 2), (1, 2, 3), (1, 2, 4), (1, 3, 5), (2, 3, 6),
+    (2, 4, 6), (2, 4, 7), (3, 8), (1, 2, 3, 4), (1, 2)
+)
+HOUSE_RENT = 3
+HOTEL_RENT = 4
+
+# Colors that cannot carry a house or hotel
+NO_BUILDING_COLORS = (COLOR_INDEX['railroad'], COLOR_INDEX['utility'])
+
+# Color spellings accepted from clients (property dict keys and card names)
+COLOR_ALIASES = {
+    'brown': 'brown',
+    'light-blue': 'light-blue', 'light blue': 'light-blue', 'lightblue': 'light-blue',
+    'light_blue': 'light-blue',
+    'pink': 'pink', 'purple': 'pink', 'magenta': 'pink',
+    'orange': 'orange',
+    'red': 'red',
+    'yellow': 'yellow',
+    'green': 'green',
+    'dark-blue': 'dark-blue', 'dark blue': 'dark-blue', 'darkblue': 'dark-blue',
+    'dark_blue': 'dark-blue', 'blue': 'dark-blue',
+    'railroad': 'railroad', 'black': 'railroad',
+    'utility': 'utility', 'gray': 'utility', 'grey': 'utility'
+}
+
+# Card kinds. Properties occupy PROPERTY_BASE + color index.
+MONEY_1, MONEY_2, MONEY_3, MONEY_4, MONEY_5, MONEY_10 = range(6)
+PROPERTY_BASE = 6
+(WILD_ANY, WILD_LIGHT_BLUE_BROWN, WILD_LIGHT_BLUE_RAILROAD, WILD_DARK_BLUE_GREEN,
+ WILD_RAILROAD_GREEN, WILD_RED_YELLOW, WILD_PINK_ORANGE, WILD_UTILITY_RAILROAD) = range(16, 24)
+(DEAL_BREAKER, JUST_SAY_NO, SLY_DEAL, FORCED_DEAL,
+ DEBT_COLLECTOR, BIRTHDAY, PASS_GO, DOUBLE_RENT) = range(24, 32)
+HOUSE, HOTEL = 32, 33
+(RENT_ANY, RENT_DARK_BLUE_GREEN, RENT_RED_YELLOW, RENT_PINK_ORANGE,
+ RENT_LIGHT_BLUE_BROWN, RENT_RAILROAD_UTILITY) = range(34, 40)
+NUM_KINDS = 40
+
+_ALL_COLORS = tuple(range(NUM_COLORS))
+
+
+def _colors(*names: str) -> Tuple[int, ...]:
+    return tuple(COLOR_INDEX[name] for name in names)
+
+
+# (name, category, cash value, colors, copies in the deck)
+_KIND_DEFINITIONS = [
+    ("$1M", CardCategory.MONEY, 1, (), 6),
+    ("$2M", CardCategory.MONEY, 2, (), 5),
+    ("$3M", CardCategory.MONEY, 3, (), 3),
+    ("$4M", CardCategory.MONEY, 4, (), 3),
+    ("$5M", CardCategory.MONEY, 5, (), 2),
+    ("$10M", CardCategory.MONEY, 10, (), 1),
+    ("Brown Property", CardCategory.PROPERTY, 1, _colors('brown'), 2),
+    ("Light Blue Property", CardCategory.PROPERTY, 1, _colors('light-blue'), 3),
+    ("Pink Property", CardCategory.PROPERTY, 2, _colors('pink'), 3),
+    ("Orange Property", CardCategory.PROPERTY, 2, _colors('orange'), 3),
+    ("Red Property", CardCategory.PROPERTY, 3, _colors('red'), 3),
+    ("Yellow Property", CardCategory.PROPERTY, 3, _colors('yellow'), 3),
+    ("Green Property", CardCategory.PROPERTY, 4, _colors('green'), 3),
+    ("Dark Blue Property", CardCategory.PROPERTY, 4, _colors('dark-blue'), 2),
+    ("Railroad Property", CardCategory.PROPERTY, 2, _colors('railroad'), 4),
+    ("Utility Property", CardCategory.PROPERTY, 2, _colors('utility'), 2),
+    ("10-Color Wild", CardCategory.WILD, 0, _ALL_COLORS, 2),
+    ("Light Blue & Brown", CardCategory.WILD, 1, _colors('light-blue', 'brown'), 1),
+    ("Light Blue & Railroad", CardCategory.WILD, 4, _colors('light-blue', 'railroad'), 1),
+    ("Dark Blue & Green", CardCategory.WILD, 4, _colors('dark-blue', 'green'), 1),
+    ("Railroad & Green", CardCategory.WILD, 4, _colors('railroad', 'green'), 1),
+    ("Red & Yellow", CardCategory.WILD, 3, _colors('red', 'yellow'), 2),
+    ("Purple & Orange", CardCategory.WILD, 2, _colors('pink', 'orange'), 2),
+    ("Utility & Railroad", CardCategory.WILD, 2, _colors('utility', 'railroad'), 1),
+    ("Deal Breaker", CardCategory.ACTION, 5, (), 2),
+    ("Just Say No", CardCategory.ACTION, 4, (), 3),
+    ("Sly Deal", CardCategory.ACTION, 3, (), 3),
+    ("Forced Deal", CardCategory.ACTION, 3, (), 3),
+    ("Debt Collector", CardCategory.ACTION, 3, (), 3),
+    ("It's My Birthday", CardCategory.ACTION, 2, (), 3),
+    ("Pass Go", CardCategory.ACTION, 1, (), 10),
+    ("Double The Rent", CardCategory.ACTION, 1, (), 2),
+    ("House", CardCategory.BUILDING, 3, (), 3),
+    ("Hotel", CardCategory.BUILDING, 4, (), 2),
+    ("All Color Wild Rent", CardCategory.RENT, 3, _ALL_COLORS, 3),
+    ("Green & Dark Blue Rent", CardCategory.RENT, 1, _colors('green', 'dark-blue'), 2),
+    ("Red & Yellow Rent", CardCategory.RENT, 1, _colors('red', 'yellow'), 2),
+    ("Purple & Orange Rent", CardCategory.RENT, 1, _colors('pink', 'orange'), 2),
+    ("Brown & Light Blue Rent", CardCategory.RENT, 1, _colors('brown', 'light-blue'), 2),
+    ("Railroad & Utility Rent", CardCategory.RENT, 1, _colors('railroad', 'utility'), 2),
+]
+
+KIND_NAMES = tuple(definition[0] for definition in _KIND_DEFINITIONS)
+KIND_CATEGORY = tuple(definition[1] for definition in _KIND_DEFINITIONS)
+KIND_VALUE = tuple(definition[2] for definition in _KIND_DEFINITIONS)
+KIND_COLORS = tuple(definition[3] for definition in _KIND_DEFINITIONS)
+DECK_COMPOSITION = tuple(definition[4] for definition in _KIND_DEFINITIONS)
+DECK_SIZE = sum(DECK_COMPOSITION)
+
+MONEY_KIND_BY_VALUE = {KIND_VALUE[kind]: kind for kind in range(MONEY_1, MONEY_10 + 1)}
+
+_ACTION_KEYWORDS = [
+    ('deal breaker', DEAL_BREAKER),
+    ('just say no', JUST_SAY_NO),
+    ('sly deal', SLY_DEAL),
+    ('forced deal', FORCED_DEAL),
+    ('force deal', FORCED_DEAL),
+    ('debt collector', DEBT_COLLECTOR),
+    ('birthday', BIRTHDAY),
+    ('pass go', PASS_GO),
+    ('double the rent', DOUBLE_RENT),
+    ('double rent', DOUBLE_RENT),
+    ('hotel', HOTEL),
+    ('house', HOUSE),
+]
+
+_COLOR_PATTERN = re.compile(
+    r'light[\s_-]?blue|dark[\s_-]?blue|blue|brown|pink|purple|magenta|orange|'
+    r'red|yellow|green|railroad|black|utility|gray|grey'
+)
+_MONEY_PATTERN = re.compile(r'^\$?\s*(\d+)\s*m?$')
+# Whole words only: 'any' must not match inside "Water Works Company"
+_ANY_COLOR_PATTERN = re.compile(r'\b(?:10[\s-]?colou?rs?|multi\w*|any|all[\s-]colou?rs?|rainbow)\b')
+
+
+def resolve_color(name: str) -> Optional[int]:
+    """Map a client color spelling to a color index, or None when unknown"""
+    color = COLOR_ALIASES.get(str(name).strip().lower())
+    return COLOR_INDEX[color] if color else None
+
+
+def _parse_colors(text: str) -> List[int]:
+    colors = []
+    for match in _COLOR_PATTERN.findall(text):
+        index = resolve_color(match.replace('_', ' ').replace('-', ' '))
+        if index is not None and index not in colors:
+            colors.append(index)
+    return colors
+
+
+def _kind_for_colors(colors: List[int], category: CardCategory) -> Optional[int]:
+    """Find the two-color wild or rent kind covering the parsed colors"""
+    wanted = set(colors)
+    for kind, definition in enumerate(_KIND_DEFINITIONS):
+        if definition[1] == category and len(definition[3]) == 2 and wanted <= set(definition[3]):
+            return kind
+    return None
+
+
+def _classify_name(name: str) -> int:
+    text = name.strip().lower()
+    if not text:
+        return -1
+
+    money = _MONEY_PATTERN.match(text)
+    if money:
+        return MONEY_KIND_BY_VALUE.get(int(money.group(1)), -1)
+
+    for keyword, kind in _ACTION_KEYWORDS:
+        if keyword in text:
+            return kind
+
+    colors = _parse_colors(text)
+
+    if 'rent' in text:
+        if len(colors) == 0 or len(colors) > 2 or _ANY_COLOR_PATTERN.search(text) or 'wild' in text:
+            return RENT_ANY
+        kind = _kind_for_colors(colors, CardCategory.RENT)
+        return RENT_ANY if kind is None else kind
+
+    if _ANY_COLOR_PATTERN.search(text) or (('wild' in text) and not colors):
+        return WILD_ANY
+    if len(colors) >= 2:
+        kind = _kind_for_colors(colors[:2], CardCategory.WILD)
+        return PROPERTY_BASE + colors[0] if kind is None else kind
+    if len(colors) == 1:
+        return PROPERTY_BASE + colors[0]
+    return -1
+
+
+def _classify_fields(name, card_type, color, value) -> int:
+    if name:
+        kind = _classify_name(str(name))
+        if kind >= 0:
+            return kind
+    if color:
+        index = resolve_color(color)
+        if index is not None:
+            return PROPERTY_BASE + index
+    if value is not None and (card_type in ('', 'money') or not name):
+        try:
+            return MONEY_KIND_BY_VALUE.get(int(value), -1)
+        except (TypeError, ValueError):
+            return -1
+    return -1
+
+
+# ---------------------------------------------------------------- catalog
+
+# Engine action key and effect per kind (keys match MonopolyDealEngine.action_cards)
+_ACTION_EFFECTS = {
+    DEAL_BREAKER: ('deal_breaker', 'steal_complete_set'),
+    SLY_DEAL: ('sly_deal', 'steal_property'),
+    FORCED_DEAL: ('force_deal', 'swap_property'),
+    DEBT_COLLECTOR: ('debt_collector', 'collect_5m'),
+    BIRTHDAY: ('birthday', 'collect_2m_all'),
+    JUST_SAY_NO: ('just_say_no', 'block_action'),
+    PASS_GO: ('pass_go', 'draw_2_cards'),
+    DOUBLE_RENT: ('double_rent', 'double_rent'),
+    HOUSE: ('house', 'add_rent_1'),
+    HOTEL: ('hotel', 'add_rent_3'),
+}
+
+
+class Card(NamedTuple):
+    """Immutable card record shared by every spelling of the same card"""
+    kind: int
+    name: str
+    category: CardCategory
+    value: int
+    colors: Tuple[str, ...]
+    action: Optional[str]   # MonopolyDealEngine.action_cards key ('rent' for rent cards)
+    effect: Optional[str]
+
+    @property
+    def engine_type(self) -> str:
+        """Card type as used by the analysis engine: money, property or action"""
+        if self.category == CardCategory.MONEY:
+            return 'money'
+        if self.category in (CardCategory.PROPERTY, CardCategory.WILD):
+            return 'property'
+        return 'action'
+
+
+def _make_card(kind: int) -> Card:
+    category = KIND_CATEGORY[kind]
+    action, effect = _ACTION_EFFECTS.get(kind, (None, None))
+    if category == CardCategory.RENT:
+        action, effect = 'rent', 'collect_rent'
+    return Card(kind, KIND_NAMES[kind], category, KIND_VALUE[kind],
+                tuple(COLORS[color] for color in KIND_COLORS[kind]), action, effect)
+
+
+CARDS: Tuple[Card, ...] = tuple(_make_card(kind) for kind in range(NUM_KINDS))
+
+_INTERN_LIMIT = 4096  # cap on spellings learned at runtime
+
+
+def _catalog_spellings(kind: int) -> List[str]:
+    """Spellings registered up front for a kind (all are checked by _classify_name)"""
+    name = KIND_NAMES[kind]
+    spellings = [name]
+    category = KIND_CATEGORY[kind]
+    if category == CardCategory.MONEY:
+        value = KIND_VALUE[kind]
+        spellings += [f"{value}M", f"${value}", str(value), f"${value} M"]
+    elif category == CardCategory.PROPERTY:
+        color = COLORS[kind - PROPERTY_BASE]
+        for alias, canonical in COLOR_ALIASES.items():
+            if canonical == color:
+                spellings += [f"{alias.title()} Property", alias.title()]
+    elif category in (CardCategory.WILD, CardCategory.RENT) and len(KIND_COLORS[kind]) == 2:
+        first, second = (COLORS[color].replace('-', ' ').title() for color in KIND_COLORS[kind])
+        for a, b in ((first, second), (second, first)):
+            if category == CardCategory.WILD:
+                spellings += [f"{a} & {b}", f"{a}/{b}", f"{a} & {b} Wild", f"{a}/{b} Wild", f"Wild {a}/{b}"]
+            else:
+                spellings += [f"{a} & {b} Rent", f"{a}/{b} Rent", f"Rent {a}/{b}", f"Rent {a} & {b}"]
+    return spellings
+
+
+def _build_catalog() -> Dict[str, Card]:
+    catalog = {}
+    extra = ["Force Deal", "It's My Birthday", "Birthday", "Double Rent", "Double the Rent",
+             "Rent", "Wild Rent", "Multi-Color Wild", "Property Wild", "Wild", "Purple & Orange Wild"]
+    for spelling in [s for kind in range(NUM_KINDS) for s in _catalog_spellings(kind)] + extra:
+        for key in (spelling, spelling.lower()):
+            kind = _classify_name(key)
+            if kind >= 0:
+                catalog.setdefault(key, CARDS[kind])
+    return catalog
+
+
+CARD_CATALOG: Dict[str, Card] = _build_catalog()
+_CATALOG_LIMIT = len(CARD_CATALOG) + _INTERN_LIMIT
+_FIELD_CATALOG: Dict[tuple, Optional[Card]] = {}
+
+
+def _intern(table: dict, key, kind: int, limit: int) -> Optional[Card]:
+    """Remember the parse of a spelling seen for the first time (up to limit entries)"""
+    card = CARDS[kind] if kind >= 0 else None
+    if len(table) < limit:
+        table[key] = card
+    return card
+
+
+def lookup_card(card) -> Optional[Card]:
+    """
+    Return the catalog Card for a client card (string, dict or pydantic card model),
+    or None when the card cannot be recognised
+    """
+    if isinstance(card, str):
+        if card in CARD_CATALOG:
+            return CARD_CATALOG[card]
+        return _intern(CARD_CATALOG, card, _classify_name(card), _CATALOG_LIMIT)
+
+    if isinstance(card, dict):
+        key = (card.get('name', ''), card.get('type', ''), card.get('color', ''), card.get('value'))
+    else:
+        key = (getattr(card, 'name', ''), getattr(card, 'type', ''),
+               getattr(card, 'color', ''), getattr(card, 'value', None))
+    try:
+        if key in _FIELD_CATALOG:
+            return _FIELD_CATALOG[key]
+    except TypeError:
+        # Unhashable field values are parsed without interning
+        kind = _classify_fields(*key)
+        return CARDS[kind] if kind >= 0 else None
+    return _intern(_FIELD_CATALOG, key, _classify_fields(*key), _INTERN_LIMIT)
+
+
+def classify_card(card) -> int:
+    """
+    Return the card kind for a client card (string, dict or pydantic card model),
+    or -1 when the card cannot be recognised
+    """
+    record = lookup_card(card)
+    return record.kind if record is not None else -1
@@ -0,0 +1,200 @@
+"""
+Compact integer-encoded game state for the engine hot path.
+
+A CompactGameState is built once from a pydantic GameState. Every player is
+reduced to fixed-size count arrays (properties, property cash value and
+buildings per color, hand multiset per card kind) plus an integer bank total,
+so evaluation is array indexing and copying a state is a handful of list
+slices. Arrays are stored per field ("struct of arrays"): props[player][color].
+Hands may be partly hidden (PlayerState.handCount): hands[] counts the known
+cards, hidden[] the rest, which come from the unseen pool (see determinize).
+Hand counts needing more hidden cards than the unseen pool holds are rejected.
+"""
+
+from operator import ge
+from typing import List, Optional
+
+from app.core.cards import (
+    CardCategory, NUM_COLORS, NUM_KINDS, SET_SIZES, PROPERTY_VALUES, RENT_TABLE,
+    HOUSE_RENT, HOTEL_RENT, DECK_COMPOSITION, KIND_CATEGORY, KIND_VALUE, KIND_NAMES,
+    MONEY_KIND_BY_VALUE, HOUSE, HOTEL, COLORS, PROPERTY_BASE, classify_card, resolve_color
+)
+from app.models.game import GameState, PlayerState, EdgeRules
+
+_BANK_DENOMINATIONS = sorted(MONEY_KIND_BY_VALUE, reverse=True)
+
+
+class CompactGameState:
+    """Per-player count arrays for a game position"""
+
+    __slots__ = ('names', 'hands', 'hand_sizes', 'hand_kinds', 'hidden', 'props', 'prop_values',
+                 'houses', 'hotels', 'banks', 'discard', 'unseen', 'deck_count')
+
+    def __init__(self):
+        self.names: List[str] = []
+        self.hands: List[List[int]] = []          # [player][kind] -> count
+        self.hand_sizes: List[int] = []           # known plus hidden cards
+        self.hand_kinds: List[List[int]] = []     # source hand order, shared between copies
+        self.hidden: List[int] = []               # [player] -> hand cards not known, shared between copies
+        self.props: List[List[int]] = []          # [player][color] -> property cards
+        self.prop_values: List[List[int]] = []    # [player][color] -> cash value of those cards
+        self.houses: List[List[int]] = []
+        self.hotels: List[List[int]] = []
+        self.banks: List[int] = []
+        self.discard: List[int] = []
+        self.unseen: List[int] = [0] * NUM_KINDS  # cards not visible anywhere, by kind
+        self.deck_count = 0
+
+    @classmethod
+    def from_game_state(cls, game_state: GameState) -> "CompactGameState":
+        """
+        Encode a GameState. Card strings are parsed exactly once here.
+        Raises ValueError when the hidden hand cards outnumber the unseen cards.
+        """
+        state = cls()
+        unseen = list(DECK_COMPOSITION)
+
+        def take(kind: int) -> None:
+            if kind >= 0 and unseen[kind] > 0:
+                unseen[kind] -= 1
+
+        for player in game_state.players:
+            hand = [0] * NUM_KINDS
+            kinds = []
+            for card in player.hand or []:
+                kind = classify_card(card)
+                kinds.append(kind)
+                if kind >= 0:
+                    hand[kind] += 1
+                    take(kind)
+
+            props = [0] * NUM_COLORS
+            values = [0] * NUM_COLORS
+            houses = [0] * NUM_COLORS
+            hotels = [0] * NUM_COLORS
+            for color_name, cards in (player.properties or {}).items():
+                # Client spellings ("Dark Blue", "purple", ...) count toward their canonical color
+                color = resolve_color(color_name)
+                if color is None or not isinstance(cards, list):
+                    continue
+                for card in cards:
+                    kind = classify_card(card)
+                    take(kind)
+                    if kind == HOUSE:
+                        houses[color] = 1
+                    elif kind == HOTEL:
+                        hotels[color] = 1
+                    else:
+                        props[color] += 1
+                        category = KIND_CATEGORY[kind] if kind >= 0 else None
+                        values[color] += (KIND_VALUE[kind]
+                                          if category in (CardCategory.PROPERTY, CardCategory.WILD)
+                                          else PROPERTY_VALUES[color])
+
+            bank = 0
+            for item in player.bank or []:
+                value = int(item) if isinstance(item, (int, float)) else 0
+                bank += value
+                take(MONEY_KIND_BY_VALUE.get(value, -1))
+
+            state.names.append(player.name)
+            state.hands.append(hand)
+            hidden = max(0, player.handCount - len(kinds)) if player.handCount is not None else 0
+            state.hand_sizes.append(sum(hand) + hidden)
+            state.hand_kinds.append(kinds)
+            state.hidden.append(hidden)
+            state.props.append(props)
+            state.prop_values.append(values)
+            state.houses.append(houses)
+            state.hotels.append(hotels)
+            state.banks.append(bank)
+
+        for card in game_state.discard or []:
+            kind = classify_card(card)
+            if kind >= 0:
+                state.discard.append(kind)
+                take(kind)
+
+        hidden, pool = sum(state.hidden), sum(unseen)
+        if hidden > pool:
+            raise ValueError(f"handCount leaves {hidden} hand cards unknown, but only {pool} cards are unseen")
+        state.unseen = unseen
+        state.deck_count = max(0, game_state.deckCount)
+        return state
+
+    def to_game_state(self, edge_rules: Optional[EdgeRules] = None) -> GameState:
+        """
+        Decode back into a GameState. Counts survive exactly; card identities the
+        arrays do not keep are normalised: banks become the fewest money cards and
+        wilds on a set show as that color's property card.
+        """
+        players = []
+        for player, name in enumerate(self.names):
+            hand = [KIND_NAMES[kind] for kind, count in enumerate(self.hands[player]) for _ in range(count)]
+            bank, remaining = [], self.banks[player]
+            for value in _BANK_DENOMINATIONS:
+                while remaining >= value:
+                    bank.append(value)
+                    remaining -= value
+            properties = {}
+            for color in range(NUM_COLORS):
+                cards = [KIND_NAMES[PROPERTY_BASE + color]] * self.props[player][color]
+                cards += [KIND_NAMES[HOUSE]] * self.houses[player][color] + [KIND_NAMES[HOTEL]] * self.hotels[player][color]
+                if cards:
+                    properties[COLORS[color]] = cards
+            hidden = self.hidden[player] if player < len(self.hidden) else 0
+            players.append(PlayerState(id=player + 1, name=name, hand=hand, bank=bank, properties=properties,
+                                       handCount=len(hand) + hidden if hidden else None))
+        return GameState(players=players, discard=[KIND_NAMES[kind] for kind in self.discard],
+                         deckCount=self.deck_count, edgeRules=edge_rules or EdgeRules())
+
+    def copy(self) -> "CompactGameState":
+        clone = CompactGameState.__new__(CompactGameState)
+        self.copy_into(clone)
+        return clone
+
+    def copy_into(self, clone: "CompactGameState") -> None:
+        """Copy every array into clone (which may be a subclass instance)"""
+        clone.names = self.names
+        clone.hands = [hand[:] for hand in self.hands]
+        clone.hand_sizes = self.hand_sizes[:]
+        clone.hand_kinds = self.hand_kinds
+        clone.hidden = self.hidden
+        clone.props = [props[:] for props in self.props]
+        clone.prop_values = [values[:] for values in self.prop_values]
+        clone.houses = [houses[:] for houses in self.houses]
+        clone.hotels = [hotels[:] for hotels in self.hotels]
+        clone.banks = self.banks[:]
+        clone.discard = self.discard[:]
+        clone.unseen = self.unseen[:]
+        clone.deck_count = self.deck_count
+
+    @property
+    def num_players(self) -> int:
+        return len(self.names)
+
+    def unseen_cards(self) -> List[int]:
+        """Unseen card kinds expanded into a list (one entry per physical card)"""
+        return [kind for kind in range(NUM_KINDS) for _ in range(self.unseen[kind])]
+
+    def complete_sets(self, player: int) -> int:
+        return sum(map(ge, self.props[player], SET_SIZES))
+
+    def wealth(self, player: int) -> int:
+        """Bank plus property base values (same measure as MonopolyDealEngine._calculate_player_wealth)"""
+        return self.banks[player] + sum(map(int.__mul__, self.props[player], PROPERTY_VALUES))
+
+    def assets(self, player: int) -> int:
+        """Bank plus the cash value of property cards (what the player could pay with)"""
+        return self.banks[player] + sum(self.prop_values[player])
+
+    def rent(self, player: int, color: int) -> int:
+        count = self.props[player][color]
+        if count == 0:
+            return 0
+        size = SET_SIZES[color]
+        table = RENT_TABLE[color]
+        rent = table[min(count, size, len(table)) - 1]
+        if count >= size:
+            rent += HOUSE_RENT * self.houses[player][color] + HOTEL_RENT * self.hotels[player][color]
+        return rent
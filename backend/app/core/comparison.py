@@ -0,0 +1,256 @@
+"""
+Variance-reduced comparison of simulation alternatives.
+
+Comparing candidate moves, strategies or rule variants with independent
+rollouts spends most of the games on card luck that has nothing to do with
+the choice being compared. compare() plays every alternative with three
+variance reduction techniques:
+
+- common random numbers: every alternative plays the same determinizations
+  (hidden hands and deck order) with the same reshuffle seed per rollout,
+  so rollout i differs between alternatives only through the choice;
+- antithetic pairs: determinizations come in pairs whose hidden hands and
+  draws are rotated between the seats (app.core.determinize), and a pair
+  is averaged into one sample;
+- an optional control variate from the static evaluator: the value
+  evaluation (app.core.batch_eval.value_scores) of the dealt position with
+  the first round of draws in hand, for the seat of interest against the
+  mean opponent. The evaluation is linear in the card counts and every
+  hand slot and deck position is marginally a uniform draw from the unseen
+  pool, so its expectation is known exactly. The regression coefficient is
+  fitted from the samples.
+
+Every estimate reports its standard error next to the standard error that
+independent rollouts of the same count would have had (the binomial
+p(1 - p) / n per alternative). varianceReduction is their squared ratio:
+how many times more independent rollouts would reach the same confidence.
+Differences against the first alternative gain the most, since common
+random numbers cancel the shared luck.
+"""
+
+import math
+import random
+import time
+from typing import List, NamedTuple, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from pydantic import BaseModel
+
+from app.core.batch_eval import StateBatch, value_scores
+from app.core.compact_state import CompactGameState
+from app.core.confidence import DEFAULT_CONFIDENCE, z_score
+from app.core.determinize import Determinizations, HiddenInformation
+from app.core.moves import END_TURN, Move, PLAYS_PER_TURN, generate_moves
+from app.core.parallel_simulation import new_request_seed, spawn_seeds
+from app.core.simulation import GameSimulator, DEFAULT_MAX_TURNS, _Rollout
+from app.models.game import GameState, EdgeRules
+
+
+DRAW_COUNT = 2  # Cards each seat draws at the start of a turn (control variate lookahead)
+
+
+class Alternative(NamedTuple):
+    """
+    One option being compared. Unset fields fall back to the comparison's defaults.
+
+    label: name in the report
+    edge_rules: rule variant
+    characters: PlayerCharacter value per seat
+    move: first play for the seat on move; the policy plays the rest of its turn
+    """
+    label: str
+    edge_rules: Optional[EdgeRules] = None
+    characters: Optional[Sequence[str]] = None
+    move: Optional[Move] = None
+
+
+class Estimate(BaseModel):
+    """A win rate, or a difference of win rates, with its variance reduction"""
+    label: str
+    value: float                     # Estimate after the control variate (if any)
+    rawValue: float                  # Plain mean of the rollouts
+    standardError: float
+    independentStandardError: float  # Standard error of independent rollouts of the same count
+    varianceReduction: Optional[float] = None  # (independent / achieved standard error)^2; None when exact
+    confidenceInterval: List[float]  # [low, high]
+    controlCoefficient: Optional[float] = None
+
+
+class ComparisonResult(BaseModel):
+    player: int                      # Seat whose win rate is estimated
+    rollouts: int                    # Rollouts per alternative
+    commonRandomNumbers: bool
+    antithetic: bool
+    controlVariate: bool
+    alternatives: List[Estimate]
+    differences: List[Estimate]      # Each later alternative minus the first
+    seed: int
+    elapsedMs: float
+
+
+def _control_values(state: CompactGameState, hidden: HiddenInformation, deals: Determinizations, player: int,
+                    drawing_seats: Sequence[int]) -> Tuple[np.ndarray, float]:
+    """
+    Static value evaluation of each deal with the first round of draws in hand,
+    seat player minus the mean opponent, and its exact expectation over deals.
+    """
+    n = state.num_players
+    hands = np.asarray(state.hands, dtype=np.float64) + deals.hands
+    mean_hands = np.asarray(state.hands, dtype=np.float64).copy()
+    pool = np.asarray(state.unseen, dtype=np.float64)
+    share = pool / pool.sum() if pool.sum() else pool
+    mean_hands += hidden.hidden[:, None] * share
+
+    decks = deals.decks
+    depth = decks.shape[1]
+    rows = np.arange(len(deals))
+    for turn, seat in enumerate(drawing_seats):
+        for draw in range(DRAW_COUNT):
+            position = depth - 1 - turn * DRAW_COUNT - draw  # Rollouts draw from the end of the deck
+            if position < 0:
+                break
+            np.add.at(hands, (rows, seat, decks[:, position]), 1.0)
+            mean_hands[seat] += share
+
+    def evaluate(hand_counts: np.ndarray) -> np.ndarray:
+        count = hand_counts.shape[0]
+        batch = StateBatch(np.broadcast_to(np.asarray(state.props, dtype=np.float64), (count,) + np.shape(state.props)),
+                           np.broadcast_to(np.asarray(state.banks, dtype=np.float64), (count, n)), hand_counts)
+        scores = value_scores(batch)
+        return scores[:, player] - (scores.sum(axis=1) - scores[:, player]) / max(n - 1, 1)
+
+    return evaluate(hands), float(evaluate(mean_hands[None])[0])
+
+
+def _estimate(label: str, samples: np.ndarray, controls: Optional[np.ndarray], independent_variance: float,
+              z: float, bounds: Tuple[float, float]) -> Estimate:
+    """Mean of per-unit samples, optionally adjusted by centred controls, with its standard error"""
+    raw = float(samples.mean())
+    adjusted, ddof, coefficient = samples, 1, None
+    if controls is not None and len(samples) > 2 and controls.var() > 0:
+        coefficient = float(np.cov(samples, controls)[0, 1] / controls.var(ddof=1))
+        adjusted, ddof = samples - coefficient * controls, 2
+    value = float(adjusted.mean())
+    variance = float(adjusted.var(ddof=ddof)) / len(samples) if len(samples) > ddof else independent_variance
+    error = math.sqrt(max(variance, 0.0))
+    independent_error = math.sqrt(independent_variance)
+    return Estimate(
+        label=label,
+        value=value,
+        rawValue=raw,
+        standardError=error,
+        independentStandardError=independent_error,
+        varianceReduction=independent_variance / variance if variance > 0 else None,
+        confidenceInterval=[max(bounds[0], value - z * error), min(bounds[1], value + z * error)],
+        controlCoefficient=coefficient
+    )
+
+
+def compare(game_state: Union[GameState, CompactGameState], alternatives: Sequence[Alternative],
+            num_rollouts: int, edge_rules: Optional[EdgeRules] = None,
+            characters: Sequence[str] = ('normal', 'normal'), player: int = 0, first_player: int = 0,
+            seed: Optional[int] = None, common_random_numbers: bool = True, antithetic: bool = False,
+            control_variate: bool = False, confidence: float = DEFAULT_CONFIDENCE,
+            max_turns: int = DEFAULT_MAX_TURNS) -> ComparisonResult:
+    """
+    Estimate player's win rate under each alternative from the same position.
+
+    Args:
+        game_state: Position to compare from. When an alternative names a move, first_player
+            is taken to be mid-turn (cards already drawn) for every alternative, as in analysis
+        alternatives: Options to compare; the first is the baseline for differences
+        num_rollouts: Rollouts per alternative (rounded up to even for antithetic pairs)
+        edge_rules: Rules for alternatives without their own (default EdgeRules)
+        characters: Seat characters for alternatives without their own
+        player: Seat whose win rate is estimated
+        first_player: Seat that moves next
+        seed: Comparison seed (random when None)
+        common_random_numbers: Play every alternative on the same deals and reshuffle seeds
+        antithetic: Deal rollouts in antithetic pairs
+        control_variate: Adjust by the static value evaluation of the first round of draws
+        confidence: Confidence level of the reported intervals
+        max_turns: Turn limit per rollout (the leader wins at the limit)
+    """
+    started = time.perf_counter()
+    if not alternatives:
+        raise ValueError("Nothing to compare")
+    state = game_state if isinstance(game_state, CompactGameState) \
+        else CompactGameState.from_game_state(game_state)
+    n = state.num_players
+    if not 0 <= player < n or not 0 <= first_player < n:
+        raise ValueError("Seat index out of range")
+    seed = new_request_seed() if seed is None else seed
+    rollouts = max(1, num_rollouts)
+    if antithetic:
+        rollouts += rollouts % 2
+
+    mid_turn = any(alternative.move is not None for alternative in alternatives)
+    # Seats that draw in the first round: the mover has already drawn when mid-turn
+    drawing_seats = [(first_player + offset) % n for offset in range(1 if mid_turn else 0, n)]
+    hidden = HiddenInformation(state)
+    streams = spawn_seeds(seed, 1 if common_random_numbers else len(alternatives))
+
+    outcomes = np.zeros((len(alternatives), rollouts))
+    controls = np.zeros((len(alternatives), rollouts)) if control_variate else None
+    for index, alternative in enumerate(alternatives):
+        stream = streams[0 if common_random_numbers else index]
+        deals = hidden.sample(rollouts, np.random.default_rng(stream), antithetic)
+        game_seeds = spawn_seeds(stream, rollouts)
+        if controls is not None:
+            values, expected = _control_values(state, hidden, deals, player, drawing_seats)
+            controls[index] = values - expected
+
+        simulator = GameSimulator(alternative.edge_rules or edge_rules, max_turns=max_turns)
+        weights = simulator.seat_weights(list(alternative.characters or characters), n)
+        move = alternative.move
+        if move is not None and move not in generate_moves(state, first_player, simulator.move_rules):
+            raise ValueError(f"{alternative.label}: {move.describe(state.names)} is not a legal play")
+
+        for rollout_index in range(rollouts):
+            hands, deck = deals.sample(rollout_index)
+            rollout = _Rollout(simulator, state, [], weights, random.Random(game_seeds[rollout_index]), (hands, deck))
+            if not mid_turn:
+                winner = rollout.run(first_player, max_turns)[0]
+            else:
+                plays_left = PLAYS_PER_TURN
+                if move is not None:
+                    plays_left = 0 if move == END_TURN else plays_left - rollout.play(
+                        first_player, move.kind, move.color, plays_left, move.target, move.give, move.doubles)
+                if rollout.winner < 0 and rollout.finish_turn(first_player, plays_left):
+                    winner = rollout.run((first_player + 1) % n, max_turns - 1)[0]
+                else:
+                    winner = rollout.winner if rollout.winner >= 0 else rollout.leader()
+            outcomes[index, rollout_index] = winner == player
+
+    # Antithetic pairs are averaged into one sample each
+    unit = 2 if antithetic else 1
+    samples = outcomes.reshape(len(alternatives), -1, unit).mean(axis=2)
+    centred = controls.reshape(len(alternatives), -1, unit).mean(axis=2) if controls is not None else None
+    rates = outcomes.mean(axis=1)
+    binomial = rates * (1.0 - rates) / rollouts
+    z = z_score(confidence)
+
+    estimates = [
+        _estimate(alternative.label, samples[index], centred[index] if centred is not None else None,
+                  float(binomial[index]), z, (0.0, 1.0))
+        for index, alternative in enumerate(alternatives)
+    ]
+    differences = []
+    for index, alternative in enumerate(alternatives[1:], 1):
+        difference_controls = None
+        if centred is not None:
+            # Shared deals share one control; independent deals difference theirs
+            difference_controls = centred[0] if common_random_numbers else centred[index] - centred[0]
+        differences.append(_estimate(f"{alternative.label} - {alternatives[0].label}", samples[index] - samples[0],
+                                     difference_controls, float(binomial[index] + binomial[0]), z, (-1.0, 1.0)))
+    return ComparisonResult(
+        player=player,
+        rollouts=rollouts,
+        commonRandomNumbers=common_random_numbers,
+        antithetic=antithetic,
+        controlVariate=control_variate,
+        alternatives=estimates,
+        differences=differences,
+        seed=seed,
+        elapsedMs=(time.perf_counter() - started) * 1000
+    )
@@ -0,0 +1,149 @@
+"""
+Confidence intervals for simulated win rates and sequential stopping rules.
+
+Each player's win rate is a binomial proportion. Two intervals are offered:
+Wilson score intervals and Bayesian (Jeffreys prior, Beta(wins + 1/2,
+losses + 1/2)) equal-tailed credible intervals. Both behave well near 0 and 1
+and for small samples, unlike the plain normal approximation.
+
+A StoppingRule is checked after every shard of rollouts: the run stops once
+every interval half-width is at most epsilon, or once the leader's lower
+bound is above every other player's upper bound. Checks happen in shard order,
+so a seeded run stops at the same point for any number of workers. The
+intervals are not widened for the repeated looks; an epsilon-width stop is
+reported at the nominal level.
+"""
+
+import math
+from statistics import NormalDist
+from typing import Dict, Optional, Sequence, Tuple
+
+from app.models.game import IntervalMethod
+
+
+DEFAULT_CONFIDENCE = 0.95
+
+_BETA_EPS = 1e-12
+_BETA_ITERATIONS = 200
+
+
+def z_score(confidence: float) -> float:
+    """Two-sided standard normal quantile for a confidence level"""
+    return NormalDist().inv_cdf(0.5 + confidence / 2.0)
+
+
+def wilson_interval(wins: float, games: int, confidence: float = DEFAULT_CONFIDENCE) -> Tuple[float, float]:
+    """Wilson score interval for a proportion"""
+    if games <= 0:
+        return 0.0, 1.0
+    z = z_score(confidence)
+    p = wins / games
+    denominator = 1.0 + z * z / games
+    centre = (p + z * z / (2 * games)) / denominator
+    half = z * math.sqrt(p * (1 - p) / games + z * z / (4 * games * games)) / denominator
+    return max(0.0, centre - half), min(1.0, centre + half)
+
+
+def _beta_fraction(a: float, b: float, x: float) -> float:
+    """Continued fraction for the regularized incomplete beta function (modified Lentz)"""
+    tiny = 1e-300
+    c, d = 1.0, 1.0 - (a + b) * x / (a + 1.0)
+    d = 1.0 / (d if abs(d) > tiny else tiny)
+    result = d
+    for m in range(1, _BETA_ITERATIONS + 1):
+        for numerator in (m * (b - m) * x / ((a + 2 * m - 1) * (a + 2 * m)),
+                          -(a + m) * (a + b + m) * x / ((a + 2 * m) * (a + 2 * m + 1))):
+            d = 1.0 + numerator * d
+            d = 1.0 / (d if abs(d) > tiny else tiny)
+            c = 1.0 + numerator / c
+            c = c if abs(c) > tiny else tiny
+            result *= d * c
+        if abs(d * c - 1.0) < _BETA_EPS:
+            break
+    return result
+
+
+def beta_cdf(x: float, a: float, b: float) -> float:
+    """Regularized incomplete beta I_x(a, b)"""
+    if x <= 0.0:
+        return 0.0
+    if x >= 1.0:
+        return 1.0
+    log_front = (math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b)
+                 + a * math.log(x) + b * math.log1p(-x))
+    if x < (a + 1.0) / (a + b + 2.0):
+        return math.exp(log_front) * _beta_fraction(a, b, x) / a
+    return 1.0 - math.exp(log_front) * _beta_fraction(b, a, 1.0 - x) / b
+
+
+def beta_quantile(q: float, a: float, b: float) -> float:
+    """Inverse of beta_cdf by bisection"""
+    low, high = 0.0, 1.0
+    for _ in range(60):
+        mid = (low + high) / 2.0
+        if beta_cdf(mid, a, b) < q:
+            low = mid
+        else:
+            high = mid
+    return (low + high) / 2.0
+
+
+def bayes_interval(wins: float, games: int, confidence: float = DEFAULT_CONFIDENCE) -> Tuple[float, float]:
+    """Equal-tailed credible interval under a Jeffreys Beta(1/2, 1/2) prior"""
+    if games <= 0:
+        return 0.0, 1.0
+    a, b = wins + 0.5, games - wins + 0.5
+    tail = (1.0 - confidence) / 2.0
+    low = beta_quantile(tail, a, b) if wins > 0 else 0.0
+    high = beta_quantile(1.0 - tail, a, b) if wins < games else 1.0
+    return low, high
+
+
+def interval(wins: float, games: int, confidence: float = DEFAULT_CONFIDENCE,
+             method: IntervalMethod = IntervalMethod.WILSON) -> Tuple[float, float]:
+    if method == IntervalMethod.BAYES:
+        return bayes_interval(wins, games, confidence)
+    return wilson_interval(wins, games, confidence)
+
+
+def intervals(names: Sequence[str], wins: Sequence[float], games: int,
+              confidence: float = DEFAULT_CONFIDENCE,
+              method: IntervalMethod = IntervalMethod.WILSON) -> Dict[str, Tuple[float, float]]:
+    """Interval per player name"""
+    return {name: interval(won, games, confidence, method) for name, won in zip(names, wins)}
+
+
+def leader_separated(bounds: Dict[str, Tuple[float, float]]) -> bool:
+    """True when the player with the highest lower bound is above every other upper bound"""
+    if len(bounds) < 2:
+        return True
+    leader = max(bounds, key=lambda name: bounds[name][0])
+    return all(bounds[leader][0] > high for name, (_, high) in bounds.items() if name != leader)
+
+
+class StoppingRule:
+    """
+    Target-precision stopping for a simulation: stop when every interval's
+    half-width is at most epsilon, or when the leader is statistically separated.
+    """
+
+    PRECISION = 'precision'
+    SEPARATED = 'leader_separated'
+
+    def __init__(self, epsilon: float, confidence: float = DEFAULT_CONFIDENCE,
+                 method: IntervalMethod = IntervalMethod.WILSON, min_games: int = 1):
+        self.epsilon = epsilon
+        self.confidence = confidence
+        self.method = method
+        self.min_games = min_games
+
+    def check(self, names: Sequence[str], wins: Sequence[float], games: int) -> Optional[str]:
+        """Reason to stop after games rollouts, or None to keep going"""
+        if games < self.min_games:
+            return None
+        bounds = intervals(names, wins, games, self.confidence, self.method)
+        if all((high - low) / 2.0 <= self.epsilon for low, high in bounds.values()):
+            return self.PRECISION
+        if leader_separated(bounds):
+            return self.SEPARATED
+        return None
@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import List, Optional
 import os
 
 
@@ -29,6 +29,46 @@ class Settings(BaseSettings):
     PAY_PER_GAME_PRICE: int = 100  # $1.00 in cents
     MONTHLY_SUBSCRIPTION_PRICE: int = 1500  # $15.00 in cents
     
+    # Analysis result cache
+    ANALYSIS_CACHE_SIZE: int = 1024
+    ANALYSIS_CACHE_TTL_SECONDS: float = 300.0
+    
+    # Board summaries kept for incremental re-analysis after card operations
+    INCREMENTAL_CACHE_SIZE: int = 1024
+    
+    # Search time (timeBudgetMs) one /analyze/batch call may spend across its items
+    ANALYSIS_BATCH_TIME_BUDGET_MS: int = 60000
+    
+    # Interval between interim updates on the streaming endpoints
+    STREAM_REPORT_MS: float = 50.0
+    
+    # Worker processes of the shared simulation pool (one per core when not set)
+    SIMULATION_POOL_WORKERS: Optional[int] = None
+    
+    # Background simulation jobs; set SIMULATION_JOB_DB to a SQLite file path to keep jobs across restarts
+    SIMULATION_JOB_WORKERS: int = 2
+    SIMULATION_JOB_QUEUE_SIZE: int = 64
+    SIMULATION_JOB_HISTORY: int = 1000
+    SIMULATION_JOB_DB: Optional[str] = None
+    
+    # Exact endgame solver: used when at most ENDGAME_DECK_THRESHOLD cards are left to draw, or a
+    # player is one set from winning and at most ENDGAME_MISSING_CARDS cards short of it
+    ENDGAME_DECK_THRESHOLD: int = 6
+    ENDGAME_MISSING_CARDS: int = 1
+    ENDGAME_HORIZON_TURNS: int = 2
+    ENDGAME_MAX_NODES: int = 20000
+    ENDGAME_SAMPLES: int = 4
+    ENDGAME_TIME_BUDGET_MS: float = 200.0  # Most solver time per analysis, taken from its timeBudgetMs/deadlineMs
+    
+    # Most games one /tournament request may play, so it finishes within a request timeout
+    TOURNAMENT_MAX_GAMES: int = 20000
+    
+    # Opening book file (see app.core.opening_book); first-turn analyses are answered from it when set
+    OPENING_BOOK_PATH: Optional[str] = None
+    
+    # Rule sweep directory (see app.core.rule_sweep); rule validation reports measured balance from it when set
+    RULE_SWEEP_PATH: Optional[str] = None
+    
     class Config:
         env_file = ".env"
         case_sensitive = True
@@ -0,0 +1,59 @@
+"""
+Wall-clock deadline shared by the phases of one analysis.
+
+An analysis runs in phases of growing cost: encoding and per-player evaluation,
+the one-ply card analysis, expected values over hidden hands and the forward
+search. Each later phase checks the Deadline before (and while) it runs and
+stops early when time is up; the answer is built from whatever the phases have
+produced so far. A phase that was cut short marks the deadline as truncated,
+which is reported back as the response's completed flag.
+"""
+
+import time
+from typing import Optional
+
+
+class Deadline:
+    """Deadline budget_ms after construction; None means unbounded"""
+
+    __slots__ = ('started', 'at', 'truncated')
+
+    def __init__(self, budget_ms: Optional[float] = None):
+        self.started = time.perf_counter()
+        self.at = self.started + budget_ms / 1000.0 if budget_ms else None
+        self.truncated = False
+
+    @property
+    def bounded(self) -> bool:
+        return self.at is not None
+
+    @property
+    def completed(self) -> bool:
+        """True while no phase has been cut short"""
+        return not self.truncated
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self.started) * 1000.0
+
+    def remaining_ms(self) -> float:
+        if self.at is None:
+            return float('inf')
+        return max(0.0, (self.at - time.perf_counter()) * 1000.0)
+
+    def expired(self) -> bool:
+        return self.at is not None and time.perf_counter() >= self.at
+
+    def check(self) -> bool:
+        """True when there is time left; otherwise records that a phase was cut short"""
+        if self.expired():
+            self.truncated = True
+            return False
+        return True
+
+    def clip(self, budget_ms: float) -> float:
+        """Budget for a phase that wants budget_ms, cut to the time remaining"""
+        remaining = self.remaining_ms()
+        if budget_ms > remaining:
+            self.truncated = True
+            return remaining
+        return budget_ms
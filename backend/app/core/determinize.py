@@ -0,0 +1,119 @@
+"""
+Determinized sampling of hidden information.
+
+Opponents' hands (beyond the cards known from PlayerState.hand) and the deck
+order are hidden. The information set is the unseen pool: the standard
+106-card composition minus every visible card (known hands, banks,
+properties, discard), already tracked as CompactGameState.unseen. A
+determinization deals each seat's hidden hand cards and then the deck from
+one random permutation of that pool, so every sample is consistent with the
+card counts.
+
+K samples are drawn in one NumPy pass: argsort of a (K, pool) matrix of
+uniform keys gives K independent permutations, hidden hands are counted
+with a single bincount and the decks are the remaining columns.
+
+Antithetic sampling pairs every deal with its seat-rotated partner: each
+hidden hand moves to the next seat with the same number of hidden cards,
+and the deck's turn-sized draw blocks (counted from the top) rotate by one
+seat within every round, so the draws one seat got go to the next. The
+partner is a fixed permutation of card positions, so it is as likely as
+the deal itself, and the luck the two deals hand each seat pulls their
+outcomes in opposite directions, which lowers the variance of their mean.
+"""
+
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from app.core.cards import NUM_KINDS
+from app.core.compact_state import CompactGameState
+
+
+DEFAULT_SAMPLES = 64
+_DRAW_BLOCK = 2  # Cards a seat draws per turn: the unit antithetic deals rotate
+
+
+class Determinizations:
+    """K sampled deals: hands (K, players, kinds) hidden-card counts and decks (K, deck) in draw order"""
+
+    __slots__ = ('hands', 'decks')
+
+    def __init__(self, hands: np.ndarray, decks: np.ndarray):
+        self.hands = hands
+        self.decks = decks
+
+    def __len__(self) -> int:
+        return self.decks.shape[0]
+
+    def sample(self, index: int) -> Tuple[List[List[int]], List[int]]:
+        """One deal as plain lists, the form rollouts consume"""
+        return self.hands[index].tolist(), self.decks[index].tolist()
+
+
+class HiddenInformation:
+    """
+    Sampler for one position's information set. Built once per state; every
+    sample() call draws a fresh batch of determinizations.
+    """
+
+    def __init__(self, state: CompactGameState):
+        self.num_players = state.num_players
+        self.pool = np.repeat(np.arange(NUM_KINDS), state.unseen)
+        # Hidden hand slots are dealt first (seat by seat), the deck gets what is left
+        hidden = np.asarray(state.hidden or [0] * self.num_players, dtype=np.int64)
+        size = len(self.pool)
+        dealt = np.minimum(np.cumsum(hidden), size)
+        self.hidden = np.diff(dealt, prepend=0)
+        self.hand_slots = int(dealt[-1]) if len(dealt) else 0
+        self.seats = np.repeat(np.arange(self.num_players), self.hidden)
+        self.deck_count = min(state.deck_count, size - self.hand_slots)
+        self.partner = self._partner_positions()
+
+    @property
+    def has_hidden_hands(self) -> bool:
+        return self.hand_slots > 0
+
+    def _partner_positions(self) -> np.ndarray:
+        """Card position of the antithetic partner deal that each position takes its card from"""
+        partner = np.arange(len(self.pool))
+        starts = np.cumsum(self.hidden) - self.hidden
+        for seat in range(self.num_players):
+            # The next seat with as many hidden cards hands this seat its hand
+            for offset in range(1, self.num_players):
+                source = (seat - offset) % self.num_players
+                if self.hidden[source] == self.hidden[seat]:
+                    partner[starts[seat]:starts[seat] + self.hidden[seat]] = \
+                        np.arange(starts[source], starts[source] + self.hidden[source])
+                    break
+        # Deck positions are drawn from the end; rotate whole rounds of draw blocks by one seat
+        top = self.hand_slots + self.deck_count - 1
+        round_size = _DRAW_BLOCK * self.num_players
+        for first in range(0, self.deck_count - round_size + 1, round_size):
+            for block in range(self.num_players):
+                source = (block - 1) % self.num_players
+                for card in range(_DRAW_BLOCK):
+                    partner[top - first - block * _DRAW_BLOCK - card] = top - first - source * _DRAW_BLOCK - card
+        return partner
+
+    def sample(self, k: int, rng: Optional[np.random.Generator] = None,
+               antithetic: bool = False) -> Determinizations:
+        """Draw k determinizations; antithetic ones come in pairs (rows 2i, 2i + 1) of partner deals"""
+        rng = rng if rng is not None else np.random.default_rng()
+        if antithetic:
+            order = np.argsort(rng.random(((k + 1) // 2, len(self.pool))), axis=1)
+            order = np.stack([order, order[:, self.partner]], axis=1).reshape(-1, len(self.pool))[:k]
+        else:
+            order = np.argsort(rng.random((k, len(self.pool))), axis=1)
+        deals = self.pool[order[:, :self.hand_slots + self.deck_count]]
+
+        cells = self.num_players * NUM_KINDS
+        index = (np.arange(k)[:, None] * cells + self.seats * NUM_KINDS + deals[:, :self.hand_slots]).ravel()
+        hands = np.bincount(index, minlength=k * cells).reshape(k, self.num_players, NUM_KINDS)
+        return Determinizations(hands, deals[:, self.hand_slots:])
+
+
+def sample_determinizations(state: CompactGameState, k: int = DEFAULT_SAMPLES,
+                            rng: Optional[np.random.Generator] = None) -> Determinizations:
+    """K consistent deals of the hidden hands and deck of state"""
+    return HiddenInformation(state).sample(k, rng)
@@ -0,0 +1,531 @@
+"""
+Exact solver for near-terminal positions.
+
+When a player is one set from winning and a card or so short of it, or the
+deck is nearly empty, the game is usually decided within a turn or two and
+exhaustive search is tractable. EndgameSolver searches the next `horizon`
+turns exactly:
+
+- decision nodes: every legal play (app.core.moves) of the player to move;
+  player 0 maximizes their win probability, every opponent minimizes it;
+- chance nodes: each card drawn (turn start and Pass Go) is one node over the
+  unseen pool, weighted by the count of each kind. The deck is a uniformly
+  random subset of that pool, so drawing from the pool until deckCount cards
+  are gone is exact. Deck exhaustion follows DeckExhaustionRule: RESHUFFLE
+  turns the discard pile into the new pool, GAME_OVER ends the game at the
+  next turn-start draw with the leader winning, as in rollouts.
+
+Payments, Just Say No responses and hand-limit discards follow the rollout
+rules (app.core.simulation), so nodes are _Rollout copies and every card
+behaves exactly as it does in simulation.
+
+Values are (lower, upper) bounds on player 0's win probability: a decided
+game is exact, a position still open when the horizon ends is (0, 1).
+Positions are memoized on their full contents, so transpositions (play
+orders, draw orders) are solved once. Pruning uses the bound that a game is
+only won with three complete sets: a decision node stops at the first play
+that wins for the player to move, and on the last turn of the horizon a
+player who cannot possibly complete the missing sets with the plays left
+(counting every property the opponents hold as reachable when they hold a
+steal or charge card) leaves the position open without expanding it.
+
+The horizon is deepened one turn at a time within a node budget
+(ENDGAME_MAX_NODES); positions left unexpanded when the budget or a deadline
+runs out stay open, so the bounds are always sound. Positions whose bounds
+cannot close within the horizon at all are not solved (can_close). Hidden hand
+cards are determinized: each sampled deal is solved exactly and the recommended line
+is the one with the best mean value over the deals.
+"""
+
+import random
+import time
+from itertools import chain
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from pydantic import BaseModel
+
+from app.core.cards import (
+    CardCategory, NUM_COLORS, NUM_KINDS, SET_SIZES, RENT_TABLE, HOUSE_RENT, HOTEL_RENT,
+    KIND_CATEGORY, KIND_COLORS, DEAL_BREAKER, SLY_DEAL, FORCED_DEAL, DEBT_COLLECTOR, BIRTHDAY,
+    PASS_GO, DOUBLE_RENT, JUST_SAY_NO
+)
+from app.core.compact_state import CompactGameState
+from app.core.config import settings
+from app.core.deadline import Deadline
+from app.core.determinize import HiddenInformation
+from app.core.moves import Move, END_TURN, PLAYS_PER_TURN, generate_moves
+from app.core.simulation import GameSimulator, SETS_TO_WIN, _Rollout
+from app.models.game import EdgeRules
+
+
+WIN = (1.0, 1.0)
+LOSS = (0.0, 0.0)
+OPEN = (0.0, 1.0)
+Bounds = Tuple[float, float]
+
+_COLOR_RANGE = range(NUM_COLORS)
+_OPENING_DRAW = 5
+_TURN_DRAW = 2
+_CHECK_EVERY = 1024  # nodes between deadline checks
+
+_PLACEABLE = (CardCategory.PROPERTY, CardCategory.WILD)
+_CHARGE_KINDS = tuple(kind for kind in range(NUM_KINDS) if KIND_CATEGORY[kind] == CardCategory.RENT) \
+    + (DEBT_COLLECTOR, BIRTHDAY)
+# Cards that can move an opponent's properties to the player who plays them
+_REACHING_KINDS = _CHARGE_KINDS + (DEAL_BREAKER, SLY_DEAL, FORCED_DEAL)
+# Largest rent a rent card can charge before doubling: full set with a house and a hotel
+_MAX_RENT = tuple(
+    max((RENT_TABLE[color][-1] + HOUSE_RENT + HOTEL_RENT for color in KIND_COLORS[kind]), default=0)
+    for kind in range(NUM_KINDS)
+)
+
+
+def cards_short(state: CompactGameState, player: int) -> int:
+    """Property cards player still needs for their next complete set (0 once they have won)"""
+    if state.complete_sets(player) >= SETS_TO_WIN:
+        return 0
+    return min(size - count for count, size in zip(state.props[player], SET_SIZES) if count < size)
+
+
+def is_endgame(state: CompactGameState, deck_threshold: Optional[int] = None,
+               missing_cards: Optional[int] = None,
+               complete: Optional[Sequence[int]] = None) -> bool:
+    """
+    At most deck_threshold cards are left to draw, or a player is one set from winning
+    and at most missing_cards cards short of it. complete holds the players' complete
+    set counts when the caller already keeps them.
+    """
+    deck_threshold = settings.ENDGAME_DECK_THRESHOLD if deck_threshold is None else deck_threshold
+    missing_cards = settings.ENDGAME_MISSING_CARDS if missing_cards is None else missing_cards
+    if not state.num_players:
+        return False
+    if state.deck_count <= deck_threshold:
+        return True
+    complete = complete if complete is not None else [state.complete_sets(player)
+                                                      for player in range(state.num_players)]
+    return any(sets >= SETS_TO_WIN - 1 and cards_short(state, player) <= missing_cards
+               for player, sets in enumerate(complete))
+
+
+class EndgameResult(BaseModel):
+    """Outcome of an endgame solve for player 0"""
+    winProbability: float  # midpoint of the bounds
+    lowerBound: float
+    upperBound: float
+    proven: bool  # the bounds meet: the value is exact for every solved deal
+    bestLine: List[str]
+    bestMoves: List[Move] = []
+    bestAction: str
+    nodes: int
+    determinizations: int  # sampled hidden-hand deals (0 when every hand is known)
+    horizon: int
+    elapsedMs: float
+    completed: bool = True  # False when the node budget or a deadline cut the search
+
+
+class _Position(_Rollout):
+    """A rollout copy with the draw pile kept as counts and the turn structure made explicit"""
+
+    __slots__ = ('pool', 'deck_left', 'pending', 'turn_draw', 'player', 'plays_left', 'turns_left')
+
+    def draw(self, player: int, count: int) -> bool:
+        # Draws become chance nodes in the solver instead of popping a fixed deck order
+        self.pending += count
+        return True
+
+    def clone(self) -> "_Position":
+        child = _Position.__new__(_Position)
+        self.copy_into(child)
+        child.sim = self.sim
+        child.rng = self.rng
+        child.n = self.n
+        child.deck = self.deck
+        child.weights = self.weights
+        child.winner = self.winner
+        child.over = self.over
+        child.pool = self.pool[:]
+        child.deck_left = self.deck_left
+        child.pending = self.pending
+        child.turn_draw = self.turn_draw
+        child.player = self.player
+        child.plays_left = self.plays_left
+        child.turns_left = self.turns_left
+        return child
+
+    def key(self, reshuffle: bool) -> tuple:
+        parts = [self.banks, self.pool]
+        if self.turns_left == 1:
+            # On the last turn searched, a waiting hand only matters for Just Say No responses
+            mover = self.player
+            parts.append(self.hands[mover])
+            parts.append([hand[JUST_SAY_NO] if seat != mover else 0 for seat, hand in enumerate(self.hands)])
+            parts.append([min(size, 2) if seat != mover else 0 for seat, size in enumerate(self.hand_sizes)])
+        else:
+            parts.extend(self.hands)
+        for zone in (self.props, self.prop_values, self.houses, self.hotels):
+            parts.extend(zone)
+        key = tuple(chain.from_iterable(parts))
+        flags = (self.deck_left, self.pending, self.turn_draw, self.player, self.plays_left, self.turns_left)
+        return key + flags + (tuple(sorted(self.discard)) if reshuffle else ())
+
+
+class EndgameSolver:
+    """
+    Memoized expectiminimax over the next few turns, for player 0.
+    Rules are taken from the simulator, so one solver serves one EdgeRules set.
+    """
+
+    def __init__(self, edge_rules: Optional[EdgeRules] = None, horizon: Optional[int] = None,
+                 max_nodes: Optional[int] = None, characters: Sequence[str] = (),
+                 character_weights: Optional[Dict[str, Dict[str, float]]] = None,
+                 simulator: Optional[GameSimulator] = None):
+        self.simulator = simulator or GameSimulator(edge_rules, character_weights=character_weights)
+        self.horizon = max(1, settings.ENDGAME_HORIZON_TURNS if horizon is None else horizon)
+        self.max_nodes = settings.ENDGAME_MAX_NODES if max_nodes is None else max_nodes
+        self.characters = list(characters)
+        self.reshuffle = self.simulator.reshuffle
+        self.move_rules = self.simulator.move_rules
+        self._memo: Dict[tuple, Bounds] = {}
+        self._nodes = 0
+        self._limit = self.max_nodes
+        self._truncated = False
+        self._deadline: Optional[Deadline] = None
+
+    # ------------------------------------------------------------------ search
+
+    def value(self, position: _Position) -> Bounds:
+        """(lower, upper) bounds on player 0's win probability"""
+        if position.winner >= 0:
+            return WIN if position.winner == 0 else LOSS
+        if position.turns_left == 1 and position.plays_left <= 0:
+            # The last turn searched is over; cards still to draw cannot be played before the horizon
+            return OPEN
+        key = position.key(self.reshuffle)
+        cached = self._memo.get(key)
+        if cached is not None:
+            return cached
+        if self._deadline is not None and self._nodes % _CHECK_EVERY == 0 and self._deadline.expired():
+            self._limit = self._nodes
+        if self._nodes >= self._limit:
+            # Out of budget: the position stays open (a sound but loose bound, not memoized)
+            self._truncated = True
+            return OPEN
+        self._nodes += 1
+
+        if position.pending:
+            bounds = self._draw_value(position)
+        elif position.plays_left <= 0:
+            bounds = self._turn_end_value(position)
+        else:
+            bounds = self._decision_value(position)
+        self._memo[key] = bounds
+        return bounds
+
+    def _draw_value(self, position: _Position) -> Bounds:
+        """Chance node: the active player draws one card"""
+        if position.deck_left == 0:
+            child = position.clone()
+            if not self.reshuffle:
+                if child.turn_draw:
+                    # The game ends at a turn-start draw from an empty deck; the leader wins
+                    return WIN if child.leader() == 0 else LOSS
+                child.pending = 0
+            elif not child.discard:
+                child.pending = 0
+            else:
+                child.pool = np.bincount(child.discard, minlength=NUM_KINDS).tolist()
+                child.deck_left = len(child.discard)
+                child.discard = []
+            if not child.pending:
+                child.turn_draw = False
+            return self.value(child)
+
+        total = sum(position.pool)
+        player = position.player
+        lower = upper = 0.0
+        for kind, count in enumerate(position.pool):
+            if not count:
+                continue
+            child = position.clone()
+            child.pool[kind] -= 1
+            child.deck_left -= 1
+            child.hands[player][kind] += 1
+            child.hand_sizes[player] += 1
+            child.pending -= 1
+            if not child.pending:
+                child.turn_draw = False
+            child_lower, child_upper = self.value(child)
+            lower += count * child_lower
+            upper += count * child_upper
+        return lower / total, upper / total
+
+    def _turn_end_value(self, position: _Position) -> Bounds:
+        """Discard to the hand limit and start the next player's turn (or stop at the horizon)"""
+        child = position.clone()
+        child.discard_to_limit(child.player)
+        child.turns_left -= 1
+        if child.turns_left <= 0:
+            return OPEN
+        child.player = (child.player + 1) % child.n
+        child.plays_left = PLAYS_PER_TURN
+        child.pending = _OPENING_DRAW if child.hand_sizes[child.player] == 0 else _TURN_DRAW
+        child.turn_draw = True
+        if child.turns_left == 1 and (self.reshuffle or child.deck_left >= child.pending) \
+                and self._cannot_decide(child):
+            return OPEN
+        return self.value(child)
+
+    def _decision_value(self, position: _Position) -> Bounds:
+        """The player to move picks the play that is best for them"""
+        player = position.player
+        if position.turns_left == 1 and self._cannot_decide(position):
+            return OPEN
+        maximize = player == 0
+        children = []
+        for move in generate_moves(position, player, self.move_rules, position.plays_left):
+            child = self.apply(position, move)
+            if child.winner >= 0 and (child.winner == 0) == maximize:
+                # Three complete sets end the game: nothing can beat a winning play
+                return WIN if maximize else LOSS
+            children.append(child)
+
+        pick = max if maximize else min
+        lower, upper = (0.0, 0.0) if maximize else (1.0, 1.0)
+        for child in children:
+            child_lower, child_upper = self.value(child)
+            lower, upper = pick(lower, child_lower), pick(upper, child_upper)
+            if (maximize and lower >= 1.0) or (not maximize and upper <= 0.0):
+                break
+        return lower, upper
+
+    def apply(self, position: _Position, move: Move) -> _Position:
+        """The position after the player to move makes a play"""
+        child = position.clone()
+        if move == END_TURN:
+            child.plays_left = 0
+            return child
+        used = child.play(child.player, move.kind, move.color, child.plays_left, move.target, move.give,
+                          move.doubles)
+        child.plays_left -= used
+        return child
+
+    # ------------------------------------------------------------------ bounds
+
+    def _cannot_decide(self, position: _Position) -> bool:
+        """
+        On the last turn of the horizon: True when no play sequence can end the game
+        in a way the player to move would choose, so the position stays open.
+        The mover only aims for their own win; an opponent (minimizing player 0's
+        chances) for any opponent's win, which another seat can only get from the
+        mover's Forced Deal.
+        """
+        mover = position.player
+        if not self._out_of_reach(position, mover, active=True):
+            return False
+        if mover == 0 or position.n == 2:
+            return True
+        return all(self._out_of_reach(position, seat, active=False)
+                   for seat in range(1, position.n) if seat != mover)
+
+    def _out_of_reach(self, position: _Position, seat: int, active: bool) -> bool:
+        """
+        seat cannot reach SETS_TO_WIN complete sets in the plays left this turn.
+        Each property card gained costs a play, except that a Deal Breaker takes a whole
+        set and a charge paid in properties can hand over several cards at once.
+        """
+        needed = SETS_TO_WIN - position.complete_sets(seat)
+        if needed <= 0:
+            return False
+        plays = position.plays_left
+        if plays <= 0:
+            return True
+        mover = position.player
+        hand = position.hands[mover]
+        mine = position.props[seat]
+        n = position.n
+        if position.pending or hand[PASS_GO]:
+            # Cards still to come: any property and any steal or charge card may turn up
+            supply = None
+            reach = any(hand[kind] for kind in _REACHING_KINDS) or any(position.pool[kind] for kind in _REACHING_KINDS)
+            if not active:
+                reach = False
+                if not (hand[FORCED_DEAL] or position.pool[FORCED_DEAL]):
+                    return True
+        elif not active:
+            # A seat that is not moving only receives the card handed over in the mover's Forced Deal
+            if not hand[FORCED_DEAL]:
+                return True
+            supply, reach = None, False
+        else:
+            reach = self._charges_take_properties(position, seat)
+            supply = [0] * NUM_COLORS
+            for kind, count in enumerate(hand):
+                if count and KIND_CATEGORY[kind] in _PLACEABLE:
+                    for color in KIND_COLORS[kind]:
+                        supply[color] += count
+            steals = hand[SLY_DEAL] + hand[FORCED_DEAL]
+
+        costs = []
+        for color in _COLOR_RANGE:
+            size = SET_SIZES[color]
+            if mine[color] >= size:
+                continue
+            others = sum(position.props[other][color] for other in range(n) if other != seat)
+            if reach:
+                costs.append(max(0, size - mine[color] - others))
+                continue
+            missing = size - mine[color]
+            if supply is not None and missing > supply[color] + min(steals, others):
+                continue
+            costs.append(missing)
+        if active and supply is not None and not reach and hand[DEAL_BREAKER]:
+            complete_elsewhere = sum(1 for other in range(n) if other != seat
+                                     for color in _COLOR_RANGE if position.props[other][color] >= SET_SIZES[color])
+            costs.extend([1] * min(hand[DEAL_BREAKER], complete_elsewhere))
+        if len(costs) < needed:
+            return True
+        costs.sort()
+        return sum(costs[:needed]) > plays
+
+    def _charges_take_properties(self, position: _Position, seat: int) -> bool:
+        """A charge card in the mover's hand could be paid (partly) in property cards"""
+        hand = position.hands[seat]
+        amount = 0
+        for kind in _CHARGE_KINDS:
+            if hand[kind]:
+                if kind == DEBT_COLLECTOR:
+                    amount = max(amount, 5)
+                elif kind == BIRTHDAY:
+                    amount = max(amount, 2)
+                else:
+                    doubles = min(hand[DOUBLE_RENT], self.move_rules.doubles_allowed[position.plays_left])
+                    amount = max(amount, _MAX_RENT[kind] << doubles)
+        if amount == 0:
+            return False
+        return any(position.banks[other] < amount and any(position.props[other])
+                   for other in range(position.n) if other != seat)
+
+    # ------------------------------------------------------------------- roots
+
+    def can_close(self, state: CompactGameState) -> bool:
+        """
+        False when solving cannot move the bounds off (0, 1): the deck is not running out,
+        player 0 cannot complete the missing sets this turn and no opponent is one set
+        from winning, so every horizon leaves the root open
+        """
+        if state.deck_count <= settings.ENDGAME_DECK_THRESHOLD or state.hidden[0]:
+            return True
+        if any(state.complete_sets(seat) >= SETS_TO_WIN - 1 for seat in range(1, state.num_players)):
+            return True
+        return not self._cannot_decide(self._root(state, None, 1))
+
+    def _root(self, state: CompactGameState, hidden_hands: Optional[List[List[int]]], horizon: int) -> _Position:
+        weights = self.simulator.seat_weights(self.characters, state.num_players)
+        deal = (hidden_hands or [[0] * NUM_KINDS for _ in range(state.num_players)], [])
+        position = _Position(self.simulator, state, [], weights, random.Random(0), deal)
+        pool = list(state.unseen)
+        if hidden_hands:
+            pool = [count - sum(hand[kind] for hand in hidden_hands) for kind, count in enumerate(pool)]
+        position.pool = pool
+        position.deck_left = min(state.deck_count, sum(pool))
+        position.pending = 0
+        position.turn_draw = False
+        position.player = 0
+        position.plays_left = PLAYS_PER_TURN
+        position.turns_left = horizon
+        return position
+
+    def solve(self, state: CompactGameState, samples: Optional[int] = None, seed: Optional[int] = None,
+              deadline: Optional[Deadline] = None) -> EndgameResult:
+        """
+        Solve player 0's turn (player 0 to play, cards already drawn) and the turns after it.
+
+        The horizon is deepened one turn at a time while the node budget lasts; the
+        result is the deepest one searched completely (or the first, if even that
+        ran out of budget). A proven value stops the deepening.
+
+        Args:
+            state: Position to solve
+            samples: Deals of the hidden hand cards to solve (ENDGAME_SAMPLES by default);
+                unused when every hand is known
+            seed: Seed for the hidden-hand deals
+            deadline: Hard stop; unexpanded positions then stay open
+
+        Returns:
+            EndgameResult with player 0's win-probability bounds and best line
+        """
+        started = time.perf_counter()
+        self._nodes = 0
+        self._limit = self.max_nodes
+        self._deadline = deadline
+
+        hidden = HiddenInformation(state)
+        hands = [None]
+        if hidden.has_hidden_hands:
+            count = max(1, settings.ENDGAME_SAMPLES if samples is None else samples)
+            deals = hidden.sample(count, np.random.default_rng(seed))
+            hands = [deals.hands[index].tolist() for index in range(count)]
+
+        result = None
+        for horizon in range(1, self.horizon + 1):
+            self._memo = {}
+            self._truncated = False
+            line, (lower, upper) = self._best_line([self._root(state, deal, horizon) for deal in hands])
+            if result is not None and self._truncated:
+                break
+            result = EndgameResult(
+                winProbability=(lower + upper) / 2,
+                lowerBound=lower,
+                upperBound=upper,
+                proven=upper - lower < 1e-9,
+                bestLine=[move.describe(state.names) for move in line],
+                bestMoves=line,
+                bestAction=(line[0] if line else END_TURN).action,
+                nodes=self._nodes,
+                determinizations=len(hands) if hidden.has_hidden_hands else 0,
+                horizon=horizon,
+                elapsedMs=0.0,
+                completed=not self._truncated
+            )
+            if result.proven or self._truncated:
+                break
+        result.nodes = self._nodes
+        result.elapsedMs = (time.perf_counter() - started) * 1000.0
+        return result
+
+    def _best_line(self, positions: List[_Position]) -> Tuple[List[Move], Bounds]:
+        """
+        Player 0's plays this turn with the best mean bounds over the deals, and those bounds.
+        The line stops at the end of the turn, a win, or a draw (Pass Go), after which the
+        deals no longer share one continuation.
+        """
+        line: List[Move] = []
+        root_bounds = None
+        while all(position.winner < 0 and not position.pending and position.plays_left > 0
+                  for position in positions):
+            options = [generate_moves(position, 0, self.move_rules, position.plays_left) for position in positions]
+            shared = [move for move in options[0] if all(move in moves for moves in options[1:])]
+            candidates = [(move, [self.apply(position, move) for position in positions]) for move in shared]
+            # Plays that win on the spot in every deal come first, so the line takes the shortest win
+            candidates.sort(key=lambda candidate: not all(child.winner == 0 for child in candidate[1]))
+            best_move, best_bounds, best_children = None, None, None
+            for move, children in candidates:
+                bounds = self._mean(children)
+                if best_bounds is None or bounds > best_bounds:
+                    best_move, best_bounds, best_children = move, bounds, children
+                if bounds[0] >= 1.0:
+                    break
+            if best_move is None:
+                break
+            line.append(best_move)
+            if root_bounds is None:
+                root_bounds = best_bounds
+            if best_move == END_TURN:
+                break
+            positions = best_children
+        return line, root_bounds if root_bounds is not None else self._mean(positions)
+
+    def _mean(self, positions: List[_Position]) -> Bounds:
+        values = [self.value(position) for position in positions]
+        return sum(value[0] for value in values) / len(values), sum(value[1] for value in values) / len(values)
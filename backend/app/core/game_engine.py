@@ -4,10 +4,29 @@ Handles game logic, analysis, and AI recommendations with comprehensive rule val
 Based on research: "Implementation of Artificial Intelligence with 3 Different Characters of AI Player on Monopoly Deal Computer Game"
 """
 
-from typing import Dict, List, Any, Tuple, Optional
-from app.models.game import GameState, AnalysisResponse, AIStrategy
+import math
+import threading
+from functools import lru_cache
+from typing import Dict, Iterator, List, Any, Tuple, Optional, Sequence
+import numpy as np
+from app.models.game import GameState, AnalysisResponse, AIStrategy, EdgeRules, IntervalMethod
+from app.core.parallel_simulation import ParallelSimulator
+from app.core.confidence import StoppingRule, DEFAULT_CONFIDENCE
+from app.core.config import settings
+from app.core.deadline import Deadline
+from app.core.compact_state import CompactGameState
+from app.core.simulation import GameSimulator
+from app.core.search import TurnSearch, SearchResult
+from app.core.endgame import EndgameSolver, EndgameResult, is_endgame
+from app.core import batch_eval, zobrist
+from app.core.determinize import HiddenInformation, DEFAULT_SAMPLES
+from app.core.moves import kind_moves
+from app.core.rule_kernel import compile_rules
+from app.core.cards import (
+    CardCategory, Card, CARDS, COLOR_INDEX, COLORS, SET_SIZES, NUM_KINDS, KIND_CATEGORY, KIND_VALUE,
+    DOUBLE_RENT, DEAL_BREAKER, SLY_DEAL, FORCED_DEAL, DEBT_COLLECTOR, BIRTHDAY, lookup_card
+)
 from enum import Enum
-import random
 
 
 class PlayerCharacter(Enum):
@@ -34,6 +53,20 @@ class MonopolyDealEngine:
     Implements BFS algorithm with 3 character types and asset evaluation methods
     """
     
+    # Win probability scaling per game phase
+    _PHASE_MULTIPLIERS = {
+        GamePhase.EARLY: 0.8,   # Less predictable early game
+        GamePhase.MIDDLE: 1.0,  # Standard calculation
+        GamePhase.LATE: 1.2     # More decisive late game
+    }
+    
+    # Card categories counted as action cards by the value evaluation
+    _ACTION_CATEGORIES = (CardCategory.ACTION, CardCategory.BUILDING)
+    # Hand kinds that allow rent collection (every card with "rent" in its name)
+    _RENT_KINDS = tuple(
+        kind for kind in range(NUM_KINDS) if KIND_CATEGORY[kind] == CardCategory.RENT
+    ) + (DOUBLE_RENT,)
+    
     def __init__(self, edge_rules=None):
         self.edge_rules = edge_rules
         self.property_values = {
@@ -91,17 +124,28 @@ class MonopolyDealEngine:
                 'money_hoarding': 1.0
             }
         }
+        
+        # Rule-derived tables built once per engine (engines are shared via get_engine)
+        self.character_weights = {c.value: weights for c, weights in self.character_multipliers.items()}
+        self.simulator = GameSimulator(edge_rules, character_weights=self.character_weights) if edge_rules else None
+        kernel = compile_rules(edge_rules)
+        self.move_rules = kernel.moves
+        self.rules_code = kernel.code
     
     def calculate_game_phase(self, game_state: GameState) -> GamePhase:
         """Calculate current game phase based on research formula"""
-        total_cards = 106  # Standard Monopoly Deal deck
-        cards_dealt_beginning = len(game_state.players) * 5
         cards_in_play = sum(len(player.hand) + len(player.bank) + 
                            sum(len(props) for props in player.properties.values()) 
                            for player in game_state.players)
+        return self.game_phase_for(len(game_state.players), cards_in_play)
+    
+    def game_phase_for(self, num_players: int, cards_in_play: int) -> GamePhase:
+        """calculate_game_phase from the player count and the number of cards in play"""
+        total_cards = 106  # Standard Monopoly Deal deck
+        cards_dealt_beginning = num_players * 5
         
         # Estimate cycles based on cards dealt
-        cycles = (total_cards - cards_dealt_beginning - cards_in_play) // (2 * len(game_state.players))
+        cycles = (total_cards - cards_dealt_beginning - cards_in_play) // (2 * num_players)
         
         if cycles <= 3:
             return GamePhase.EARLY
@@ -189,56 +233,96 @@ class MonopolyDealEngine:
         value_score = self.evaluate_assets_value(player_data)
         return (logical_score + value_score) / 2
     
+    def evaluate_compact_logical(self, compact: CompactGameState, player: int) -> float:
+        """Logical asset evaluation on the compact state (same scoring as evaluate_assets_logical)"""
+        score = 0.0
+        for count, size in zip(compact.props[player], SET_SIZES):
+            if count >= size:
+                score += 50  # Complete set bonus
+            elif count:
+                score += count / size * 30  # Partial completion
+        score += min(compact.banks[player] * 2, 20)  # Cap money contribution
+        return score
+    
+    def evaluate_compact_value(self, compact: CompactGameState, player: int) -> float:
+        """Value asset evaluation on the compact state (same scoring as evaluate_assets_value)"""
+        score = compact.banks[player] * 3
+        score += (compact.wealth(player) - compact.banks[player]) * 2
+        hand = compact.hands[player]
+        for kind, count in enumerate(hand):
+            if count and KIND_CATEGORY[kind] in self._ACTION_CATEGORIES:
+                score += KIND_VALUE[kind] * count
+        return float(score)
+    
+    def evaluate_compact(self, compact: CompactGameState, player: int, asset_type: AssetEvaluation) -> float:
+        """Evaluate one player of a compact state with the given asset evaluation"""
+        if asset_type == AssetEvaluation.LOGICAL:
+            return self.evaluate_compact_logical(compact, player)
+        if asset_type == AssetEvaluation.VALUE:
+            return self.evaluate_compact_value(compact, player)
+        return (self.evaluate_compact_logical(compact, player) + self.evaluate_compact_value(compact, player)) / 2
+    
     def bfs_decision_tree(self, game_state: GameState, character: PlayerCharacter, 
-                         asset_type: AssetEvaluation) -> List[Dict[str, Any]]:
+                         asset_type: AssetEvaluation,
+                         compact: Optional[CompactGameState] = None,
+                         deadline: Optional[Deadline] = None,
+                         card_moves: Optional[List[Optional[List[Dict[str, Any]]]]] = None) -> List[Dict[str, Any]]:
         """
         BFS implementation for decision making as described in research paper
         Returns prioritized list of possible moves
+        With a deadline, cards not reached in time are left out
+        card_moves holds options per hand card from an earlier analysis (BoardSummary.moves_for):
+        entries that are set are reused, the rest are analyzed and stored
         """
+        compact = compact or CompactGameState.from_game_state(game_state)
         current_player = game_state.players[0]  # Assume first player is current
         moves = []
         
         # Level 1: Analyze each card in hand
-        for card in current_player.hand:
-            move_options = self._analyze_card_bfs(card, game_state, character, asset_type)
+        for index, (card, kind) in enumerate(zip(current_player.hand, compact.hand_kinds[0])):
+            move_options = card_moves[index] if card_moves is not None else None
+            if move_options is None:
+                if deadline is not None and moves and not deadline.check():
+                    break
+                move_options = self._analyze_card_bfs(card, kind, compact, character, asset_type)
+                if card_moves is not None:
+                    card_moves[index] = move_options
             moves.extend(move_options)
         
         # Level 2: Analyze combinations and strategic plays
-        strategic_moves = self._analyze_strategic_combinations(game_state, character, asset_type)
-        moves.extend(strategic_moves)
+        if deadline is None or deadline.check():
+            strategic_moves = self._analyze_strategic_combinations(compact, character, asset_type)
+            moves.extend(strategic_moves)
         
         # Sort moves by priority score
         moves.sort(key=lambda x: x.get('priority_score', 0), reverse=True)
         
         return moves[:5]  # Return top 5 moves
     
-    def _analyze_card_bfs(self, card, game_state: GameState, 
+    def _analyze_card_bfs(self, card, kind: int, compact: CompactGameState, 
                          character: PlayerCharacter, asset_type: AssetEvaluation) -> List[Dict[str, Any]]:
-        """Analyze individual card using BFS approach"""
+        """Analyze individual card using BFS approach (kind is pre-classified in the compact state)"""
         moves = []
         
+        # Card record comes from the kind parsed once in CompactGameState
+        record = CARDS[kind] if kind >= 0 else None
+        kind_type = record.engine_type if record else 'action'
+        
         # Handle both string and dict card formats
         if isinstance(card, str):
-            card_name = card
-            # Infer card type from name
-            if 'Property' in card_name:
-                card_type = 'property'
-            elif any(money in card_name for money in ['$1M', '$2M', '$3M', '$4M', '$5M', '$10M']):
-                card_type = 'money'
-            else:
-                card_type = 'action'
-            
-            # Convert to dict format
-            card_dict = {'name': card_name, 'type': card_type}
+            card_type = kind_type
+            card_dict = {'name': card, 'type': card_type}
+            if kind_type == 'money':
+                card_dict['value'] = record.value
         else:
-            card_dict = card
-            card_type = card_dict.get('type', '')
+            card_dict = card if isinstance(card, dict) else card.dict()
+            card_type = card_dict.get('type', '') or kind_type
         
         if card_type == 'money':
             moves.append({
                 'action': 'play_money',
                 'card': card_dict,
-                'priority_score': self._calculate_money_priority(card_dict, character, asset_type),
+                'priority_score': self._calculate_money_priority(card_dict, character, asset_type, record),
                 'reasoning': f"Play {card_dict.get('name', 'money card')} to bank for security"
             })
         
@@ -246,90 +330,25 @@ class MonopolyDealEngine:
             moves.append({
                 'action': 'play_property',
                 'card': card_dict,
-                'priority_score': self._calculate_property_priority(card_dict, game_state, character, asset_type),
+                'priority_score': self._calculate_property_priority(card_dict, compact, character, asset_type, record),
                 'reasoning': f"Play {card_dict.get('name', 'property')} to build set"
             })
         
         elif card_type == 'action':
-            action_moves = self._analyze_action_card(card_dict, game_state, character, asset_type)
+            action_moves = self._analyze_action_card(card_dict, compact, character, asset_type, record)
             moves.extend(action_moves)
         
         return moves
     
-    def _analyze_action_card(self, card: dict, game_state: GameState, 
-                           character: PlayerCharacter, asset_type: AssetEvaluation) -> List[Dict[str, Any]]:
-        """Analyze action cards for optimal play"""
-        moves = []
-        card_name = card.get('name', '').lower()
-        current_player = game_state.players[0]
-        opponents = game_state.players[1:]
-        
-        # Handle "It's My Birthday" card
-        if "it's my birthday" in card_name or "birthday" in card_name:
-            if opponents:
-                total_potential = sum(len(getattr(opp, 'bank', [])) for opp in opponents)
-                if total_potential > 0:
-                    moves.append({
-                        'action': 'play_birthday',
-                        'card': card,
-                        'priority_score': total_potential * 15 * self.character_multipliers[character]['action_card_usage'],
-                        'reasoning': f"Use It's My Birthday to collect 2M from each opponent"
-                    })
-        
-        # Handle rent cards
-        elif 'rent' in card_name:
-            # Only suggest if player has properties to charge rent for
-            if current_player.properties and opponents:
-                best_property_set = max(current_player.properties.items(), 
-                                      key=lambda x: len(x[1]) if x[0] in self.rent_values else 0)
-                if best_property_set[0] in self.rent_values:
-                    rent_value = self.rent_values[best_property_set[0]][min(len(best_property_set[1]) - 1, 
-                                                                          len(self.rent_values[best_property_set[0]]) - 1)]
-                    moves.append({
-                        'action': 'play_rent',
-                        'card': card,
-                        'property_set': best_property_set[0],
-                        'rent_value': rent_value,
-                        'priority_score': rent_value * 12 * self.character_multipliers[character]['action_card_usage'],
-                        'reasoning': f"Use rent card to collect {rent_value}M from {best_property_set[0]} properties"
-                    })
-        
-        # Handle other action cards (Deal Breaker, Sly Deal, etc.)
-        elif 'deal breaker' in card_name and character == PlayerCharacter.AGGRESSIVE:
-            # Find best complete set to steal
-            for opponent in opponents:
-                for color, props in getattr(opponent, 'properties', {}).items():
-                    if color in self.complete_sets and len(props) >= self.complete_sets[color]:
-                        moves.append({
-                            'action': 'play_deal_breaker',
-                            'card': card,
-                            'target_set': color,
-                            'priority_score': 50 * self.character_multipliers[character]['action_card_usage'],
-                            'reasoning': f"Use Deal Breaker to steal complete {color} set"
-                        })
-                        break
-        
-        return moves
-    
     def _calculate_money_priority(self, card: dict, character: PlayerCharacter, 
-                                asset_type: AssetEvaluation) -> float:
+                                asset_type: AssetEvaluation, record: Optional[Card] = None) -> float:
         """Calculate priority for playing money cards"""
-        # Extract value from card name if not provided
+        # Take the value from the catalog record if not provided
         base_value = card.get('value', 1)
-        if base_value == 1:  # Default value, try to extract from name
-            card_name = card.get('name', '')
-            if '$1M' in card_name:
-                base_value = 1
-            elif '$2M' in card_name:
-                base_value = 2
-            elif '$3M' in card_name:
-                base_value = 3
-            elif '$4M' in card_name:
-                base_value = 4
-            elif '$5M' in card_name:
-                base_value = 5
-            elif '$10M' in card_name:
-                base_value = 10
+        if base_value == 1:  # Default value, try the card's catalog entry
+            record = record or lookup_card(card.get('name', ''))
+            if record is not None and record.category == CardCategory.MONEY:
+                base_value = record.value
         
         multiplier = self.character_multipliers[character]['money_hoarding']
         
@@ -340,35 +359,24 @@ class MonopolyDealEngine:
         else:  # LOGICAL_VALUE
             return base_value * multiplier * 1.2
     
-    def _calculate_property_priority(self, card: dict, game_state: GameState, 
-                                   character: PlayerCharacter, asset_type: AssetEvaluation) -> float:
+    def _calculate_property_priority(self, card: dict, compact: CompactGameState, 
+                                   character: PlayerCharacter, asset_type: AssetEvaluation,
+                                   record: Optional[Card] = None) -> float:
         """Calculate priority for playing property cards"""
-        current_player = game_state.players[0]
-        
-        # Extract color from card name if not provided
+        # Take the color from the catalog record if not provided
         color = card.get('color', '')
         if not color:
-            card_name = card.get('name', '')
-            # Map card names to colors
-            color_mapping = {
-                'Brown Property': 'brown',
-                'Light Blue Property': 'light-blue', 
-                'Pink Property': 'pink',
-                'Orange Property': 'orange',
-                'Red Property': 'red',
-                'Yellow Property': 'yellow',
-                'Green Property': 'green',
-                'Dark Blue Property': 'dark-blue',
-                'Railroad Property': 'railroad',
-                'Utility Property': 'utility'
-            }
-            color = color_mapping.get(card_name, 'unknown')
+            record = record or lookup_card(card.get('name', ''))
+            colors = record.colors if record is not None else ()
+            # Wild cards go to the color closest to completion
+            color = max(colors, key=lambda c: compact.props[0][COLOR_INDEX[c]] / SET_SIZES[COLOR_INDEX[c]],
+                        default='unknown')
         
         if color not in self.complete_sets:
             return 10.0
         
         # Check current progress toward complete set
-        current_count = len(current_player.properties.get(color, []))
+        current_count = compact.props[0][COLOR_INDEX[color]]
         needed_for_complete = self.complete_sets[color]
         completion_ratio = current_count / needed_for_complete
         
@@ -388,80 +396,134 @@ class MonopolyDealEngine:
         
         return base_priority * multiplier
     
-    def _analyze_action_card(self, card: dict, game_state: GameState, 
-                           character: PlayerCharacter, asset_type: AssetEvaluation) -> List[Dict[str, Any]]:
-        """Analyze action card usage options"""
+    def _analyze_action_card(self, card: dict, compact: CompactGameState, 
+                           character: PlayerCharacter, asset_type: AssetEvaluation,
+                           record: Optional[Card] = None) -> List[Dict[str, Any]]:
+        """Analyze action card usage options: one move per legal target under the edge rules"""
         moves = []
-        card_name = card.get('name', '').lower().replace(' ', '_')
-        
-        # Map common action card names
-        action_name_mapping = {
-            'deal_breaker': 'deal_breaker',
-            'sly_deal': 'sly_deal', 
-            'force_deal': 'force_deal',
-            'debt_collector': 'debt_collector',
-            'its_my_birthday': 'birthday',
-            'just_say_no': 'just_say_no',
-            'pass_go': 'pass_go',
-            'house': 'house',
-            'hotel': 'hotel',
-            'double_the_rent': 'double_rent'
-        }
+        record = record or lookup_card(card)
+        if record is None:
+            return moves
         
-        mapped_name = action_name_mapping.get(card_name, card_name)
+        multiplier = self.character_multipliers[character]['action_card_usage']
+        names = compact.names
+        mine = compact.props[0]
+        card_name = card.get('name', record.name)
         
-        if mapped_name in self.action_cards:
-            action_info = self.action_cards[mapped_name]
-            base_priority = action_info['value'] * 10
+        for move in kind_moves(compact, 0, record.kind, self.move_rules):
+            if move.color == -2:
+                continue  # Banking is weighed with the money cards
+            target = names[move.target] if move.target >= 0 else None
+            option = {'card': card, 'move': move.describe(names)}
             
-            # Apply character-specific action usage multiplier
-            multiplier = self.character_multipliers[character]['action_card_usage']
-            priority = base_priority * multiplier
+            if record.category == CardCategory.RENT:
+                rent_value = compact.rent(0, move.color) * 2 ** move.doubles
+                payers = [move.target] if move.target >= 0 else range(1, compact.num_players)
+                collected = sum(min(rent_value, compact.assets(payer)) for payer in payers)
+                option.update({
+                    'action': 'play_rent',
+                    'target_player': target,
+                    'property_set': COLORS[move.color],
+                    'rent_value': rent_value,
+                    'priority_score': (collected * 12 - move.doubles * self.action_cards['double_rent']['value'] * 10)
+                                      * multiplier,
+                    'reasoning': f"Use {card_name} to collect {rent_value}M from {COLORS[move.color]} properties"
+                                 + (f" from {target}" if target else "")
+                })
+            elif record.kind == BIRTHDAY:
+                collected = sum(min(2, compact.assets(payer)) for payer in range(1, compact.num_players))
+                option.update({
+                    'action': 'play_birthday',
+                    'priority_score': collected * 12 * multiplier,
+                    'reasoning': "Use It's My Birthday to collect 2M from each opponent"
+                })
+            elif record.kind == DEBT_COLLECTOR:
+                collected = min(5, compact.assets(move.target))
+                option.update({
+                    'action': 'play_debt_collector',
+                    'target_player': target,
+                    'priority_score': collected * 12 * multiplier,
+                    'reasoning': f"Use Debt Collector to collect {collected}M from {target}"
+                })
+            elif record.kind == DEAL_BREAKER:
+                option.update({
+                    'action': 'play_deal_breaker',
+                    'target_player': target,
+                    'target_set': COLORS[move.color],
+                    'priority_score': (50 + compact.prop_values[move.target][move.color]) * multiplier,
+                    'reasoning': f"Use Deal Breaker to steal {target}'s complete {COLORS[move.color]} set"
+                })
+            elif record.kind in (SLY_DEAL, FORCED_DEAL):
+                completes = mine[move.color] + 1 == SET_SIZES[move.color]
+                priority = 30 + (30 if completes else 0)
+                option.update({'target_player': target, 'target_set': COLORS[move.color]})
+                if record.kind == SLY_DEAL:
+                    option.update({
+                        'action': 'play_sly_deal',
+                        'reasoning': f"Use Sly Deal to take a {COLORS[move.color]} property from {target}"
+                    })
+                else:
+                    # Giving up progress on the traded-away set counts against the swap
+                    priority -= 10 * mine[move.give] / SET_SIZES[move.give]
+                    option.update({
+                        'action': 'play_forced_deal',
+                        'give_set': COLORS[move.give],
+                        'reasoning': f"Use Forced Deal to swap your {COLORS[move.give]} for "
+                                     f"{target}'s {COLORS[move.color]}"
+                    })
+                option['priority_score'] = priority * multiplier
+            else:
+                action_info = self.action_cards.get(record.action)
+                if action_info is None:
+                    continue
+                option.update({
+                    'action': 'build' if record.category == CardCategory.BUILDING else 'play_action',
+                    'priority_score': action_info['value'] * 10 * multiplier,
+                    'reasoning': f"Use {card_name} for {action_info['effect']}"
+                })
+                if move.color >= 0:
+                    option['property_set'] = COLORS[move.color]
             
-            moves.append({
-                'action': 'play_action',
-                'card': card,
-                'priority_score': priority,
-                'reasoning': f"Use {card.get('name', 'action card')} for {action_info['effect']}"
-            })
+            moves.append(option)
         
         return moves
     
-    def _analyze_strategic_combinations(self, game_state: GameState, 
+    def _analyze_strategic_combinations(self, compact: CompactGameState, 
                                       character: PlayerCharacter, asset_type: AssetEvaluation) -> List[Dict[str, Any]]:
         """Analyze strategic combinations and advanced plays"""
         moves = []
-        current_player = game_state.players[0]
         
         # Check for rent collection opportunities
-        rent_moves = self._analyze_rent_opportunities(game_state, character, asset_type)
+        rent_moves = self._analyze_rent_opportunities(compact, character, asset_type)
         moves.extend(rent_moves)
         
         # Check for deal breaker opportunities (aggressive character)
         if character == PlayerCharacter.AGGRESSIVE:
-            deal_breaker_moves = self._analyze_deal_breaker_opportunities(game_state, asset_type)
+            deal_breaker_moves = self._analyze_deal_breaker_opportunities(compact, asset_type)
             moves.extend(deal_breaker_moves)
         
         return moves
     
-    def _analyze_rent_opportunities(self, game_state: GameState, 
+    def _analyze_rent_opportunities(self, compact: CompactGameState, 
                                   character: PlayerCharacter, asset_type: AssetEvaluation) -> List[Dict[str, Any]]:
         """Analyze rent collection opportunities"""
         moves = []
-        current_player = game_state.players[0]
         
         # Only suggest rent collection if player has rent cards in hand
-        has_rent_card = any('rent' in str(card).lower() for card in current_player.hand)
+        hand = compact.hands[0]
+        has_rent_card = any(hand[kind] for kind in self._RENT_KINDS)
         if not has_rent_card:
             return moves
         
         # Check each property set for rent potential
-        for color, properties in current_player.properties.items():
-            if len(properties) > 0 and color in self.rent_values:
-                rent_value = self.rent_values[color][min(len(properties) - 1, len(self.rent_values[color]) - 1)]
+        opponents = list(range(1, compact.num_players))
+        for color_index, count in enumerate(compact.props[0]):
+            color = COLORS[color_index]
+            if count > 0:
+                rent_value = self.rent_values[color][min(count - 1, len(self.rent_values[color]) - 1)]
                 
                 # Calculate target selection based on character
-                target_priority = self._calculate_rent_target_priority(game_state.players[1:], character)
+                target_priority = self._calculate_rent_target_priority(compact, opponents, character)
                 
                 if target_priority > 0:
                     moves.append({
@@ -474,45 +536,48 @@ class MonopolyDealEngine:
         
         return moves
     
-    def _analyze_deal_breaker_opportunities(self, game_state: GameState, 
+    def _analyze_deal_breaker_opportunities(self, compact: CompactGameState, 
                                           asset_type: AssetEvaluation) -> List[Dict[str, Any]]:
         """Analyze deal breaker opportunities for aggressive players"""
         moves = []
         
         # Check if any opponent has complete sets worth stealing
-        for opponent in game_state.players[1:]:
-            for color, properties in opponent.properties.items():
-                if color in self.complete_sets and len(properties) >= self.complete_sets[color]:
-                    set_value = len(properties) * self.property_values.get(color, 1)
+        for opponent in range(1, compact.num_players):
+            opponent_name = compact.names[opponent]
+            for color_index, count in enumerate(compact.props[opponent]):
+                color = COLORS[color_index]
+                if count >= self.complete_sets[color]:
+                    set_value = count * self.property_values[color]
                     
                     moves.append({
                         'action': 'deal_breaker',
-                        'target_player': opponent.name,
+                        'target_player': opponent_name,
                         'target_set': color,
                         'priority_score': set_value * 15,  # High priority for complete sets
-                        'reasoning': f"Steal complete {color} set from {opponent.name}"
+                        'reasoning': f"Steal complete {color} set from {opponent_name}"
                     })
         
         return moves
     
-    def _calculate_rent_target_priority(self, opponents: List, character: PlayerCharacter) -> float:
+    def _calculate_rent_target_priority(self, compact: CompactGameState, opponents: List[int], 
+                                        character: PlayerCharacter) -> float:
         """Calculate priority for rent collection targets"""
         if not opponents:
             return 0.0
         
         # Aggressive: Target richest player
         if character == PlayerCharacter.AGGRESSIVE:
-            max_wealth = max(self._calculate_player_wealth(opp) for opp in opponents)
+            max_wealth = max(compact.wealth(opp) for opp in opponents)
             return max_wealth
         
         # Defensive: Target based on threat level
         elif character == PlayerCharacter.DEFENSIVE:
-            min_threat = min(self._calculate_threat_level(opp) for opp in opponents)
+            min_threat = min(compact.complete_sets(opp) * 20 + compact.wealth(opp) for opp in opponents)
             return min_threat
         
         # Normal: Balanced approach
         else:
-            avg_wealth = sum(self._calculate_player_wealth(opp) for opp in opponents) / len(opponents)
+            avg_wealth = sum(compact.wealth(opp) for opp in opponents) / len(opponents)
             return avg_wealth
     
     def _calculate_player_wealth(self, player) -> float:
@@ -543,94 +608,150 @@ class MonopolyDealEngine:
         )
         return complete_sets * 20 + self._calculate_player_wealth(player)
 
-    def analyze_game_state(self, game_state: GameState, strategy: AIStrategy) -> AnalysisResponse:
+    def _resolve_strategy(self, strategy: AIStrategy) -> Tuple[PlayerCharacter, AssetEvaluation]:
+        """Map strategy to character and asset type (based on research findings)"""
+        # Win rates below are the published figures; app.core.tournament measures them under any EdgeRules
+        character_mapping = {
+            'aggressive': (PlayerCharacter.AGGRESSIVE, AssetEvaluation.LOGICAL),  # 45% win rate
+            'defensive': (PlayerCharacter.DEFENSIVE, AssetEvaluation.VALUE),     # 35% win rate  
+            'normal': (PlayerCharacter.NORMAL, AssetEvaluation.LOGICAL),         # 40% win rate
+            'balanced': (PlayerCharacter.NORMAL, AssetEvaluation.LOGICAL_VALUE)  # Fallback
+        }
+        
+        strategy_key = strategy.value if hasattr(strategy, 'value') else str(strategy).lower()
+        return character_mapping.get(strategy_key, 
+                                     (PlayerCharacter.NORMAL, AssetEvaluation.LOGICAL_VALUE))
+
+    def search_turn(self, game_state: GameState, strategy: AIStrategy, time_budget_ms: float,
+                    compact: Optional[CompactGameState] = None, seed: Optional[int] = None,
+                    max_iterations: Optional[int] = None, deadline: Optional[Deadline] = None) -> SearchResult:
+        """
+        Time-budgeted MCTS over the current player's plays this turn.
+        Leaves are scored with the strategy's asset evaluation; opponents play NORMAL.
+        A deadline is a hard stop, even before every root move has been tried.
+        """
+        for result in self.iter_search_turn(game_state, strategy, time_budget_ms, compact, seed,
+                                            max_iterations, deadline):
+            pass
+        return result
+
+    def iter_search_turn(self, game_state: GameState, strategy: AIStrategy, time_budget_ms: float,
+                         compact: Optional[CompactGameState] = None, seed: Optional[int] = None,
+                         max_iterations: Optional[int] = None, deadline: Optional[Deadline] = None,
+                         report_ms: Optional[float] = None) -> Iterator[SearchResult]:
+        """search_turn yielding a snapshot every report_ms and the final result last"""
+        character, asset_type = self._resolve_strategy(strategy)
+        compact = compact or CompactGameState.from_game_state(game_state)
+        search = TurnSearch(
+            lambda state, player: self.evaluate_compact(state, player, asset_type),
+            self.edge_rules or game_state.edgeRules,
+            characters=[character.value] + [PlayerCharacter.NORMAL.value] * (compact.num_players - 1),
+            character_weights=self.character_weights,
+            simulator=self.simulator
+        )
+        return search.iter_search(compact, time_budget_ms, seed=seed, max_iterations=max_iterations,
+                                  deadline=deadline, report_ms=report_ms)
+
+    def solve_endgame(self, game_state: GameState, strategy: AIStrategy,
+                      compact: Optional[CompactGameState] = None,
+                      deadline: Optional[Deadline] = None) -> Optional[EndgameResult]:
+        """
+        Exact solve of a near-terminal position for the current player (see app.core.endgame).
+        Hidden hands are dealt from the position hash, so a state always gets the same answer.
+        Without a deadline the solve gets settings.ENDGAME_TIME_BUDGET_MS; None when the
+        bounds cannot close, so solving would be wasted.
+        """
+        character, _ = self._resolve_strategy(strategy)
+        compact = compact or CompactGameState.from_game_state(game_state)
+        solver = EndgameSolver(
+            self.edge_rules or game_state.edgeRules,
+            characters=[character.value] + [PlayerCharacter.NORMAL.value] * (compact.num_players - 1),
+            character_weights=self.character_weights,
+            simulator=self.simulator
+        )
+        if not solver.can_close(compact):
+            return None
+        return solver.solve(compact, seed=zobrist.hash_state(compact),
+                            deadline=deadline or Deadline(settings.ENDGAME_TIME_BUDGET_MS))
+
+    def analyze_game_state(self, game_state: GameState, strategy: AIStrategy,
+                           time_budget_ms: Optional[float] = None, summary=None,
+                           deadline_ms: Optional[float] = None) -> AnalysisResponse:
         """
         Analyze game state using research-based BFS algorithm with character types
         Based on "Implementation of Artificial Intelligence with 3 Different Characters"
+        With a time budget the recommendation comes from a forward search of the turn instead.
+        A BoardSummary of game_state (see app.core.incremental) supplies the encoded state
+        and per-player evaluations without re-encoding the board.
+        With deadline_ms the analysis is anytime: the one-ply card analysis, hidden-hand
+        expectations and search stop when the deadline passes, the best move found so far
+        is returned and completed is False.
+        """
+        for response in self.iter_analysis(game_state, strategy, time_budget_ms, summary, deadline_ms):
+            pass
+        return response
+
+    def iter_analysis(self, game_state: GameState, strategy: AIStrategy,
+                      time_budget_ms: Optional[float] = None, summary=None,
+                      deadline_ms: Optional[float] = None,
+                      report_ms: Optional[float] = None) -> Iterator[AnalysisResponse]:
+        """
+        analyze_game_state as a stream of improving answers. With report_ms and a time
+        budget, the one-ply answer is yielded as soon as it is ready and the search's best
+        line every report_ms after that; interim answers have completed=False and
+        debug['progress']. The last item is always the answer analyze_game_state returns.
         """
+        deadline = Deadline(deadline_ms)
         try:
-            # Map strategy to character and asset type (based on research findings)
-            character_mapping = {
-                'aggressive': (PlayerCharacter.AGGRESSIVE, AssetEvaluation.LOGICAL),  # 45% win rate
-                'defensive': (PlayerCharacter.DEFENSIVE, AssetEvaluation.VALUE),     # 35% win rate  
-                'normal': (PlayerCharacter.NORMAL, AssetEvaluation.LOGICAL),         # 40% win rate
-                'balanced': (PlayerCharacter.NORMAL, AssetEvaluation.LOGICAL_VALUE)  # Fallback
-            }
-            
-            strategy_key = strategy.value if hasattr(strategy, 'value') else str(strategy).lower()
-            character, asset_type = character_mapping.get(strategy_key, 
-                                                        (PlayerCharacter.NORMAL, AssetEvaluation.LOGICAL_VALUE))
+            character, asset_type = self._resolve_strategy(strategy)
             
-            # Calculate current game phase
-            game_phase = self.calculate_game_phase(game_state)
+            # Calculate current game phase (a summary carries its card count)
+            if summary is not None:
+                game_phase = self.game_phase_for(len(game_state.players), summary.cards_in_play)
+            else:
+                game_phase = self.calculate_game_phase(game_state)
             
             # Get current player
             current_player = game_state.players[0] if game_state.players else None
             if not current_player:
-                return AnalysisResponse(
+                yield AnalysisResponse(
                     recommendedMove="No players found in game state",
                     reasoning="Invalid game state - no players detected",
                     strongestPlayer="Unknown",
                     winProbability={}
                 )
+                return
+            
+            # Encode the state once; BFS and evaluators work on the count arrays
+            compact = summary.state if summary is not None else CompactGameState.from_game_state(game_state)
             
-            # Use BFS decision tree to get recommended moves
-            possible_moves = self.bfs_decision_tree(game_state, character, asset_type)
+            # Use BFS decision tree to get recommended moves, reusing a summary's per-card options
+            card_moves = None
+            if summary is not None:
+                card_moves = summary.moves_for((self.rules_code, character.value, asset_type.value))
+            possible_moves = self.bfs_decision_tree(game_state, character, asset_type, compact, deadline, card_moves)
             
             # Analyze each player using appropriate asset evaluation
             player_evaluations = {}
             complete_sets_count = {}
             
-            for player in game_state.players:
-                # Convert bank integers to card-like objects for consistency
-                bank_cards = []
-                if player.bank:
-                    for val in player.bank:
-                        if isinstance(val, int):
-                            bank_cards.append({'value': val})
-                        elif isinstance(val, dict) and 'value' in val:
-                            bank_cards.append(val)
-                        else:
-                            # Handle string or other formats
-                            try:
-                                bank_cards.append({'value': int(val)})
-                            except (ValueError, TypeError):
-                                bank_cards.append({'value': 1})  # Default value
-                
-                # Convert hand items to consistent format
-                hand_cards = []
-                if hasattr(player, 'hand') and player.hand:
-                    for card in player.hand:
-                        if isinstance(card, dict):
-                            hand_cards.append(card)
-                        elif isinstance(card, str):
-                            # Convert string card names to basic card objects
-                            hand_cards.append({'name': card, 'type': 'unknown'})
-                        else:
-                            hand_cards.append({'name': str(card), 'type': 'unknown'})
-                
-                player_data = {
-                    'properties': player.properties or {},
-                    'bank': bank_cards,
-                    'hand': hand_cards
-                }
-                
+            for index, name in enumerate(compact.names):
                 # Use research-based asset evaluation
-                if asset_type == AssetEvaluation.LOGICAL:
-                    score = self.evaluate_assets_logical(player_data)
-                elif asset_type == AssetEvaluation.VALUE:
-                    score = self.evaluate_assets_value(player_data)
-                else:  # LOGICAL_VALUE
-                    score = self.evaluate_assets_logical_value(player_data)
-                
-                player_evaluations[player.name] = score
-                
-                # Count complete sets
-                sets_completed = sum(
-                    1 for color, props in (player.properties or {}).items()
-                    if color in self.complete_sets and len(props) >= self.complete_sets[color]
-                )
-                complete_sets_count[player.name] = sets_completed
+                if summary is not None:
+                    player_evaluations[name] = summary.evaluate(index, asset_type.value)
+                    complete_sets_count[name] = summary.complete[index]
+                else:
+                    player_evaluations[name] = self.evaluate_compact(compact, index, asset_type)
+                    complete_sets_count[name] = compact.complete_sets(index)
+            
+            # Hidden hand cards are valued at their expectation over sampled deals
+            # (known cards only once the deadline has passed)
+            if any(compact.hidden) and deadline.check():
+                expected = self.evaluate_hidden(compact, asset_type,
+                                                position_hash=summary.hash if summary is not None else None)
+                for index, name in enumerate(compact.names):
+                    if compact.hidden[index]:
+                        player_evaluations[name] = float(expected[index])
             
             # Determine strongest player
             strongest_player = max(player_evaluations.keys(), 
@@ -641,6 +762,18 @@ class MonopolyDealEngine:
                 player_evaluations, complete_sets_count, character, game_phase
             )
             
+            # Near-terminal positions: the exact solver's bounds replace the heuristic where it is off.
+            # It only runs on a time budget or deadline, and its time is charged to the budget
+            endgame = None
+            complete = summary.complete if summary is not None else None
+            if (time_budget_ms or deadline.bounded) and is_endgame(compact, complete=complete) and deadline.check():
+                solve_ms = min(settings.ENDGAME_TIME_BUDGET_MS, time_budget_ms or math.inf, deadline.remaining_ms())
+                endgame = self.solve_endgame(game_state, strategy, compact, Deadline(solve_ms))
+                if endgame is not None:
+                    win_probabilities = self._bound_probabilities(win_probabilities, compact.names[0], endgame)
+                    if time_budget_ms:
+                        time_budget_ms = max(1.0, time_budget_ms - endgame.elapsedMs)
+            
             # Generate recommendation from BFS results
             if possible_moves:
                 best_move = possible_moves[0]
@@ -652,24 +785,115 @@ class MonopolyDealEngine:
                 recommendation = "Draw cards and assess hand"
                 reasoning = f"No optimal moves found. Focus on {asset_type.value} asset building in {game_phase.value} game phase."
             
-            return AnalysisResponse(
-                recommendedMove=recommendation,
-                reasoning=reasoning,
-                strongestPlayer=strongest_player,
-                winProbability=win_probabilities
-            )
+            def answer(result: Optional[SearchResult] = None, final: bool = True) -> AnalysisResponse:
+                move, why, debug = recommendation, reasoning, None
+                if endgame is not None:
+                    debug = {'endgame': {
+                        'lowerBound': endgame.lowerBound,
+                        'upperBound': endgame.upperBound,
+                        'proven': endgame.proven,
+                        'horizon': endgame.horizon,
+                        'nodes': endgame.nodes,
+                        'determinizations': endgame.determinizations,
+                        'elapsedMs': endgame.elapsedMs,
+                        'bestLine': endgame.bestLine
+                    }}
+                    if endgame.proven and endgame.bestLine:
+                        move = f"{endgame.bestAction}: {', then '.join(endgame.bestLine)}"
+                        why = f"{reasoning} {self._describe_endgame(endgame, compact.names[0])}"
+                if result is not None:
+                    if result.bestLine and result.iterations:
+                        move = f"{result.bestAction}: {', then '.join(result.bestLine)}"
+                        why = (f"{reasoning} Forward search: {result.iterations} playouts in "
+                               f"{result.elapsedMs:.0f} ms, expected value {result.expectedValue:.2f}.")
+                    debug = debug or {}
+                    debug.update({
+                        'search': {
+                            'iterations': result.iterations,
+                            'elapsedMs': result.elapsedMs,
+                            'expectedValue': result.expectedValue,
+                            'bestLine': result.bestLine
+                        },
+                        'transpositionTable': result.transpositions
+                    })
+                if not final:
+                    debug = debug or {}
+                    debug['progress'] = {
+                        'phase': 'search' if result is not None else 'one_ply',
+                        'elapsedMs': deadline.elapsed_ms()
+                    }
+                elif deadline.bounded:
+                    debug = debug or {}
+                    debug['deadline'] = {
+                        'deadlineMs': deadline_ms,
+                        'elapsedMs': deadline.elapsed_ms(),
+                        'completed': deadline.completed
+                    }
+                return AnalysisResponse(
+                    recommendedMove=move,
+                    reasoning=why,
+                    strongestPlayer=strongest_player,
+                    winProbability=win_probabilities,
+                    debug=debug,
+                    completed=final and deadline.completed
+                )
+            
+            # Forward search replaces the one-ply recommendation when given CPU time,
+            # unless the endgame solver has already proven the outcome
+            if not (time_budget_ms and deadline.check()) or (endgame is not None and endgame.proven):
+                yield answer()
+                return
+            if report_ms:
+                yield answer(final=False)
+            result = None
+            for result in self.iter_search_turn(game_state, strategy, deadline.clip(time_budget_ms), compact,
+                                                deadline=deadline if deadline.bounded else None,
+                                                report_ms=report_ms):
+                if report_ms:
+                    yield answer(result, final=False)
+            if not result.completed:
+                deadline.truncated = True
+            yield answer(result)
             
         except Exception as e:
             print(f"Analysis error: {e}")
             import traceback
             traceback.print_exc()
-            return AnalysisResponse(
+            yield AnalysisResponse(
                 recommendedMove="Unable to analyze game state",
                 reasoning=f"Analysis error: {str(e)}",
                 strongestPlayer="Unknown",
                 winProbability={}
             )
     
+    @staticmethod
+    def _bound_probabilities(win_probabilities: Dict[str, float], mover: str,
+                             endgame: EndgameResult) -> Dict[str, float]:
+        """Clamp the mover's heuristic win probability into the solver's bounds; opponents share the rest"""
+        if mover not in win_probabilities:
+            return win_probabilities
+        mine = min(max(win_probabilities[mover], endgame.lowerBound), endgame.upperBound)
+        if endgame.proven:
+            mine = endgame.winProbability
+        others = {name: prob for name, prob in win_probabilities.items() if name != mover}
+        total = sum(others.values())
+        bounded = {mover: mine}
+        for name, prob in others.items():
+            bounded[name] = (1.0 - mine) * (prob / total if total > 0 else 1.0 / len(others))
+        return bounded
+
+    @staticmethod
+    def _describe_endgame(endgame: EndgameResult, mover: str) -> str:
+        turns = f"{endgame.horizon} turn{'s' if endgame.horizon != 1 else ''}"
+        if endgame.lowerBound >= 1.0:
+            outcome = f"{mover} has a forced win"
+        elif endgame.upperBound <= 0.0:
+            outcome = f"{mover} cannot avoid losing"
+        else:
+            outcome = f"{mover} wins with probability {endgame.winProbability:.0%}"
+        return (f"Endgame solver: {outcome} within {turns} ({endgame.nodes} positions, "
+                f"{endgame.elapsedMs:.0f} ms).")
+
     def _generate_recommendation(self, player, game_state: GameState, strategy: AIStrategy, complete_sets: Dict) -> str:
         """Generate move recommendation based on current game state"""
         
@@ -739,73 +963,133 @@ class MonopolyDealEngine:
         
         return " ".join(reasoning_parts)
     
-    def simulate_game(self, game_state: GameState, strategy: AIStrategy, num_simulations: int) -> List[AnalysisResponse]:
+    def simulate_game(self, game_state: GameState, strategy: AIStrategy, num_simulations: int,
+                      seed: Optional[int] = None, max_workers: Optional[int] = None,
+                      target_precision: Optional[float] = None, confidence: float = DEFAULT_CONFIDENCE,
+                      interval_method: IntervalMethod = IntervalMethod.WILSON) -> List[AnalysisResponse]:
         """
-        Run multiple game simulations (simplified implementation)
+        Run Monte Carlo rollouts of the game from the given state.
+        The current player (first player) uses the character for the requested strategy,
+        opponents play the NORMAL character. Win probabilities are empirical win rates.
+        Rollouts are sharded across a process pool; a given seed gives the same
+        result for any max_workers.
+
+        With target_precision, num_simulations is the maximum: the run stops once every
+        win-rate interval's half-width is at most target_precision or the leader is
+        separated from everyone else. Intervals and the stop are reported in debug['simulation'].
         """
-        results = []
-        
-        for _ in range(min(num_simulations, 10)):  # Limit simulations for performance
-            # Create a variation of the analysis with some randomness
-            analysis = self.analyze_game_state(game_state, strategy)
-            
-            # Add some randomness to win probabilities for simulation variety
-            varied_probs = {}
-            for player, prob in analysis.winProbability.items():
-                variation = random.uniform(-0.1, 0.1)
-                varied_probs[player] = max(0.0, min(1.0, prob + variation))
-            
-            # Normalize
-            total = sum(varied_probs.values())
-            if total > 0:
-                varied_probs = {name: prob/total for name, prob in varied_probs.items()}
+        for response in self.iter_simulation(game_state, strategy, num_simulations, seed, max_workers,
+                                             target_precision, confidence, interval_method):
+            pass
+        return [response]
+
+    def iter_simulation(self, game_state: GameState, strategy: AIStrategy, num_simulations: int,
+                        seed: Optional[int] = None, max_workers: Optional[int] = None,
+                        target_precision: Optional[float] = None, confidence: float = DEFAULT_CONFIDENCE,
+                        interval_method: IntervalMethod = IntervalMethod.WILSON) -> Iterator[AnalysisResponse]:
+        """
+        simulate_game as a stream: one answer per completed shard of rollouts with the
+        win rates so far (completed=False), the final answer last (completed=True).
+        """
+        analysis = self.analyze_game_state(game_state, strategy)
+        if not game_state.players:
+            yield analysis
+            return
+        
+        character, _ = self._resolve_strategy(strategy)
+        characters = [character.value] + [PlayerCharacter.NORMAL.value] * (len(game_state.players) - 1)
+        simulator = ParallelSimulator(
+            self.edge_rules or game_state.edgeRules,
+            max_workers=max_workers,
+            character_weights=self.character_weights
+        )
+        stop = StoppingRule(target_precision, confidence, interval_method) if target_precision else None
+        summaries = simulator.iter_run(game_state, characters, num_simulations, seed=seed, stop=stop)
+        for summary in summaries:
+            final = summary.stopReason is not None or summary.games >= num_simulations
+            win_rates = summary.win_rates()
+            reasoning = (f"{analysis.reasoning} Simulated {summary.games} games "
+                         f"(average {summary.average_turns():.1f} turns).")
+            if summary.stopReason:
+                reasoning += f" Stopped early ({summary.stopReason.replace('_', ' ')})."
             
-            varied_analysis = AnalysisResponse(
+            yield AnalysisResponse(
                 recommendedMove=analysis.recommendedMove,
-                reasoning=analysis.reasoning,
-                strongestPlayer=analysis.strongestPlayer,
-                winProbability=varied_probs
+                reasoning=reasoning,
+                strongestPlayer=max(win_rates, key=win_rates.get),
+                winProbability=win_rates,
+                debug={'simulation': {
+                    'games': summary.games,
+                    'maxGames': num_simulations,
+                    'stoppedEarly': summary.stopReason is not None,
+                    'stopReason': summary.stopReason,
+                    'confidenceLevel': confidence,
+                    'intervalMethod': IntervalMethod(interval_method).value,
+                    'intervals': {name: [round(low, 4), round(high, 4)] for name, (low, high)
+                                  in summary.confidence_intervals(confidence, interval_method).items()}
+                }, **({} if final else {'progress': {'phase': 'simulation', 'games': summary.games}})},
+                completed=final
             )
-            
-            results.append(varied_analysis)
-        
-        return results
     
     def _calculate_research_based_probabilities(self, player_evaluations: Dict[str, float], 
                                               complete_sets_count: Dict[str, int],
                                               character: PlayerCharacter, 
                                               game_phase: GamePhase) -> Dict[str, float]:
         """Calculate win probabilities based on research methodology"""
-        win_probabilities = {}
-        total_evaluation = sum(player_evaluations.values()) if player_evaluations else 1
-        
-        for player_name, evaluation in player_evaluations.items():
-            # Base probability from evaluation score
-            base_prob = evaluation / total_evaluation if total_evaluation > 0 else 0
-            
-            # Complete sets bonus (critical factor in Monopoly Deal)
-            sets_completed = complete_sets_count.get(player_name, 0)
-            sets_bonus = sets_completed * 0.25  # 25% bonus per complete set
-            
-            # Game phase adjustment
-            phase_multiplier = {
-                GamePhase.EARLY: 0.8,   # Less predictable early game
-                GamePhase.MIDDLE: 1.0,  # Standard calculation
-                GamePhase.LATE: 1.2     # More decisive late game
-            }.get(game_phase, 1.0)
-            
-            # Character-specific risk adjustment
-            risk_factor = self.character_multipliers[character]['risk_tolerance']
-            
-            final_prob = (base_prob + sets_bonus) * phase_multiplier * risk_factor
-            win_probabilities[player_name] = min(0.95, max(0.05, final_prob))
-        
-        # Normalize probabilities to sum to 1.0
-        total_prob = sum(win_probabilities.values())
-        if total_prob > 0:
-            win_probabilities = {name: prob/total_prob for name, prob in win_probabilities.items()}
-        
-        return win_probabilities
+        if not player_evaluations:
+            return {}
+        names = list(player_evaluations)
+        # Same vectorized formula as the batch evaluator, on a single state
+        probabilities = batch_eval.win_probabilities(
+            np.array([[player_evaluations[name] for name in names]]),
+            np.array([[complete_sets_count.get(name, 0) for name in names]]),
+            self._PHASE_MULTIPLIERS.get(game_phase, 1.0),
+            self.character_multipliers[character]['risk_tolerance']
+        )[0]
+        return {name: float(prob) for name, prob in zip(names, probabilities)}
+    
+    def evaluate_batch(self, states: Sequence[CompactGameState], asset_type: AssetEvaluation) -> np.ndarray:
+        """
+        Asset scores for many states in one vectorized call.
+        Returns an (N, players) array; seats missing from smaller games score 0.
+        """
+        return batch_eval.asset_scores(batch_eval.StateBatch.from_states(states), asset_type.value)
+    
+    def evaluate_hidden(self, compact: CompactGameState, asset_type: AssetEvaluation,
+                        samples: int = DEFAULT_SAMPLES, position_hash: Optional[int] = None) -> np.ndarray:
+        """
+        Per-player asset scores averaged over determinizations of the hidden hand cards.
+        Samples are seeded from the position hash, so a state always gets the same estimate.
+        Pass position_hash when it is already known (a BoardSummary carries it).
+        """
+        if position_hash is None:
+            position_hash = zobrist.hash_state(compact)
+        deals = HiddenInformation(compact).sample(samples, np.random.default_rng(position_hash))
+        shape = (samples, compact.num_players)
+        batch = batch_eval.StateBatch(
+            np.broadcast_to(np.asarray(compact.props, dtype=np.float64), shape + (len(COLORS),)),
+            np.broadcast_to(np.asarray(compact.banks, dtype=np.float64), shape),
+            np.asarray(compact.hands, dtype=np.float64) + deals.hands
+        )
+        return batch_eval.asset_scores(batch, asset_type.value).mean(axis=0)
+    
+    def win_probabilities_batch(self, states: Sequence[CompactGameState], character: PlayerCharacter,
+                                asset_type: AssetEvaluation,
+                                game_phases: Optional[Sequence[GamePhase]] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Research-based win probabilities for many states in one vectorized call.
+        Returns (scores, probabilities), both (N, players); game phases default to MIDDLE.
+        """
+        batch = batch_eval.StateBatch.from_states(states)
+        scores = batch_eval.asset_scores(batch, asset_type.value)
+        phases = 1.0 if game_phases is None else np.array(
+            [self._PHASE_MULTIPLIERS.get(phase, 1.0) for phase in game_phases]
+        )
+        probabilities = batch_eval.win_probabilities(
+            scores, batch.complete_sets(), phases,
+            self.character_multipliers[character]['risk_tolerance'], batch.mask
+        )
+        return scores, probabilities
     
     def _generate_research_based_reasoning(self, best_move: Dict[str, Any], 
                                          character: PlayerCharacter,
@@ -866,4 +1150,27 @@ class MonopolyDealEngine:
                           player_scores: Dict[str, float], complete_sets_count: Dict[str, int]) -> str:
         """Legacy method - provides basic reasoning"""
         game_phase = self.calculate_game_phase(game_state)
-        return f"Analysis based on current {game_phase.value} game phase and player positions."
\ No newline at end of file
+        return f"Analysis based on current {game_phase.value} game phase and player positions."
+
+# Engines are read-only after construction, so one instance per rule set is
+# shared by every request using those rules
+ENGINE_CACHE_SIZE = 32
+_engine_cache_lock = threading.Lock()
+
+
+@lru_cache(maxsize=ENGINE_CACHE_SIZE)
+def _cached_engine(rules_key: tuple) -> MonopolyDealEngine:
+    return MonopolyDealEngine(EdgeRules(**dict(rules_key)))
+
+
+def get_engine(edge_rules: Optional[EdgeRules] = None) -> MonopolyDealEngine:
+    """Shared MonopolyDealEngine for an EdgeRules configuration (bounded LRU cache)"""
+    key = (edge_rules or EdgeRules()).cache_key()
+    # lru_cache alone may build the same engine twice under concurrent misses
+    with _engine_cache_lock:
+        return _cached_engine(key)
+
+
+def engine_cache_info() -> Dict[str, int]:
+    info = _cached_engine.cache_info()
+    return {'hits': info.hits, 'misses': info.misses, 'size': info.currsize, 'maxsize': info.maxsize}
@@ -0,0 +1,313 @@
+"""
+Compact binary game logs.
+
+A log file holds any number of games played from a fresh deal. Each game is
+a fixed 32-byte header followed by one fixed 8-byte record per play:
+
+    file:    b"MDGLOG" + uint16 version
+    header:  seed u8, records u4, rules u2, turns u2, players u1, first u1,
+             winner i1, flags u1, characters u1[8], reserved u1[4]
+    record:  turn u2, player u1, kind i1, color i1, target i1, give i1, doubles i1
+
+All integers are little-endian. rules is the app.core.rule_space code of the
+game's EdgeRules, characters the per-seat index into CHARACTERS (255 for an
+unused slot). A record is a Move with every target resolved, so replay does
+not depend on the policy that chose it.
+
+Nothing else is stored. The deal and the deck order come from the seed, and
+draws, payments, Just Say No exchanges and hand-limit discards follow from
+the rules and the seats' characters. GameReplayer re-runs those steps to
+rebuild the position at any point of a game. Headers and records are plain
+NumPy structured arrays, so GameLogReader memory-maps the file and hands out
+zero-copy views. A scan that only reads headers hops from game to game
+without touching the records.
+"""
+
+import os
+import random
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.cards import (
+    CardCategory, KIND_CATEGORY, KIND_COLORS, DEBT_COLLECTOR, DEAL_BREAKER, SLY_DEAL, FORCED_DEAL,
+    DOUBLE_RENT, RENT_ANY
+)
+from app.core.compact_state import CompactGameState
+from app.core.determinize import HiddenInformation
+from app.core.moves import Move, PLAYS_PER_TURN
+from app.core.rule_space import encode_rules, decode_rules
+from app.core.simulation import GameSimulator, DEFAULT_MAX_TURNS, _Rollout
+from app.core.tournament import opening_state
+from app.models.game import EdgeRules, GameState
+
+
+MAGIC = b"MDGLOG"
+FORMAT_VERSION = 1
+MAX_SEATS = 8
+NO_CHARACTER = 255
+CHARACTERS = ('aggressive', 'defensive', 'normal')  # Character codes; append only
+FINISHED = 1  # Header flag: the game ended before the turn limit
+
+FILE_HEADER_SIZE = len(MAGIC) + 2
+HEADER_DTYPE = np.dtype([
+    ('seed', '<u8'), ('records', '<u4'), ('rules', '<u2'), ('turns', '<u2'),
+    ('players', 'u1'), ('first', 'u1'), ('winner', 'i1'), ('flags', 'u1'),
+    ('characters', 'u1', (MAX_SEATS,)), ('reserved', 'u1', (4,))
+])
+RECORD_DTYPE = np.dtype([
+    ('turn', '<u2'), ('player', 'u1'), ('kind', 'i1'), ('color', 'i1'),
+    ('target', 'i1'), ('give', 'i1'), ('doubles', 'i1')
+])
+
+
+class LoggedGame:
+    """One game: its header (a HEADER_DTYPE scalar) and records (a RECORD_DTYPE array)"""
+
+    __slots__ = ('header', 'records')
+
+    def __init__(self, header: np.void, records: np.ndarray):
+        self.header = header
+        self.records = records
+
+    @property
+    def seed(self) -> int:
+        return int(self.header['seed'])
+
+    @property
+    def edge_rules(self) -> EdgeRules:
+        return decode_rules(int(self.header['rules']))
+
+    @property
+    def characters(self) -> List[str]:
+        return [CHARACTERS[code] for code in self.header['characters'][:int(self.header['players'])]]
+
+    @property
+    def turns(self) -> int:
+        return int(self.header['turns'])
+
+    @property
+    def winner(self) -> int:
+        return int(self.header['winner'])
+
+    @property
+    def finished(self) -> bool:
+        return bool(self.header['flags'] & FINISHED)
+
+    def moves(self) -> Iterator[Tuple[int, int, Move]]:
+        """(turn, player, Move) for every record"""
+        for turn, player, kind, color, target, give, doubles in self.records.tolist():
+            yield turn, player, Move(kind, color, target, give, doubles)
+
+
+def _initial_rollout(simulator: GameSimulator, characters: Sequence[str], seed: int, rollout_class=_Rollout):
+    """The fresh deal a seed stands for: deal and deck from NumPy, reshuffles from random.Random"""
+    state = opening_state(len(characters))
+    deal = HiddenInformation(state).sample(1, np.random.default_rng(seed)).sample(0)
+    weights = simulator.seat_weights(characters, len(characters))
+    return rollout_class(simulator, state, [], weights, random.Random(seed), deal)
+
+
+class _LoggingRollout(_Rollout):
+    """Rollout that records every play with its targets resolved"""
+
+    __slots__ = ('turn', 'log')
+
+    def take_turn(self, player: int) -> bool:
+        self.turn += 1
+        return super().take_turn(player)
+
+    def play(self, player: int, kind: int, color: int, plays_left: int,
+             target: int = -1, give: int = -1, doubles: int = -1) -> int:
+        category = KIND_CATEGORY[kind]
+        if color != -2 and category is CardCategory.RENT:
+            color = color if color >= 0 else self.best_rent_color(player, KIND_COLORS[kind])
+            if doubles < 0:
+                doubles = min(self.hands[player][DOUBLE_RENT], self.sim.doubles_allowed[plays_left])
+            if kind == RENT_ANY and target < 0:
+                target = self.richest_opponent(player)
+        elif color != -2 and target < 0:
+            chosen = None
+            if kind == DEBT_COLLECTOR:
+                target = self.richest_opponent(player)
+            elif kind == SLY_DEAL or kind == FORCED_DEAL:
+                chosen = self.steal_target(player)
+            elif kind == DEAL_BREAKER:
+                chosen = self.deal_breaker_target(player)
+            if chosen is not None:
+                target, color = chosen
+                if kind == FORCED_DEAL and give < 0:
+                    give = self.give_away_color(player, target)
+        self.log.append((self.turn, player, kind, color, target, give, doubles))
+        return super().play(player, kind, color, plays_left, target, give, doubles)
+
+
+def play_game(edge_rules: Optional[EdgeRules] = None, characters: Sequence[str] = ('normal', 'normal'),
+              seed: int = 0, max_turns: int = DEFAULT_MAX_TURNS) -> LoggedGame:
+    """Play one self-play game from the fresh deal for seed and return its log"""
+    edge_rules = edge_rules or EdgeRules()
+    characters = list(characters)
+    if not 2 <= len(characters) <= MAX_SEATS:
+        raise ValueError(f"A logged game needs 2 to {MAX_SEATS} seats")
+    simulator = GameSimulator(edge_rules, max_turns=max_turns)
+    rollout = _initial_rollout(simulator, characters, seed, _LoggingRollout)
+    rollout.turn, rollout.log = -1, []
+    winner, turns, finished = rollout.run(0, max_turns)
+
+    header = np.zeros((), dtype=HEADER_DTYPE)
+    header['seed'] = seed
+    header['records'] = len(rollout.log)
+    header['rules'] = encode_rules(edge_rules)
+    header['turns'] = turns
+    header['players'] = len(characters)
+    header['winner'] = winner
+    header['flags'] = FINISHED if finished else 0
+    codes = [CHARACTERS.index(character) for character in characters]
+    header['characters'] = codes + [NO_CHARACTER] * (MAX_SEATS - len(codes))
+    return LoggedGame(header[()], np.array(rollout.log, dtype=RECORD_DTYPE).reshape(-1))
+
+
+class GameLogWriter:
+    """Appends games to a log file; each game is written as soon as it is added"""
+
+    def __init__(self, path: str):
+        new = not os.path.exists(path) or os.path.getsize(path) == 0
+        self._file = open(path, 'ab')
+        if new:
+            self._file.write(MAGIC + np.uint16(FORMAT_VERSION).astype('<u2').tobytes())
+
+    def write(self, game: LoggedGame) -> None:
+        if int(game.header['records']) != len(game.records):
+            raise ValueError("Header record count does not match the records")
+        self._file.write(np.asarray(game.header, dtype=HEADER_DTYPE).tobytes())
+        self._file.write(np.ascontiguousarray(game.records, dtype=RECORD_DTYPE).tobytes())
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self) -> "GameLogWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class GameLogReader:
+    """Memory-mapped log file; games are views into the mapping"""
+
+    def __init__(self, path: str):
+        size = os.path.getsize(path)
+        self._data = np.memmap(path, dtype=np.uint8, mode='r') if size else np.zeros(0, dtype=np.uint8)
+        if size < FILE_HEADER_SIZE or bytes(self._data[:len(MAGIC)]) != MAGIC:
+            raise ValueError(f"{path} is not a game log")
+        version = int(self._data[len(MAGIC):FILE_HEADER_SIZE].view('<u2')[0])
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported game log version {version}")
+
+    def _header_at(self, offset: int) -> np.void:
+        return self._data[offset:offset + HEADER_DTYPE.itemsize].view(HEADER_DTYPE)[0]
+
+    def offsets(self) -> Iterator[int]:
+        """Byte offset of every game header"""
+        offset, end = FILE_HEADER_SIZE, len(self._data)
+        while offset + HEADER_DTYPE.itemsize <= end:
+            yield offset
+            offset += HEADER_DTYPE.itemsize + int(self._header_at(offset)['records']) * RECORD_DTYPE.itemsize
+
+    def headers(self) -> np.ndarray:
+        """All game headers as one HEADER_DTYPE array (records are not read)"""
+        return np.array([self._header_at(offset) for offset in self.offsets()], dtype=HEADER_DTYPE)
+
+    def game_at(self, offset: int) -> LoggedGame:
+        header = self._header_at(offset)
+        start = offset + HEADER_DTYPE.itemsize
+        end = start + int(header['records']) * RECORD_DTYPE.itemsize
+        return LoggedGame(header, self._data[start:end].view(RECORD_DTYPE))
+
+    def __iter__(self) -> Iterator[LoggedGame]:
+        for offset in self.offsets():
+            yield self.game_at(offset)
+
+
+class GameReplayer:
+    """
+    Rebuilds positions of a logged game by replaying its records from the seed's deal.
+
+    A position is addressed as (turn, plays): the state during that turn after its
+    draw and its first plays plays; plays=None is the end of the turn, after discards.
+    """
+
+    def __init__(self, game: LoggedGame, names: Optional[Sequence[str]] = None):
+        self.game = game
+        self.edge_rules = game.edge_rules
+        self.names = list(names) if names else None
+        self._simulator = GameSimulator(self.edge_rules)
+        self._characters = game.characters
+        # Record index where each turn starts (records are in turn order)
+        turns = game.records['turn'] if len(game.records) else np.zeros(0, dtype=np.uint16)
+        self._turn_starts = np.searchsorted(turns, np.arange(game.turns + 1), side='left')
+
+    def initial_state(self) -> GameState:
+        """The deal, before the first turn's draw"""
+        return self._snapshot(_initial_rollout(self._simulator, self._characters, self.game.seed))
+
+    def state_at(self, turn: int, plays: Optional[int] = None) -> GameState:
+        for position_turn, position_plays, rollout in self._positions(turn):
+            if position_turn == turn and position_plays == plays:
+                return self._snapshot(rollout)
+        raise ValueError(f"Turn {turn} with {plays} plays is not a position of this game")
+
+    def final_state(self) -> GameState:
+        rollout = None
+        for _, _, rollout in self._positions(self.game.turns - 1):
+            pass
+        return self._snapshot(rollout) if rollout is not None else self.initial_state()
+
+    def states(self) -> Iterator[Tuple[int, GameState]]:
+        """(turn, GameState) at the end of every turn"""
+        for turn, plays, rollout in self._positions(self.game.turns - 1):
+            if plays is None:
+                yield turn, self._snapshot(rollout)
+
+    def _positions(self, last_turn: int) -> Iterator[Tuple[int, Optional[int], _Rollout]]:
+        """Replay turns up to last_turn, yielding the live rollout at every position"""
+        game = self.game
+        rollout = _initial_rollout(self._simulator, self._characters, game.seed)
+        n = rollout.n
+        records = game.records.tolist()
+        first = int(game.header['first'])
+        for turn in range(min(last_turn, game.turns - 1) + 1):
+            player = (first + turn) % n
+            if not rollout.draw(player, 5 if rollout.hand_sizes[player] == 0 else 2):
+                return
+            yield turn, 0, rollout
+            plays_left = PLAYS_PER_TURN
+            start, end = self._turn_starts[turn], self._turn_starts[turn + 1]
+            for index, (_, seat, kind, color, target, give, doubles) in enumerate(records[start:end]):
+                if seat != player:
+                    raise ValueError(f"Record for seat {seat} in seat {player}'s turn {turn}")
+                plays_left -= rollout.play(player, kind, color, plays_left, target, give, doubles)
+                yield turn, index + 1, rollout
+                if rollout.winner >= 0:
+                    return
+            rollout.discard_to_limit(player)
+            yield turn, None, rollout
+
+    def _snapshot(self, rollout: _Rollout) -> GameState:
+        compact = CompactGameState.copy(rollout)
+        compact.hidden = [0] * rollout.n
+        compact.deck_count = len(rollout.deck)
+        if self.names:
+            compact.names = self.names
+        return compact.to_game_state(self.edge_rules)
+
+
+def write_games(path: str, num_games: int, edge_rules: Optional[EdgeRules] = None,
+                characters: Sequence[str] = ('normal', 'normal'), seed: int = 0,
+                max_turns: int = DEFAULT_MAX_TURNS) -> int:
+    """Append num_games self-play games with consecutive seeds from seed; returns the bytes written"""
+    start = os.path.getsize(path) if os.path.exists(path) else 0
+    with GameLogWriter(path) as writer:
+        for index in range(num_games):
+            writer.write(play_game(edge_rules, characters, seed + index, max_turns))
+    return os.path.getsize(path) - start
@@ -0,0 +1,310 @@
+"""
+Incremental re-analysis after card transfers.
+
+A BoardSummary keeps, next to the CompactGameState, the per-player features
+the engine's evaluators are built from: the logical score term of every color,
+complete set counts, property wealth (bank + property base values is the
+player's wealth, plus 20 per complete set is their threat) and the worth of
+action cards in hand. Applying a CardTransfer touches only the moved card's
+player(s) and color: a few count updates, one color term and a re-sum of that
+player's color terms. The Zobrist hash of the position is carried along the
+same way, and identifies the summary so a client can chain card operations
+without the server re-encoding the board each time. A summary is reused for a
+token when the posted state has the same players, hand cards, bank totals,
+deck count and number of cards in play; these checks cost one pass over the
+piles, not a re-serialization of the board. Anything else is encoded afresh.
+
+The summary also carries what the engine derives from the board besides
+scores: the number of cards in play (the game phase), which no transfer from
+hand to the table changes, and the engine's move options per card in the
+current player's hand. A transfer to an opponent keeps the options for money
+and property cards, which read only the current player's own table, and drops
+the rest; a transfer by the current player drops them all.
+"""
+
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.cards import (
+    CardCategory, NUM_COLORS, SET_SIZES, PROPERTY_VALUES, KIND_CATEGORY, KIND_VALUE,
+    HOUSE, HOTEL, lookup_card, resolve_color
+)
+from app.core.compact_state import CompactGameState
+from app.core.config import settings
+from app.core import zobrist
+from app.models.game import GameState, CardTransfer
+
+
+_ACTION_CATEGORIES = (CardCategory.ACTION, CardCategory.BUILDING)
+
+# Move options that depend only on the card and the current player's own properties
+_OWN_TABLE_ACTIONS = frozenset({'play_money', 'play_property'})
+
+
+def _color_score(count: int, size: int) -> float:
+    """Per-color term of MonopolyDealEngine.evaluate_compact_logical"""
+    if count >= size:
+        return 50
+    if count:
+        return count / size * 30
+    return 0.0
+
+
+def _action_worth(kind: int) -> int:
+    return KIND_VALUE[kind] if kind >= 0 and KIND_CATEGORY[kind] in _ACTION_CATEGORIES else 0
+
+
+def cards_in_play(game_state: GameState) -> int:
+    """Hand, bank and property cards of every player (the count the game phase is read from)"""
+    return sum(len(player.hand) + len(player.bank) + sum(len(props) for props in player.properties.values())
+               for player in game_state.players)
+
+
+def _bank_total(bank: List[Any]) -> int:
+    """Bank value as CompactGameState.from_game_state counts it"""
+    return sum(int(item) for item in bank or [] if isinstance(item, (int, float)))
+
+
+def _own_table_only(options: List[Dict[str, Any]]) -> bool:
+    # An action card without options now may gain some when an opponent's table changes
+    return bool(options) and all(option.get('action') in _OWN_TABLE_ACTIONS for option in options)
+
+
+class BoardSummary:
+    """
+    Compact state plus per-player evaluation features, updated in place by apply_transfer.
+    Evaluations match MonopolyDealEngine.evaluate_compact for the same position exactly.
+    """
+
+    __slots__ = ('state', 'ids', 'hand_cards', 'color_scores', 'logical_props', 'complete',
+                 'property_wealth', 'action_worth', 'hash', 'cards_in_play', 'card_moves')
+
+    @classmethod
+    def from_game_state(cls, game_state: GameState) -> "BoardSummary":
+        summary = cls.__new__(cls)
+        state = CompactGameState.from_game_state(game_state)
+        summary.state = state
+        summary.ids = [player.id for player in game_state.players]
+        summary.hand_cards = [list(player.hand or []) for player in game_state.players]
+        summary.color_scores = [list(map(_color_score, props, SET_SIZES)) for props in state.props]
+        summary.logical_props = [sum(scores) for scores in summary.color_scores]
+        summary.complete = [state.complete_sets(player) for player in range(state.num_players)]
+        summary.property_wealth = [sum(map(int.__mul__, props, PROPERTY_VALUES)) for props in state.props]
+        summary.action_worth = [sum(_action_worth(kind) * count for kind, count in enumerate(hand))
+                                for hand in state.hands]
+        summary.hash = zobrist.hash_state(state)
+        summary.cards_in_play = cards_in_play(game_state)
+        summary.card_moves = {}
+        return summary
+
+    def copy(self) -> "BoardSummary":
+        clone = BoardSummary.__new__(BoardSummary)
+        clone.state = self.state.copy()
+        clone.state.hand_kinds = self.state.hand_kinds[:]  # rows are replaced, never mutated
+        clone.ids = self.ids
+        clone.hand_cards = self.hand_cards[:]
+        clone.color_scores = [scores[:] for scores in self.color_scores]
+        clone.logical_props = self.logical_props[:]
+        clone.complete = self.complete[:]
+        clone.property_wealth = self.property_wealth[:]
+        clone.action_worth = self.action_worth[:]
+        clone.hash = self.hash
+        clone.cards_in_play = self.cards_in_play
+        clone.card_moves = {key: entries[:] for key, entries in self.card_moves.items()}
+        return clone
+
+    @property
+    def token(self) -> str:
+        """Hex form of the position hash, safe to round-trip through JSON"""
+        return f"{self.hash:016x}"
+
+    def describes(self, game_state: GameState) -> bool:
+        """Whether game_state is the position this summary was made for, as far as a cheap check can tell"""
+        players = game_state.players
+        return (len(players) == len(self.ids)
+                and game_state.deckCount == self.state.deck_count
+                and all(player.id == player_id and player.name == name and player.hand == hand
+                        and _bank_total(player.bank) == bank
+                        for player, player_id, name, hand, bank in zip(players, self.ids, self.state.names,
+                                                                       self.hand_cards, self.state.banks))
+                and cards_in_play(game_state) == self.cards_in_play)
+
+    def moves_for(self, key: Tuple) -> List[Optional[List[Dict[str, Any]]]]:
+        """
+        Cached move options per card in the current player's hand for an engine key
+        (None where not analyzed yet). The engine fills the list in place.
+        """
+        entries = self.card_moves.get(key)
+        if entries is None:
+            entries = self.card_moves[key] = [None] * len(self.hand_cards[0]) if self.hand_cards else []
+        return entries
+
+    # Features
+
+    def wealth(self, player: int) -> int:
+        return self.state.banks[player] + self.property_wealth[player]
+
+    def threat(self, player: int) -> int:
+        return self.complete[player] * 20 + self.wealth(player)
+
+    def logical(self, player: int) -> float:
+        return self.logical_props[player] + min(self.state.banks[player] * 2, 20)
+
+    def value(self, player: int) -> float:
+        bank = self.state.banks[player]
+        return float(bank * 3 + self.property_wealth[player] * 2 + self.action_worth[player])
+
+    def evaluate(self, player: int, asset_type: str) -> float:
+        """Score for an AssetEvaluation value ('logical', 'value' or 'logical_value')"""
+        if asset_type == 'logical':
+            return self.logical(player)
+        if asset_type == 'value':
+            return self.value(player)
+        return (self.logical(player) + self.value(player)) / 2
+
+    def features(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            name: {
+                'completeSets': self.complete[player],
+                'bank': self.state.banks[player],
+                'wealth': self.wealth(player),
+                'threat': self.threat(player)
+            }
+            for player, name in enumerate(self.state.names)
+        }
+
+    # Incremental updates
+
+    def _set_hand(self, player: int, kind: int, delta: int) -> None:
+        hand = self.state.hands[player]
+        old = hand[kind]
+        hand[kind] = old + delta
+        self.state.hand_sizes[player] += delta
+        self.action_worth[player] += _action_worth(kind) * delta
+        self.hash = zobrist.update(self.hash, player, zobrist.HAND, kind, old, old + delta)
+
+    def _set_bank(self, player: int, delta: int) -> None:
+        old = self.state.banks[player]
+        self.state.banks[player] = old + delta
+        self.hash = zobrist.update(self.hash, player, zobrist.BANK, 0, old, old + delta)
+
+    def _add_property(self, player: int, color: int, kind: int) -> None:
+        state = self.state
+        if kind == HOUSE or kind == HOTEL:
+            zone, counts = (zobrist.HOUSES, state.houses) if kind == HOUSE else (zobrist.HOTELS, state.hotels)
+            self.hash = zobrist.update(self.hash, player, zone, color, counts[player][color], 1)
+            counts[player][color] = 1
+            return
+        props = state.props[player]
+        old = props[color]
+        props[color] = old + 1
+        category = KIND_CATEGORY[kind] if kind >= 0 else None
+        value = KIND_VALUE[kind] if category in (CardCategory.PROPERTY, CardCategory.WILD) else PROPERTY_VALUES[color]
+        old_value = state.prop_values[player][color]
+        state.prop_values[player][color] = old_value + value
+        self.hash = zobrist.update(self.hash, player, zobrist.PROPERTIES, color, old, old + 1)
+        self.hash = zobrist.update(self.hash, player, zobrist.PROP_VALUE, color, old_value, old_value + value)
+
+        size = SET_SIZES[color]
+        scores = self.color_scores[player]
+        scores[color] = _color_score(old + 1, size)
+        self.logical_props[player] = sum(scores)
+        self.complete[player] += (old + 1 >= size) - (old >= size)
+        self.property_wealth[player] += PROPERTY_VALUES[color]
+
+    def _take_from_hand(self, player: int, card_id: str) -> Optional[int]:
+        """Remove the first copy of card_id from the player's hand; its kind, or None if absent"""
+        cards = self.hand_cards[player]
+        if card_id not in cards:
+            return None
+        index = cards.index(card_id)
+        self.hand_cards[player] = cards[:index] + cards[index + 1:]
+        kinds = self.state.hand_kinds[player]
+        kind = kinds[index]
+        self.state.hand_kinds[player] = kinds[:index] + kinds[index + 1:]
+        if kind >= 0:
+            self._set_hand(player, kind, -1)
+        return kind
+
+    def apply_transfer(self, transfer: CardTransfer) -> bool:
+        """
+        Apply a transfer in place, mirroring the card-operation endpoint. Returns False for
+        transfers the summary does not model; the caller should rebuild from the new state.
+        """
+        route = (transfer.fromLocation, transfer.toLocation)
+        if route not in (('hand', 'properties'), ('hand', 'bank')):
+            return False
+        player = self.ids.index(transfer.toPlayerId)
+        kind = self._take_from_hand(player, transfer.cardId)
+        if kind is None:
+            return True  # card not in hand: nothing moves
+        if player == 0:
+            self.card_moves = {}
+        else:
+            for entries in self.card_moves.values():
+                entries[:] = [options if options is not None and _own_table_only(options) else None
+                              for options in entries]
+        if route == ('hand', 'properties'):
+            color = resolve_color(transfer.propertySet)
+            if color is not None:
+                self._add_property(player, color, kind)
+        else:
+            record = lookup_card(transfer.cardId)
+            self._set_bank(player, record.value if record is not None else 0)
+        return True
+
+
+class SummaryCache:
+    """Thread-safe bounded map from position hash to BoardSummary (LRU replacement)"""
+
+    def __init__(self, capacity: int = 1024):
+        self._table = zobrist.TranspositionTable(capacity)
+        self._lock = threading.Lock()
+
+    def get(self, token: Optional[str], game_state: GameState) -> Optional[BoardSummary]:
+        """Summary for a token, provided it was made for exactly the posted state"""
+        if not token:
+            return None
+        try:
+            key = int(token, 16)
+        except ValueError:
+            return None
+        with self._lock:
+            summary = self._table.get(key)
+        if summary is None or not summary.describes(game_state):
+            return None
+        return summary
+
+    def put(self, summary: BoardSummary) -> None:
+        with self._lock:
+            self._table.put(summary.hash, summary)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return self._table.stats()
+
+
+summary_cache = SummaryCache(settings.INCREMENTAL_CACHE_SIZE)
+
+
+def summarize_after(game_state: GameState, new_game_state: GameState, transfer: Any,
+                    token: Optional[str] = None,
+                    cache: Optional[SummaryCache] = None) -> Tuple[BoardSummary, bool]:
+    """
+    Summary of new_game_state, the result of applying transfer to game_state.
+    Starts from the cached summary for token when there is one and updates it
+    incrementally; otherwise encodes the new state in full. Returns the summary
+    and whether the incremental path was taken. The result is cached.
+    """
+    cache = summary_cache if cache is None else cache
+    base = cache.get(token, game_state)
+    summary = None
+    if base is not None and isinstance(transfer, CardTransfer):
+        summary = base.copy()
+        if not summary.apply_transfer(transfer):
+            summary = None
+    incremental = summary is not None
+    if summary is None:
+        summary = BoardSummary.from_game_state(new_game_state)
+    cache.put(summary)
+    return summary, incremental
@@ -0,0 +1,331 @@
+"""
+Legal move generation for one player's turn.
+
+Enumerates every distinct play (card x target player x target set x wild
+color, plus stacked Double the Rent cards and building moves) available to a
+player under the active EdgeRules, and drops dominated options while
+generating so search and simulation only spend time on plays that differ:
+
+- rent is only charged on the highest-rent color a rent card allows, and a
+  further Double the Rent is only stacked while the doubled rent is still
+  below what the richest target can pay;
+- a wild is not added to an already complete set while it could go to an
+  incomplete color instead (under the "cap" extra-properties rule);
+- Debt Collector / Birthday / rent never target players with nothing to pay;
+- buildings are only moved to a set with a higher full-set base rent, which
+  also keeps free building moves from cycling.
+
+Moves are plain tuples over card kinds, colors and seat indexes, so they
+work on CompactGameState and simulation rollouts alike. The generators take
+either a MoveRules or its compiled MoveKernel; hot loops hold on to the
+kernel so no rule enum is compared per move.
+"""
+
+from functools import lru_cache
+from typing import Iterator, List, NamedTuple, Optional, Sequence, Union
+
+from app.core.cards import (
+    CardCategory, COLORS, NUM_COLORS, SET_SIZES, RENT_TABLE, NO_BUILDING_COLORS,
+    KIND_NAMES, KIND_CATEGORY, KIND_VALUE, KIND_COLORS, WILD_ANY, DEAL_BREAKER,
+    SLY_DEAL, FORCED_DEAL, DEBT_COLLECTOR, BIRTHDAY, PASS_GO,
+    DOUBLE_RENT, HOUSE, HOTEL, RENT_ANY
+)
+from app.models.game import EdgeRules, ExtraPropertiesRule, HotelMoveRule
+
+
+PLAYS_PER_TURN = 3
+
+_COLOR_RANGE = range(NUM_COLORS)
+_FULL_SET_RENT = tuple(RENT_TABLE[color][min(SET_SIZES[color], len(RENT_TABLE[color])) - 1]
+                       for color in _COLOR_RANGE)
+
+
+class Move(NamedTuple):
+    """
+    One play. Fields left at -1 are chosen by the character policy when played.
+
+    kind: card kind (-1 ends the turn)
+    color: color the card goes to, charges rent on or takes (-2 banks the card as money)
+    target: opponent seat the card is played against
+    give: own color handed over by a Forced Deal; source color of a building move
+    doubles: Double the Rent cards stacked on a rent card
+    """
+    kind: int
+    color: int = -1
+    target: int = -1
+    give: int = -1
+    doubles: int = -1
+
+    @property
+    def is_building_move(self) -> bool:
+        return self.give >= 0 and (self.kind == HOUSE or self.kind == HOTEL)
+
+    @property
+    def action(self) -> str:
+        if self.kind < 0:
+            return 'end_turn'
+        category = KIND_CATEGORY[self.kind]
+        if self.color == -2 or category == CardCategory.MONEY:
+            return 'bank_money'
+        if category in (CardCategory.PROPERTY, CardCategory.WILD):
+            return 'play_property'
+        if category == CardCategory.BUILDING:
+            return 'move_building' if self.give >= 0 else 'build'
+        return 'play_action'
+
+    def describe(self, names: Optional[Sequence[str]] = None) -> str:
+        """Readable form, naming target seats from names when given"""
+        if self.kind < 0:
+            return "End turn"
+        name = KIND_NAMES[self.kind]
+        action = self.action
+        if action == 'bank_money':
+            return f"Bank {name} (${KIND_VALUE[self.kind]}M)"
+        if action == 'move_building':
+            return f"Move {name} from {COLORS[self.give]} to {COLORS[self.color]}"
+        if action in ('play_property', 'build'):
+            return f"Play {name} on {COLORS[self.color]}"
+
+        target = ''
+        if self.target >= 0:
+            target = names[self.target] if names and self.target < len(names) else f"player {self.target + 1}"
+        if self.kind == DEAL_BREAKER and target:
+            return f"Play {name}: take {target}'s {COLORS[self.color]} set"
+        if self.kind == SLY_DEAL and target:
+            return f"Play {name}: take {COLORS[self.color]} from {target}"
+        if self.kind == FORCED_DEAL and target:
+            return f"Play {name}: swap my {COLORS[self.give]} for {target}'s {COLORS[self.color]}"
+        if KIND_CATEGORY[self.kind] == CardCategory.RENT and self.color >= 0:
+            label = f"Play {name} on {COLORS[self.color]}"
+            if self.doubles > 0:
+                label += " with Double the Rent" + (f" x{self.doubles}" if self.doubles > 1 else "")
+            return f"{label} against {target}" if target else label
+        return f"Play {name} on {target}" if target else f"Play {name}"
+
+    @property
+    def label(self) -> str:
+        return self.describe()
+
+
+END_TURN = Move(-1)
+
+
+class MoveRules(NamedTuple):
+    """The EdgeRules settings that change which plays are legal"""
+    quadruple_rent: bool = False
+    forced_deal_setup: bool = True
+    hotel_move: HotelMoveRule = HotelMoveRule.NOT_ALLOWED
+    extra_properties: ExtraPropertiesRule = ExtraPropertiesRule.CAP_RENT
+
+    @classmethod
+    def from_edge_rules(cls, edge_rules: Optional[EdgeRules]) -> "MoveRules":
+        rules = edge_rules or EdgeRules()
+        return cls(bool(rules.quadrupleRent), bool(rules.forcedDealToDealBreaker),
+                   rules.hotelMove, rules.extraProperties)
+
+    @property
+    def max_doubles(self) -> int:
+        return 2 if self.quadruple_rent else 1
+
+    @property
+    def building_move_cost(self) -> int:
+        """Plays a building move uses (0 when moves are free)"""
+        return 0 if self.hotel_move == HotelMoveRule.FREE_MOVE else 1
+
+    @property
+    def compiled(self) -> "MoveKernel":
+        return compile_move_rules(self)
+
+
+class MoveKernel:
+    """
+    MoveRules compiled once: the rule enums become constants and pre-bound
+    functions, so generating moves never compares a rule setting.
+
+    doubles_allowed[plays_left]: Double the Rent cards a rent card may stack
+    property_colors(mine, colors): colors a property card may go to
+    relocations(state, player, plays_left): building moves (empty when not allowed)
+    """
+
+    __slots__ = ('rules', 'compiled', 'quadruple_rent', 'max_doubles', 'doubles_allowed',
+                 'building_move_cost', 'forced_deal_setup', 'property_colors', 'relocations')
+
+    def __init__(self, rules: MoveRules):
+        self.rules = rules
+        self.compiled = self
+        self.quadruple_rent = rules.quadruple_rent
+        self.max_doubles = rules.max_doubles
+        self.doubles_allowed = tuple(max(0, min(plays_left - 1, self.max_doubles))
+                                     for plays_left in range(PLAYS_PER_TURN + 1))
+        self.building_move_cost = rules.building_move_cost
+        self.forced_deal_setup = rules.forced_deal_setup
+        self.property_colors = (_incomplete_colors if rules.extra_properties == ExtraPropertiesRule.CAP_RENT
+                                else _any_colors)
+        if rules.hotel_move == HotelMoveRule.NOT_ALLOWED:
+            self.relocations = _no_relocations
+        elif self.building_move_cost:
+            self.relocations = _paid_relocations
+        else:
+            self.relocations = _relocations
+
+    def __repr__(self) -> str:
+        return f"MoveKernel({self.rules!r})"
+
+
+@lru_cache(maxsize=None)
+def compile_move_rules(rules: MoveRules) -> MoveKernel:
+    return MoveKernel(rules)
+
+
+DEFAULT_RULES = MoveRules()
+
+
+def _opponents(state, player: int) -> List[int]:
+    return [seat for seat in range(len(state.names)) if seat != player]
+
+
+def _buildable(state, player: int, color: int, kind: int) -> bool:
+    """A house/hotel of this kind may be placed on the player's set of color"""
+    if color in NO_BUILDING_COLORS or state.props[player][color] < SET_SIZES[color]:
+        return False
+    if kind == HOUSE:
+        return not state.houses[player][color]
+    return state.houses[player][color] and not state.hotels[player][color]
+
+
+def _any_colors(mine, colors: List[int]) -> List[int]:
+    return colors
+
+
+def _incomplete_colors(mine, colors: List[int]) -> List[int]:
+    """Under the "cap" rule, only complete a set with a card that has nowhere else to go"""
+    incomplete = [color for color in colors if mine[color] < SET_SIZES[color]]
+    return incomplete or colors[:1]
+
+
+def _property_moves(state, player: int, kind: int, rules: MoveKernel) -> Iterator[Move]:
+    mine = state.props[player]
+    colors = [color for color in KIND_COLORS[kind] if kind != WILD_ANY or mine[color]]
+    for color in rules.property_colors(mine, colors):
+        yield Move(kind, color)
+
+
+def _building_moves(state, player: int, kind: int) -> Iterator[Move]:
+    for color in _COLOR_RANGE:
+        if _buildable(state, player, color, kind):
+            yield Move(kind, color)
+    yield Move(kind, -2)
+
+
+def _no_relocations(state, player: int, plays_left: int) -> Iterator[Move]:
+    return iter(())
+
+
+def _paid_relocations(state, player: int, plays_left: int) -> Iterator[Move]:
+    """Building moves that cost a play"""
+    return _relocations(state, player, plays_left) if plays_left > 0 else iter(())
+
+
+def _relocations(state, player: int, plays_left: int) -> Iterator[Move]:
+    """Moves of a house or hotel already on the table to a higher-rent complete set"""
+    houses, hotels = state.houses[player], state.hotels[player]
+    for source in _COLOR_RANGE:
+        for kind, placed in ((HOTEL, hotels[source]), (HOUSE, houses[source] and not hotels[source])):
+            if not placed:
+                continue
+            for color in _COLOR_RANGE:
+                if _FULL_SET_RENT[color] > _FULL_SET_RENT[source] and _buildable(state, player, color, kind):
+                    yield Move(kind, color, give=source)
+
+
+def _rent_moves(state, player: int, kind: int, rules: MoveKernel, plays_left: int) -> Iterator[Move]:
+    best_color, rent = -1, 0
+    for color in KIND_COLORS[kind]:
+        color_rent = state.rent(player, color)
+        if color_rent > rent:
+            best_color, rent = color, color_rent
+    if best_color < 0:
+        return
+    payers = [(seat, state.assets(seat)) for seat in _opponents(state, player)]
+    payers = [(seat, assets) for seat, assets in payers if assets > 0]
+    if not payers:
+        return
+    targets = payers if kind == RENT_ANY else [(-1, max(assets for _, assets in payers))]
+    max_doubles = min(state.hands[player][DOUBLE_RENT], rules.doubles_allowed[plays_left])
+    for target, assets in targets:
+        charged = rent
+        for doubles in range(max_doubles + 1):
+            if doubles and charged // 2 >= assets:
+                break  # the previous rent already took everything the target can pay
+            yield Move(kind, best_color, target, doubles=doubles)
+            charged *= 2
+
+
+def _steal_moves(state, player: int, kind: int, rules: MoveKernel) -> Iterator[Move]:
+    mine = state.props[player]
+    gives = [color for color in _COLOR_RANGE if 0 < mine[color] < SET_SIZES[color]]
+    for opponent in _opponents(state, player):
+        theirs = state.props[opponent]
+        for color in _COLOR_RANGE:
+            count = theirs[color]
+            if kind == DEAL_BREAKER:
+                if count >= SET_SIZES[color]:
+                    yield Move(kind, color, opponent)
+                continue
+            if count == 0 or count >= SET_SIZES[color]:
+                continue
+            if kind == SLY_DEAL:
+                yield Move(kind, color, opponent)
+                continue
+            for give in gives:
+                if give == color:
+                    continue
+                # Without the combo rule a Forced Deal may not hand over the card that completes a set
+                if not rules.forced_deal_setup and theirs[give] + 1 >= SET_SIZES[give]:
+                    continue
+                yield Move(kind, color, opponent, give)
+
+
+def kind_moves(state, player: int, kind: int, rules: Union[MoveRules, MoveKernel] = DEFAULT_RULES,
+               plays_left: int = PLAYS_PER_TURN) -> Iterator[Move]:
+    """Legal, non-dominated plays of one card kind the player holds"""
+    rules = rules.compiled
+    category = KIND_CATEGORY[kind]
+    if category == CardCategory.MONEY:
+        yield Move(kind)
+        return
+    if category in (CardCategory.PROPERTY, CardCategory.WILD):
+        yield from _property_moves(state, player, kind, rules)
+        return
+    if category == CardCategory.BUILDING:
+        yield from _building_moves(state, player, kind)
+        return
+
+    if category == CardCategory.RENT:
+        yield from _rent_moves(state, player, kind, rules, plays_left)
+    elif kind in (DEAL_BREAKER, SLY_DEAL, FORCED_DEAL):
+        yield from _steal_moves(state, player, kind, rules)
+    elif kind == DEBT_COLLECTOR:
+        for opponent in _opponents(state, player):
+            if state.assets(opponent) > 0:
+                yield Move(kind, target=opponent)
+    elif kind == BIRTHDAY:
+        if any(state.assets(opponent) > 0 for opponent in _opponents(state, player)):
+            yield Move(kind)
+    elif kind == PASS_GO:
+        yield Move(kind)
+    # Just Say No and Double the Rent are only played in response / with a rent card
+    yield Move(kind, -2)
+
+
+def generate_moves(state, player: int, rules: Union[MoveRules, MoveKernel] = DEFAULT_RULES,
+                   plays_left: int = PLAYS_PER_TURN) -> List[Move]:
+    """Every distinct legal play for player, END_TURN last"""
+    rules = rules.compiled
+    moves = []
+    for kind, count in enumerate(state.hands[player]):
+        if count:
+            moves.extend(kind_moves(state, player, kind, rules, plays_left))
+    moves.extend(rules.relocations(state, player, plays_left))
+    moves.append(END_TURN)
+    return moves
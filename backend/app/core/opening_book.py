@@ -0,0 +1,411 @@
+"""
+Opening book for the first turn of a game.
+
+The first player opens with a 5-card deal plus 2 draws against an empty
+table. The position is then fully described by the mover's 7 cards as a
+multiset of card kinds, so books key openings by that multiset. The
+combinatorial number system ranks it: sorted kinds a_0 <= ... <= a_6 become
+the strictly increasing b_i = a_i + i, and rank = sum C(b_i, i + 1) is a
+unique integer below C(NUM_KINDS + 6, 7), which fits in 32 bits.
+
+Books hold the openings dealt most often (sample_openings), so the likeliest
+hands are answered first. For every opening in the book, each official preset and each strategy, the
+builder stores the turn's best line from a seeded forward search and the
+mover's win rate over rollouts that play that line and continue from the
+opponent's turn. The book is one file:
+
+    b"MDBOOK" + uint16 version, uint32 header length, JSON header
+    ranks   u4[entries]                                  sorted
+    lines   i1[presets, entries, strategies, plays, 5]   Move fields, kind -1 pads
+    wins    f4[presets, entries, strategies]
+
+with every section starting on an 8-byte boundary. OpeningBook memory-maps
+the file, and a lookup is a binary search over the ranks followed by array
+indexing. Positions that are not a canonical opening, rules that are not a
+preset in the book, and hands the book does not contain return None, so
+callers fall back to live analysis.
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import os
+import random
+import threading
+from collections import Counter
+from math import comb
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.cards import DECK_COMPOSITION, DECK_SIZE, NUM_KINDS, KIND_NAMES, classify_card
+from app.core.compact_state import CompactGameState
+from app.core.config import settings
+from app.core.determinize import HiddenInformation
+from app.core.game_engine import get_engine
+from app.core.moves import Move, PLAYS_PER_TURN
+from app.core.parallel_simulation import get_process_pool, pool_size
+from app.core.rule_space import encode_rules
+from app.core.simulation import DEFAULT_MAX_TURNS
+from app.core.tournament import OPENING_HAND
+from app.models.configuration import OFFICIAL_PRESETS
+from app.models.game import GameState, PlayerState, EdgeRules, AIStrategy, AnalysisResponse
+
+
+MAGIC = b"MDBOOK"
+FORMAT_VERSION = 1
+OPENING_DRAW = 2
+HAND_SIZE = OPENING_HAND + OPENING_DRAW
+NUM_PLAYERS = 2
+OPENING_DECK = DECK_SIZE - OPENING_HAND * NUM_PLAYERS - OPENING_DRAW
+RANK_LIMIT = comb(NUM_KINDS + HAND_SIZE - 1, HAND_SIZE)
+DEFAULT_SEARCH_ITERATIONS = 300
+DEFAULT_ROLLOUTS = 256
+_MOVE_FIELDS = 5
+_ALIGN = 8
+
+
+def rank_hand(counts: Sequence[int]) -> int:
+    """Combinatorial-number-system rank of a HAND_SIZE-card multiset given as counts per kind"""
+    rank, index = 0, 0
+    for kind, count in enumerate(counts):
+        for _ in range(count):
+            rank += comb(kind + index, index + 1)
+            index += 1
+    if index != HAND_SIZE:
+        raise ValueError(f"An opening hand has {HAND_SIZE} cards, not {index}")
+    return rank
+
+
+def unrank_hand(rank: int) -> List[int]:
+    """Counts per kind of the multiset with this rank"""
+    if not 0 <= rank < RANK_LIMIT:
+        raise ValueError(f"Opening rank {rank} is outside 0..{RANK_LIMIT - 1}")
+    counts = [0] * NUM_KINDS
+    top = NUM_KINDS + HAND_SIZE - 1
+    for index in range(HAND_SIZE - 1, -1, -1):
+        b = index
+        while b + 1 < top and comb(b + 1, index + 1) <= rank:
+            b += 1
+        rank -= comb(b, index + 1)
+        counts[b - index] += 1
+        top = b
+    return counts
+
+
+def opening_hand(game_state: GameState) -> Optional[List[int]]:
+    """
+    The mover's counts per kind when game_state is a first-turn opening: two players,
+    nothing banked, played or discarded, the mover holding HAND_SIZE known cards and the
+    opponent an unknown 5-card hand. None for any other position.
+    """
+    players = game_state.players
+    if len(players) != NUM_PLAYERS or game_state.discard or game_state.deckCount != OPENING_DECK:
+        return None
+    if any(player.bank or any(player.properties.values()) for player in players):
+        return None
+    mover, opponent = players
+    if opponent.hand or opponent.handCount not in (None, OPENING_HAND):
+        return None
+    if len(mover.hand) != HAND_SIZE or mover.handCount not in (None, HAND_SIZE):
+        return None
+    counts = [0] * NUM_KINDS
+    for card in mover.hand:
+        kind = classify_card(card)
+        if kind < 0:
+            return None
+        counts[kind] += 1
+    return counts
+
+
+def opening_state(counts: Sequence[int], edge_rules: Optional[EdgeRules] = None,
+                  names: Sequence[str] = ("You", "Opponent")) -> GameState:
+    """The canonical opening GameState for a hand given as counts per kind"""
+    hand = [KIND_NAMES[kind] for kind, count in enumerate(counts) for _ in range(count)]
+    return GameState(
+        players=[
+            PlayerState(id=1, name=names[0], hand=hand, bank=[], properties={}),
+            PlayerState(id=2, name=names[1], hand=[], bank=[], properties={}, handCount=OPENING_HAND)
+        ],
+        discard=[],
+        deckCount=OPENING_DECK,
+        edgeRules=edge_rules or EdgeRules()
+    )
+
+
+def deal_openings(deals: int, seed: int = 0, batch: int = 4096) -> List[int]:
+    """Ranks of the openings of deals shuffled decks, in deal order"""
+    rng = np.random.default_rng(seed)
+    deck = np.repeat(np.arange(NUM_KINDS), DECK_COMPOSITION)
+    ranks = []
+    for start in range(0, deals, batch):
+        hands = deck[np.argsort(rng.random((min(batch, deals - start), DECK_SIZE)), axis=1)[:, :HAND_SIZE]]
+        ranks.extend(rank_hand(np.bincount(hand, minlength=NUM_KINDS).tolist()) for hand in hands)
+    return ranks
+
+
+def sample_openings(count: int, seed: int = 0, deals: Optional[int] = None) -> List[int]:
+    """Sorted ranks of the count most frequent openings over deals shuffled decks"""
+    deals = deals or max(20000, 20 * count)
+    frequency = Counter(deal_openings(deals, seed))
+    while len(frequency) < count:
+        deals *= 2
+        frequency = Counter(deal_openings(deals, seed))
+    return sorted(rank for rank, _ in frequency.most_common(count))
+
+
+def _entry_seed(seed: int, rank: int) -> int:
+    """Seed of one book entry; depends on the book seed and the opening only"""
+    return int.from_bytes(hashlib.blake2b(f"{seed}:opening:{rank}".encode(), digest_size=8).digest(), 'big')
+
+
+# ------------------------------------------------------------------ building
+
+def _analyze_openings(preset: str, strategies: Sequence[str], ranks: Sequence[int], iterations: int,
+                      rollouts: int, seed: int, max_turns: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Worker entry point: best lines and win rates for a chunk of openings under one preset"""
+    edge_rules = OFFICIAL_PRESETS[preset].rules
+    engine = get_engine(edge_rules)
+    simulator = engine.simulator
+    lines = np.full((len(ranks), len(strategies), PLAYS_PER_TURN, _MOVE_FIELDS), -1, dtype=np.int8)
+    wins = np.zeros((len(ranks), len(strategies)), dtype=np.float32)
+
+    for row, rank in enumerate(ranks):
+        entry_seed = _entry_seed(seed, rank)
+        game_state = opening_state(unrank_hand(rank), edge_rules)
+        compact = CompactGameState.from_game_state(game_state)
+        # Every strategy is scored on the same deals (strategy values name the rollout characters)
+        deals = HiddenInformation(compact).sample(rollouts, np.random.default_rng(entry_seed)) if rollouts else None
+        for column, strategy in enumerate(strategies):
+            result = engine.search_turn(game_state, AIStrategy(strategy), math.inf, compact,
+                                        seed=entry_seed, max_iterations=iterations)
+            line = [move for move in result.bestMoves if move.kind >= 0]
+            for play, move in enumerate(line):
+                lines[row, column, play] = tuple(move)
+
+            weights = simulator.seat_weights([strategy, 'normal'], NUM_PLAYERS)
+            rng = random.Random(entry_seed)
+            won = 0
+            for index in range(rollouts):
+                rollout = simulator.rollout(compact, [], weights, rng, deals.sample(index))
+                plays_left = PLAYS_PER_TURN
+                for move in line:
+                    if plays_left <= 0 or rollout.winner >= 0 or rollout.over:
+                        break
+                    plays_left -= rollout.play(0, move.kind, move.color, plays_left, move.target, move.give,
+                                               move.doubles)
+                if rollout.winner < 0:
+                    rollout.discard_to_limit(0)
+                    winner = rollout.run(1, max_turns)[0]
+                else:
+                    winner = rollout.winner
+                won += winner == 0
+            wins[row, column] = won / rollouts if rollouts else 0.0
+    return lines, wins
+
+
+def _aligned(offset: int) -> int:
+    return (offset + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+def _layout(entries: int, presets: int, strategies: int, data_start: int) -> Dict[str, Tuple[int, tuple, str]]:
+    """Section name -> (offset, shape, dtype)"""
+    sections = {}
+    offset = data_start
+    for name, shape, dtype in (
+        ('ranks', (entries,), '<u4'),
+        ('lines', (presets, entries, strategies, PLAYS_PER_TURN, _MOVE_FIELDS), 'i1'),
+        ('wins', (presets, entries, strategies), '<f4'),
+    ):
+        offset = _aligned(offset)
+        sections[name] = (offset, shape, dtype)
+        offset += int(np.prod(shape)) * np.dtype(dtype).itemsize
+    return sections
+
+
+def build_opening_book(path: str, ranks: Sequence[int], presets: Optional[Sequence[str]] = None,
+                       strategies: Optional[Sequence[str]] = None,
+                       search_iterations: int = DEFAULT_SEARCH_ITERATIONS, rollouts: int = DEFAULT_ROLLOUTS,
+                       seed: int = 0, max_workers: Optional[int] = None, chunk_size: int = 64,
+                       max_turns: int = DEFAULT_MAX_TURNS) -> Dict[str, Any]:
+    """
+    Analyze every opening rank under every preset and strategy and write the book.
+
+    Args:
+        path: Output file
+        ranks: Opening ranks to include (see rank_hand / sample_openings)
+        presets: Official preset ids (all by default)
+        strategies: AIStrategy values (all by default)
+        search_iterations: Playouts per forward search
+        rollouts: Games per win estimate
+        seed: Book seed; entries depend only on it and their rank
+        max_workers: Tasks run in parallel on the shared pool (its size by default); 1 builds in-process
+        chunk_size: Openings per pool task
+
+    Returns:
+        The book header
+    """
+    ranks = sorted(set(int(rank) for rank in ranks))
+    for rank in ranks:
+        unrank_hand(rank)
+    presets = list(presets or OFFICIAL_PRESETS)
+    strategies = [AIStrategy(strategy).value for strategy in (strategies or [s.value for s in AIStrategy])]
+    max_workers = max_workers or pool_size()
+    chunk_size = max(1, chunk_size)
+
+    # Entry seeds depend on the rank only, so a book built from more openings agrees on the shared ones
+    tasks = [(preset, strategies, ranks[start:start + chunk_size], search_iterations, rollouts, seed, max_turns)
+             for preset in presets for start in range(0, len(ranks), chunk_size)]
+    if max_workers <= 1 or len(tasks) <= 1:
+        results = [_analyze_openings(*task) for task in tasks]
+    else:
+        pool = get_process_pool()
+        results = [future.result() for future in [pool.submit(_analyze_openings, *task) for task in tasks]]
+
+    header = {
+        'version': FORMAT_VERSION,
+        'players': NUM_PLAYERS,
+        'handSize': HAND_SIZE,
+        'kinds': NUM_KINDS,
+        'presets': [{'id': preset, 'rules': encode_rules(OFFICIAL_PRESETS[preset].rules)} for preset in presets],
+        'strategies': strategies,
+        'entries': len(ranks),
+        'searchIterations': search_iterations,
+        'rollouts': rollouts,
+        'seed': seed,
+    }
+    encoded = json.dumps(header).encode()
+    data_start = len(MAGIC) + 2 + 4 + len(encoded)
+    sections = _layout(len(ranks), len(presets), len(strategies), data_start)
+    lines = np.concatenate([lines for lines, _ in results]) if results else np.zeros(0, np.int8)
+    wins = np.concatenate([wins for _, wins in results]) if results else np.zeros(0, np.float32)
+    arrays = {
+        'ranks': np.asarray(ranks, dtype='<u4'),
+        'lines': lines.reshape(sections['lines'][1]),
+        'wins': wins.reshape(sections['wins'][1]),
+    }
+
+    with open(path, 'wb') as handle:
+        handle.write(MAGIC + np.uint16(FORMAT_VERSION).astype('<u2').tobytes())
+        handle.write(np.uint32(len(encoded)).astype('<u4').tobytes() + encoded)
+        for name, (offset, shape, dtype) in sections.items():
+            handle.write(b"\0" * (offset - handle.tell()))
+            handle.write(np.ascontiguousarray(arrays[name], dtype=dtype).tobytes())
+    return header
+
+
+# ------------------------------------------------------------------- lookup
+
+class OpeningBook:
+    """A memory-mapped opening book"""
+
+    def __init__(self, path: str):
+        data = np.memmap(path, dtype=np.uint8, mode='r')
+        if bytes(data[:len(MAGIC)]) != MAGIC:
+            raise ValueError(f"{path} is not an opening book")
+        version = int(data[len(MAGIC):len(MAGIC) + 2].view('<u2')[0])
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported opening book version {version}")
+        length = int(data[len(MAGIC) + 2:len(MAGIC) + 6].view('<u4')[0])
+        start = len(MAGIC) + 6
+        self.header = json.loads(bytes(data[start:start + length]))
+        self.presets = {preset['rules']: index for index, preset in enumerate(self.header['presets'])}
+        self.strategies = {strategy: index for index, strategy in enumerate(self.header['strategies'])}
+        sections = _layout(self.header['entries'], len(self.header['presets']), len(self.header['strategies']),
+                           start + length)
+        views = {}
+        for name, (offset, shape, dtype) in sections.items():
+            size = int(np.prod(shape)) * np.dtype(dtype).itemsize
+            views[name] = data[offset:offset + size].view(dtype).reshape(shape)
+        self.ranks, self.lines, self.wins = views['ranks'], views['lines'], views['wins']
+
+    def __len__(self) -> int:
+        return len(self.ranks)
+
+    def find(self, rank: int) -> int:
+        """Entry index of an opening rank, or -1"""
+        index = int(np.searchsorted(self.ranks, rank))
+        return index if index < len(self.ranks) and int(self.ranks[index]) == rank else -1
+
+    def entry(self, counts: Sequence[int], edge_rules: EdgeRules,
+              strategy: AIStrategy) -> Optional[Tuple[List[Move], float]]:
+        """(best line, mover's win rate) for an opening hand, or None when the book lacks it"""
+        preset = self.presets.get(encode_rules(edge_rules))
+        column = self.strategies.get(AIStrategy(strategy).value)
+        if preset is None or column is None:
+            return None
+        index = self.find(rank_hand(counts))
+        if index < 0:
+            return None
+        line = [Move(*fields) for fields in self.lines[preset, index, column].tolist() if fields[0] >= 0]
+        return line, float(self.wins[preset, index, column])
+
+    def lookup(self, game_state: GameState, strategy: AIStrategy) -> Optional[AnalysisResponse]:
+        """The book's answer for an opening position, or None"""
+        counts = opening_hand(game_state)
+        if counts is None:
+            return None
+        found = self.entry(counts, game_state.edgeRules, strategy)
+        if found is None:
+            return None
+        line, win_rate = found
+        names = [player.name for player in game_state.players]
+        preset = self.header['presets'][self.presets[encode_rules(game_state.edgeRules)]]['id']
+        labels = [move.describe(names) for move in line] or ["End turn"]
+        action = line[0].action if line else 'end_turn'
+        return AnalysisResponse(
+            recommendedMove=f"{action}: {', then '.join(labels)}",
+            reasoning=(f"Opening book ({preset}): best line of a {self.header['searchIterations']}-playout "
+                       f"search; {names[0]} wins {win_rate:.0%} of {self.header['rollouts']} games "
+                       f"that follow it."),
+            strongestPlayer=names[0] if win_rate >= 0.5 else names[1],
+            winProbability={names[0]: round(win_rate, 4), names[1]: round(1.0 - win_rate, 4)},
+            debug={'openingBook': {'preset': preset, 'rank': rank_hand(counts)}}
+        )
+
+
+_book: Optional[OpeningBook] = None
+_book_loaded = False
+_book_lock = threading.Lock()
+
+
+def get_opening_book() -> Optional[OpeningBook]:
+    """The book at settings.OPENING_BOOK_PATH, loaded on first use (None when not configured)"""
+    global _book, _book_loaded
+    if _book_loaded:
+        return _book
+    with _book_lock:
+        if not _book_loaded:
+            path = settings.OPENING_BOOK_PATH
+            if path and os.path.exists(path):
+                try:
+                    _book = OpeningBook(path)
+                except ValueError as e:
+                    print(f"Opening book not loaded: {e}")
+            _book_loaded = True
+    return _book
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Build an opening book from sampled first-turn hands")
+    parser.add_argument("path", help="output file")
+    parser.add_argument("--openings", type=int, default=1000, help="distinct hands to include, most frequent first")
+    parser.add_argument("--presets", nargs="*", default=None, help="official preset ids (default: all)")
+    parser.add_argument("--iterations", type=int, default=DEFAULT_SEARCH_ITERATIONS)
+    parser.add_argument("--rollouts", type=int, default=DEFAULT_ROLLOUTS)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None, help="pool processes (default: one per core)")
+    args = parser.parse_args(argv)
+    if args.workers:
+        settings.SIMULATION_POOL_WORKERS = args.workers  # size of the shared pool this run starts
+
+    header = build_opening_book(args.path, sample_openings(args.openings, args.seed), args.presets,
+                                search_iterations=args.iterations, rollouts=args.rollouts, seed=args.seed,
+                                max_workers=args.workers)
+    print(f"Wrote {header['entries']} openings x {len(header['presets'])} presets x "
+          f"{len(header['strategies'])} strategies to {args.path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""
+Process-pool parallel simulation for Monopoly Deal.
+
+A simulation request is cut into fixed-size shards of rollouts. Every shard
+gets its own RNG stream spawned from the single request seed, so the merged
+result depends only on (seed, number of rollouts) and never on how many
+workers ran the shards. Shards are executed on a shared ProcessPoolExecutor
+of SIMULATION_POOL_WORKERS processes (one per core by default), created once
+and kept for the life of the server.
+
+With a StoppingRule the plan for the maximum number of rollouts is merged in
+shard order and checked after every shard; the first shard that satisfies the
+rule ends the run and later shards are dropped (or cancelled), so an early
+stop also depends only on the seed.
+"""
+
+import hashlib
+import math
+import os
+import secrets
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from multiprocessing import get_context
+from typing import Dict, Iterator, List, Optional, Sequence, Union
+
+from app.core.compact_state import CompactGameState
+from app.core.config import settings
+from app.core.confidence import StoppingRule
+from app.core.simulation import GameSimulator, SimulationSummary, DEFAULT_MAX_TURNS
+from app.models.game import GameState, EdgeRules
+
+
+DEFAULT_SHARD_SIZE = 64
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def spawn_seeds(seed: int, count: int) -> List[int]:
+    """Derive count independent 64-bit stream seeds from one request seed"""
+    return [
+        int.from_bytes(hashlib.blake2b(f"{seed}:{index}".encode(), digest_size=8).digest(), 'big')
+        for index in range(count)
+    ]
+
+
+def new_request_seed() -> int:
+    """Random seed for requests that did not supply one"""
+    return secrets.randbits(63)
+
+
+def pool_size() -> int:
+    """Worker processes of the shared pool: SIMULATION_POOL_WORKERS, or one per core"""
+    return settings.SIMULATION_POOL_WORKERS or os.cpu_count() or 1
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """
+    Shared simulation pool of pool_size() workers, created on first use. It is never
+    resized or shut down on a request path; a caller's max_workers only bounds how many
+    of its tasks it keeps in flight.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn keeps workers independent of the server's threads
+            _pool = ProcessPoolExecutor(max_workers=pool_size(), mp_context=get_context("spawn"))
+        return _pool
+
+
+def shutdown_process_pool() -> None:
+    """Shut the shared pool down (at exit and in tests); the next get_process_pool starts a new one"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True)
+        _pool = None
+
+
+def _run_shard(edge_rules: EdgeRules, max_turns: int, character_weights: Optional[Dict[str, Dict[str, float]]],
+               state: CompactGameState, characters: Sequence[str], count: int, seed: int) -> SimulationSummary:
+    """Worker entry point: play one shard of rollouts with its own RNG stream"""
+    simulator = GameSimulator(edge_rules, max_turns=max_turns, character_weights=character_weights)
+    return simulator.run(state, characters, count, seed=seed)
+
+
+class ParallelSimulator:
+    """
+    Shards rollouts across a process pool with deterministic per-shard RNG streams.
+    """
+
+    def __init__(self, edge_rules: Optional[EdgeRules] = None, max_workers: Optional[int] = None,
+                 shard_size: int = DEFAULT_SHARD_SIZE, max_turns: int = DEFAULT_MAX_TURNS,
+                 character_weights: Optional[Dict[str, Dict[str, float]]] = None):
+        self.edge_rules = edge_rules or EdgeRules()
+        self.max_workers = max_workers or pool_size()
+        self.shard_size = max(1, shard_size)
+        self.max_turns = max_turns
+        self.character_weights = character_weights
+
+    def shard_plan(self, num_rollouts: int, seed: int) -> List[tuple]:
+        """(rollouts, seed) per shard. Depends only on num_rollouts and seed"""
+        num_shards = max(1, math.ceil(num_rollouts / self.shard_size))
+        seeds = spawn_seeds(seed, num_shards)
+        plan = []
+        remaining = num_rollouts
+        for shard_seed in seeds:
+            count = min(self.shard_size, remaining)
+            plan.append((count, shard_seed))
+            remaining -= count
+        return plan
+
+    def run(self, game_state: Union[GameState, CompactGameState], characters: Sequence[str],
+            num_rollouts: int, seed: Optional[int] = None,
+            stop: Optional[StoppingRule] = None) -> SimulationSummary:
+        """
+        Run num_rollouts rollouts, in parallel when more than one shard and worker are available.
+
+        Args:
+            game_state: Position to simulate from
+            characters: PlayerCharacter value per seat
+            num_rollouts: Total number of games (the maximum when stop is given)
+            seed: Request seed; the same seed always gives the same summary
+            stop: Optional rule checked after each shard; the run ends as soon as it fires
+
+        Returns:
+            Merged SimulationSummary over the shards played, with stopReason set on an early stop
+        """
+        for summary in self.iter_run(game_state, characters, num_rollouts, seed, stop):
+            pass
+        return summary
+
+    def iter_run(self, game_state: Union[GameState, CompactGameState], characters: Sequence[str],
+                 num_rollouts: int, seed: Optional[int] = None,
+                 stop: Optional[StoppingRule] = None) -> Iterator[SimulationSummary]:
+        """
+        run() as a stream: yields the merged summary after every shard, in plan order.
+        The last summary is the one run() returns.
+        """
+        state = game_state if isinstance(game_state, CompactGameState) \
+            else CompactGameState.from_game_state(game_state)
+        seed = new_request_seed() if seed is None else seed
+        plan = self.shard_plan(num_rollouts, seed)
+        args = (self.edge_rules, self.max_turns, self.character_weights, state, list(characters))
+
+        if self.max_workers <= 1 or len(plan) == 1:
+            shards = (_run_shard(*args, count, shard_seed) for count, shard_seed in plan)
+            yield from self._accumulate(shards, len(plan), stop)
+            return
+
+        # Keep a window of shards in flight so an early stop or a dropped stream wastes at most one wave
+        pool = get_process_pool()
+        pending = iter(plan)
+        window = deque(pool.submit(_run_shard, *args, count, shard_seed)
+                       for count, shard_seed in islice(pending, 2 * self.max_workers))
+
+        def results():
+            while window:
+                shard = window.popleft().result()
+                following = next(pending, None)
+                if following is not None:
+                    window.append(pool.submit(_run_shard, *args, *following))
+                yield shard
+
+        try:
+            yield from self._accumulate(results(), len(plan), stop)
+        finally:
+            for future in window:
+                future.cancel()
+
+    @staticmethod
+    def _accumulate(shards, num_shards: int, stop: Optional[StoppingRule]) -> Iterator[SimulationSummary]:
+        """Running merge of shard summaries in plan order, ending at the first shard where stop fires"""
+        summary = None
+        for index, shard in enumerate(shards):
+            summary = shard if summary is None else summary.merge(shard)
+            if stop is not None and index + 1 < num_shards:
+                reason = stop.check(summary.playerNames, summary.wins, summary.games)
+                if reason is not None:
+                    summary.stopReason = reason
+                    yield summary
+                    return
+            yield summary
@@ -0,0 +1,108 @@
+"""
+EdgeRules compiled into a rule kernel for the simulation loops.
+
+Rollouts, search and the endgame solver consult the rules on every play.
+compile_rules turns an EdgeRules set into a RuleKernel once: each setting
+becomes either a plain constant (a flag or a small lookup table) or a
+pre-bound function picked for that setting, so the inner loops never read
+an enum field or compare a rule value. Kernels are cached by rule code
+(app.core.rule_space), so every simulator for the same rules shares one.
+
+Settings that cannot change a rollout are compiled out rather than checked:
+housePayment and propertyMerging only matter when buildings or separate
+same-color sets change hands, and rollout payments never transfer buildings
+while properties of a color are always one pile. A kernel therefore has no
+entry for them.
+"""
+
+from functools import lru_cache
+from typing import Callable, Optional
+
+from app.core.cards import KIND_VALUE, HOUSE, HOTEL
+from app.core.moves import MoveKernel, MoveRules
+from app.core.rule_space import decode_rules, encode_rules
+from app.models.game import EdgeRules, DeckExhaustionRule, BuildingForfeitureRule
+
+
+_HOUSE_VALUE = KIND_VALUE[HOUSE]
+_HOTEL_VALUE = KIND_VALUE[HOTEL]
+
+
+# Buildings on a set that has just become incomplete, one function per
+# BuildingForfeitureRule. game is a simulation rollout.
+
+def _discard_buildings(game, player: int, color: int) -> None:
+    houses = game.houses[player]
+    hotels = game.hotels[player]
+    if houses[color]:
+        game.discard.append(HOUSE)
+        houses[color] = 0
+    if hotels[color]:
+        game.discard.append(HOTEL)
+        hotels[color] = 0
+
+
+def _bank_buildings(game, player: int, color: int) -> None:
+    houses = game.houses[player]
+    hotels = game.hotels[player]
+    if houses[color] or hotels[color]:
+        game.banks[player] += houses[color] * _HOUSE_VALUE + hotels[color] * _HOTEL_VALUE
+        houses[color] = 0
+        hotels[color] = 0
+
+
+def _keep_buildings(game, player: int, color: int) -> None:
+    pass
+
+
+_FORFEIT = {
+    BuildingForfeitureRule.DISCARD: _discard_buildings,
+    BuildingForfeitureRule.TO_BANK: _bank_buildings,
+    BuildingForfeitureRule.KEEP_FLOATING: _keep_buildings,
+}
+
+
+class RuleKernel:
+    """
+    One EdgeRules set, compiled.
+
+    moves: MoveKernel used for move generation
+    reshuffle: the discard pile is reshuffled when the deck runs out
+    doubles_allowed[plays_left]: Double the Rent cards a rent card may stack
+    building_move_cost: plays a house/hotel move uses
+    forced_deal_setup: a Forced Deal may hand over a set-completing card
+    jsn_empty_hand / jsn_on_zero: Just Say No as the last card / against a $0 charge
+    forfeit_buildings(game, player, color): buildings on a set that became incomplete
+    """
+
+    __slots__ = ('code', 'edge_rules', 'moves', 'reshuffle', 'quadruple_rent', 'max_doubles',
+                 'doubles_allowed', 'building_move_cost', 'forced_deal_setup', 'jsn_empty_hand',
+                 'jsn_on_zero', 'forfeit_buildings')
+
+    def __init__(self, edge_rules: EdgeRules):
+        self.code = encode_rules(edge_rules)
+        self.edge_rules = edge_rules
+        moves = MoveRules.from_edge_rules(edge_rules).compiled
+        self.moves: MoveKernel = moves
+        self.reshuffle = edge_rules.deckExhaustion == DeckExhaustionRule.RESHUFFLE
+        self.quadruple_rent = moves.quadruple_rent
+        self.max_doubles = moves.max_doubles
+        self.doubles_allowed = moves.doubles_allowed
+        self.building_move_cost = moves.building_move_cost
+        self.forced_deal_setup = moves.forced_deal_setup
+        self.jsn_empty_hand = bool(edge_rules.justSayNoEmptyHand)
+        self.jsn_on_zero = bool(edge_rules.justSayNoOnZero)
+        self.forfeit_buildings: Callable[..., None] = _FORFEIT[edge_rules.buildingForfeiture]
+
+    def __repr__(self) -> str:
+        return f"RuleKernel(code={self.code})"
+
+
+@lru_cache(maxsize=None)
+def _compile(code: int) -> RuleKernel:
+    return RuleKernel(decode_rules(code))
+
+
+def compile_rules(edge_rules: Optional[EdgeRules] = None) -> RuleKernel:
+    """The shared kernel for a rule set (default EdgeRules when None)"""
+    return _compile(encode_rules(edge_rules or EdgeRules()))
@@ -0,0 +1,57 @@
+"""
+Integer codes for EdgeRules.
+
+Every EdgeRules field is an enum or a flag, so a rule set is a point in a
+small mixed-radix space (3x3x2x2x3x3x2^4 = 5184 combinations). encode_rules
+packs a rule set into one integer below RULE_SPACE_SIZE, in EdgeRules field
+order with the first field as the most significant digit; decode_rules
+inverts it. Codes are stable as long as fields and enum members are only
+ever appended.
+"""
+
+from enum import Enum
+from typing import Iterator, List, Tuple
+
+from app.models.game import EdgeRules
+
+
+def _field_options() -> List[Tuple[str, tuple]]:
+    options = []
+    for name, field in EdgeRules.model_fields.items():
+        annotation = field.annotation
+        if isinstance(annotation, type) and issubclass(annotation, Enum):
+            options.append((name, tuple(annotation)))
+        elif annotation is bool:
+            options.append((name, (False, True)))
+        else:
+            raise TypeError(f"EdgeRules.{name} is neither an enum nor a flag")
+    return options
+
+
+RULE_FIELDS = _field_options()  # (field name, allowed values in code order)
+RULE_SPACE_SIZE = 1
+for _, _values in RULE_FIELDS:
+    RULE_SPACE_SIZE *= len(_values)
+
+
+def encode_rules(rules: EdgeRules) -> int:
+    code = 0
+    for name, values in RULE_FIELDS:
+        code = code * len(values) + values.index(getattr(rules, name))
+    return code
+
+
+def decode_rules(code: int) -> EdgeRules:
+    if not 0 <= code < RULE_SPACE_SIZE:
+        raise ValueError(f"Rule code {code} is outside 0..{RULE_SPACE_SIZE - 1}")
+    settings = {}
+    for name, values in reversed(RULE_FIELDS):
+        code, digit = divmod(code, len(values))
+        settings[name] = values[digit]
+    return EdgeRules(**settings)
+
+
+def all_rules() -> Iterator[EdgeRules]:
+    """Every rule combination, in code order"""
+    for code in range(RULE_SPACE_SIZE):
+        yield decode_rules(code)
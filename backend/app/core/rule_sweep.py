@@ -0,0 +1,359 @@
+"""
+Full sweep of the EdgeRules space.
+
+Every rule combination (app.core.rule_space, 5184 of them) plays the same
+fixed corpus of games: fresh deals sampled once from the sweep seed, each
+with its own reshuffle seed and a character line-up cycling through every
+ordered pairing of the rollout characters. Because all combinations see the
+same deals, differences between them come from the rules rather than from
+the cards.
+
+Per combination the sweep records game length, seat-0 wins (the first
+player) and wins per character. Three outcome measures are derived from
+those counts:
+
+- averageTurns: mean game length in turns
+- winRateSpread: best minus worst character win rate, i.e. how strongly the
+  rules favor one play style
+- firstPlayerAdvantage: seat-0 win rate minus the fair share 1 / players
+
+The job is chunked by rule code and resumable. Results live in a directory:
+
+    root/manifest.json         sweep settings and the swept codes
+    root/chunk-00000.npy       (codes in chunk, columns) int32 counts
+    ...
+
+A chunk file is written (atomically) as soon as its chunk finishes, and a
+rerun with the same settings skips chunks already on disk. RuleSweep loads
+the counts into one table indexed by rule code and reports each rule's
+effect: the marginal mean of every measure per rule value, averaged over
+all the other rules.
+"""
+
+import argparse
+import json
+import os
+import random
+import threading
+from collections import deque
+from itertools import islice, product
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+from pydantic import BaseModel
+
+from app.core.config import settings
+from app.core.determinize import HiddenInformation
+from app.core.parallel_simulation import get_process_pool, new_request_seed, pool_size, spawn_seeds
+from app.core.rule_space import RULE_FIELDS, RULE_SPACE_SIZE, decode_rules, encode_rules
+from app.core.simulation import GameSimulator, CHARACTER_WEIGHTS, DEFAULT_MAX_TURNS, _Rollout
+from app.core.tournament import opening_state
+from app.models.game import EdgeRules
+
+
+MANIFEST = "manifest.json"
+FORMAT_VERSION = 1
+DEFAULT_GAMES = 64
+DEFAULT_CHUNK_SIZE = 64
+CHARACTERS = tuple(CHARACTER_WEIGHTS)
+# Count columns of a chunk file, per rule code
+COLUMNS = ('games', 'turns', 'unfinished', 'first_wins') + \
+    tuple(f"{character}_{count}" for count in ('wins', 'games') for character in CHARACTERS)
+_WINS = COLUMNS.index(f"{CHARACTERS[0]}_wins")
+_CHARACTER_GAMES = COLUMNS.index(f"{CHARACTERS[0]}_games")
+
+
+def value_name(value) -> str:
+    """Report key of an EdgeRules field value: the enum value, or 'True' / 'False' for flags"""
+    return str(getattr(value, 'value', value))
+
+
+def _chunk_name(chunk: int) -> str:
+    return f"chunk-{chunk:05d}.npy"
+
+
+def _sweep_chunk(codes: Sequence[int], games: int, num_players: int, seed: int, max_turns: int) -> np.ndarray:
+    """Worker entry point: play the corpus under each rule code of one chunk"""
+    state = opening_state(num_players)
+    deals = HiddenInformation(state).sample(games, np.random.default_rng(seed))
+    game_seeds = spawn_seeds(seed, games)
+    lineups = list(product(range(len(CHARACTERS)), repeat=num_players))
+    corpus = []
+    for game in range(games):
+        seats = lineups[game % len(lineups)]
+        corpus.append((deals.sample(game), seats, [CHARACTER_WEIGHTS[CHARACTERS[seat]] for seat in seats]))
+
+    rows = np.zeros((len(codes), len(COLUMNS)), dtype=np.int32)
+    for row, code in zip(rows, codes):
+        simulator = GameSimulator(decode_rules(code), max_turns=max_turns)
+        for ((hands, deck), seats, weights), game_seed in zip(corpus, game_seeds):
+            # Rollouts draw from their deck list, so every game gets a copy of the corpus deck
+            rollout = _Rollout(simulator, state, [], weights, random.Random(game_seed), (hands, deck[:]))
+            winner, turns, finished = rollout.run(0, max_turns)
+            row[0] += 1
+            row[1] += turns
+            row[2] += not finished
+            row[3] += winner == 0
+            row[_WINS + seats[winner]] += 1
+            for seat in seats:
+                row[_CHARACTER_GAMES + seat] += 1
+    return rows
+
+
+def _write_chunk(root: str, chunk: int, rows: np.ndarray) -> None:
+    path = os.path.join(root, _chunk_name(chunk))
+    partial = path + ".partial"
+    with open(partial, 'wb') as handle:
+        np.save(handle, rows)
+    os.replace(partial, path)
+
+
+def run_sweep(root: str, games: int = DEFAULT_GAMES, num_players: int = 2, seed: Optional[int] = None,
+              codes: Optional[Sequence[int]] = None, chunk_size: int = DEFAULT_CHUNK_SIZE,
+              max_workers: Optional[int] = None, max_turns: int = DEFAULT_MAX_TURNS,
+              max_chunks: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Play the game corpus under every rule combination, resuming a sweep already under root.
+
+    Args:
+        root: Sweep directory (created if missing)
+        games: Corpus size, played once per rule combination
+        num_players: Seats per game
+        seed: Sweep seed; fixes the corpus. A resumed sweep keeps the seed it was started with
+        codes: Rule codes to sweep (the whole rule space by default)
+        chunk_size: Rule codes per pool task and per chunk file
+        max_workers: Tasks run in parallel on the shared pool (its size by default); 1 sweeps in-process
+        max_turns: Turn limit per game (the leader wins at the limit)
+        max_chunks: Stop after this many new chunks (None runs the sweep to the end)
+
+    Returns:
+        The manifest, with 'completedChunks' counting the chunk files on disk
+    """
+    if num_players < 2:
+        raise ValueError("A sweep needs at least two players")
+    if games < 1:
+        raise ValueError("A sweep needs at least one game per rule combination")
+    codes = [int(code) for code in (range(RULE_SPACE_SIZE) if codes is None else codes)]
+    for code in codes:
+        if not 0 <= code < RULE_SPACE_SIZE:
+            raise ValueError(f"Rule code {code} is outside 0..{RULE_SPACE_SIZE - 1}")
+    os.makedirs(root, exist_ok=True)
+
+    options = {'games': games, 'numPlayers': num_players, 'maxTurns': max_turns,
+               'chunkSize': max(1, chunk_size), 'codes': codes}
+    manifest_path = os.path.join(root, MANIFEST)
+    if os.path.exists(manifest_path):
+        manifest = read_manifest(root)
+        if seed is not None:
+            options['seed'] = seed
+        for key, value in options.items():
+            if manifest[key] != value:
+                raise ValueError(f"{root} holds a sweep with a different {key}; use a new directory")
+    else:
+        manifest = {'version': FORMAT_VERSION, 'seed': new_request_seed() if seed is None else seed,
+                    'characters': list(CHARACTERS), 'columns': list(COLUMNS), **options}
+        with open(manifest_path, 'w') as handle:
+            json.dump(manifest, handle)
+
+    chunk_size = manifest['chunkSize']
+    chunks = [codes[start:start + chunk_size] for start in range(0, len(codes), chunk_size)]
+    plan = [(chunk, chunk_codes) for chunk, chunk_codes in enumerate(chunks)
+            if not os.path.exists(os.path.join(root, _chunk_name(chunk)))]
+    if max_chunks is not None:
+        plan = plan[:max(0, max_chunks)]
+    task = (games, num_players, manifest['seed'], max_turns)
+
+    max_workers = max_workers or pool_size()
+    if max_workers <= 1 or len(plan) <= 1:
+        for chunk, chunk_codes in plan:
+            _write_chunk(root, chunk, _sweep_chunk(chunk_codes, *task))
+    else:
+        # Each chunk is written as soon as its result is collected, so an interrupted sweep keeps them
+        pool = get_process_pool()
+        pending = iter(plan)
+        window = deque((chunk, pool.submit(_sweep_chunk, chunk_codes, *task))
+                       for chunk, chunk_codes in islice(pending, 2 * max_workers))
+        while window:
+            chunk, future = window.popleft()
+            _write_chunk(root, chunk, future.result())
+            following = next(pending, None)
+            if following is not None:
+                window.append((following[0], pool.submit(_sweep_chunk, following[1], *task)))
+
+    manifest['completedChunks'] = sum(os.path.exists(os.path.join(root, _chunk_name(chunk)))
+                                      for chunk in range(len(chunks)))
+    manifest['chunks'] = len(chunks)
+    return manifest
+
+
+def read_manifest(root: str) -> Dict[str, Any]:
+    with open(os.path.join(root, MANIFEST)) as handle:
+        return json.load(handle)
+
+
+# ------------------------------------------------------------------- report
+
+class RuleOutcome(BaseModel):
+    """Measured outcome of the corpus under one rule combination, or averaged over several"""
+    averageTurns: float
+    winRateSpread: float
+    firstPlayerAdvantage: float
+    games: int = 0
+    unfinished: int = 0
+
+
+class RuleEffect(BaseModel):
+    """One rule's effect: the outcome per value, averaged over every other rule"""
+    rule: str
+    outcomes: Dict[str, RuleOutcome]
+    turnsEffect: float          # Largest minus smallest averageTurns across values
+    spreadEffect: float
+    advantageEffect: float
+
+
+class RuleSweepReport(BaseModel):
+    combinations: int
+    gamesPerCombination: int
+    complete: bool
+    overall: RuleOutcome
+    effects: List[RuleEffect]   # Largest turnsEffect first
+
+
+class RuleSweep:
+    """Counts of a (possibly partial) sweep, indexed by rule code"""
+
+    def __init__(self, root: str):
+        manifest = read_manifest(root)
+        if manifest.get('version') != FORMAT_VERSION:
+            raise ValueError(f"Unsupported rule sweep version {manifest.get('version')}")
+        if manifest['columns'] != list(COLUMNS):
+            raise ValueError(f"{root} was written with different count columns")
+        self.manifest = manifest
+        self.counts = np.zeros((RULE_SPACE_SIZE, len(COLUMNS)), dtype=np.int64)
+        codes = manifest['codes']
+        chunk_size = manifest['chunkSize']
+        self.expected = len(codes)
+        for chunk, start in enumerate(range(0, len(codes), chunk_size)):
+            path = os.path.join(root, _chunk_name(chunk))
+            if os.path.exists(path):
+                self.counts[codes[start:start + chunk_size]] = np.load(path)
+
+        counts = self.counts.astype(np.float64)
+        games = counts[:, 0]
+        self.swept = np.flatnonzero(games)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self.turns = counts[:, 1] / games
+            rates = counts[:, _WINS:_WINS + len(CHARACTERS)] / counts[:, _CHARACTER_GAMES:]
+            played = counts[:, _CHARACTER_GAMES:] > 0
+            self.spread = np.where(played, rates, -np.inf).max(axis=1) - np.where(played, rates, np.inf).min(axis=1)
+            self.advantage = counts[:, 3] / games - 1.0 / manifest['numPlayers']
+
+    def __len__(self) -> int:
+        return len(self.swept)
+
+    @property
+    def complete(self) -> bool:
+        return len(self.swept) == self.expected
+
+    def _outcome(self, index) -> RuleOutcome:
+        index = np.atleast_1d(index)
+        return RuleOutcome(averageTurns=float(self.turns[index].mean()),
+                           winRateSpread=float(self.spread[index].mean()),
+                           firstPlayerAdvantage=float(self.advantage[index].mean()),
+                           games=int(self.counts[index, 0].sum()),
+                           unfinished=int(self.counts[index, 2].sum()))
+
+    def outcome(self, rules: EdgeRules) -> Optional[RuleOutcome]:
+        """Measured outcome under one rule set (None when it was not swept)"""
+        code = encode_rules(rules)
+        return self._outcome(code) if self.counts[code, 0] else None
+
+    def percentile(self, measure: str, q: float) -> float:
+        """q-th percentile of a measure ('turns', 'spread' or 'advantage') over the swept combinations"""
+        return float(np.percentile(getattr(self, measure)[self.swept], q))
+
+    def value_outcomes(self, field: str) -> Dict[str, RuleOutcome]:
+        """Outcome per value of one EdgeRules field, averaged over the swept combinations"""
+        values = dict(RULE_FIELDS)[field]
+        digits = self._digits(field)
+        return {
+            value_name(value): self._outcome(self.swept[digits == index])
+            for index, value in enumerate(values) if np.any(digits == index)
+        }
+
+    def _digits(self, field: str) -> np.ndarray:
+        """Code digit of field for every swept combination"""
+        place = 1
+        for name, values in reversed(RULE_FIELDS):
+            if name == field:
+                return (self.swept // place) % len(values)
+            place *= len(values)
+        raise KeyError(field)
+
+    def report(self) -> RuleSweepReport:
+        effects = []
+        for field, _ in RULE_FIELDS:
+            outcomes = self.value_outcomes(field)
+            if not outcomes:
+                continue
+            turns = [outcome.averageTurns for outcome in outcomes.values()]
+            spread = [outcome.winRateSpread for outcome in outcomes.values()]
+            advantage = [outcome.firstPlayerAdvantage for outcome in outcomes.values()]
+            effects.append(RuleEffect(rule=field, outcomes=outcomes, turnsEffect=max(turns) - min(turns),
+                                      spreadEffect=max(spread) - min(spread),
+                                      advantageEffect=max(advantage) - min(advantage)))
+        effects.sort(key=lambda effect: effect.turnsEffect, reverse=True)
+        overall = self._outcome(self.swept) if len(self.swept) else RuleOutcome(
+            averageTurns=0.0, winRateSpread=0.0, firstPlayerAdvantage=0.0)
+        return RuleSweepReport(combinations=len(self.swept), gamesPerCombination=self.manifest['games'],
+                               complete=self.complete, overall=overall, effects=effects)
+
+
+_sweep: Optional[RuleSweep] = None
+_sweep_loaded = False
+_sweep_lock = threading.Lock()
+
+
+def get_rule_sweep() -> Optional[RuleSweep]:
+    """The sweep at settings.RULE_SWEEP_PATH, loaded on first use (None when not configured)"""
+    global _sweep, _sweep_loaded
+    if _sweep_loaded:
+        return _sweep
+    with _sweep_lock:
+        if not _sweep_loaded:
+            path = settings.RULE_SWEEP_PATH
+            if path and os.path.exists(os.path.join(path, MANIFEST)):
+                try:
+                    _sweep = RuleSweep(path)
+                except ValueError as e:
+                    print(f"Rule sweep not loaded: {e}")
+            _sweep_loaded = True
+    return _sweep
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Sweep every EdgeRules combination over a fixed game corpus")
+    parser.add_argument("root", help="sweep directory; an existing sweep is resumed")
+    parser.add_argument("--games", type=int, default=DEFAULT_GAMES, help="games per rule combination")
+    parser.add_argument("--players", type=int, default=2)
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=None, help="pool processes (default: one per core)")
+    parser.add_argument("--max-chunks", type=int, default=None, help="stop after this many new chunks")
+    args = parser.parse_args(argv)
+    if args.workers:
+        settings.SIMULATION_POOL_WORKERS = args.workers  # size of the shared pool this run starts
+
+    manifest = run_sweep(args.root, args.games, args.players, args.seed, chunk_size=args.chunk_size,
+                         max_workers=args.workers, max_chunks=args.max_chunks)
+    print(f"{manifest['completedChunks']}/{manifest['chunks']} chunks done in {args.root} "
+          f"(seed {manifest['seed']})")
+    report = RuleSweep(args.root).report()
+    print(f"{'rule':<24}{'turns':>8}{'spread':>8}{'first':>8}")
+    for effect in report.effects:
+        print(f"{effect.rule:<24}{effect.turnsEffect:>8.2f}{effect.spreadEffect:>8.3f}"
+              f"{effect.advantageEffect:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
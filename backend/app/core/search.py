@@ -0,0 +1,304 @@
+"""
+Time-budgeted forward search for the current player's turn.
+
+Monte Carlo tree search (UCT) over the plays player 0 can make this turn
+(app.core.moves enumerates them under the rules in force).
+Every iteration plays one determinization of the hidden hands and deck order,
+descends the tree with UCB1, expands one untried play, finishes the turn with
+the character policy, lets every opponent take a turn and scores the leaf with
+the engine's asset evaluator. The search is anytime: it stops when the time
+budget runs out and the most visited line so far is the recommendation, so
+quality grows with the CPU it is given.
+
+Nodes are stored in a Zobrist-keyed transposition table, so play orders that
+reach the same position (property then money, or money then property) share
+one node and its statistics instead of being searched twice. Positions hash
+what player 0 can see (opponents' hands by size only), so every
+determinization of the same position finds the same node.
+
+Pass Go is a chance move: the cards it draws differ between determinizations.
+Below it the tree averages over the draws and is kept out of the table, and
+the recommended line stops at it, since the plays after it depend on cards
+not yet seen.
+"""
+
+import math
+import random
+import time
+from typing import Callable, Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+from pydantic import BaseModel
+
+from app.core.cards import CardCategory, KIND_CATEGORY, PASS_GO
+from app.core.compact_state import CompactGameState
+from app.core.deadline import Deadline
+from app.core.determinize import HiddenInformation
+from app.core.moves import Move, END_TURN, generate_moves
+from app.core.simulation import GameSimulator, PLAYS_PER_TURN
+from app.core import zobrist
+from app.core.zobrist import TranspositionTable, DEFAULT_TABLE_SIZE
+from app.models.game import EdgeRules
+
+
+DEFAULT_EXPLORATION = 1.4
+DEFAULT_HORIZON = 1  # opponent turn rounds played before the leaf is evaluated
+_DEAL_BATCH = 64  # determinizations sampled per NumPy pass
+
+# Leaf evaluator: (state, player) -> asset score (MonopolyDealEngine.evaluate_compact)
+Evaluator = Callable[[CompactGameState, int], float]
+
+
+# Plays that only change player 0's own zones (hashed incrementally)
+_LOCAL_CATEGORIES = (CardCategory.MONEY, CardCategory.PROPERTY, CardCategory.WILD, CardCategory.BUILDING)
+
+# Action cards whose outcome depends on cards drawn from the deck
+_CHANCE_KINDS = frozenset((PASS_GO,))
+
+
+def is_chance_move(move: Move) -> bool:
+    """True when playing the move draws cards (banking the card draws nothing)"""
+    return move.kind in _CHANCE_KINDS and move.color != -2
+
+
+def legal_moves(state, player: int, plays_left: int = PLAYS_PER_TURN) -> List[Move]:
+    """Plays available to player in a rollout state under its simulator's rules, END_TURN last"""
+    return generate_moves(state, player, state.sim.move_rules, plays_left)
+
+
+class MoveStat(BaseModel):
+    """Search statistics for one root move"""
+    move: str
+    action: str
+    visits: int
+    value: float
+
+
+class SearchResult(BaseModel):
+    """Outcome of a time-budgeted search"""
+    bestLine: List[str]
+    bestMoves: List[Move] = []  # bestLine as moves
+    bestAction: str
+    expectedValue: float
+    moves: List[MoveStat]
+    iterations: int
+    elapsedMs: float
+    transpositions: Dict[str, int] = {}
+    completed: bool = True  # False when a deadline stopped the search before every root move was tried
+
+
+class _Node:
+    """Statistics for one position; children are keyed by the move leading to them"""
+    __slots__ = ('children', 'visits', 'value')
+
+    def __init__(self):
+        self.children: Dict[Move, "_Node"] = {}
+        self.visits = 0
+        self.value = 0.0
+
+    def mean(self) -> float:
+        return self.value / self.visits if self.visits else 0.0
+
+    def ranked(self) -> List[tuple]:
+        """(move, child) pairs, most visited first"""
+        return sorted(self.children.items(), key=lambda item: (item[1].visits, item[1].mean()), reverse=True)
+
+
+class TurnSearch:
+    """
+    Anytime MCTS over player 0's plays this turn, scored by an asset evaluator.
+    """
+
+    def __init__(self, evaluator: Evaluator, edge_rules: Optional[EdgeRules] = None,
+                 characters: Sequence[str] = (), character_weights: Optional[Dict[str, Dict[str, float]]] = None,
+                 exploration: float = DEFAULT_EXPLORATION, horizon: int = DEFAULT_HORIZON,
+                 table_size: int = DEFAULT_TABLE_SIZE, simulator: Optional[GameSimulator] = None):
+        self.evaluator = evaluator
+        self.table_size = table_size
+        self.simulator = simulator or GameSimulator(edge_rules, character_weights=character_weights)
+        self.characters = list(characters)
+        self.exploration = exploration
+        self.horizon = horizon
+
+    def leaf_value(self, rollout) -> float:
+        """Value for player 0 in [0, 1]: 1/0 for a decided game, else share of the asset score"""
+        if rollout.winner >= 0:
+            return 1.0 if rollout.winner == 0 else 0.0
+        mine = self.evaluator(rollout, 0)
+        best_opponent = max((self.evaluator(rollout, p) for p in range(1, rollout.n)), default=0.0)
+        total = mine + best_opponent
+        return mine / total if total > 0 else 0.5
+
+    def select(self, node: _Node, moves: List[Move]) -> Move:
+        log_visits = math.log(node.visits or 1)
+        best, best_score = END_TURN, -1.0
+        for move in moves:
+            child = node.children[move]
+            score = child.mean() + self.exploration * math.sqrt(log_visits / max(child.visits, 1))
+            if score > best_score:
+                best, best_score = move, score
+        return best
+
+    @staticmethod
+    def apply(rollout, move: Move, h: int, plays_left: int) -> tuple:
+        """
+        Play a move for player 0 and return (hash, plays_left) afterwards.
+        Bank, property and building plays update the hash incrementally; action
+        cards can touch every player and the deck, so those rehash what player 0 sees.
+        """
+        if move == END_TURN:
+            return zobrist.update_plays(h, plays_left, 0), 0
+        kind, color = move.kind, move.color
+        hand = rollout.hands[0]
+        category = KIND_CATEGORY[kind]
+        simple = (color == -2 or category in _LOCAL_CATEGORIES) and not move.is_building_move
+        if simple:
+            old_hand, old_bank = hand[kind], rollout.banks[0]
+            if color >= 0:
+                old_props, old_value = rollout.props[0][color], rollout.prop_values[0][color]
+                old_house, old_hotel = rollout.houses[0][color], rollout.hotels[0][color]
+        used = rollout.play(0, kind, color, plays_left, move.target, move.give, move.doubles)
+        remaining = plays_left - used
+        if not simple:
+            return zobrist.hash_state(rollout, remaining, viewer=0), remaining
+
+        h = zobrist.update_plays(h, plays_left, remaining)
+        h = zobrist.update(h, 0, zobrist.HAND, kind, old_hand, hand[kind])
+        h = zobrist.update(h, 0, zobrist.BANK, 0, old_bank, rollout.banks[0])
+        if color >= 0:
+            h = zobrist.update(h, 0, zobrist.PROPERTIES, color, old_props, rollout.props[0][color])
+            h = zobrist.update(h, 0, zobrist.PROP_VALUE, color, old_value, rollout.prop_values[0][color])
+            h = zobrist.update(h, 0, zobrist.HOUSES, color, old_house, rollout.houses[0][color])
+            h = zobrist.update(h, 0, zobrist.HOTELS, color, old_hotel, rollout.hotels[0][color])
+        return h, remaining
+
+    def iterate(self, root: _Node, root_hash: int, table: TranspositionTable, state: CompactGameState,
+                deal: tuple, weights: list, rng: random.Random) -> None:
+        """One playout of a determinization from the root, backing the leaf value up the visited path"""
+        rollout = self.simulator.rollout(state, [], weights, rng, deal)
+        node = root
+        path = [root]
+        h = root_hash
+        plays_left = PLAYS_PER_TURN
+        drawn = False  # a chance move was played: positions below depend on this determinization's draws
+
+        while rollout.winner < 0 and plays_left > 0:
+            moves = legal_moves(rollout, 0, plays_left)
+            untried = [move for move in moves if move not in node.children]
+            move = untried[rng.randrange(len(untried))] if untried else self.select(node, moves)
+            h, plays_left = self.apply(rollout, move, h, plays_left)
+            drawn = drawn or is_chance_move(move)
+            if untried:
+                if drawn:
+                    child = _Node()
+                else:
+                    # A transposed position reuses the node reached through another play order
+                    child = table.get(h)
+                    if child is None:
+                        child = _Node()
+                        table.put(h, child)
+                node.children[move] = child
+            node = node.children[move]
+            path.append(node)
+            if untried:
+                break
+
+        if rollout.winner < 0 and rollout.finish_turn(0, plays_left):
+            for turn in range(self.horizon * (rollout.n - 1)):
+                if not rollout.take_turn(1 + turn % (rollout.n - 1)):
+                    break
+
+        value = self.leaf_value(rollout)
+        for visited in path:
+            visited.visits += 1
+            visited.value += value
+
+    def search(self, state: CompactGameState, time_budget_ms: float, seed: Optional[int] = None,
+               max_iterations: Optional[int] = None, deadline: Optional[Deadline] = None) -> SearchResult:
+        """
+        Search player 0's turn until the time budget (or max_iterations) is spent.
+
+        Args:
+            state: Position with player 0 to play
+            time_budget_ms: Wall-clock budget in milliseconds
+            seed: Seed for determinizations and tie breaks
+            max_iterations: Optional hard cap on playouts (for reproducible runs)
+            deadline: Hard stop; unlike the budget it also cuts the first pass over the root moves
+
+        Returns:
+            SearchResult with the most visited line and root move statistics
+        """
+        for result in self.iter_search(state, time_budget_ms, seed, max_iterations, deadline):
+            pass
+        return result
+
+    def iter_search(self, state: CompactGameState, time_budget_ms: float, seed: Optional[int] = None,
+                    max_iterations: Optional[int] = None, deadline: Optional[Deadline] = None,
+                    report_ms: Optional[float] = None) -> Iterator[SearchResult]:
+        """
+        Same search as search(), yielding a snapshot of the best line so far every
+        report_ms of search time and the final result last. Snapshots do not change
+        the playouts, so the final result equals search() with the same arguments.
+        """
+        started = time.perf_counter()
+        budget_end = started + time_budget_ms / 1000.0
+        next_report = started + report_ms / 1000.0 if report_ms else None
+        rng = random.Random(seed)
+        hidden = HiddenInformation(state)
+        deal_rng = np.random.default_rng(seed)
+        weights = self.simulator.seat_weights(self.characters, state.num_players)
+        table = TranspositionTable(self.table_size)
+        root = _Node()
+        root_hash = zobrist.hash_state(state, PLAYS_PER_TURN, viewer=0) if state.num_players else 0
+        table.put(root_hash, root)
+
+        iterations = 0
+        minimum = 0
+        if state.num_players:
+            # Always visit each root move once so an exhausted budget still yields a move
+            probe = self.simulator.rollout(state, state.unseen_cards(), weights, random.Random(0))
+            minimum = len(legal_moves(probe, 0))
+            while iterations < minimum or time.perf_counter() < budget_end:
+                if max_iterations is not None and iterations >= max_iterations:
+                    break
+                if deadline is not None and deadline.expired():
+                    break
+                # Playouts average over determinizations drawn a batch at a time
+                if iterations % _DEAL_BATCH == 0:
+                    deals = hidden.sample(_DEAL_BATCH, deal_rng)
+                self.iterate(root, root_hash, table, state, deals.sample(iterations % _DEAL_BATCH), weights, rng)
+                iterations += 1
+                if next_report is not None and time.perf_counter() >= next_report:
+                    yield self._result(state, root, table, iterations, iterations >= minimum, started)
+                    next_report = time.perf_counter() + report_ms / 1000.0
+
+        reached_cap = max_iterations is not None and iterations >= max_iterations
+        yield self._result(state, root, table, iterations, iterations >= minimum or reached_cap, started)
+
+    @staticmethod
+    def _result(state: CompactGameState, root: _Node, table: TranspositionTable, iterations: int,
+                completed: bool, started: float) -> SearchResult:
+        """SearchResult for the tree as it stands"""
+        stats = root.ranked()
+        line = []
+        node = root
+        while node.children and len(line) < PLAYS_PER_TURN:
+            move, node = node.ranked()[0]
+            line.append(move)
+            if move == END_TURN or is_chance_move(move):
+                break
+        best_move, best = stats[0] if stats else (END_TURN, None)
+
+        return SearchResult(
+            bestLine=[move.describe(state.names) for move in line],
+            bestMoves=line,
+            bestAction=best_move.action,
+            expectedValue=best.mean() if best else 0.0,
+            moves=[MoveStat(move=move.describe(state.names), action=move.action, visits=child.visits,
+                            value=child.mean())
+                   for move, child in stats],
+            iterations=iterations,
+            elapsedMs=(time.perf_counter() - started) * 1000.0,
+            transpositions=table.stats(),
+            completed=completed
+        )
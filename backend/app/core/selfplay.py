@@ -0,0 +1,263 @@
+"""
+Self-play dataset generation.
+
+Engine rollouts are played from fresh deals across EdgeRules presets and
+character line-ups, and every turn becomes one feature row: the position
+after the turn's draw (property counts by color, banks and hand sizes per
+seat, the mover's hand by card kind, deck size), the plays the policy chose
+and the game's final winner.
+
+Rows are written column by column as .npy files, one directory per shard of
+games, plus a manifest.json describing columns, presets and characters:
+
+    root/manifest.json
+    root/shard-00000/props.npy    (rows, players, colors) int8
+    root/shard-00000/winner.npy   (rows,) int8
+    ...
+
+Only one shard per worker is held in memory, so the output size is bounded by
+disk alone. Shards are plain .npy arrays, so load_shard memory-maps them and
+analysis reads columns without copying. Every shard has its own seed spawned
+from the dataset seed; the files depend only on the seed, never on the
+number of workers.
+"""
+
+import argparse
+import json
+import os
+import random
+from collections import deque
+from itertools import islice
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+from app.core.cards import NUM_COLORS, NUM_KINDS
+from app.core.determinize import HiddenInformation
+from app.core.moves import PLAYS_PER_TURN
+from app.core.parallel_simulation import get_process_pool, new_request_seed, pool_size, spawn_seeds
+from app.core.simulation import GameSimulator, CHARACTER_WEIGHTS, DEFAULT_MAX_TURNS, _Rollout
+from app.core.tournament import opening_state
+from app.models.configuration import OFFICIAL_PRESETS
+
+
+MANIFEST = "manifest.json"
+FORMAT_VERSION = 1
+DEFAULT_GAMES_PER_SHARD = 1000
+_DEAL_BATCH = 256
+
+# Column name -> dtype; shapes are (rows, ...) as listed in the module docstring
+COLUMNS = {
+    'game': 'int32',         # (rows,) game index within the dataset
+    'turn': 'int16',         # (rows,) turn number, from 0
+    'player': 'int8',        # (rows,) seat taking the turn
+    'preset': 'int8',        # (rows,) index into manifest presets
+    'characters': 'int8',    # (rows, players) index into manifest characters per seat
+    'props': 'int8',         # (rows, players, colors) property cards per color
+    'banks': 'int16',        # (rows, players) bank totals
+    'hand_sizes': 'int8',    # (rows, players)
+    'hand': 'int8',          # (rows, kinds) the mover's hand by card kind
+    'deck_count': 'int16',   # (rows,)
+    'move_kinds': 'int8',    # (rows, plays) card kind per play, -1 when unused
+    'move_colors': 'int8',   # (rows, plays) target color, -2 banked, -1 none
+    'winner': 'int8',        # (rows,) seat that won the game
+    'finished': 'bool',      # (rows,) False when the game hit the turn limit
+}
+
+
+class _RecordingRollout(_Rollout):
+    """Rollout that records every turn's position after the draw and the plays made"""
+
+    __slots__ = ('turns', 'moves')
+
+    def take_turn(self, player: int) -> bool:
+        if not self.draw(player, 5 if self.hand_sizes[player] == 0 else 2):
+            return False
+        self.moves = []
+        self.turns.append((
+            player,
+            [props[:] for props in self.props],
+            self.banks[:],
+            self.hand_sizes[:],
+            self.hands[player][:],
+            len(self.deck),
+            self.moves
+        ))
+        return self.finish_turn(player, PLAYS_PER_TURN)
+
+    def play(self, player: int, kind: int, color: int, plays_left: int,
+             target: int = -1, give: int = -1, doubles: int = -1) -> int:
+        self.moves.append((kind, color))
+        return super().play(player, kind, color, plays_left, target, give, doubles)
+
+
+def _play_shard(root: str, shard: int, presets: Sequence[str], characters: Sequence[str], num_players: int,
+                first_game: int, num_games: int, seed: int, max_turns: int) -> Dict[str, Any]:
+    """Worker entry point: play one shard of games and write its columns"""
+    rng = random.Random(seed)
+    deal_rng = np.random.default_rng(seed)
+    state = opening_state(num_players)
+    hidden = HiddenInformation(state)
+    simulators = {
+        preset: GameSimulator(OFFICIAL_PRESETS[preset].rules, max_turns=max_turns) for preset in set(presets)
+    }
+    columns: Dict[str, list] = {name: [] for name in COLUMNS}
+
+    for index in range(num_games):
+        if index % _DEAL_BATCH == 0:
+            deals = hidden.sample(min(_DEAL_BATCH, num_games - index), deal_rng)
+        game = first_game + index
+        preset_index = game % len(presets)
+        seats = [rng.randrange(len(characters)) for _ in range(num_players)]
+        weights = [CHARACTER_WEIGHTS[characters[seat]] for seat in seats]
+
+        rollout = _RecordingRollout(simulators[presets[preset_index]], state, [], weights, rng,
+                                    deals.sample(index % _DEAL_BATCH))
+        rollout.turns = []
+        winner, _, finished = rollout.run(0, max_turns)
+
+        for turn, (player, props, banks, hand_sizes, hand, deck_count, moves) in enumerate(rollout.turns):
+            plays = moves[:PLAYS_PER_TURN] + [(-1, -1)] * (PLAYS_PER_TURN - len(moves))
+            columns['game'].append(game)
+            columns['turn'].append(turn)
+            columns['player'].append(player)
+            columns['preset'].append(preset_index)
+            columns['characters'].append(seats)
+            columns['props'].append(props)
+            columns['banks'].append(banks)
+            columns['hand_sizes'].append(hand_sizes)
+            columns['hand'].append(hand)
+            columns['deck_count'].append(deck_count)
+            columns['move_kinds'].append([kind for kind, _ in plays])
+            columns['move_colors'].append([color for _, color in plays])
+            columns['winner'].append(winner)
+            columns['finished'].append(finished)
+
+    name = f"shard-{shard:05d}"
+    directory = os.path.join(root, name)
+    os.makedirs(directory, exist_ok=True)
+    empty_shapes = {'characters': (0, num_players), 'props': (0, num_players, NUM_COLORS),
+                    'banks': (0, num_players), 'hand_sizes': (0, num_players), 'hand': (0, NUM_KINDS),
+                    'move_kinds': (0, PLAYS_PER_TURN), 'move_colors': (0, PLAYS_PER_TURN)}
+    for column, dtype in COLUMNS.items():
+        values = columns[column]
+        array = np.asarray(values, dtype=dtype) if values else np.zeros(empty_shapes.get(column, (0,)), dtype)
+        np.save(os.path.join(directory, f"{column}.npy"), array)
+    return {'name': name, 'games': num_games, 'rows': len(columns['game'])}
+
+
+def generate_dataset(root: str, num_games: int, presets: Optional[Sequence[str]] = None,
+                     characters: Optional[Sequence[str]] = None, num_players: int = 2,
+                     games_per_shard: int = DEFAULT_GAMES_PER_SHARD, seed: Optional[int] = None,
+                     max_workers: Optional[int] = None, max_turns: int = DEFAULT_MAX_TURNS) -> Dict[str, Any]:
+    """
+    Play num_games self-play games and write them as column shards under root.
+
+    Args:
+        root: Output directory (created if missing)
+        num_games: Total number of games
+        presets: Official preset ids to cycle through, game by game (all by default)
+        characters: Character names drawn at random for every seat (all by default)
+        num_players: Seats per game
+        games_per_shard: Games per shard; bounds the rows held in memory per worker
+        seed: Dataset seed; the same seed always writes the same files
+        max_workers: Tasks run in parallel on the shared pool (its size by default); 1 plays in-process
+        max_turns: Turn limit per game (the leader wins at the limit)
+
+    Returns:
+        The manifest, also written to root/manifest.json
+    """
+    presets = list(presets or OFFICIAL_PRESETS)
+    characters = list(characters or CHARACTER_WEIGHTS)
+    for preset in presets:
+        if preset not in OFFICIAL_PRESETS:
+            raise ValueError(f"Unknown preset: {preset}")
+    for character in characters:
+        if character not in CHARACTER_WEIGHTS:
+            raise ValueError(f"Unknown character: {character}")
+    if num_players < 2:
+        raise ValueError("Self-play needs at least two players")
+    seed = new_request_seed() if seed is None else seed
+    max_workers = max_workers or pool_size()
+    games_per_shard = max(1, games_per_shard)
+    os.makedirs(root, exist_ok=True)
+
+    starts = list(range(0, num_games, games_per_shard))
+    plan = [
+        (root, shard, presets, characters, num_players, start, min(games_per_shard, num_games - start), shard_seed,
+         max_turns)
+        for shard, (start, shard_seed) in enumerate(zip(starts, spawn_seeds(seed, len(starts))))
+    ]
+
+    if max_workers <= 1 or len(plan) <= 1:
+        shards = [_play_shard(*args) for args in plan]
+    else:
+        # A window of shards in flight keeps at most 2 * max_workers shards in memory
+        pool = get_process_pool()
+        pending = iter(plan)
+        window = deque(pool.submit(_play_shard, *args) for args in islice(pending, 2 * max_workers))
+        shards = []
+        while window:
+            shards.append(window.popleft().result())
+            following = next(pending, None)
+            if following is not None:
+                window.append(pool.submit(_play_shard, *following))
+
+    manifest = {
+        'version': FORMAT_VERSION,
+        'seed': seed,
+        'numPlayers': num_players,
+        'colors': NUM_COLORS,
+        'kinds': NUM_KINDS,
+        'plays': PLAYS_PER_TURN,
+        'presets': presets,
+        'characters': characters,
+        'columns': dict(COLUMNS),
+        'games': num_games,
+        'rows': sum(shard['rows'] for shard in shards),
+        'shards': shards,
+    }
+    with open(os.path.join(root, MANIFEST), 'w') as handle:
+        json.dump(manifest, handle, indent=2)
+    return manifest
+
+
+def read_manifest(root: str) -> Dict[str, Any]:
+    with open(os.path.join(root, MANIFEST)) as handle:
+        return json.load(handle)
+
+
+def load_shard(directory: str, mmap_mode: Optional[str] = 'r') -> Dict[str, np.ndarray]:
+    """Columns of one shard, memory-mapped by default (mmap_mode=None reads them into memory)"""
+    return {
+        column: np.load(os.path.join(directory, f"{column}.npy"), mmap_mode=mmap_mode)
+        for column in COLUMNS
+    }
+
+
+def iter_shards(root: str, mmap_mode: Optional[str] = 'r') -> Iterator[Dict[str, np.ndarray]]:
+    """Every shard of a dataset, in game order"""
+    for shard in read_manifest(root)['shards']:
+        yield load_shard(os.path.join(root, shard['name']), mmap_mode)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Write a self-play dataset of per-turn feature rows")
+    parser.add_argument("root", help="output directory")
+    parser.add_argument("--games", type=int, default=10000)
+    parser.add_argument("--presets", nargs="*", default=None, help="official preset ids (default: all)")
+    parser.add_argument("--characters", nargs="*", default=None, help="characters (default: all)")
+    parser.add_argument("--players", type=int, default=2)
+    parser.add_argument("--games-per-shard", type=int, default=DEFAULT_GAMES_PER_SHARD)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    manifest = generate_dataset(args.root, args.games, args.presets, args.characters, args.players,
+                                args.games_per_shard, args.seed, args.workers)
+    print(f"Wrote {manifest['rows']} rows from {manifest['games']} games in "
+          f"{len(manifest['shards'])} shards to {args.root} (seed {manifest['seed']})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,630 @@
+"""
+Monte Carlo rollout engine for Monopoly Deal.
+
+Plays a GameState forward to the end of the game many times using the
+AGGRESSIVE / DEFENSIVE / NORMAL character policies and reports empirical win
+rates. Each turn follows the official structure: draw 2 (5 from an empty hand),
+up to 3 plays, payments from bank then properties, and a 7-card hand limit.
+
+Rollouts run on copies of a CompactGameState, so all per-rollout state is flat
+integer lists indexed by card kind and color and a rollout costs a few hundred
+microseconds rather than milliseconds. Each rollout starts from its own
+determinization of the hidden hands and deck order (app.core.determinize).
+"""
+
+import random
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from pydantic import BaseModel
+
+from app.core.cards import (
+    CardCategory, NUM_COLORS, NUM_KINDS, SET_SIZES, PROPERTY_VALUES,
+    NO_BUILDING_COLORS, KIND_CATEGORY, KIND_VALUE, KIND_COLORS,
+    WILD_ANY, DEAL_BREAKER, JUST_SAY_NO, SLY_DEAL, FORCED_DEAL, DEBT_COLLECTOR,
+    BIRTHDAY, PASS_GO, DOUBLE_RENT, HOUSE, HOTEL, RENT_ANY
+)
+from app.core.compact_state import CompactGameState
+from app.core.confidence import intervals, DEFAULT_CONFIDENCE
+from app.core.determinize import HiddenInformation
+from app.core.moves import PLAYS_PER_TURN
+from app.core.rule_kernel import compile_rules
+from app.models.game import GameState, EdgeRules, IntervalMethod
+
+
+# Policy weights per character. Kept in sync with
+# MonopolyDealEngine.character_multipliers (keys are PlayerCharacter values).
+CHARACTER_WEIGHTS = {
+    'aggressive': {'property_acquisition': 1.5, 'action_card_usage': 1.8,
+                   'risk_tolerance': 2.0, 'money_hoarding': 0.7},
+    'defensive': {'property_acquisition': 1.0, 'action_card_usage': 0.8,
+                  'risk_tolerance': 0.5, 'money_hoarding': 1.5},
+    'normal': {'property_acquisition': 1.2, 'action_card_usage': 1.0,
+               'risk_tolerance': 1.0, 'money_hoarding': 1.0},
+}
+
+HAND_LIMIT = 7
+SETS_TO_WIN = 3
+DEFAULT_MAX_TURNS = 200
+_DEAL_BATCH = 256  # determinizations sampled per NumPy pass
+
+_COLOR_RANGE = range(NUM_COLORS)
+_KIND_RANGE = range(NUM_KINDS)
+_MONEY = CardCategory.MONEY
+_PROPERTY = CardCategory.PROPERTY
+_WILD = CardCategory.WILD
+_RENT = CardCategory.RENT
+_BUILDING = CardCategory.BUILDING
+
+# Discard preference at the hand limit: lowest keep-value goes first
+_KEEP_VALUE = tuple(
+    (KIND_VALUE[kind] + 10 if KIND_CATEGORY[kind] in (_PROPERTY, _WILD) else KIND_VALUE[kind])
+    + (20 if kind == JUST_SAY_NO else 0)
+    for kind in _KIND_RANGE
+)
+_DISCARD_ORDER = tuple(sorted(_KIND_RANGE, key=lambda kind: _KEEP_VALUE[kind]))
+
+
+class SimulationSummary(BaseModel):
+    """Aggregated outcome of a batch of rollouts"""
+    playerNames: List[str]
+    wins: List[float]
+    games: int = 0
+    unfinished: int = 0
+    totalTurns: int = 0
+    stopReason: Optional[str] = None  # Set when a StoppingRule ended the run early
+
+    def win_rates(self) -> Dict[str, float]:
+        if self.games == 0:
+            return {name: 0.0 for name in self.playerNames}
+        return {name: wins / self.games for name, wins in zip(self.playerNames, self.wins)}
+
+    def average_turns(self) -> float:
+        return self.totalTurns / self.games if self.games else 0.0
+
+    def confidence_intervals(self, confidence: float = DEFAULT_CONFIDENCE,
+                             method: IntervalMethod = IntervalMethod.WILSON) -> Dict[str, Tuple[float, float]]:
+        """(low, high) win-rate interval per player"""
+        return intervals(self.playerNames, self.wins, self.games, confidence, method)
+
+    def merge(self, other: "SimulationSummary") -> "SimulationSummary":
+        return SimulationSummary(
+            playerNames=self.playerNames,
+            wins=[a + b for a, b in zip(self.wins, other.wins)],
+            games=self.games + other.games,
+            unfinished=self.unfinished + other.unfinished,
+            totalTurns=self.totalTurns + other.totalTurns
+        )
+
+
+class _Rollout(CompactGameState):
+    """Mutable game played to completion from a private copy of a CompactGameState"""
+
+    __slots__ = ('sim', 'rng', 'n', 'deck', 'weights', 'winner', 'over')
+
+    def __init__(self, sim: "GameSimulator", template: CompactGameState, unseen_cards: List[int],
+                 weights: list, rng: random.Random, deal: Optional[tuple] = None):
+        template.copy_into(self)
+        self.sim = sim
+        self.rng = rng
+        self.n = len(self.names)
+        self.weights = weights
+        self.winner = -1
+        self.over = False  # ended on deck exhaustion (DeckExhaustionRule.GAME_OVER)
+        if deal is not None:
+            # Pre-sampled determinization: (hidden hand counts per seat, deck in draw order)
+            hidden_hands, self.deck = deal
+            for player, count in enumerate(self.hidden):
+                if count:
+                    self.hands[player] = list(map(int.__add__, self.hands[player], hidden_hands[player]))
+                    self.hand_sizes[player] = sum(self.hands[player])
+            return
+        deck = unseen_cards[:]
+        rng.shuffle(deck)
+        dealt = 0
+        for player, count in enumerate(self.hidden):
+            if count:
+                hand = self.hands[player]
+                for kind in deck[dealt:dealt + count]:
+                    hand[kind] += 1
+                dealt += count
+                self.hand_sizes[player] = sum(hand)
+        self.deck = deck[dealt:dealt + self.deck_count]
+
+    # ------------------------------------------------------------------ helpers
+
+    def best_rent_color(self, player: int, colors) -> int:
+        best_color, best_rent = -1, 0
+        for color in colors:
+            rent = self.rent(player, color)
+            if rent > best_rent:
+                best_color, best_rent = color, rent
+        return best_color
+
+    def check_win(self, player: int) -> bool:
+        if self.winner < 0 and self.complete_sets(player) >= SETS_TO_WIN:
+            self.winner = player
+        return self.winner >= 0
+
+    def draw(self, player: int, count: int) -> bool:
+        """Draw cards into a hand. Returns False when the game ends on deck exhaustion"""
+        hand = self.hands[player]
+        for _ in range(count):
+            if not self.deck:
+                if not self.sim.reshuffle:
+                    self.over = True
+                    return False
+                if not self.discard:
+                    return True
+                self.deck = self.discard
+                self.discard = []
+                self.rng.shuffle(self.deck)
+            hand[self.deck.pop()] += 1
+            self.hand_sizes[player] += 1
+        return True
+
+    def use_card(self, player: int, kind: int, discard: bool = True) -> None:
+        self.hands[player][kind] -= 1
+        self.hand_sizes[player] -= 1
+        if discard:
+            self.discard.append(kind)
+
+    def add_property(self, player: int, color: int, value: int) -> None:
+        self.props[player][color] += 1
+        self.prop_values[player][color] += value
+
+    def remove_property(self, player: int, color: int) -> int:
+        """Remove one property card of a color and return its cash value"""
+        props = self.props[player]
+        values = self.prop_values[player]
+        count = props[color]
+        value = values[color] // count
+        was_complete = count >= SET_SIZES[color]
+        props[color] = count - 1
+        values[color] -= value
+        if was_complete and count - 1 < SET_SIZES[color]:
+            self.sim.forfeit_buildings(self, player, color)
+        return value
+
+    def steal_target(self, player: int):
+        """Best single property to steal: (opponent, color) or None"""
+        mine = self.props[player]
+        best, best_score = None, -1.0
+        for opponent in range(self.n):
+            if opponent == player:
+                continue
+            theirs = self.props[opponent]
+            for color in _COLOR_RANGE:
+                count = theirs[color]
+                if count == 0 or count >= SET_SIZES[color]:
+                    continue
+                score = (mine[color] + 1) / SET_SIZES[color] + PROPERTY_VALUES[color] * 0.01
+                if score > best_score:
+                    best, best_score = (opponent, color), score
+        return best
+
+    def deal_breaker_target(self, player: int):
+        best, best_value = None, -1
+        for opponent in range(self.n):
+            if opponent == player:
+                continue
+            theirs = self.props[opponent]
+            for color in _COLOR_RANGE:
+                if theirs[color] >= SET_SIZES[color]:
+                    value = self.prop_values[opponent][color] + 10
+                    if value > best_value:
+                        best, best_value = (opponent, color), value
+        return best
+
+    def give_away_color(self, player: int, opponent: int = -1) -> int:
+        """Least useful incomplete property color to hand over in a Forced Deal"""
+        mine = self.props[player]
+        best_color, best_score = -1, 99.0
+        for color in _COLOR_RANGE:
+            count = mine[color]
+            if count == 0 or count >= SET_SIZES[color]:
+                continue
+            if opponent >= 0 and not self.sim.forced_deal_setup \
+                    and self.props[opponent][color] + 1 >= SET_SIZES[color]:
+                continue
+            score = count / SET_SIZES[color] + PROPERTY_VALUES[color] * 0.01
+            if score < best_score:
+                best_color, best_score = color, score
+        return best_color
+
+    def richest_opponent(self, player: int) -> int:
+        best, best_assets = -1, -1
+        for opponent in range(self.n):
+            if opponent != player:
+                assets = self.assets(opponent)
+                if assets > best_assets:
+                    best, best_assets = opponent, assets
+        return best
+
+    # ----------------------------------------------------------- interaction
+
+    def blocked(self, actor: int, target: int, severity: float) -> bool:
+        """Resolve a Just Say No exchange. Returns True when the action is cancelled"""
+        sim = self.sim
+        if severity <= 0 and not sim.jsn_on_zero:
+            return False
+        defender, attacker = target, actor
+        cancelled = False
+        while True:
+            if not self.hands[defender][JUST_SAY_NO]:
+                return cancelled
+            if self.hand_sizes[defender] == 1 and not sim.jsn_empty_hand:
+                return cancelled
+            threshold = 3.0 * self.weights[defender]['risk_tolerance']
+            if severity < threshold:
+                return cancelled
+            self.use_card(defender, JUST_SAY_NO)
+            cancelled = not cancelled
+            defender, attacker = attacker, defender
+
+    def pay(self, payer: int, receiver: int, amount: int) -> None:
+        """Pay a debt from the bank first, then properties (incomplete sets first)"""
+        bank = self.banks[payer]
+        if bank >= amount:
+            self.banks[payer] = bank - amount
+            self.banks[receiver] += amount
+            return
+        self.banks[payer] = 0
+        self.banks[receiver] += bank
+        remaining = amount - bank
+        props = self.props[payer]
+        while remaining > 0:
+            color, best_key = -1, None
+            for candidate in _COLOR_RANGE:
+                count = props[candidate]
+                if count == 0:
+                    continue
+                key = (count >= SET_SIZES[candidate], self.prop_values[payer][candidate] // count)
+                if best_key is None or key < best_key:
+                    color, best_key = candidate, key
+            if color < 0:
+                break
+            value = self.remove_property(payer, color)
+            self.add_property(receiver, color, value)
+            remaining -= value
+        self.check_win(receiver)
+
+    def charge(self, actor: int, target: int, amount: int) -> None:
+        available = min(amount, self.assets(target))
+        if not self.blocked(actor, target, available):
+            self.pay(target, actor, amount)
+
+    # ---------------------------------------------------------------- policy
+
+    def score_play(self, player: int, kind: int):
+        """Return (score, color) for playing a card kind; score <= 0 means hold it"""
+        weights = self.weights[player]
+        category = KIND_CATEGORY[kind]
+        mine = self.props[player]
+
+        if category is _MONEY:
+            return (6 + 2 * KIND_VALUE[kind]) * weights['money_hoarding'], -1
+
+        if category is _PROPERTY or category is _WILD:
+            best_score, best_color = 0.0, -1
+            for color in KIND_COLORS[kind]:
+                count = mine[color]
+                size = SET_SIZES[color]
+                if kind == WILD_ANY and count == 0:
+                    continue
+                if count >= size:
+                    score = 2.0
+                else:
+                    score = 20 + 30 * (count + 1) / size + (40 if count + 1 == size else 0)
+                if score > best_score:
+                    best_score, best_color = score, color
+            return best_score * weights['property_acquisition'], best_color
+
+        usage = weights['action_card_usage']
+        score = 0.0
+        if kind == PASS_GO:
+            score = 40.0
+        elif kind == DEBT_COLLECTOR:
+            target = self.richest_opponent(player)
+            if target >= 0:
+                score = min(5, self.assets(target)) * 8 * usage
+        elif kind == BIRTHDAY:
+            score = sum(min(2, self.assets(o)) for o in range(self.n) if o != player) * 8 * usage
+        elif category is _RENT:
+            color = self.best_rent_color(player, KIND_COLORS[kind])
+            if color >= 0:
+                rent = self.rent(player, color)
+                if kind == RENT_ANY:
+                    target = self.richest_opponent(player)
+                    gain = min(rent, self.assets(target)) if target >= 0 else 0
+                else:
+                    gain = sum(min(rent, self.assets(o)) for o in range(self.n) if o != player)
+                score = gain * 8 * usage
+        elif kind == SLY_DEAL:
+            target = self.steal_target(player)
+            if target is not None:
+                color = target[1]
+                score = (35 + (30 if mine[color] + 1 == SET_SIZES[color] else 0)) * usage
+        elif kind == FORCED_DEAL:
+            target = self.steal_target(player)
+            if target is not None:
+                give_color = self.give_away_color(player, target[0])
+                if give_color >= 0 and give_color != target[1]:
+                    score = 25 * usage
+        elif kind == DEAL_BREAKER:
+            target = self.deal_breaker_target(player)
+            if target is not None:
+                score = (60 + 3 * self.prop_values[target[0]][target[1]]) * usage
+        elif kind == HOUSE:
+            for color in _COLOR_RANGE:
+                if mine[color] >= SET_SIZES[color] and color not in NO_BUILDING_COLORS \
+                        and not self.houses[player][color]:
+                    score = 30.0
+                    return score, color
+        elif kind == HOTEL:
+            for color in _COLOR_RANGE:
+                if mine[color] >= SET_SIZES[color] and self.houses[player][color] \
+                        and not self.hotels[player][color]:
+                    score = 35.0
+                    return score, color
+
+        if score > 0:
+            return score, -1
+        # Unusable action: bank it as money when it is worth enough
+        if kind in (JUST_SAY_NO, DOUBLE_RENT):
+            return 0.0, -1
+        return KIND_VALUE[kind] * 2 * weights['money_hoarding'] - 4, -2
+
+    def play(self, player: int, kind: int, color: int, plays_left: int,
+             target: int = -1, give: int = -1, doubles: int = -1) -> int:
+        """
+        Execute a play and return the number of plays it consumed. target, give and
+        doubles (see moves.Move) fix the card's targets; -1 leaves them to the policy.
+        """
+        category = KIND_CATEGORY[kind]
+
+        if color == -2 or category is _MONEY:
+            self.use_card(player, kind, discard=False)
+            self.banks[player] += KIND_VALUE[kind]
+            return 1
+
+        if category is _PROPERTY or category is _WILD:
+            self.use_card(player, kind, discard=False)
+            self.add_property(player, color, KIND_VALUE[kind])
+            self.check_win(player)
+            return 1
+
+        if category is _BUILDING:
+            if give >= 0:
+                # Building moved from the give set (EdgeRules.hotelMove)
+                zone = self.houses if kind == HOUSE else self.hotels
+                zone[player][give] = 0
+                zone[player][color] = 1
+                return self.sim.building_move_cost
+            self.use_card(player, kind, discard=False)
+            if kind == HOUSE:
+                self.houses[player][color] = 1
+            else:
+                self.hotels[player][color] = 1
+            return 1
+
+        self.use_card(player, kind)
+        n = self.n
+
+        if kind == PASS_GO:
+            # Running out of cards under GAME_OVER sets self.over; finish_turn then ends the game
+            self.draw(player, 2)
+            return 1
+
+        if kind == DEBT_COLLECTOR:
+            self.charge(player, target if target >= 0 else self.richest_opponent(player), 5)
+            return 1
+
+        if kind == BIRTHDAY:
+            for opponent in range(n):
+                if opponent != player:
+                    self.charge(player, opponent, 2)
+            return 1
+
+        if category is _RENT:
+            rent_color = color if color >= 0 else self.best_rent_color(player, KIND_COLORS[kind])
+            rent = self.rent(player, rent_color)
+            used = 1
+            if doubles < 0:
+                doubles = min(self.hands[player][DOUBLE_RENT], self.sim.doubles_allowed[plays_left])
+            for _ in range(doubles):
+                self.use_card(player, DOUBLE_RENT)
+                rent *= 2
+                used += 1
+            if kind == RENT_ANY:
+                self.charge(player, target if target >= 0 else self.richest_opponent(player), rent)
+            else:
+                for opponent in range(n):
+                    if opponent != player:
+                        self.charge(player, opponent, rent)
+            return used
+
+        if kind == SLY_DEAL:
+            target = (target, color) if target >= 0 else self.steal_target(player)
+            if target is not None:
+                opponent, steal_color = target
+                if not self.blocked(player, opponent, PROPERTY_VALUES[steal_color] + 3):
+                    value = self.remove_property(opponent, steal_color)
+                    self.add_property(player, steal_color, value)
+                    self.check_win(player)
+            return 1
+
+        if kind == FORCED_DEAL:
+            target = (target, color) if target >= 0 else self.steal_target(player)
+            give_color = give if give >= 0 else \
+                self.give_away_color(player, target[0]) if target is not None else -1
+            if target is not None and give_color >= 0:
+                opponent, steal_color = target
+                if not self.blocked(player, opponent, PROPERTY_VALUES[steal_color] + 2):
+                    taken = self.remove_property(opponent, steal_color)
+                    given = self.remove_property(player, give_color)
+                    self.add_property(player, steal_color, taken)
+                    self.add_property(opponent, give_color, given)
+                    self.check_win(player)
+                    self.check_win(opponent)
+            return 1
+
+        if kind == DEAL_BREAKER:
+            target = (target, color) if target >= 0 else self.deal_breaker_target(player)
+            if target is not None:
+                opponent, steal_color = target
+                if not self.blocked(player, opponent, 100):
+                    self.props[player][steal_color] += self.props[opponent][steal_color]
+                    self.prop_values[player][steal_color] += self.prop_values[opponent][steal_color]
+                    self.houses[player][steal_color] |= self.houses[opponent][steal_color]
+                    self.hotels[player][steal_color] |= self.hotels[opponent][steal_color]
+                    self.props[opponent][steal_color] = 0
+                    self.prop_values[opponent][steal_color] = 0
+                    self.houses[opponent][steal_color] = 0
+                    self.hotels[opponent][steal_color] = 0
+                    self.check_win(player)
+            return 1
+
+        return 1
+
+    def take_turn(self, player: int) -> bool:
+        """Play one full turn. Returns False when the game has ended"""
+        if not self.draw(player, 5 if self.hand_sizes[player] == 0 else 2):
+            return False
+        return self.finish_turn(player, PLAYS_PER_TURN)
+
+    def finish_turn(self, player: int, plays_left: int) -> bool:
+        """Play out the rest of a turn with the policy, then discard to the hand limit"""
+        if self.over:
+            return False  # a Pass Go played before this call ran out the deck
+        hand = self.hands[player]
+        while plays_left > 0:
+            best_score, best_kind, best_color = 0.0, -1, -1
+            for kind, count in enumerate(hand):
+                if count:
+                    score, color = self.score_play(player, kind)
+                    if score > best_score:
+                        best_score, best_kind, best_color = score, kind, color
+            if best_kind < 0:
+                break
+            plays_left -= self.play(player, best_kind, best_color, plays_left)
+            if self.winner >= 0 or self.over:
+                return False
+        self.discard_to_limit(player)
+        return True
+
+    def discard_to_limit(self, player: int) -> None:
+        """End-of-turn discards down to the hand limit, lowest keep-value first"""
+        hand = self.hands[player]
+        excess = self.hand_sizes[player] - HAND_LIMIT
+        if excess > 0:
+            for kind in _DISCARD_ORDER:
+                while hand[kind] and excess > 0:
+                    self.use_card(player, kind)
+                    excess -= 1
+                if excess == 0:
+                    break
+
+    def leader(self) -> int:
+        """Winner by most complete sets, then total assets, when the game stops early"""
+        return max(range(self.n), key=lambda player: (self.complete_sets(player), self.assets(player)))
+
+    def run(self, first_player: int, max_turns: int):
+        """Play to completion. Returns (winner, turns, finished)"""
+        for player in range(self.n):
+            if self.check_win(player):
+                return self.winner, 0, True
+        player = first_player
+        for turn in range(1, max_turns + 1):
+            if not self.take_turn(player):
+                if self.winner >= 0:
+                    return self.winner, turn, True
+                return self.leader(), turn, True
+            player = (player + 1) % self.n
+        return self.leader(), max_turns, False
+
+
+class GameSimulator:
+    """
+    Monte Carlo rollout engine. EdgeRules are compiled once into a RuleKernel
+    (app.core.rule_kernel) whose constants and pre-bound functions are copied
+    onto the simulator, so the rollout loop only touches plain attributes.
+    """
+
+    def __init__(self, edge_rules: Optional[EdgeRules] = None, max_turns: int = DEFAULT_MAX_TURNS,
+                 character_weights: Optional[Dict[str, Dict[str, float]]] = None):
+        rules = edge_rules or EdgeRules()
+        self.edge_rules = rules
+        self.max_turns = max_turns
+        self.character_weights = character_weights or CHARACTER_WEIGHTS
+        kernel = compile_rules(rules)
+        self.kernel = kernel
+        self.reshuffle = kernel.reshuffle
+        self.quadruple_rent = kernel.quadruple_rent
+        self.doubles_allowed = kernel.doubles_allowed
+        self.building_move_cost = kernel.building_move_cost
+        self.forced_deal_setup = kernel.forced_deal_setup
+        self.jsn_empty_hand = kernel.jsn_empty_hand
+        self.jsn_on_zero = kernel.jsn_on_zero
+        self.forfeit_buildings = kernel.forfeit_buildings
+        self.move_rules = kernel.moves
+
+    def seat_weights(self, characters: Sequence[str], num_players: int) -> list:
+        """Policy weights per seat; seats without a character play NORMAL"""
+        return [self.character_weights.get(characters[i] if i < len(characters) else 'normal',
+                                           self.character_weights['normal']) for i in range(num_players)]
+
+    def rollout(self, state: CompactGameState, unseen_cards: List[int], weights: list,
+                rng: random.Random, deal: Optional[tuple] = None) -> _Rollout:
+        """
+        A fresh mutable game copied from state. Hidden hands and the deck come from
+        deal (a Determinizations.sample) or else from shuffling unseen_cards.
+        """
+        return _Rollout(self, state, unseen_cards, weights, rng, deal)
+
+    def run(self, game_state: Union[GameState, CompactGameState], characters: Sequence[str], num_rollouts: int,
+            seed: Optional[int] = None, first_player: int = 0, antithetic: bool = False) -> SimulationSummary:
+        """
+        Play num_rollouts games forward from game_state.
+
+        Args:
+            game_state: Position to simulate from (player 0 moves next by default);
+                an already encoded CompactGameState is used as-is
+            characters: PlayerCharacter value per seat ('aggressive', 'defensive', 'normal')
+            num_rollouts: Number of games to play
+            seed: Seed for the rollout RNG (random when None)
+            first_player: Seat index that takes the next turn
+            antithetic: Deal rollouts in antithetic pairs (see app.core.determinize)
+
+        Returns:
+            SimulationSummary with win counts per player
+        """
+        state = game_state if isinstance(game_state, CompactGameState) \
+            else CompactGameState.from_game_state(game_state)
+        n = state.num_players
+        weights = self.seat_weights(characters, n)
+        rng = random.Random(seed)
+        # Hidden hands and deck orders for all rollouts are sampled in NumPy batches
+        hidden = HiddenInformation(state)
+        deal_rng = np.random.default_rng(seed)
+        wins = [0.0] * n
+        unfinished = 0
+        total_turns = 0
+
+        for index in range(num_rollouts if n else 0):
+            if index % _DEAL_BATCH == 0:
+                deals = hidden.sample(min(_DEAL_BATCH, num_rollouts - index), deal_rng, antithetic)
+            rollout = _Rollout(self, state, [], weights, rng, deals.sample(index % _DEAL_BATCH))
+            winner, turns, finished = rollout.run(first_player, self.max_turns)
+            wins[winner] += 1
+            total_turns += turns
+            if not finished:
+                unfinished += 1
+
+        return SimulationSummary(
+            playerNames=state.names,
+            wins=wins,
+            games=num_rollouts if n else 0,
+            unfinished=unfinished,
+            totalTurns=total_turns
+        )
@@ -0,0 +1,355 @@
+"""
+Background simulation jobs.
+
+Large simulation runs are submitted as jobs instead of being played inside the
+HTTP request. A bounded in-process queue feeds a small pool of worker threads;
+each worker drives MonopolyDealEngine.iter_simulation, whose shards run on the
+shared simulation process pool, and publishes progress (games played and the
+win rates so far) after every shard. Clients poll or stream a job's status and
+can cancel it: a queued job is dropped, a running one stops at the next shard
+boundary and cancels the shards still in flight.
+
+Jobs optionally persist to a SQLite file (settings.SIMULATION_JOB_DB). Finished
+jobs stay available for polling across restarts; jobs that were queued or
+running when the process stopped are queued again and, since the seed is fixed
+at submission, replay to the same result. Callbacks are not stored, so restored
+jobs get the queue's on_restore callback instead.
+"""
+
+import logging
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from app.core.config import settings
+from app.core.game_engine import get_engine
+from app.core.parallel_simulation import new_request_seed
+from app.models.game import (
+    GameState, AnalysisResponse, SimulationResponse, SimulationJobRequest, SimulationJobResponse, JobStatus
+)
+
+
+logger = logging.getLogger(__name__)
+
+FINISHED_STATUSES = (JobStatus.COMPLETED, JobStatus.FAILED, JobStatus.CANCELLED)
+_PROGRESS_SAVE_SECONDS = 1.0  # Progress is written to the store at most this often
+
+
+def simulation_response(game_state: GameState, results: List[AnalysisResponse], seed: int) -> SimulationResponse:
+    """SimulationResponse for the answers of simulate_game (shared by /simulate and jobs)"""
+    player_wins = {player.name: 0.0 for player in game_state.players}
+    for result in results:
+        for player_name, prob in result.winProbability.items():
+            player_wins[player_name] += prob
+    num_sims = len(results)
+    average_win_probability = {name: round(wins / num_sims, 2) for name, wins in player_wins.items()}
+    simulation = (results[-1].debug or {}).get('simulation', {}) if results else {}
+    return SimulationResponse(
+        results=results,
+        averageWinProbability=average_win_probability,
+        strategyPerformance=dict(average_win_probability),
+        seed=seed,
+        confidenceIntervals=simulation.get('intervals', {}),
+        gamesPlayed=simulation.get('games'),
+        stoppedEarly=simulation.get('stoppedEarly', False),
+        stopReason=simulation.get('stopReason')
+    )
+
+
+class JobQueueFull(Exception):
+    """Raised by JobQueue.submit when the queue is at capacity"""
+    pass
+
+
+class Job:
+    """One simulation job; fields are written by its worker under the queue's lock"""
+
+    def __init__(self, job_id: str, request: SimulationJobRequest, seed: int, user_id: Optional[int] = None,
+                 on_finish: Optional[Callable[["Job"], None]] = None):
+        self.id = job_id
+        self.request = request
+        self.seed = seed
+        self.user_id = user_id
+        self.on_finish = on_finish
+        self.status = JobStatus.QUEUED
+        self.games = 0
+        self.created_at = datetime.utcnow()
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self.latest: Optional[AnalysisResponse] = None
+        self.result: Optional[SimulationResponse] = None
+        self.error: Optional[str] = None
+        self.cancel_requested = threading.Event()
+        self.version = 0  # Bumped on every change, for waiters
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATUSES
+
+    def snapshot(self) -> SimulationJobResponse:
+        return SimulationJobResponse(
+            jobId=self.id,
+            status=self.status,
+            gamesPlayed=self.games,
+            maxGames=self.request.numSimulations,
+            seed=self.seed,
+            createdAt=self.created_at,
+            startedAt=self.started_at,
+            finishedAt=self.finished_at,
+            latest=None if self.finished else self.latest,
+            result=self.result,
+            error=self.error
+        )
+
+
+class SQLiteJobStore:
+    """Job records in a SQLite file (one row per job, JSON request and result)"""
+
+    def __init__(self, path: str):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS simulation_jobs ("
+                "id TEXT PRIMARY KEY, user_id INTEGER, status TEXT, seed INTEGER, games INTEGER, "
+                "request TEXT, result TEXT, error TEXT, created_at TEXT, started_at TEXT, finished_at TEXT)"
+            )
+
+    def save(self, job: Job) -> None:
+        row = (
+            job.id, job.user_id, job.status.value, job.seed, job.games, job.request.model_dump_json(),
+            job.result.model_dump_json() if job.result is not None else None, job.error,
+            *(moment.isoformat() if moment else None for moment in (job.created_at, job.started_at, job.finished_at))
+        )
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO simulation_jobs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", row)
+
+    def delete(self, job_id: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM simulation_jobs WHERE id = ?", (job_id,))
+
+    def load(self) -> List[Job]:
+        """All stored jobs, oldest first"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, user_id, status, seed, games, request, result, error, created_at, started_at, "
+                "finished_at FROM simulation_jobs ORDER BY created_at"
+            ).fetchall()
+        jobs = []
+        for job_id, user_id, status, seed, games, request, result, error, created, started, finished in rows:
+            job = Job(job_id, SimulationJobRequest.model_validate_json(request), seed, user_id)
+            job.status = JobStatus(status)
+            job.games = games
+            job.result = SimulationResponse.model_validate_json(result) if result else None
+            job.error = error
+            job.created_at, job.started_at, job.finished_at = (
+                datetime.fromisoformat(moment) if moment else None for moment in (created, started, finished)
+            )
+            jobs.append(job)
+        return jobs
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class JobQueue:
+    """
+    Bounded queue of simulation jobs executed by a fixed number of worker threads.
+    Workers start on first use; finished jobs beyond history are forgotten, oldest first.
+    on_restore is the finish callback of unfinished jobs restored from the store.
+    """
+
+    def __init__(self, workers: int = 2, max_queued: int = 64, history: int = 1000,
+                 store: Optional[SQLiteJobStore] = None, on_restore: Optional[Callable[[Job], None]] = None):
+        self.workers = max(1, workers)
+        self.history = history
+        self.store = store
+        self._queue: "queue.Queue[Optional[Job]]" = queue.Queue(maxsize=max_queued)
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._threads: List[threading.Thread] = []
+        if store is not None:
+            self._restore(store.load(), on_restore)
+
+    # Client API
+
+    def submit(self, request: SimulationJobRequest, user_id: Optional[int] = None,
+               on_finish: Optional[Callable[[Job], None]] = None) -> Job:
+        """Queue a job; raises JobQueueFull when max_queued jobs are already waiting"""
+        seed = request.seed if request.seed is not None else new_request_seed()
+        job = Job(uuid.uuid4().hex, request, seed, user_id, on_finish)
+        with self._lock:
+            self._start_workers()
+            try:
+                self._queue.put_nowait(job)
+            except queue.Full:
+                raise JobQueueFull(f"Simulation queue is full ({self._queue.maxsize} jobs waiting)")
+            self._jobs[job.id] = job
+        self._save(job)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """Cancel a job: queued jobs are dropped at once, running ones at their next shard"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.finished:
+                return job
+            job.cancel_requested.set()
+            if job.status == JobStatus.QUEUED:
+                self._finish(job, JobStatus.CANCELLED)
+        if job.finished:
+            self._save(job)
+        return job
+
+    def wait(self, job: Job, version: int, timeout: float) -> int:
+        """Block until job changes past version (or timeout); returns its current version"""
+        with self._changed:
+            self._changed.wait_for(lambda: job.version != version, timeout)
+            return job.version
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            counts = {status.value: 0 for status in JobStatus}
+            for job in self._jobs.values():
+                counts[job.status.value] += 1
+            counts['workers'] = self.workers
+            return counts
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the workers once they finish the jobs they are running; queued jobs stay queued"""
+        with self._lock:
+            threads, self._threads = self._threads, []
+        for _ in threads:
+            self._queue.put(None)
+        if wait:
+            for thread in threads:
+                thread.join()
+
+    # Workers
+
+    def _start_workers(self) -> None:
+        """Start the worker threads (caller holds the lock)"""
+        while len(self._threads) < self.workers:
+            thread = threading.Thread(target=self._work, name=f"simulation-job-{len(self._threads)}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _work(self) -> None:
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            with self._lock:
+                if job.finished:
+                    continue  # cancelled while queued
+                job.status = JobStatus.RUNNING
+                job.started_at = datetime.utcnow()
+                self._touch(job)
+            self._save(job)
+            self._run(job)
+
+    def _run(self, job: Job) -> None:
+        request = job.request
+        saved = time.monotonic()
+        updates = get_engine(request.gameState.edgeRules).iter_simulation(
+            request.gameState, request.strategy, request.numSimulations, job.seed, None,
+            request.targetPrecision, request.confidenceLevel, request.intervalMethod
+        )
+        try:
+            for update in updates:
+                if job.cancel_requested.is_set():
+                    break
+                with self._lock:
+                    job.latest = update
+                    job.games = (update.debug or {}).get('simulation', {}).get('games', job.games)
+                    if update.completed:
+                        job.result = simulation_response(request.gameState, [update], job.seed)
+                        self._finish(job, JobStatus.COMPLETED)
+                    else:
+                        self._touch(job)
+                if not job.finished and time.monotonic() - saved >= _PROGRESS_SAVE_SECONDS:
+                    self._save(job)
+                    saved = time.monotonic()
+        except Exception as e:
+            with self._lock:
+                job.error = str(e)
+                self._finish(job, JobStatus.FAILED)
+        finally:
+            updates.close()  # Cancels shards still in flight
+        if not job.finished:
+            with self._lock:
+                self._finish(job, JobStatus.CANCELLED)
+        self._save(job)
+        if job.on_finish is not None:
+            try:
+                job.on_finish(job)
+            except Exception:
+                logger.exception("Simulation job %s callback failed", job.id)
+
+    # Bookkeeping (callers hold the lock)
+
+    def _touch(self, job: Job) -> None:
+        job.version += 1
+        self._changed.notify_all()
+
+    def _finish(self, job: Job, status: JobStatus) -> None:
+        job.status = status
+        job.finished_at = datetime.utcnow()
+        self._touch(job)
+        self._evict()
+
+    def _evict(self) -> None:
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for job_id in finished[:max(0, len(finished) - self.history)]:
+            del self._jobs[job_id]
+            if self.store is not None:
+                self.store.delete(job_id)
+
+    def _save(self, job: Job) -> None:
+        if self.store is not None and job.id in self._jobs:
+            self.store.save(job)
+
+    def _restore(self, jobs: List[Job], on_finish: Optional[Callable[[Job], None]]) -> None:
+        """Load stored jobs; unfinished ones start over from their seed, or fail if the queue is full"""
+        with self._lock:
+            for job in jobs:
+                self._jobs[job.id] = job
+                if not job.finished:
+                    job.status, job.games, job.started_at = JobStatus.QUEUED, 0, None
+                    job.on_finish = on_finish
+                    self._start_workers()
+                    try:
+                        self._queue.put_nowait(job)
+                    except queue.Full:
+                        job.error = f"Simulation queue was full on restart ({self._queue.maxsize} jobs waiting)"
+                        self._finish(job, JobStatus.FAILED)
+                    self.store.save(job)
+
+
+_job_queue: Optional[JobQueue] = None
+_job_queue_lock = threading.Lock()
+
+
+def get_job_queue(on_restore: Optional[Callable[[Job], None]] = None) -> JobQueue:
+    """
+    Shared job queue, created (and restored from the job store, if configured) on first use;
+    on_restore is the finish callback of the restored jobs
+    """
+    global _job_queue
+    with _job_queue_lock:
+        if _job_queue is None:
+            store = SQLiteJobStore(settings.SIMULATION_JOB_DB) if settings.SIMULATION_JOB_DB else None
+            _job_queue = JobQueue(settings.SIMULATION_JOB_WORKERS, settings.SIMULATION_JOB_QUEUE_SIZE,
+                                  settings.SIMULATION_JOB_HISTORY, store, on_restore)
+        return _job_queue
@@ -0,0 +1,226 @@
+"""
+Round-robin strategy tournaments.
+
+An entrant is a PlayerCharacter paired with an AssetEvaluation. Every pair of
+entrants plays heads-up games from a fresh deal (five hidden cards each, the
+rest of the deck shuffled) under one EdgeRules set, half of them with each
+entrant moving first, so first-player advantage cancels out of the pairing.
+
+Rollouts choose plays from per-seat policy weights, so an entrant's
+AssetEvaluation is expressed as a tilt of its character weights: LOGICAL
+favours completing sets over banking, VALUE favours the bank, LOGICAL_VALUE
+plays the plain character.
+
+Games are cut into shards that run on the shared simulation process pool,
+each with a seed spawned from the tournament seed, so results depend only on
+the seed and never on the number of workers. Ratings are a Bradley-Terry fit
+of the pairwise results on the Elo scale (mean 1500); Elo intervals use the
+fit's per-entrant standard error and ignore the covariance between ratings.
+"""
+
+import math
+import time
+from itertools import combinations
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from app.core.cards import DECK_SIZE
+from app.core.compact_state import CompactGameState
+from app.core.confidence import interval, z_score, DEFAULT_CONFIDENCE
+from app.core.game_engine import PlayerCharacter, AssetEvaluation
+from app.core.parallel_simulation import (
+    get_process_pool, new_request_seed, pool_size, spawn_seeds, _run_shard, DEFAULT_SHARD_SIZE
+)
+from app.core.simulation import CHARACTER_WEIGHTS, DEFAULT_MAX_TURNS
+from app.models.game import (
+    GameState, PlayerState, EdgeRules, IntervalMethod, TournamentEntrant, TournamentResponse
+)
+
+
+OPENING_HAND = 5
+ELO_BASE = 1500.0
+ELO_SCALE = 400.0 / math.log(10)  # Elo points per unit of log-strength
+_FIT_ITERATIONS = 500
+_FIT_TOLERANCE = 1e-10
+_PRIOR_GAMES = 1.0  # Virtual drawn games against every opponent, keeps unbeaten ratings finite
+
+# Weight multipliers expressing each AssetEvaluation in the rollout policy
+ASSET_WEIGHT_TILTS = {
+    AssetEvaluation.LOGICAL.value: {'property_acquisition': 1.25, 'money_hoarding': 0.8},
+    AssetEvaluation.VALUE.value: {'property_acquisition': 0.85, 'money_hoarding': 1.25},
+    AssetEvaluation.LOGICAL_VALUE.value: {},
+}
+
+
+def entrant_name(character: str, asset_evaluation: str) -> str:
+    return f"{character}/{asset_evaluation}"
+
+
+def entrant_weights(character: str, asset_evaluation: str) -> Dict[str, float]:
+    """Rollout policy weights for a character playing with an asset evaluation"""
+    weights = dict(CHARACTER_WEIGHTS[character])
+    for key, factor in ASSET_WEIGHT_TILTS[asset_evaluation].items():
+        weights[key] *= factor
+    return weights
+
+
+def opening_state(num_players: int = 2) -> CompactGameState:
+    """A fresh deal: every seat holds OPENING_HAND unseen cards, the rest is the deck"""
+    players = [PlayerState(id=seat + 1, name=f"seat{seat}", hand=[], bank=[], properties={},
+                           handCount=OPENING_HAND) for seat in range(num_players)]
+    game_state = GameState(players=players, discard=[], deckCount=DECK_SIZE - OPENING_HAND * num_players,
+                           edgeRules=EdgeRules())
+    return CompactGameState.from_game_state(game_state)
+
+
+def fit_elo(wins: Sequence[Sequence[float]], games: Sequence[Sequence[int]]) -> Tuple[List[float], List[float]]:
+    """
+    Bradley-Terry ratings from a pairwise result matrix (wins[i][j]: games i won against j).
+
+    Returns:
+        (elo, standard error) per entrant, Elo centred on ELO_BASE
+    """
+    n = len(wins)
+    if n == 0:
+        return [], []
+    # Prior: _PRIOR_GAMES drawn games against each opponent
+    w = [[wins[i][j] + (_PRIOR_GAMES / 2 if i != j else 0.0) for j in range(n)] for i in range(n)]
+    g = [[games[i][j] + (_PRIOR_GAMES if i != j else 0.0) for j in range(n)] for i in range(n)]
+    totals = [sum(row) for row in w]
+    strength = [1.0] * n
+    # Minorization-maximization updates (Hunter 2004), normalised to geometric mean 1
+    for _ in range(_FIT_ITERATIONS):
+        updated = [
+            totals[i] / sum(g[i][j] / (strength[i] + strength[j]) for j in range(n) if j != i) if n > 1 else 1.0
+            for i in range(n)
+        ]
+        scale = math.exp(sum(math.log(value) for value in updated) / n)
+        updated = [value / scale for value in updated]
+        change = max(abs(a - b) for a, b in zip(updated, strength))
+        strength = updated
+        if change < _FIT_TOLERANCE:
+            break
+
+    elo, errors = [], []
+    for i in range(n):
+        information = sum(
+            g[i][j] * strength[i] * strength[j] / (strength[i] + strength[j]) ** 2 for j in range(n) if j != i
+        )
+        elo.append(ELO_BASE + ELO_SCALE * math.log(strength[i]))
+        errors.append(ELO_SCALE / math.sqrt(information) if information > 0 else math.inf)
+    return elo, errors
+
+
+def run_tournament(edge_rules: Optional[EdgeRules] = None,
+                   characters: Sequence[str] = tuple(c.value for c in PlayerCharacter),
+                   asset_evaluations: Sequence[str] = tuple(a.value for a in AssetEvaluation),
+                   games_per_pairing: int = 200, seed: Optional[int] = None,
+                   max_workers: Optional[int] = None, shard_size: int = DEFAULT_SHARD_SIZE,
+                   confidence: float = DEFAULT_CONFIDENCE, method: IntervalMethod = IntervalMethod.WILSON,
+                   max_turns: int = DEFAULT_MAX_TURNS, max_games: Optional[int] = None) -> TournamentResponse:
+    """
+    Play a round-robin between every character / asset-evaluation pairing.
+
+    Args:
+        edge_rules: Rules every game is played under
+        characters: PlayerCharacter values taking part
+        asset_evaluations: AssetEvaluation values taking part
+        games_per_pairing: Games per pair of entrants, split over both seatings
+        seed: Tournament seed; the same seed always gives the same result
+        max_workers: Tasks run in parallel on the shared pool (its size by default); 1 plays in-process
+        shard_size: Games per pool task
+        confidence: Confidence level of the win-rate and Elo intervals
+        method: Win-rate interval method
+        max_turns: Turn limit per game (the leader wins at the limit)
+        max_games: Most games the whole round-robin may play (no limit when None)
+
+    Returns:
+        TournamentResponse with entrants ordered by Elo
+
+    Raises:
+        ValueError: On unknown characters or asset evaluations, fewer than two entrants,
+            or more than max_games games in total
+    """
+    started = time.perf_counter()
+    edge_rules = edge_rules or EdgeRules()
+    characters = [PlayerCharacter(value).value for value in dict.fromkeys(characters)]
+    asset_evaluations = [AssetEvaluation(value).value for value in dict.fromkeys(asset_evaluations)]
+    entrants = [(character, asset) for character in characters for asset in asset_evaluations]
+    if len(entrants) < 2:
+        raise ValueError("A tournament needs at least two entrants")
+    total_games = len(entrants) * (len(entrants) - 1) // 2 * games_per_pairing
+    if max_games is not None and total_games > max_games:
+        raise ValueError(f"A tournament of {len(entrants)} entrants at {games_per_pairing} games per pairing "
+                         f"plays {total_games} games; at most {max_games} are allowed per request")
+    names = [entrant_name(*entrant) for entrant in entrants]
+    weights = dict(CHARACTER_WEIGHTS)
+    weights.update({name: entrant_weights(*entrant) for name, entrant in zip(names, entrants)})
+    seed = new_request_seed() if seed is None else seed
+    max_workers = max_workers or pool_size()
+    shard_size = max(1, shard_size)
+    state = opening_state()
+
+    # Tasks: (first entrant, second entrant, games); both seatings of every pairing
+    tasks = []
+    for a, b in combinations(range(len(entrants)), 2):
+        for first, second, count in ((a, b, games_per_pairing - games_per_pairing // 2),
+                                     (b, a, games_per_pairing // 2)):
+            for start in range(0, count, shard_size):
+                tasks.append((first, second, min(shard_size, count - start)))
+    seeds = spawn_seeds(seed, len(tasks))
+    args = [(edge_rules, max_turns, weights, state, [names[first], names[second]], count, task_seed)
+            for (first, second, count), task_seed in zip(tasks, seeds)]
+
+    if max_workers <= 1 or len(tasks) == 1:
+        summaries = [_run_shard(*task_args) for task_args in args]
+    else:
+        pool = get_process_pool()
+        summaries = [future.result() for future in [pool.submit(_run_shard, *task_args) for task_args in args]]
+
+    n = len(entrants)
+    wins = [[0.0] * n for _ in range(n)]
+    games = [[0] * n for _ in range(n)]
+    first_wins = 0.0
+    unfinished = total_turns = 0
+    for (first, second, _), summary in zip(tasks, summaries):
+        wins[first][second] += summary.wins[0]
+        wins[second][first] += summary.wins[1]
+        games[first][second] += summary.games
+        games[second][first] += summary.games
+        first_wins += summary.wins[0]
+        unfinished += summary.unfinished
+        total_turns += summary.totalTurns
+    played = sum(summary.games for summary in summaries)
+
+    elo, errors = fit_elo(wins, games)
+    z = z_score(confidence)
+    results = []
+    for i, (character, asset) in enumerate(entrants):
+        entrant_wins, entrant_games = sum(wins[i]), sum(games[i])
+        results.append(TournamentEntrant(
+            name=names[i],
+            character=character,
+            assetEvaluation=asset,
+            games=entrant_games,
+            wins=entrant_wins,
+            winRate=entrant_wins / entrant_games if entrant_games else 0.0,
+            confidenceInterval=list(interval(entrant_wins, entrant_games, confidence, method)),
+            elo=elo[i],
+            eloInterval=[elo[i] - z * errors[i], elo[i] + z * errors[i]]
+        ))
+    results.sort(key=lambda entrant: -entrant.elo)
+
+    elapsed = time.perf_counter() - started
+    return TournamentResponse(
+        entrants=results,
+        headToHead={
+            names[i]: {names[j]: wins[i][j] / games[i][j] for j in range(n) if j != i and games[i][j]}
+            for i in range(n)
+        },
+        gamesPlayed=played,
+        unfinished=unfinished,
+        averageTurns=total_turns / played if played else 0.0,
+        firstPlayerWinRate=first_wins / played if played else 0.0,
+        seed=seed,
+        elapsedMs=elapsed * 1000.0,
+        gamesPerMinute=played / elapsed * 60.0 if elapsed > 0 else 0.0
+    )
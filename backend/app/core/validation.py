@@ -7,12 +7,20 @@ checking for logical consistency, performance implications, and potential confli
 
 from typing import List, Dict, Set, Tuple
 from pydantic import BaseModel
+from app.core.rule_space import RULE_FIELDS
+from app.core.rule_sweep import RuleOutcome, RuleSweep, get_rule_sweep, value_name
 from app.models.game import (
     EdgeRules, HousePaymentRule, HotelMoveRule, DeckExhaustionRule,
     ExtraPropertiesRule, BuildingForfeitureRule, PropertyMergingRule
 )
 
 
+# Measured balance (rule sweep): outliers beyond this percentile of all rule combinations are flagged
+MEASURED_PERCENTILE = 90
+# Largest tolerated first-player win-rate edge over a fair share
+FIRST_PLAYER_TOLERANCE = 0.1
+
+
 class ValidationResult(BaseModel):
     """Result of rule validation with errors, warnings, and suggestions."""
     
@@ -172,7 +180,64 @@ class RuleValidationEngine:
         return {"warnings": warnings, "suggestions": suggestions}
     
     def _check_gameplay_balance(self, rules: EdgeRules) -> Dict[str, List[str]]:
-        """Check for gameplay balance implications."""
+        """
+        Check for gameplay balance implications.
+        
+        Uses the outcomes measured by the rule sweep (settings.RULE_SWEEP_PATH) when
+        the rule set was swept, and otherwise estimates balance from how permissive
+        the rules are.
+        """
+        sweep = get_rule_sweep()
+        measured = sweep.outcome(rules) if sweep is not None else None
+        if measured is None:
+            return self._estimate_gameplay_balance(rules)
+        return self._measured_gameplay_balance(rules, sweep, measured)
+    
+    def _measured_gameplay_balance(self, rules: EdgeRules, sweep: RuleSweep,
+                                   measured: RuleOutcome) -> Dict[str, List[str]]:
+        """Flag rule sets whose measured outcomes are outliers among all rule combinations."""
+        warnings = []
+        suggestions = []
+        
+        if measured.averageTurns > sweep.percentile('turns', MEASURED_PERCENTILE):
+            warnings.append(
+                f"Measured games under this rule set last {measured.averageTurns:.1f} turns on average, "
+                f"longer than {MEASURED_PERCENTILE}% of rule combinations"
+            )
+            # The rule whose current value lengthens games the most
+            best = None
+            for field, _ in RULE_FIELDS:
+                outcomes = sweep.value_outcomes(field)
+                current = outcomes.get(value_name(getattr(rules, field)))
+                if current is None:
+                    continue
+                value, shortest = min(outcomes.items(), key=lambda item: item[1].averageTurns)
+                saved = current.averageTurns - shortest.averageTurns
+                if saved > 0 and (best is None or saved > best[2]):
+                    best = (field, value, saved)
+            if best is not None:
+                suggestions.append(
+                    f"Setting {best[0]} to '{best[1]}' shortens measured games by "
+                    f"{best[2]:.1f} turns on average"
+                )
+        
+        if abs(measured.firstPlayerAdvantage) > FIRST_PLAYER_TOLERANCE:
+            side = "first" if measured.firstPlayerAdvantage > 0 else "later"
+            warnings.append(
+                f"Measured games favor the {side} player: the first player's win rate is "
+                f"{measured.firstPlayerAdvantage:+.0%} from a fair share"
+            )
+        
+        if measured.winRateSpread > sweep.percentile('spread', MEASURED_PERCENTILE):
+            warnings.append(
+                f"Measured win rates favor one play style: character win rates differ by "
+                f"{measured.winRateSpread:.0%}, more than in {MEASURED_PERCENTILE}% of rule combinations"
+            )
+        
+        return {"warnings": warnings, "suggestions": suggestions}
+    
+    def _estimate_gameplay_balance(self, rules: EdgeRules) -> Dict[str, List[str]]:
+        """Estimate balance from the share of permissive rules (used without a rule sweep)."""
         warnings = []
         suggestions = []
         
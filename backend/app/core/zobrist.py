@@ -0,0 +1,141 @@
+"""
+Zobrist hashing of compact game states and a bounded transposition table.
+
+Every (player, zone, slot, count) combination has a fixed random 64-bit key;
+a position hashes to the XOR of the keys for its current counts. Changing one
+count is two XORs (old key out, new key in), so a search can carry the hash
+through simple plays instead of rehashing the whole position. Keys come from
+a fixed seed so hashes agree across processes.
+
+A search over determinized rollouts hashes what its player can see: with a
+viewer, other players' hands count only by their size, so every sample of the
+hidden cards maps one information state to one key.
+"""
+
+import random
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+from app.core.cards import NUM_COLORS, NUM_KINDS
+
+
+# Zones of a player's position
+HAND = 0        # slot = card kind, count = cards of that kind
+PROPERTIES = 1  # slot = color, count = property cards
+PROP_VALUE = 2  # slot = color, count = cash value of those cards
+HOUSES = 3      # slot = color
+HOTELS = 4      # slot = color
+BANK = 5        # slot = 0, count = bank total
+HAND_SIZE = 6   # slot = 0, count = cards in hand (hands the viewer cannot see)
+
+_ZONE_SLOTS = (NUM_KINDS, NUM_COLORS, NUM_COLORS, NUM_COLORS, NUM_COLORS, 1, 1)
+_MAX_COUNT = 128  # counts above this share the top key
+_MAX_PLAYS = 8
+
+_SEED = 0x6D6F6E6F706F6C79
+
+DEFAULT_TABLE_SIZE = 50000
+
+
+@lru_cache(maxsize=None)
+def _player_keys(player: int) -> List[List[List[int]]]:
+    """keys[zone][slot][count] for one seat"""
+    rng = random.Random(_SEED + player)
+    return [[[rng.getrandbits(64) for _ in range(_MAX_COUNT)] for _ in range(slots)] for slots in _ZONE_SLOTS]
+
+
+_plays_rng = random.Random(_SEED - 1)
+_PLAYS_KEYS = tuple(_plays_rng.getrandbits(64) for _ in range(_MAX_PLAYS))
+
+
+def zone_key(player: int, zone: int, slot: int, count: int) -> int:
+    return _player_keys(player)[zone][slot][min(count, _MAX_COUNT - 1)]
+
+
+def plays_key(plays_left: int) -> int:
+    return _PLAYS_KEYS[min(max(plays_left, 0), _MAX_PLAYS - 1)]
+
+
+def hash_state(state, plays_left: int = 0, viewer: Optional[int] = None) -> int:
+    """
+    Full hash of every player's zones plus the plays left this turn.
+    With a viewer, hands other than the viewer's hash by size only.
+    """
+    h = plays_key(plays_left)
+    for player in range(len(state.names)):
+        keys = _player_keys(player)
+        hand = state.hands[player]
+        if viewer is not None and player != viewer:
+            size = state.hand_sizes[player]
+            if size:
+                h ^= keys[HAND_SIZE][0][min(size, _MAX_COUNT - 1)]
+            hand = ()
+        for zone, counts in ((HAND, hand), (PROPERTIES, state.props[player]),
+                             (PROP_VALUE, state.prop_values[player]), (HOUSES, state.houses[player]),
+                             (HOTELS, state.hotels[player])):
+            zone_keys = keys[zone]
+            for slot, count in enumerate(counts):
+                if count:
+                    h ^= zone_keys[slot][min(count, _MAX_COUNT - 1)]
+        bank = state.banks[player]
+        if bank:
+            h ^= keys[BANK][0][min(bank, _MAX_COUNT - 1)]
+    return h
+
+
+def update(h: int, player: int, zone: int, slot: int, old: int, new: int) -> int:
+    """Incremental update for one count changing from old to new (zero counts have no key)"""
+    if old == new:
+        return h
+    if old:
+        h ^= zone_key(player, zone, slot, old)
+    if new:
+        h ^= zone_key(player, zone, slot, new)
+    return h
+
+
+def update_plays(h: int, old: int, new: int) -> int:
+    return h ^ plays_key(old) ^ plays_key(new)
+
+
+class TranspositionTable:
+    """
+    Bounded hash -> entry map with least-recently-used replacement.
+    Tracks hits, misses and evictions for debug output.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_TABLE_SIZE):
+        self.capacity = max(1, capacity)
+        self.entries: "OrderedDict[int, Any]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get(self, key: int) -> Optional[Any]:
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key: int, entry: Any) -> None:
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'entries': len(self.entries),
+            'evictions': self.evictions,
+            'capacity': self.capacity
+        }
@@ -1,4 +1,5 @@
-from typing import List, Dict, Optional, Union
+from datetime import datetime
+from typing import Any, List, Dict, Optional, Union
 from pydantic import BaseModel, Field
 from enum import Enum
 from sqlalchemy import Column, Integer, String, Boolean, JSON, ForeignKey, DateTime
@@ -42,6 +43,24 @@ class PropertyMergingRule(str, Enum):
     NO_MERGE = "no_merge"
 
 
+class IntervalMethod(str, Enum):
+    WILSON = "wilson"
+    BAYES = "bayes"
+
+
+class StreamFormat(str, Enum):
+    SSE = "sse"
+    NDJSON = "ndjson"
+
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
 class AIStrategy(str, Enum):
     AGGRESSIVE = "aggressive"
     DEFENSIVE = "defensive"
@@ -86,6 +105,7 @@ class PlayerState(BaseModel):
     hand: List[Union[str, MoneyCard, PropertyCard, ActionCard]]
     bank: List[int]
     properties: Dict[str, List[str]]
+    handCount: Optional[int] = Field(None, ge=0)  # cards held when only some of the hand is known
     
     class Config:
         json_schema_extra = {
@@ -153,6 +173,10 @@ class EdgeRules(BaseModel):
     justSayNoEmptyHand: bool = True
     justSayNoOnZero: bool = True
     
+    def cache_key(self) -> tuple:
+        """Hashable key identifying this rule configuration"""
+        return tuple(sorted(self.model_dump().items()))
+    
     def get_rule_descriptions(self) -> Dict[str, str]:
         """Get human-readable descriptions for all rules"""
         return {
@@ -262,6 +286,8 @@ class GameState(BaseModel):
 class AnalysisRequest(BaseModel):
     gameState: GameState
     strategy: AIStrategy = AIStrategy.NORMAL
+    timeBudgetMs: Optional[int] = Field(None, ge=1, le=30000)  # Enables forward search of the turn
+    deadlineMs: Optional[int] = Field(None, ge=1, le=30000)  # Hard bound; best answer so far when it passes
 
 
 class AnalysisResponse(BaseModel):
@@ -269,6 +295,8 @@ class AnalysisResponse(BaseModel):
     reasoning: str
     strongestPlayer: str
     winProbability: Dict[str, float]
+    debug: Optional[Dict[str, Any]] = None  # Search statistics when forward search ran
+    completed: bool = True  # False when deadlineMs cut the analysis short
     
     class Config:
         json_schema_extra = {
@@ -281,16 +309,102 @@ class AnalysisResponse(BaseModel):
         }
 
 
+class AnalysisBatchRequest(BaseModel):
+    # AnalysisRequest bodies, validated one by one so a malformed item fails on its own
+    items: List[Dict[str, Any]] = Field(..., min_length=1, max_length=200)
+
+
+class AnalysisBatchItem(BaseModel):
+    index: int
+    result: Optional[AnalysisResponse] = None
+    error: Optional[str] = None
+    cached: bool = False  # Served from the analysis cache or an identical item in the batch
+
+
+class AnalysisBatchResponse(BaseModel):
+    items: List[AnalysisBatchItem]
+    succeeded: int
+    failed: int
+    analyzed: int = 0  # Successful items that needed their own analysis (the billed ones)
+    elapsedMs: float
+
+
 class SimulationRequest(BaseModel):
     gameState: GameState
     strategy: AIStrategy
     numSimulations: int = Field(..., ge=1, le=1000)
+    seed: Optional[int] = Field(None, ge=0)  # Same seed reproduces the same results
+    # Target-precision mode: numSimulations becomes the maximum and the run stops once every
+    # interval half-width is at most targetPrecision or the leader is statistically separated
+    targetPrecision: Optional[float] = Field(None, gt=0, lt=0.5)
+    confidenceLevel: float = Field(0.95, gt=0, lt=1)
+    intervalMethod: IntervalMethod = IntervalMethod.WILSON
 
 
 class SimulationResponse(BaseModel):
     results: List[AnalysisResponse]
     averageWinProbability: Dict[str, float]
     strategyPerformance: Dict[str, float]
+    seed: Optional[int] = None
+    confidenceIntervals: Dict[str, List[float]] = {}  # [low, high] win probability per player
+    gamesPlayed: Optional[int] = None
+    stoppedEarly: bool = False
+    stopReason: Optional[str] = None  # 'precision' or 'leader_separated'
+
+
+class SimulationJobRequest(SimulationRequest):
+    """Simulation run as a background job; jobs are not bound by the request's time"""
+    numSimulations: int = Field(..., ge=1, le=100000)
+
+
+class SimulationJobResponse(BaseModel):
+    jobId: str
+    status: JobStatus
+    gamesPlayed: int = 0
+    maxGames: int
+    seed: int
+    createdAt: datetime
+    startedAt: Optional[datetime] = None
+    finishedAt: Optional[datetime] = None
+    latest: Optional[AnalysisResponse] = None  # Win rates so far while running
+    result: Optional[SimulationResponse] = None  # Set once completed
+    error: Optional[str] = None
+
+
+class TournamentRequest(BaseModel):
+    """Round-robin between character / asset-evaluation pairings from fresh deals"""
+    presetId: Optional[str] = None  # Official preset; edgeRules is used when not given
+    edgeRules: EdgeRules = Field(default_factory=EdgeRules)
+    characters: List[str] = ["aggressive", "defensive", "normal"]  # PlayerCharacter values
+    assetEvaluations: List[str] = ["logical", "value", "logical_value"]  # AssetEvaluation values
+    gamesPerPairing: int = Field(200, ge=2, le=20000)  # Split evenly over both seatings
+    seed: Optional[int] = Field(None, ge=0)
+    confidenceLevel: float = Field(0.95, gt=0, lt=1)
+    intervalMethod: IntervalMethod = IntervalMethod.WILSON
+
+
+class TournamentEntrant(BaseModel):
+    name: str  # "<character>/<assetEvaluation>"
+    character: str
+    assetEvaluation: str
+    games: int
+    wins: float
+    winRate: float
+    confidenceInterval: List[float]  # [low, high] win rate
+    elo: float
+    eloInterval: List[float]  # [low, high] Elo at the same confidence level
+
+
+class TournamentResponse(BaseModel):
+    entrants: List[TournamentEntrant]  # Highest Elo first
+    headToHead: Dict[str, Dict[str, float]]  # Row entrant's win rate against column entrant
+    gamesPlayed: int
+    unfinished: int  # Games stopped at the turn limit and awarded to the leader
+    averageTurns: float
+    firstPlayerWinRate: float
+    seed: int
+    elapsedMs: float
+    gamesPerMinute: float
 
 
 class CardOperationRequest(BaseModel):
@@ -298,6 +412,8 @@ class CardOperationRequest(BaseModel):
     gameState: GameState
     operation: Union[CardTransfer, CardSelection]
     edgeRules: EdgeRules
+    strategy: Optional[AIStrategy] = None  # analyze the resulting state with this strategy
+    stateHash: Optional[str] = None  # stateHash returned for gameState by the previous operation
 
 
 class CardOperationResponse(BaseModel):
@@ -306,6 +422,8 @@ class CardOperationResponse(BaseModel):
     newGameState: GameState
     message: str
     validationErrors: Optional[List[str]] = None
+    stateHash: Optional[str] = None
+    analysis: Optional[AnalysisResponse] = None
     
     class Config:
         json_schema_extra = {
@@ -0,0 +1,52 @@
+"""
+Shared test fixtures.
+"""
+
+import copy
+from typing import Mapping, Optional, Sequence
+
+import pytest
+from app.models.game import GameState, PlayerState, EdgeRules
+
+
+NAMES = ("Alice", "Bob", "Cat", "Dan", "Eve", "Fay")
+
+ALICE = {
+    "hand": ["Pass Go", "Deal Breaker", "Green Property"],
+    "bank": [5, 2],
+    "properties": {"green": ["Green Property", "Green Property"]}
+}
+
+BOB = {
+    "hand": ["House"],
+    "bank": [1, 1],
+    "properties": {"dark-blue": ["Dark Blue Property", "Dark Blue Property"], "red": ["Red Property"]}
+}
+
+
+def make_game_state(players: Sequence[Mapping] = (ALICE, BOB), names: Sequence[str] = NAMES,
+                    discard: Sequence[str] = ("Debt Collector",), deck_count: int = 70,
+                    edge_rules: Optional[EdgeRules] = None) -> GameState:
+    """
+    Build a GameState for tests.
+
+    Each player is a mapping of PlayerState fields; id defaults to seat + 1, name to
+    names[seat] and the card lists to empty. The mappings are copied, so module-level
+    player constants can be shared between tests.
+    """
+    return GameState(
+        players=[
+            PlayerState(**{"id": seat + 1, "name": names[seat], "hand": [], "bank": [], "properties": {},
+                           **copy.deepcopy(dict(player))})
+            for seat, player in enumerate(players)
+        ],
+        discard=list(discard),
+        deckCount=deck_count,
+        edgeRules=edge_rules or EdgeRules()
+    )
+
+
+@pytest.fixture
+def game_state() -> GameState:
+    """The default two-player position: Alice close to a green set, Bob holding a House"""
+    return make_game_state()
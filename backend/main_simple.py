@@ -4,6 +4,7 @@ Perfect for demo/trial usage where users just test configurations and AI analysi
 """
 
 from fastapi import FastAPI, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
@@ -11,7 +12,8 @@ import os
 
 # Import your existing models and engines
 from app.models.game import EdgeRules, GameState, AnalysisRequest, AnalysisResponse
-from app.core.game_engine import MonopolyDealEngine
+from app.core.game_engine import engine_cache_info
+from app.core.analysis_cache import analyze_cached, analysis_cache
 from app.core.validation import RuleValidationEngine, ValidationResult
 from app.models.configuration import OFFICIAL_PRESETS, ConfigurationPreset
 
@@ -109,13 +111,13 @@ async def test_configuration_system():
 async def analyze_game(request: AnalysisRequest):
     """Analyze a game state and provide move recommendations (stateless)"""
     try:
-        # Create game engine with edge rules from request
-        game_engine = MonopolyDealEngine(request.gameState.edgeRules)
-        
-        # Perform analysis
-        analysis_result = game_engine.analyze_game_state(
+        # Memoized analysis through the shared engine for the edge rules
+        analysis_result = await run_in_threadpool(
+            analyze_cached,
             request.gameState,
-            request.strategy
+            request.strategy,
+            request.timeBudgetMs,
+            deadline_ms=request.deadlineMs
         )
         
         return analysis_result
@@ -131,6 +133,14 @@ async def analyze_game_test(request: AnalysisRequest):
     """Test endpoint for game analysis without authentication"""
     return await analyze_game(request)
 
+@app.get("/api/v1/analysis/cache-stats")
+async def get_cache_stats():
+    """Hit rates of the analysis result cache and the engine cache"""
+    return {
+        "analysisCache": analysis_cache.stats(),
+        "engineCache": engine_cache_info()
+    }
+
 # Export configuration endpoint (stateless)
 @app.get("/api/v1/configuration/export/{preset_id}")
 async def export_configuration(preset_id: str):
@@ -0,0 +1,104 @@
+"""
+Tests for the canonical-state analysis result cache.
+"""
+
+import time
+
+import pytest
+from app.core.analysis_cache import AnalysisCache, analyze_cached, canonical_key
+from app.core.game_engine import get_engine
+from app.models.game import EdgeRules, AIStrategy
+from conftest import ALICE, BOB, make_game_state
+
+
+class TestCanonicalKey:
+    """Test which request differences change the cache key."""
+
+    def test_ordering_and_spelling_are_ignored(self):
+        first, _ = canonical_key(make_game_state(), AIStrategy.NORMAL)
+        second, _ = canonical_key(
+            make_game_state((dict(ALICE, hand=["Green Property", "Pass Go", "Deal Breaker"]), BOB)), AIStrategy.NORMAL
+        )
+        third, _ = canonical_key(
+            make_game_state((dict(ALICE, hand=["green property", "Pass Go", "Deal Breaker"]), BOB)), AIStrategy.NORMAL
+        )
+
+        assert first == second == third
+
+    def test_unique_names_are_ignored(self):
+        first, names = canonical_key(make_game_state(), AIStrategy.NORMAL)
+        second, other_names = canonical_key(make_game_state(names=("Carol", "Dan")), AIStrategy.NORMAL)
+
+        assert first == second
+        assert names != other_names
+
+    def test_relevant_fields_change_the_key(self):
+        base, _ = canonical_key(make_game_state(), AIStrategy.NORMAL)
+
+        assert base != canonical_key(make_game_state(), AIStrategy.AGGRESSIVE)[0]
+        assert base != canonical_key(make_game_state(), AIStrategy.NORMAL, time_budget_ms=50)[0]
+        assert base != canonical_key(make_game_state(edge_rules=EdgeRules(quadrupleRent=True)), AIStrategy.NORMAL)[0]
+        assert base != canonical_key(make_game_state((dict(ALICE, hand=["Pass Go"]), BOB)), AIStrategy.NORMAL)[0]
+        assert base != canonical_key(make_game_state(names=("Bob", "Bob")), AIStrategy.NORMAL)[0]
+
+
+class TestAnalysisCache:
+    """Test memoized analysis, relabelling, eviction and expiry."""
+
+    def test_hit_returns_same_analysis(self):
+        cache = AnalysisCache()
+        first = analyze_cached(make_game_state(), AIStrategy.AGGRESSIVE, cache=cache)
+        second = analyze_cached(make_game_state(), AIStrategy.AGGRESSIVE, cache=cache)
+
+        assert first == second
+        assert first == get_engine().analyze_game_state(make_game_state(), AIStrategy.AGGRESSIVE)
+        assert cache.stats()['hits'] == 1
+        assert cache.stats()['hitRate'] == pytest.approx(0.5)
+
+    def test_hit_is_relabelled_with_caller_names(self):
+        cache = AnalysisCache()
+        players = (dict(ALICE, hand=["Green Property", "$3M"]), BOB)
+        original = analyze_cached(make_game_state(players), AIStrategy.NORMAL, cache=cache)
+        renamed = analyze_cached(make_game_state(players, names=("Carol", "Dan")), AIStrategy.NORMAL, cache=cache)
+
+        assert cache.hits == 1
+        assert set(renamed.winProbability) == {"Carol", "Dan"}
+        assert renamed.winProbability["Carol"] == original.winProbability["Alice"]
+        assert renamed.strongestPlayer == {"Alice": "Carol", "Bob": "Dan"}[original.strongestPlayer]
+
+    def test_answers_naming_players_are_not_shared_across_names(self):
+        cache = AnalysisCache()
+        original = analyze_cached(make_game_state(), AIStrategy.NORMAL, cache=cache)
+        renamed = analyze_cached(make_game_state(names=("Carol", "Dan")), AIStrategy.NORMAL, cache=cache)
+
+        assert "Bob" in original.reasoning
+        assert "Bob" not in renamed.reasoning + renamed.recommendedMove and "Dan" in renamed.reasoning
+        assert cache.hits == 0 and len(cache) == 2
+        assert analyze_cached(make_game_state(names=("Carol", "Dan")), AIStrategy.NORMAL, cache=cache) == renamed
+        assert cache.hits == 1
+
+    def test_cached_result_is_not_shared_mutable_state(self):
+        cache = AnalysisCache()
+        first = analyze_cached(make_game_state(), AIStrategy.NORMAL, cache=cache)
+        first.winProbability["Alice"] = 2.0
+
+        assert analyze_cached(make_game_state(), AIStrategy.NORMAL, cache=cache).winProbability["Alice"] != 2.0
+
+    def test_lru_eviction(self):
+        cache = AnalysisCache(max_entries=1)
+        analyze_cached(make_game_state(), AIStrategy.NORMAL, cache=cache)
+        analyze_cached(make_game_state(), AIStrategy.DEFENSIVE, cache=cache)
+        analyze_cached(make_game_state(), AIStrategy.NORMAL, cache=cache)
+
+        assert cache.stats()['evictions'] == 2
+        assert cache.stats()['hits'] == 0
+        assert len(cache) == 1
+
+    def test_entries_expire_after_ttl(self):
+        cache = AnalysisCache(ttl_seconds=0.01)
+        analyze_cached(make_game_state(), AIStrategy.NORMAL, cache=cache)
+        time.sleep(0.02)
+        analyze_cached(make_game_state(), AIStrategy.NORMAL, cache=cache)
+
+        assert cache.stats()['expirations'] == 1
+        assert cache.stats()['hits'] == 0
@@ -0,0 +1,95 @@
+"""
+Tests for bulk analysis of many game states.
+"""
+
+from app.core.analysis_cache import AnalysisCache
+from app.core.batch_analysis import analyze_batch
+from app.core.game_engine import get_engine
+from app.core.parallel_simulation import shutdown_process_pool
+from app.models.game import GameState, EdgeRules, AIStrategy
+from conftest import make_game_state
+
+
+def banked_state(bank=5, names=("Alice", "Bob"), quadruple_rent=False):
+    return make_game_state((
+        {"hand": ["Sly Deal", "Wild Rent", "Green Property"], "bank": [bank, 2],
+         "properties": {"green": ["Green Property", "Green Property"]}},
+        {"hand": ["House"], "bank": [1], "properties": {"red": ["Red Property", "Red Property"]}}
+    ), names=names, discard=(), deck_count=60, edge_rules=EdgeRules(quadrupleRent=quadruple_rent))
+
+
+def item(state, strategy=AIStrategy.NORMAL, **budget):
+    return {"gameState": state.model_dump(mode="json"), "strategy": strategy.value, **budget}
+
+
+class TestBatchAnalysis:
+    """Test per-item results, errors, deduplication and parallel execution."""
+
+    def setup_method(self):
+        self.cache = AnalysisCache()
+        self.states = [banked_state(bank, quadruple_rent=bank % 2 == 0) for bank in range(1, 9)]
+
+    def test_results_match_single_analyses_in_order(self):
+        batch = analyze_batch([item(state) for state in self.states], cache=self.cache, max_workers=1)
+
+        assert batch.succeeded == 8 and batch.failed == 0
+        for index, (state, result) in enumerate(zip(self.states, batch.items)):
+            assert result.index == index
+            assert result.result == get_engine(state.edgeRules).analyze_game_state(state, AIStrategy.NORMAL)
+
+    def test_invalid_items_fail_alone(self):
+        empty = GameState(players=[], discard=[], deckCount=0, edgeRules=EdgeRules())
+        items = [item(self.states[0]), {"gameState": {"players": "nope"}}, item(empty)]
+        batch = analyze_batch(items, cache=self.cache, max_workers=1)
+
+        assert batch.items[0].result is not None and batch.items[0].error is None
+        assert batch.items[1].result is None and "players" in batch.items[1].error
+        assert batch.items[2].result is None and batch.items[2].error
+        assert (batch.succeeded, batch.failed) == (1, 2)
+
+    def test_identical_positions_are_analyzed_once(self):
+        renamed = banked_state(names=("Carol", "Dan"))
+        batch = analyze_batch([item(banked_state()), item(renamed), item(banked_state()), item(renamed)],
+                              cache=self.cache, max_workers=1)
+
+        # The answer names Bob as a target, so the renamed position gets its own analysis
+        assert "Bob" in batch.items[0].result.reasoning
+        assert "Bob" not in batch.items[1].result.reasoning and "Dan" in batch.items[1].result.reasoning
+        assert len(self.cache) == 2
+        assert [result.cached for result in batch.items] == [False, False, True, True]
+        assert set(batch.items[1].result.winProbability) == {"Carol", "Dan"}
+        assert batch.items[3].result == batch.items[1].result
+
+        again = analyze_batch([item(banked_state())], cache=self.cache, max_workers=1)
+        assert again.items[0].cached and again.items[0].result == batch.items[0].result
+
+    def test_search_time_is_capped_per_batch(self):
+        items = [item(self.states[0], timeBudgetMs=30), item(self.states[0], timeBudgetMs=30),
+                 item(self.states[1], timeBudgetMs=30, deadlineMs=20), item(self.states[2], timeBudgetMs=30),
+                 item(self.states[3])]
+        batch = analyze_batch(items, cache=self.cache, max_workers=1, time_budget_ms=50)
+
+        # The duplicate rides on the first analysis; the third position no longer fits
+        assert [entry.error is None for entry in batch.items] == [True, True, True, False, True]
+        assert batch.items[3].error == "Batch time budget used up (30 ms needed, 0 ms left)"
+
+    def test_only_new_analyses_count_against_the_limit(self):
+        analyze_batch([item(self.states[0])], cache=self.cache, max_workers=1)
+        items = [item(self.states[0]), item(self.states[1]), item(self.states[1]), item(self.states[2])]
+        batch = analyze_batch(items, cache=self.cache, max_workers=1, max_analyses=1)
+
+        # The cached position and the duplicate are free; the second new position is over the limit
+        assert [entry.error is None for entry in batch.items] == [True, True, True, False]
+        assert batch.items[3].error == "Analysis limit reached (1 new analyses per batch)"
+        assert batch.analyzed == 1
+
+    def test_parallel_chunks_match_serial(self):
+        items = [item(state, strategy) for state in self.states for strategy in AIStrategy]
+        serial = analyze_batch(items, cache=AnalysisCache(), max_workers=1)
+        parallel = analyze_batch(items, cache=AnalysisCache(), max_workers=2, chunk_size=5)
+
+        assert [entry.result for entry in parallel.items] == [entry.result for entry in serial.items]
+
+    @classmethod
+    def teardown_class(cls):
+        shutdown_process_pool()
@@ -0,0 +1,89 @@
+"""
+Tests for batched NumPy evaluation of game states.
+"""
+
+import random
+
+import numpy as np
+import pytest
+from app.core.batch_eval import StateBatch, logical_scores, value_scores, win_probabilities
+from app.core.compact_state import CompactGameState
+from app.core.simulation import GameSimulator, CHARACTER_WEIGHTS
+from app.core.game_engine import MonopolyDealEngine, PlayerCharacter, AssetEvaluation, GamePhase
+from conftest import make_game_state
+
+
+# Seat i holds i + 1 green properties
+PLAYERS = [{"hand": ["Pass Go", "House", "Green Property"], "bank": [seat + 1, 2],
+            "properties": {"green": ["Green Property"] * (seat + 1), "brown": ["Brown Property"]}}
+           for seat in range(3)]
+
+
+def played_states(count):
+    """Mid-game states reached by playing a few turns from the test position"""
+    compact = CompactGameState.from_game_state(make_game_state(PLAYERS[:2], discard=(), deck_count=60))
+    simulator = GameSimulator()
+    weights = [CHARACTER_WEIGHTS['normal']] * 2
+    states = []
+    for seed in range(count):
+        rollout = simulator.rollout(compact, compact.unseen_cards(), weights, random.Random(seed))
+        for turn in range(seed % 6):
+            if not rollout.take_turn(turn % 2):
+                break
+        states.append(rollout.copy())
+    return states
+
+
+class TestBatchEvaluation:
+    """Test vectorized scores match the per-state evaluators."""
+
+    def setup_method(self):
+        self.engine = MonopolyDealEngine()
+        self.states = played_states(40)
+
+    def test_scores_match_compact_evaluators(self):
+        batch = StateBatch.from_states(self.states)
+        logical = logical_scores(batch)
+        value = value_scores(batch)
+
+        for index, state in enumerate(self.states):
+            for player in range(state.num_players):
+                assert logical[index, player] == pytest.approx(self.engine.evaluate_compact_logical(state, player))
+                assert value[index, player] == pytest.approx(self.engine.evaluate_compact_value(state, player))
+
+    def test_probabilities_match_scalar_formula(self):
+        scores, probabilities = self.engine.win_probabilities_batch(
+            self.states, PlayerCharacter.AGGRESSIVE, AssetEvaluation.LOGICAL_VALUE,
+            [GamePhase.LATE] * len(self.states)
+        )
+
+        for index, state in enumerate(self.states):
+            evaluations = {name: self.engine.evaluate_compact(state, p, AssetEvaluation.LOGICAL_VALUE)
+                           for p, name in enumerate(state.names)}
+            sets = {name: state.complete_sets(p) for p, name in enumerate(state.names)}
+            expected = self.engine._calculate_research_based_probabilities(
+                evaluations, sets, PlayerCharacter.AGGRESSIVE, GamePhase.LATE
+            )
+            assert list(probabilities[index]) == pytest.approx([expected[name] for name in state.names])
+        assert np.allclose(probabilities.sum(axis=1), 1.0)
+
+    def test_mixed_player_counts_are_masked(self):
+        states = [CompactGameState.from_game_state(make_game_state(PLAYERS[:2], discard=(), deck_count=60)),
+                  CompactGameState.from_game_state(make_game_state(PLAYERS, discard=(), deck_count=60))]
+        scores = self.engine.evaluate_batch(states, AssetEvaluation.LOGICAL)
+        _, probabilities = self.engine.win_probabilities_batch(states, PlayerCharacter.NORMAL, AssetEvaluation.LOGICAL)
+
+        assert scores.shape == (2, 3)
+        assert scores[0, 2] == 0.0
+        assert probabilities[0, 2] == 0.0
+        assert probabilities[0, :2].sum() == pytest.approx(1.0)
+        assert probabilities[1].sum() == pytest.approx(1.0)
+
+    def test_feature_rows_without_states(self):
+        # Callers with their own feature rows can build a batch directly
+        props = np.zeros((1, 2, 10))
+        props[0, 0, 0] = 2  # complete brown set
+        batch = StateBatch(props, np.array([[5, 20]]), np.zeros((1, 2, 40)))
+
+        assert list(logical_scores(batch)[0]) == [50 + 10, 20]
+        assert win_probabilities(logical_scores(batch), batch.complete_sets())[0].sum() == pytest.approx(1.0)
@@ -0,0 +1,115 @@
+"""
+Tests for the compact integer-encoded game state and the engine paths using it.
+"""
+
+import pytest
+from app.core.compact_state import CompactGameState
+from app.core.cards import COLOR_INDEX, DECK_SIZE, PROPERTY_BASE, DEAL_BREAKER, HOUSE
+from app.core.game_engine import MonopolyDealEngine, PlayerCharacter, AssetEvaluation
+from app.models.game import EdgeRules
+from conftest import make_game_state
+
+
+class TestCompactGameState:
+    """Test encoding and copying of compact states."""
+
+    def test_encoding_counts(self, game_state):
+        compact = CompactGameState.from_game_state(game_state)
+
+        assert compact.names == ["Alice", "Bob"]
+        assert compact.banks == [7, 2]
+        assert compact.hand_sizes == [3, 1]
+        assert compact.hands[0][DEAL_BREAKER] == 1
+        assert compact.hands[1][HOUSE] == 1
+        assert compact.props[0][COLOR_INDEX['green']] == 2
+        assert compact.props[1][COLOR_INDEX['dark-blue']] == 2
+        assert compact.hand_kinds[0][2] == PROPERTY_BASE + COLOR_INDEX['green']
+
+    def test_unseen_pool_excludes_visible_cards(self, game_state):
+        compact = CompactGameState.from_game_state(game_state)
+        visible = 3 + 1 + 2 + 3 + 4 + 1  # hands, banks, properties, discard
+
+        assert sum(compact.unseen) == DECK_SIZE - visible
+        assert len(compact.unseen_cards()) == DECK_SIZE - visible
+
+    def test_copy_is_independent(self, game_state):
+        compact = CompactGameState.from_game_state(game_state)
+        clone = compact.copy()
+        clone.props[0][COLOR_INDEX['green']] += 1
+        clone.banks[1] = 0
+
+        assert compact.props[0][COLOR_INDEX['green']] == 2
+        assert compact.banks[1] == 2
+        assert clone.complete_sets(0) == 1
+        assert compact.complete_sets(0) == 0
+
+    def test_derived_measures(self, game_state):
+        compact = CompactGameState.from_game_state(game_state)
+
+        assert compact.complete_sets(1) == 1
+        assert compact.wealth(1) == 2 + 2 * 4 + 3
+        assert compact.rent(1, COLOR_INDEX['dark-blue']) == 8
+
+    def test_property_keys_resolve_through_color_aliases(self):
+        compact = CompactGameState.from_game_state(make_game_state((
+            {"properties": {"Dark Blue": ["Boardwalk"], "dark_blue": ["Park Place"], "purple": ["Pink Property"]}},
+            {}
+        )))
+
+        assert compact.props[0][COLOR_INDEX['dark-blue']] == 2
+        assert compact.props[0][COLOR_INDEX['pink']] == 1
+
+    def test_round_trip_through_game_state(self, game_state):
+        compact = CompactGameState.from_game_state(game_state)
+        decoded = compact.to_game_state(EdgeRules(quadrupleRent=True))
+        again = CompactGameState.from_game_state(decoded)
+
+        assert decoded.edgeRules.quadrupleRent
+        assert decoded.players[0].bank == [5, 2]
+        for field in ('names', 'hands', 'hand_sizes', 'props', 'prop_values', 'houses', 'hotels', 'banks',
+                      'discard', 'deck_count'):
+            assert getattr(again, field) == getattr(compact, field)
+        # Bob's [1, 1] bank comes back as one $2M card
+        assert decoded.players[1].bank == [2]
+        assert sum(again.unseen) == sum(compact.unseen) + 1
+
+
+class TestCompactEvaluators:
+    """Test compact evaluators agree with the dict-based evaluators."""
+
+    def setup_method(self):
+        self.engine = MonopolyDealEngine()
+        self.state = make_game_state()
+        self.compact = CompactGameState.from_game_state(self.state)
+
+    def test_logical_matches_dict_evaluator(self):
+        for index, player in enumerate(self.state.players):
+            player_data = {'properties': player.properties, 'bank': player.bank}
+            assert self.engine.evaluate_compact_logical(self.compact, index) == \
+                pytest.approx(self.engine.evaluate_assets_logical(player_data))
+
+    def test_value_counts_bank_properties_and_actions(self):
+        # Bob: bank 2*3, dark-blue 2*4*2, red 1*3*2, House 3
+        assert self.engine.evaluate_compact_value(self.compact, 1) == 6 + 16 + 6 + 3
+
+    def test_bfs_accepts_prebuilt_compact_state(self):
+        moves = self.engine.bfs_decision_tree(
+            self.state, PlayerCharacter.AGGRESSIVE, AssetEvaluation.LOGICAL, self.compact
+        )
+
+        assert moves
+        assert any(move['action'] == 'deal_breaker' and move['target_set'] == 'dark-blue' for move in moves)
+
+    def test_card_priorities_use_catalog(self):
+        money = self.engine._calculate_money_priority(
+            {'name': '$5M'}, PlayerCharacter.NORMAL, AssetEvaluation.LOGICAL
+        )
+        wild = self.engine._calculate_property_priority(
+            {'name': 'Dark Blue & Green'}, self.compact, PlayerCharacter.NORMAL, AssetEvaluation.LOGICAL
+        )
+        green = self.engine._calculate_property_priority(
+            {'name': 'Green Property'}, self.compact, PlayerCharacter.NORMAL, AssetEvaluation.LOGICAL
+        )
+
+        assert money == pytest.approx(5 * 1.0 * 0.8)
+        assert wild == green  # wild goes to green, where Alice already holds two cards
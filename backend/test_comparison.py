@@ -0,0 +1,103 @@
+"""
+Tests for variance-reduced comparisons: common random numbers, antithetic pairs and control variates.
+"""
+
+import numpy as np
+import pytest
+from app.core.comparison import Alternative, _control_values, compare
+from app.core.compact_state import CompactGameState
+from app.core.determinize import HiddenInformation
+from app.core.moves import END_TURN, Move, generate_moves
+from app.core.cards import SLY_DEAL
+from app.core.simulation import GameSimulator
+from app.core.tournament import opening_state
+from app.models.game import EdgeRules, DeckExhaustionRule
+from conftest import make_game_state
+
+
+MIDGAME = (
+    {"hand": ["$3M", "Green Property", "Pass Go", "Debt Collector"], "bank": [2],
+     "properties": {"green": ["Green Property"], "brown": ["Brown Property"]}},
+    {"bank": [1, 1], "properties": {"red": ["Red Property"] * 2}, "handCount": 5}
+)
+
+
+def midgame_state():
+    return CompactGameState.from_game_state(make_game_state(MIDGAME, discard=(), deck_count=60))
+
+
+STRATEGIES = [Alternative('normal'), Alternative('aggressive', characters=['aggressive', 'normal']),
+              Alternative('defensive', characters=['defensive', 'normal'])]
+
+
+class TestComparison:
+    """Test the estimators and the variance they report."""
+
+    def setup_method(self):
+        self.opening = opening_state(2)
+
+    def test_identical_alternatives_cancel_exactly(self):
+        same = [Alternative('a'), Alternative('b')]
+        shared = compare(self.opening, same, 40, seed=3)
+        assert shared.differences[0].value == 0.0
+        assert shared.differences[0].standardError == 0.0
+        assert shared.differences[0].varianceReduction is None
+
+        independent = compare(self.opening, same, 40, seed=3, common_random_numbers=False)
+        assert independent.differences[0].standardError > 0.0
+
+    def test_common_random_numbers_reduce_difference_variance(self):
+        result = compare(self.opening, STRATEGIES, 300, seed=1)
+
+        assert [estimate.label for estimate in result.differences] == \
+            ['aggressive - normal', 'defensive - normal']
+        for estimate in result.differences:
+            assert estimate.varianceReduction > 1.5
+            assert estimate.standardError < estimate.independentStandardError
+            low, high = estimate.confidenceInterval
+            assert low <= estimate.value <= high
+        for estimate in result.alternatives:
+            assert estimate.value == estimate.rawValue and 0.0 <= estimate.value <= 1.0
+
+    def test_antithetic_pairs_and_seeds(self):
+        first = compare(self.opening, STRATEGIES[:2], 51, seed=2, antithetic=True)
+        again = compare(self.opening, STRATEGIES[:2], 51, seed=2, antithetic=True)
+
+        assert first.rollouts == 52 and first.antithetic
+        assert [e.value for e in first.alternatives] == [e.value for e in again.alternatives]
+        assert first.alternatives[0].independentStandardError == pytest.approx(
+            np.sqrt(first.alternatives[0].rawValue * (1 - first.alternatives[0].rawValue) / 52))
+
+    def test_control_variate_expectation_is_exact(self):
+        state = midgame_state()
+        hidden = HiddenInformation(state)
+        deals = hidden.sample(20000, np.random.default_rng(4))
+        values, expected = _control_values(state, hidden, deals, 0, [1, 0])
+
+        assert values.std() > 0
+        assert abs(values.mean() - expected) < 4 * values.std() / np.sqrt(len(values))
+
+        result = compare(state, STRATEGIES[:2], 60, seed=5, control_variate=True)
+        assert result.controlVariate
+        assert all(estimate.controlCoefficient is not None for estimate in result.alternatives)
+
+    def test_candidate_moves(self):
+        state = midgame_state()
+        moves = generate_moves(state, 0)
+        alternatives = [Alternative(move.describe(state.names), move=move) for move in moves[:3]] + \
+            [Alternative('end turn', move=END_TURN)]
+        result = compare(state, alternatives, 40, seed=6, edge_rules=EdgeRules(
+            deckExhaustion=DeckExhaustionRule.RESHUFFLE))
+
+        assert len(result.alternatives) == 4 and len(result.differences) == 3
+        with pytest.raises(ValueError):
+            compare(state, [Alternative('steal', move=Move(SLY_DEAL, 0, 1))], 10, seed=6)
+        with pytest.raises(ValueError):
+            compare(state, [], 10)
+
+    def test_simulator_runs_antithetic_pairs(self):
+        simulator = GameSimulator()
+        summary = simulator.run(self.opening, ['normal', 'normal'], 20, seed=7, antithetic=True)
+
+        assert summary.games == 20 and sum(summary.wins) == 20
+        assert simulator.run(self.opening, ['normal', 'normal'], 20, seed=7, antithetic=True).wins == summary.wins
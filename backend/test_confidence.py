@@ -0,0 +1,115 @@
+"""
+Tests for win-rate confidence intervals and target-precision simulation.
+"""
+
+import pytest
+from app.core.confidence import (
+    wilson_interval, bayes_interval, beta_cdf, leader_separated, StoppingRule
+)
+from app.core.config import settings
+from app.core.parallel_simulation import ParallelSimulator, get_process_pool, shutdown_process_pool
+from app.core.game_engine import MonopolyDealEngine
+from app.models.game import AIStrategy, IntervalMethod, SimulationRequest
+from conftest import make_game_state
+
+
+PLAYERS = (
+    {"hand": ["Pass Go", "Deal Breaker", "Green Property"], "bank": [5, 2],
+     "properties": {"green": ["Green Property", "Green Property"], "dark-blue": ["Blue Property", "Blue Property"]}},
+    {"hand": ["House"], "bank": [1], "properties": {"red": ["Red Property"]}}
+)
+
+
+class TestIntervals:
+    """Test the Wilson and Jeffreys intervals against known values."""
+
+    def test_wilson_matches_reference_values(self):
+        low, high = wilson_interval(50, 100)
+
+        assert low == pytest.approx(0.4038, abs=1e-4)
+        assert high == pytest.approx(0.5962, abs=1e-4)
+        assert wilson_interval(0, 10)[0] == pytest.approx(0.0)
+        assert wilson_interval(0, 0) == (0.0, 1.0)
+
+    def test_beta_cdf(self):
+        assert beta_cdf(0.3, 1, 1) == pytest.approx(0.3)
+        assert beta_cdf(0.5, 7.5, 7.5) == pytest.approx(0.5)
+        assert beta_cdf(0.2, 2, 3) == pytest.approx(0.1808)  # 1 - (1 + 3x)(1 - x)^3
+
+    def test_bayes_interval(self):
+        low, high = bayes_interval(50, 100)
+
+        # Close to Wilson for a mid-range proportion, and symmetric around one half
+        assert low == pytest.approx(0.4036, abs=1e-3)
+        assert low + high == pytest.approx(1.0)
+        assert bayes_interval(10, 10)[1] == 1.0
+        assert bayes_interval(3, 40, 0.99)[0] < bayes_interval(3, 40, 0.9)[0]
+
+    def test_intervals_shrink_with_more_games(self):
+        for method in (wilson_interval, bayes_interval):
+            small, large = method(30, 100), method(300, 1000)
+            assert large[1] - large[0] < small[1] - small[0]
+            assert small[0] < 0.3 < small[1]
+
+    def test_leader_separation(self):
+        assert leader_separated({'a': (0.6, 0.8), 'b': (0.2, 0.4)})
+        assert not leader_separated({'a': (0.5, 0.8), 'b': (0.3, 0.55)})
+
+
+class TestEarlyStopping:
+    """Test target-precision runs stop reproducibly and report intervals."""
+
+    def test_stopping_rule_reasons(self):
+        rule = StoppingRule(0.05)
+
+        assert rule.check(['a', 'b'], [150, 150], 300) is None
+        assert rule.check(['a', 'b'], [250, 250], 500) == StoppingRule.PRECISION
+        assert rule.check(['a', 'b'], [60, 4], 64) == StoppingRule.SEPARATED
+
+    def test_run_stops_on_a_shard_boundary(self):
+        simulator = ParallelSimulator(max_workers=1, shard_size=32)
+        summary = simulator.run(make_game_state(PLAYERS, discard=()), ['normal', 'normal'], 1000, seed=3,
+                                stop=StoppingRule(0.2))
+
+        assert summary.stopReason is not None
+        assert summary.games < 1000 and summary.games % 32 == 0
+
+    def test_early_stop_independent_of_worker_count(self):
+        rule = StoppingRule(0.08, method=IntervalMethod.BAYES)
+        serial = ParallelSimulator(max_workers=1, shard_size=20).run(
+            make_game_state(PLAYERS, discard=()), ['normal', 'normal'], 400, seed=8, stop=rule)
+        parallel = ParallelSimulator(max_workers=2, shard_size=20).run(
+            make_game_state(PLAYERS, discard=()), ['normal', 'normal'], 400, seed=8, stop=rule)
+
+        assert (serial.games, serial.wins, serial.stopReason) == \
+            (parallel.games, parallel.wins, parallel.stopReason)
+
+    def test_shared_pool_is_not_replaced_by_larger_requests(self, monkeypatch):
+        monkeypatch.setattr(settings, "SIMULATION_POOL_WORKERS", 2)
+        shutdown_process_pool()
+        pool = get_process_pool()
+        ParallelSimulator(max_workers=4, shard_size=20).run(
+            make_game_state(PLAYERS, discard=()), ['normal', 'normal'], 100, seed=8)
+
+        assert get_process_pool() is pool
+        assert pool._max_workers == 2
+
+    def test_simulate_game_reports_intervals(self):
+        engine = MonopolyDealEngine()
+        result = engine.simulate_game(make_game_state(PLAYERS, discard=()), AIStrategy.AGGRESSIVE, 1000, seed=5,
+                                      target_precision=0.1)[0]
+        simulation = result.debug['simulation']
+
+        assert simulation['stoppedEarly']
+        assert simulation['games'] < 1000
+        for name, (low, high) in simulation['intervals'].items():
+            assert low <= result.winProbability[name] <= high
+
+    def test_request_validates_precision(self):
+        with pytest.raises(ValueError):
+            SimulationRequest(gameState=make_game_state(PLAYERS, discard=()), strategy=AIStrategy.NORMAL,
+                              numSimulations=10, targetPrecision=0.7)
+
+    @classmethod
+    def teardown_class(cls):
+        shutdown_process_pool()
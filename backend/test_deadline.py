@@ -0,0 +1,96 @@
+"""
+Tests for deadline-bounded (anytime) analysis.
+"""
+
+import time
+
+from app.core.analysis_cache import AnalysisCache, analyze_cached
+from app.core.compact_state import CompactGameState
+from app.core.deadline import Deadline
+from app.core.game_engine import MonopolyDealEngine
+from app.models.game import AIStrategy, AnalysisRequest
+from conftest import make_game_state
+
+
+HAND = ["Sly Deal", "Forced Deal", "Deal Breaker", "Wild Rent", "Double The Rent",
+        "Debt Collector", "Birthday", "Green Property", "House", "$5M"]
+PROPERTIES = {"green": ["Green", "Green"], "red": ["Red"], "brown": ["Brown", "Brown"]}
+# Six seats; the opponents hold six cards of which one is known
+TABLE = [{"hand": HAND, "bank": [5, 3, 1], "properties": PROPERTIES}] + \
+    [{"hand": ["Pass Go"], "bank": [5, 3, 1], "properties": PROPERTIES, "handCount": 6}] * 5
+
+
+class TestDeadline:
+    """Test the shared deadline bookkeeping."""
+
+    def test_unbounded_deadline_never_truncates(self):
+        deadline = Deadline()
+
+        assert deadline.check() and not deadline.bounded
+        assert deadline.clip(1000) == 1000
+        assert deadline.completed
+
+    def test_expired_deadline_marks_truncation(self):
+        deadline = Deadline(1)
+        time.sleep(0.005)
+
+        assert deadline.remaining_ms() == 0.0
+        assert not deadline.check()
+        assert not deadline.completed
+
+    def test_clip_cuts_budget_to_remaining_time(self):
+        deadline = Deadline(50)
+
+        assert deadline.clip(10) == 10 and deadline.completed
+        assert deadline.clip(500) <= 50 and not deadline.completed
+
+
+class TestAnytimeAnalysis:
+    """Test analyses return in time with the best answer found so far."""
+
+    def setup_method(self):
+        self.engine = MonopolyDealEngine()
+        self.state = make_game_state(TABLE, names=[f"Player {seat}" for seat in range(1, 7)], discard=(),
+                                     deck_count=20)
+
+    def test_generous_deadline_gives_the_full_answer(self):
+        full = self.engine.analyze_game_state(self.state, AIStrategy.NORMAL)
+        bounded = self.engine.analyze_game_state(self.state, AIStrategy.NORMAL, deadline_ms=10000)
+
+        assert full.completed and bounded.completed
+        assert bounded.recommendedMove == full.recommendedMove
+        assert bounded.winProbability == full.winProbability
+        assert bounded.debug['deadline']['completed']
+
+    def test_deadline_cuts_search_short(self):
+        started = time.perf_counter()
+        result = self.engine.analyze_game_state(self.state, AIStrategy.AGGRESSIVE,
+                                                time_budget_ms=5000, deadline_ms=100)
+        elapsed = (time.perf_counter() - started) * 1000
+
+        assert elapsed < 1000
+        assert not result.completed
+        assert result.recommendedMove and len(result.winProbability) == 6
+        assert result.debug['search']['elapsedMs'] <= 150
+
+    def test_expired_deadline_stops_search_before_root_moves_are_tried(self):
+        deadline = Deadline(1)
+        time.sleep(0.005)
+        compact = CompactGameState.from_game_state(self.state)
+        result = self.engine.search_turn(self.state, AIStrategy.NORMAL, 1000, compact, seed=1, deadline=deadline)
+
+        assert result.iterations == 0
+        assert not result.completed
+
+    def test_truncated_answers_are_not_cached(self):
+        cache = AnalysisCache()
+        analyze_cached(self.state, AIStrategy.NORMAL, 5000, cache=cache, deadline_ms=20)
+        assert len(cache) == 0
+
+        analyze_cached(self.state, AIStrategy.NORMAL, cache=cache, deadline_ms=10000)
+        assert len(cache) == 1
+
+    def test_request_accepts_deadline(self):
+        request = AnalysisRequest(gameState=self.state, deadlineMs=250)
+
+        assert request.deadlineMs == 250
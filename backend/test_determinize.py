@@ -0,0 +1,149 @@
+"""
+Tests for determinized sampling of hidden hands and deck order.
+"""
+
+import random
+
+import numpy as np
+import pytest
+from fastapi import HTTPException
+from app.api.v1.endpoints.analysis import _check_game_state
+from app.core.cards import DECK_SIZE, NUM_KINDS
+from app.core.compact_state import CompactGameState
+from app.core.determinize import HiddenInformation, sample_determinizations
+from app.core.game_engine import MonopolyDealEngine, AssetEvaluation
+from app.core.simulation import GameSimulator, CHARACTER_WEIGHTS
+from app.models.game import AIStrategy
+from conftest import make_game_state
+
+
+def partly_hidden_state(hand_counts=(None, 5, 4), deck_count=60):
+    """Bob shows one card of five and Cat none of four"""
+    players = (
+        {"hand": ["Pass Go", "Deal Breaker", "Green Property"], "bank": [5, 2],
+         "properties": {"green": ["Green Property", "Green Property"]}},
+        {"hand": ["House"], "bank": [1, 1], "properties": {"dark-blue": ["Dark Blue Property", "Dark Blue Property"]}},
+        {"bank": [3], "properties": {"red": ["Red Property"]}}
+    )
+    return make_game_state([dict(player, handCount=count) for player, count in zip(players, hand_counts)],
+                           deck_count=deck_count)
+
+
+class TestHiddenInformation:
+    """Test the unseen pool and the consistency of sampled deals."""
+
+    def setup_method(self):
+        self.state = CompactGameState.from_game_state(partly_hidden_state())
+
+    def test_hidden_counts_and_pool(self):
+        visible = 3 + 1 + 2 + 2 + 1 + 2 + 2 + 1 + 1  # hands, banks, properties, discard
+
+        assert self.state.hidden == [0, 4, 4]
+        assert self.state.hand_sizes == [3, 5, 4]
+        assert len(HiddenInformation(self.state).pool) == DECK_SIZE - visible
+
+    def test_samples_are_consistent_deals(self):
+        deals = sample_determinizations(self.state, 500, np.random.default_rng(1))
+
+        assert deals.hands.shape == (500, 3, NUM_KINDS)
+        assert deals.decks.shape == (500, 60)
+        assert (deals.hands.sum(axis=2) == [0, 4, 4]).all()
+        # No sample uses more copies of a kind than are unseen
+        dealt = deals.hands.sum(axis=1) + np.stack([np.bincount(deck, minlength=NUM_KINDS) for deck in deals.decks])
+        assert (dealt <= np.array(self.state.unseen)).all()
+
+    def test_hidden_cards_follow_the_pool_composition(self):
+        hidden = HiddenInformation(self.state)
+        deals = hidden.sample(20000, np.random.default_rng(2))
+        expected = 4 * np.array(self.state.unseen) / len(hidden.pool)
+
+        assert np.allclose(deals.hands[:, 1].mean(axis=0), expected, atol=0.02)
+
+    def test_seeded_samples_repeat(self):
+        first = sample_determinizations(self.state, 8, np.random.default_rng(5))
+        second = sample_determinizations(self.state, 8, np.random.default_rng(5))
+
+        assert (first.hands == second.hands).all() and (first.decks == second.decks).all()
+
+    def test_short_pool_deals_hands_first(self):
+        state = CompactGameState.from_game_state(partly_hidden_state(deck_count=500))
+        hidden = HiddenInformation(state)
+        deals = hidden.sample(4, np.random.default_rng(0))
+
+        assert deals.decks.shape[1] == len(hidden.pool) - 8
+        assert (deals.hands.sum(axis=2) == [0, 4, 4]).all()
+
+    def test_hand_counts_beyond_the_pool_are_rejected(self):
+        pool = sum(self.state.unseen)
+        # Bob shows one card, so his hidden cards may take the whole pool but no more
+        CompactGameState.from_game_state(partly_hidden_state((None, pool + 1, None)))
+        too_many = partly_hidden_state((None, pool + 2, None))
+
+        with pytest.raises(ValueError, match="unseen"):
+            CompactGameState.from_game_state(too_many)
+        with pytest.raises(ValueError):
+            GameSimulator().run(too_many, ['normal'] * 3, 10, seed=1)
+        analysis = MonopolyDealEngine().analyze_game_state(too_many, AIStrategy.NORMAL)
+        assert analysis.winProbability == {} and "unseen" in analysis.reasoning
+        with pytest.raises(HTTPException) as error:
+            _check_game_state(too_many)
+        assert error.value.status_code == 400
+
+    def test_antithetic_pairs_rotate_seats(self):
+        deals = HiddenInformation(self.state).sample(5, np.random.default_rng(3), antithetic=True)
+        first, partner = deals.sample(0), deals.sample(1)
+
+        assert len(deals) == 5
+        # Seats 1 and 2 hide four cards each, so they trade hands; seat 0 hides none
+        assert partner[0][1] == first[0][2] and partner[0][2] == first[0][1]
+        # Each seat's first draw (two cards from the top) goes to the next seat
+        assert partner[1][-2:] == first[1][-6:-4] and partner[1][-4:-2] == first[1][-2:]
+        assert sorted(partner[1]) == sorted(first[1])
+        assert (deals.hands[2] != deals.hands[0]).any()
+
+
+class TestDeterminizedPlay:
+    """Test that rollouts and analysis use the sampled deals."""
+
+    def test_rollout_deals_hidden_hands(self):
+        state = CompactGameState.from_game_state(partly_hidden_state())
+        deals = sample_determinizations(state, 1, np.random.default_rng(3))
+        rollout = GameSimulator().rollout(state, [], [CHARACTER_WEIGHTS['normal']] * 3,
+                                          random.Random(0), deals.sample(0))
+
+        assert [sum(hand) for hand in rollout.hands] == [3, 5, 4]
+        assert rollout.hand_sizes == [3, 5, 4]
+        assert len(rollout.deck) == 60
+        # The template keeps only the known cards
+        assert sum(state.hands[1]) == 1
+
+    def test_shuffled_rollout_deals_hidden_hands(self):
+        state = CompactGameState.from_game_state(partly_hidden_state())
+        rollout = GameSimulator().rollout(state, state.unseen_cards(), [CHARACTER_WEIGHTS['normal']] * 3,
+                                          random.Random(0))
+
+        assert [sum(hand) for hand in rollout.hands] == [3, 5, 4]
+        assert len(rollout.deck) == 60
+
+    def test_simulation_runs_with_hidden_hands(self):
+        summary = GameSimulator().run(partly_hidden_state(), ['normal'] * 3, 40, seed=4)
+
+        assert summary.games == 40
+        assert sum(summary.wins) == 40
+
+    def test_analysis_values_hidden_cards_at_their_expectation(self):
+        engine = MonopolyDealEngine()
+        game_state = partly_hidden_state()
+        compact = CompactGameState.from_game_state(game_state)
+        expected = engine.evaluate_hidden(compact, AssetEvaluation.VALUE, samples=4000)
+        known = engine.evaluate_compact(compact, 1, AssetEvaluation.VALUE)
+
+        # Hidden cards add value; the fully known seat is unchanged
+        assert expected[1] > known
+        assert expected[0] == pytest.approx(engine.evaluate_compact(compact, 0, AssetEvaluation.VALUE))
+
+        first = engine.analyze_game_state(game_state, AIStrategy.DEFENSIVE)
+        second = engine.analyze_game_state(game_state, AIStrategy.DEFENSIVE)
+        assert first.winProbability == second.winProbability
+        assert first.winProbability != engine.analyze_game_state(partly_hidden_state((None, None, None)),
+                                                                 AIStrategy.DEFENSIVE).winProbability
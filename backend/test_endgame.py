@@ -0,0 +1,150 @@
+"""
+Tests for the exact endgame solver and its use in analysis.
+"""
+
+from math import comb
+
+import pytest
+from app.core.cards import PROPERTY_BASE, WILD_ANY, WILD_LIGHT_BLUE_BROWN, COLOR_INDEX
+from app.core.compact_state import CompactGameState
+from app.core.config import settings
+from app.core.endgame import EndgameSolver, is_endgame
+from app.core.game_engine import MonopolyDealEngine
+from app.models.game import GameState, PlayerState, EdgeRules, AIStrategy, DeckExhaustionRule
+
+
+TWO_SETS = {"green": ["Green Property"] * 3, "dark-blue": ["Dark Blue Property"] * 2}
+
+
+def endgame_state(hand, deck_count=30, discard=(), edge_rules=None, opponent_hand_count=None):
+    """Alice holds two complete sets and one brown property; Bob holds one red property"""
+    return GameState(
+        players=[
+            PlayerState(id=1, name="Alice", hand=list(hand), bank=[],
+                        properties=dict(TWO_SETS, brown=["Brown Property"])),
+            PlayerState(id=2, name="Bob", hand=[] if opponent_hand_count else ["$2M"], bank=[],
+                        properties={"red": ["Red Property"]}, handCount=opponent_hand_count)
+        ],
+        discard=list(discard),
+        deckCount=deck_count,
+        edgeRules=edge_rules or EdgeRules()
+    )
+
+
+def solve(game_state, **kwargs):
+    return EndgameSolver(game_state.edgeRules, **kwargs).solve(CompactGameState.from_game_state(game_state), seed=1)
+
+
+class TestEndgameSolver:
+    """Test proven outcomes, chance nodes, deck exhaustion and the node budget."""
+
+    def test_winning_play_is_proven_at_once(self):
+        result = solve(endgame_state(["$1M", "Brown Property"], opponent_hand_count=5))
+
+        assert result.proven and result.winProbability == 1.0
+        assert result.bestLine == ["Play Brown Property on brown"]
+        assert result.determinizations > 0
+        assert result.nodes < 10
+
+    def test_pass_go_draws_are_chance_nodes(self):
+        result = solve(endgame_state(["Pass Go"]), horizon=1)
+
+        # Drawing any card that completes brown wins; later Pass Go draws can only add chances
+        pool = CompactGameState.from_game_state(endgame_state(["Pass Go"])).unseen
+        total = sum(pool)
+        helpful = pool[PROPERTY_BASE + COLOR_INDEX['brown']] + pool[WILD_ANY] + pool[WILD_LIGHT_BLUE_BROWN]
+        at_least = 1 - comb(total - helpful, 2) / comb(total, 2)
+        assert result.bestLine == ["Play Pass Go"]
+        assert at_least <= result.lowerBound < 1.0
+        assert result.upperBound == 1.0 and result.completed
+
+    def test_reshuffle_refills_the_pool_from_the_discard(self):
+        result = solve(endgame_state(["Pass Go"], deck_count=0, discard=["Brown Property"]), horizon=1)
+
+        assert result.proven and result.winProbability == 1.0
+        assert result.bestLine == ["Play Pass Go"]
+
+    def test_game_over_ends_at_the_next_draw(self):
+        rules = EdgeRules(deckExhaustion=DeckExhaustionRule.GAME_OVER)
+        stuck = solve(endgame_state(["Pass Go"], deck_count=0, discard=["Brown Property"], edge_rules=rules),
+                      horizon=1)
+        assert stuck.upperBound == 1.0 and stuck.lowerBound == 0.0
+
+        # Bob's turn opens on an empty deck and Alice, with more complete sets, is the leader
+        ahead = solve(endgame_state(["$1M"], deck_count=0, edge_rules=rules), horizon=2)
+        assert ahead.proven and ahead.winProbability == 1.0 and ahead.horizon == 2
+
+    def test_node_budget_keeps_sound_bounds(self):
+        exact = solve(endgame_state(["Pass Go"]), horizon=1)
+        cut = solve(endgame_state(["Pass Go"]), horizon=1, max_nodes=50)
+
+        assert not cut.completed
+        assert cut.lowerBound <= exact.lowerBound and cut.upperBound >= exact.upperBound
+
+    def test_endgame_detection(self):
+        assert is_endgame(CompactGameState.from_game_state(endgame_state(["$1M"])))
+        early = GameState(players=[PlayerState(id=1, name="A", hand=["$1M"], bank=[], properties={}),
+                                   PlayerState(id=2, name="B", hand=[], bank=[], properties={})],
+                          discard=[], deckCount=40, edgeRules=EdgeRules())
+        assert not is_endgame(CompactGameState.from_game_state(early))
+        early.deckCount = 3
+        assert is_endgame(CompactGameState.from_game_state(early), deck_threshold=5)
+
+        # Two sets but no third set in sight is not an endgame while the deck is full
+        far = endgame_state(["$1M"], deck_count=40)
+        far.players[0].properties.pop("brown")
+        assert not is_endgame(CompactGameState.from_game_state(far))
+        assert is_endgame(CompactGameState.from_game_state(far), missing_cards=2)
+
+
+class TestEndgameAnalysis:
+    """Test that analysis hands proven endgames to the solver."""
+
+    def setup_method(self):
+        self.engine = MonopolyDealEngine(EdgeRules())
+
+    def test_proven_win_replaces_the_heuristic(self):
+        response = self.engine.analyze_game_state(endgame_state(["$1M", "Brown Property"], opponent_hand_count=5),
+                                                  AIStrategy.NORMAL, time_budget_ms=50)
+
+        assert response.winProbability == {"Alice": 1.0, "Bob": 0.0}
+        assert "Brown Property" in response.recommendedMove
+        assert response.debug['endgame']['proven']
+        assert 'search' not in response.debug
+
+    def test_open_positions_keep_the_heuristic_within_bounds(self, monkeypatch):
+        monkeypatch.setattr(settings, 'ENDGAME_MAX_NODES', 500)
+        response = self.engine.analyze_game_state(endgame_state(["Pass Go"]), AIStrategy.NORMAL, deadline_ms=5000)
+        bounds = response.debug['endgame']
+
+        assert not bounds['proven']
+        assert bounds['nodes'] <= 500
+        assert bounds['lowerBound'] <= response.winProbability["Alice"] <= bounds['upperBound']
+        assert sum(response.winProbability.values()) == pytest.approx(1.0)
+
+    def test_solver_runs_on_the_requests_budget(self, monkeypatch):
+        budgets = []
+        solve_endgame = self.engine.solve_endgame
+
+        def recording(game_state, strategy, compact=None, deadline=None):
+            budgets.append((deadline.at - deadline.started) * 1000.0)
+            return solve_endgame(game_state, strategy, compact, deadline)
+
+        monkeypatch.setattr(self.engine, 'solve_endgame', recording)
+        state = endgame_state(["Pass Go"])
+        response = self.engine.analyze_game_state(state, AIStrategy.NORMAL)
+        assert budgets == [] and 'endgame' not in (response.debug or {})
+
+        self.engine.analyze_game_state(state, AIStrategy.NORMAL, time_budget_ms=30)
+        assert budgets[-1] == pytest.approx(30)
+        self.engine.analyze_game_state(state, AIStrategy.NORMAL, deadline_ms=5000)
+        assert budgets[-1] == pytest.approx(settings.ENDGAME_TIME_BUDGET_MS)
+
+    def test_positions_that_cannot_close_are_not_solved(self):
+        # Alice cannot complete brown this turn and Bob is nowhere near a third set
+        state = endgame_state(["$1M"])
+        assert is_endgame(CompactGameState.from_game_state(state))
+        assert self.engine.solve_endgame(state, AIStrategy.NORMAL) is None
+
+        response = self.engine.analyze_game_state(state, AIStrategy.NORMAL, deadline_ms=5000)
+        assert 'endgame' not in (response.debug or {})
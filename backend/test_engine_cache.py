@@ -0,0 +1,46 @@
+"""
+Tests for the shared engine cache keyed by EdgeRules.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from app.core.game_engine import MonopolyDealEngine, get_engine, engine_cache_info
+from app.models.game import EdgeRules, DeckExhaustionRule
+
+
+class TestEngineCache:
+    """Test engines are built once per rule configuration."""
+
+    def test_equal_rules_share_an_engine(self):
+        first = get_engine(EdgeRules(quadrupleRent=True))
+        second = get_engine(EdgeRules(quadrupleRent=True))
+
+        assert isinstance(first, MonopolyDealEngine)
+        assert first is second
+        assert first.edge_rules == EdgeRules(quadrupleRent=True)
+        assert first.simulator.quadruple_rent
+
+    def test_different_rules_get_different_engines(self):
+        reshuffle = get_engine(EdgeRules())
+        game_over = get_engine(EdgeRules(deckExhaustion=DeckExhaustionRule.GAME_OVER))
+
+        assert reshuffle is not game_over
+        assert get_engine() is reshuffle
+        assert not game_over.simulator.reshuffle
+
+    def test_cache_hits_are_counted(self):
+        get_engine(EdgeRules(justSayNoOnZero=False))
+        before = engine_cache_info()
+        get_engine(EdgeRules(justSayNoOnZero=False))
+        after = engine_cache_info()
+
+        assert after['hits'] == before['hits'] + 1
+        assert after['size'] <= after['maxsize']
+
+    def test_concurrent_lookups_share_one_engine(self):
+        rules = EdgeRules(justSayNoEmptyHand=False, quadrupleRent=True)
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            engines = list(pool.map(lambda _: get_engine(rules), range(32)))
+
+        assert all(engine is get_engine(rules) for engine in engines)
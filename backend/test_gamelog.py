@@ -0,0 +1,103 @@
+"""
+Tests for binary game logs, their reader and the replayer.
+"""
+
+import pytest
+from app.core.compact_state import CompactGameState
+from app.core.gamelog import (
+    GameLogReader, GameLogWriter, GameReplayer, HEADER_DTYPE, RECORD_DTYPE, play_game, write_games,
+    _initial_rollout
+)
+from app.core.rule_space import RULE_SPACE_SIZE, all_rules, decode_rules, encode_rules
+from app.core.simulation import GameSimulator
+from app.models.configuration import OFFICIAL_PRESETS
+from app.models.game import EdgeRules, HotelMoveRule
+
+
+RULES = OFFICIAL_PRESETS["flexible_house_rules"].rules
+
+
+class TestRuleCodes:
+    """Test the integer coding of EdgeRules."""
+
+    def test_every_code_round_trips(self):
+        assert RULE_SPACE_SIZE == 3 * 3 * 2 * 2 * 3 * 3 * 2 ** 4
+        assert [encode_rules(rules) for rules in all_rules()] == list(range(RULE_SPACE_SIZE))
+        for preset in OFFICIAL_PRESETS.values():
+            assert decode_rules(encode_rules(preset.rules)) == preset.rules
+
+    def test_out_of_range_codes_are_rejected(self):
+        with pytest.raises(ValueError):
+            decode_rules(RULE_SPACE_SIZE)
+
+
+class TestGameLog:
+    """Test the file layout, reading and replay."""
+
+    def test_fixed_width_layout(self, tmp_path):
+        path = str(tmp_path / "games.log")
+        games = [play_game(RULES, ["aggressive", "defensive"], seed) for seed in range(3)]
+        with GameLogWriter(path) as writer:
+            for game in games:
+                writer.write(game)
+
+        assert HEADER_DTYPE.itemsize == 32 and RECORD_DTYPE.itemsize == 8
+        size = (tmp_path / "games.log").stat().st_size
+        assert size == 8 + sum(32 + 8 * len(game.records) for game in games)
+
+    def test_reader_returns_what_was_written(self, tmp_path):
+        path = str(tmp_path / "games.log")
+        write_games(path, 4, RULES, ["normal", "aggressive"], seed=20)
+        write_games(path, 2, EdgeRules(hotelMove=HotelMoveRule.FREE_MOVE), seed=40)
+        games = list(GameLogReader(path))
+
+        assert [game.seed for game in games] == [20, 21, 22, 23, 40, 41]
+        assert games[0].edge_rules == RULES and games[4].edge_rules.hotelMove == HotelMoveRule.FREE_MOVE
+        assert games[0].characters == ["normal", "aggressive"]
+        assert list(GameLogReader(path).headers()['seed']) == [20, 21, 22, 23, 40, 41]
+        fresh = play_game(RULES, ["normal", "aggressive"], 21)
+        assert (games[1].records == fresh.records).all() and games[1].turns == fresh.turns
+
+    def test_records_hold_resolved_moves(self):
+        game = play_game(RULES, ["aggressive", "aggressive"], 3)
+        turns = [turn for turn, _, _ in game.moves()]
+
+        assert turns == sorted(turns) and turns[-1] < game.turns
+        assert all(0 <= player < 2 for _, player, _ in game.moves())
+
+    def test_replay_reaches_the_played_final_position(self):
+        for seed in range(10):
+            game = play_game(RULES, ["aggressive", "defensive"], seed)
+            reference = _initial_rollout(GameSimulator(RULES), ["aggressive", "defensive"], seed)
+            reference.run(0, 200)
+            final = CompactGameState.from_game_state(GameReplayer(game).final_state())
+
+            assert final.props == reference.props
+            assert final.banks == reference.banks
+            assert final.hands == reference.hands
+            assert final.deck_count == len(reference.deck)
+            if game.finished and final.complete_sets(game.winner) < 3:
+                assert final.deck_count == 0  # Ended by deck exhaustion
+
+    def test_intermediate_positions(self):
+        game = play_game(RULES, ["normal", "normal"], 5)
+        replayer = GameReplayer(game, names=["Ann", "Ben"])
+
+        start = replayer.initial_state()
+        assert [player.handCount for player in start.players] == [None, None]
+        assert [len(player.hand) for player in start.players] == [5, 5]
+        assert start.deckCount == 96
+
+        first = replayer.state_at(0, 0)
+        assert len(first.players[0].hand) == 7 and first.deckCount == 94
+        assert [player.name for player in first.players] == ["Ann", "Ben"]
+        ends = list(replayer.states())
+        assert ends[0][1] == replayer.state_at(0)
+        with pytest.raises(ValueError):
+            replayer.state_at(game.turns + 5)
+
+    def test_other_files_are_rejected(self, tmp_path):
+        path = tmp_path / "other.bin"
+        path.write_bytes(b"not a game log")
+        with pytest.raises(ValueError):
+            GameLogReader(str(path))
@@ -0,0 +1,218 @@
+"""
+Tests for incremental board summaries after card transfers.
+"""
+
+import random
+
+import pytest
+from app.api.v1.endpoints.analysis import execute_card_operation
+from app.core.cards import COLOR_INDEX
+from app.core.compact_state import CompactGameState
+from app.core.game_engine import MonopolyDealEngine, AssetEvaluation
+from app.core.incremental import BoardSummary, SummaryCache, summarize_after
+from app.core import zobrist
+from app.models.game import GameState, AIStrategy, CardTransfer, CardSelection
+from conftest import make_game_state
+
+
+PLAYERS = (
+    {"hand": ["Pass Go", "Green Property", "Green Property", "House", "$3M", "Wild Property", "Deal Breaker",
+              "Red Property"],
+     "bank": [5, 2], "properties": {"green": ["Green Property"]}},
+    {"hand": ["Dark Blue Property", "Sly Deal", "$1M"], "bank": [1, 1],
+     "properties": {"dark-blue": ["Dark Blue Property"], "red": ["Red Property"]}}
+)
+
+
+def assert_matches_full(summary: BoardSummary, game_state: GameState):
+    engine = MonopolyDealEngine()
+    fresh = CompactGameState.from_game_state(game_state)
+    full = BoardSummary.from_game_state(game_state)
+    assert summary.state.hands == fresh.hands
+    assert summary.state.hand_kinds == fresh.hand_kinds
+    assert summary.state.props == fresh.props
+    assert summary.state.prop_values == fresh.prop_values
+    assert summary.state.houses == fresh.houses
+    assert summary.state.banks == fresh.banks
+    assert summary.hash == zobrist.hash_state(fresh)
+    assert summary.features() == full.features()
+    for player in range(fresh.num_players):
+        for asset_type in AssetEvaluation:
+            assert summary.evaluate(player, asset_type.value) == engine.evaluate_compact(fresh, player, asset_type)
+
+
+def random_transfer(game_state: GameState, rng: random.Random) -> CardTransfer:
+    player = rng.choice([player for player in game_state.players if player.hand])
+    card = rng.choice(player.hand)
+    if rng.random() < 0.5:
+        return CardTransfer(cardId=card, fromLocation="hand", toLocation="bank", toPlayerId=player.id)
+    color = rng.choice(["green", "red", "dark-blue", "utility"])
+    return CardTransfer(cardId=card, fromLocation="hand", toLocation="properties",
+                        toPlayerId=player.id, propertySet=color)
+
+
+class TestBoardSummary:
+    """Test that incremental updates agree with encoding the new state from scratch."""
+
+    def test_initial_summary_matches_engine(self):
+        game_state = make_game_state(PLAYERS, deck_count=60)
+        assert_matches_full(BoardSummary.from_game_state(game_state), game_state)
+
+    def test_random_transfer_sequences_match_full_rebuild(self):
+        for seed in range(20):
+            rng = random.Random(seed)
+            game_state = make_game_state(PLAYERS, deck_count=60)
+            summary = BoardSummary.from_game_state(game_state)
+            while any(player.hand for player in game_state.players):
+                transfer = random_transfer(game_state, rng)
+                game_state = execute_card_operation(transfer, game_state)
+                assert summary.apply_transfer(transfer)
+                assert_matches_full(summary, game_state)
+
+    def test_copy_leaves_original_untouched(self):
+        game_state = make_game_state(PLAYERS, deck_count=60)
+        summary = BoardSummary.from_game_state(game_state)
+        before = (summary.hash, summary.features(), [row[:] for row in summary.state.hand_kinds])
+        clone = summary.copy()
+        clone.apply_transfer(CardTransfer(cardId="Green Property", fromLocation="hand",
+                                          toLocation="properties", toPlayerId=1, propertySet="green"))
+
+        assert (summary.hash, summary.features(), summary.state.hand_kinds) == before
+        assert clone.state.props[0][COLOR_INDEX['green']] == 2
+
+    def test_completing_a_set_updates_threat(self):
+        game_state = make_game_state(PLAYERS, deck_count=60)
+        summary = BoardSummary.from_game_state(game_state)
+        threat = summary.threat(0)
+        for _ in range(2):
+            summary.apply_transfer(CardTransfer(cardId="Green Property", fromLocation="hand",
+                                                toLocation="properties", toPlayerId=1, propertySet="green"))
+
+        assert summary.complete[0] == 1
+        assert summary.threat(0) == threat + 20 + 2 * 4
+
+    def test_missing_card_is_a_no_op(self):
+        summary = BoardSummary.from_game_state(make_game_state(PLAYERS, deck_count=60))
+        before = summary.hash
+        assert summary.apply_transfer(CardTransfer(cardId="Hotel", fromLocation="hand",
+                                                   toLocation="bank", toPlayerId=1))
+        assert summary.hash == before
+
+    def test_unmodelled_routes_are_declined(self):
+        summary = BoardSummary.from_game_state(make_game_state(PLAYERS, deck_count=60))
+        assert not summary.apply_transfer(CardTransfer(cardId="Red Property", fromLocation="properties",
+                                                       toLocation="properties", fromPlayerId=2, toPlayerId=1))
+
+
+class TestSummarizeAfter:
+    """Test chaining summaries through the cache token."""
+
+    def setup_method(self):
+        self.cache = SummaryCache(capacity=16)
+
+    def test_chained_operations_take_incremental_path(self):
+        game_state = make_game_state(PLAYERS, deck_count=60)
+        first = CardTransfer(cardId="$3M", fromLocation="hand", toLocation="bank", toPlayerId=1)
+        after_first = execute_card_operation(first, game_state)
+        summary, incremental = summarize_after(game_state, after_first, first, None, self.cache)
+        assert not incremental
+
+        second = CardTransfer(cardId="Red Property", fromLocation="hand", toLocation="properties",
+                              toPlayerId=1, propertySet="red")
+        after_second = execute_card_operation(second, after_first)
+        chained, incremental = summarize_after(after_first, after_second, second, summary.token, self.cache)
+
+        assert incremental
+        assert_matches_full(chained, after_second)
+        # The cached base summary is not modified by the chained update
+        assert_matches_full(summary, after_first)
+
+    def test_stale_token_falls_back_to_full_encoding(self):
+        game_state = make_game_state(PLAYERS, deck_count=60)
+        transfer = CardTransfer(cardId="$3M", fromLocation="hand", toLocation="bank", toPlayerId=1)
+        after = execute_card_operation(transfer, game_state)
+        summary, _ = summarize_after(game_state, after, transfer, None, self.cache)
+
+        # Posting the original board with the token of a later one is detected by its content
+        again = execute_card_operation(transfer, game_state)
+        rebuilt, incremental = summarize_after(game_state, again, transfer, summary.token, self.cache)
+        assert not incremental
+        assert_matches_full(rebuilt, again)
+
+    def test_foreign_token_with_matching_piles_is_not_reused(self):
+        transfer = CardTransfer(cardId="$3M", fromLocation="hand", toLocation="bank", toPlayerId=1)
+        game_state = make_game_state(PLAYERS, deck_count=60)
+        summary, _ = summarize_after(game_state, execute_card_operation(transfer, game_state), transfer, None,
+                                     self.cache)
+
+        # Same pile sizes, but other names, another hand or another bank
+        renamed = make_game_state(PLAYERS, names=("Carol", "Dan"), deck_count=60)
+        reordered = make_game_state((dict(PLAYERS[0], hand=PLAYERS[0]["hand"][::-1]), PLAYERS[1]), deck_count=60)
+        poorer = make_game_state((dict(PLAYERS[0], bank=[5, 1]), PLAYERS[1]), deck_count=60)
+        for other in (renamed, reordered, poorer):
+            posted = execute_card_operation(transfer, other)
+            rebuilt, incremental = summarize_after(posted, execute_card_operation(transfer, posted), transfer,
+                                                   summary.token, self.cache)
+            assert not incremental
+            assert set(rebuilt.features()) == {player.name for player in other.players}
+
+    def test_selection_rebuilds(self):
+        game_state = make_game_state(PLAYERS, deck_count=60)
+        selection = CardSelection(selectedCards=["Green Property"], action="transfer")
+        summary, incremental = summarize_after(game_state, game_state, selection, None, self.cache)
+        assert not incremental
+        assert_matches_full(summary, game_state)
+
+    def test_analysis_from_summary_matches_full_analysis(self):
+        game_state = make_game_state(PLAYERS, deck_count=60)
+        transfer = CardTransfer(cardId="Green Property", fromLocation="hand", toLocation="properties",
+                                toPlayerId=1, propertySet="green")
+        base = BoardSummary.from_game_state(game_state)
+        self.cache.put(base)
+        after = execute_card_operation(transfer, game_state)
+        summary, incremental = summarize_after(game_state, after, transfer, base.token, self.cache)
+        engine = MonopolyDealEngine()
+
+        assert incremental
+        for strategy in AIStrategy:
+            assert engine.analyze_game_state(after, strategy, summary=summary) == \
+                engine.analyze_game_state(after, strategy)
+
+    def test_opponent_transfer_keeps_own_table_move_options(self):
+        game_state = make_game_state(PLAYERS, deck_count=60)
+        base = BoardSummary.from_game_state(game_state)
+        self.cache.put(base)
+        engine = MonopolyDealEngine()
+        engine.analyze_game_state(game_state, AIStrategy.NORMAL, summary=base)
+        (key, before), = base.card_moves.items()
+        assert all(options is not None for options in before)
+
+        transfer = CardTransfer(cardId="Sly Deal", fromLocation="hand", toLocation="bank", toPlayerId=2)
+        after = execute_card_operation(transfer, game_state)
+        summary, incremental = summarize_after(game_state, after, transfer, base.token, self.cache)
+        assert incremental
+        assert summary.cards_in_play == base.cards_in_play
+        kept = summary.card_moves[key]
+        for options, previous, card in zip(kept, before, game_state.players[0].hand):
+            if card in ("$3M", "Green Property", "Red Property"):
+                assert options is previous
+            elif card in ("Pass Go", "Deal Breaker"):
+                assert options is None
+        assert engine.analyze_game_state(after, AIStrategy.NORMAL, summary=summary) == \
+            engine.analyze_game_state(after, AIStrategy.NORMAL)
+
+    def test_own_transfer_drops_move_options(self):
+        game_state = make_game_state(PLAYERS, deck_count=60)
+        base = BoardSummary.from_game_state(game_state)
+        self.cache.put(base)
+        engine = MonopolyDealEngine()
+        engine.analyze_game_state(game_state, AIStrategy.NORMAL, summary=base)
+
+        transfer = CardTransfer(cardId="Green Property", fromLocation="hand", toLocation="properties",
+                                toPlayerId=1, propertySet="green")
+        after = execute_card_operation(transfer, game_state)
+        summary, incremental = summarize_after(game_state, after, transfer, base.token, self.cache)
+        assert incremental
+        assert summary.card_moves == {}
+        assert engine.analyze_game_state(after, AIStrategy.NORMAL, summary=summary) == \
+            engine.analyze_game_state(after, AIStrategy.NORMAL)
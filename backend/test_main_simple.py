@@ -0,0 +1,25 @@
+"""
+Tests for the stateless app in main_simple.
+"""
+
+import asyncio
+import time
+
+from main_simple import analyze_game_test
+from app.models.game import AnalysisRequest
+from conftest import make_game_state
+
+
+class TestStatelessAnalysis:
+    """Test the analysis endpoints of the stateless app."""
+
+    def test_deadline_is_forwarded(self):
+        request = AnalysisRequest(gameState=make_game_state(deck_count=20), strategy="aggressive",
+                                  timeBudgetMs=5000, deadlineMs=100)
+        started = time.perf_counter()
+        result = asyncio.run(analyze_game_test(request))
+        elapsed = (time.perf_counter() - started) * 1000
+
+        assert elapsed < 1000
+        assert not result.completed
+        assert result.recommendedMove
@@ -0,0 +1,160 @@
+"""
+Tests for rule-aware legal move generation.
+"""
+
+import random
+
+import pytest
+from app.core.cards import (
+    COLOR_INDEX, lookup_card, SLY_DEAL, FORCED_DEAL, DEAL_BREAKER, HOTEL, DOUBLE_RENT, RENT_ANY
+)
+from app.core.compact_state import CompactGameState
+from app.core.game_engine import MonopolyDealEngine, PlayerCharacter, AssetEvaluation
+from app.core.moves import Move, MoveRules, END_TURN, generate_moves
+from app.core.simulation import GameSimulator, CHARACTER_WEIGHTS
+from app.models.game import EdgeRules, ExtraPropertiesRule, HotelMoveRule
+from conftest import make_game_state
+
+GREEN = COLOR_INDEX['green']
+DARK_BLUE = COLOR_INDEX['dark-blue']
+RED = COLOR_INDEX['red']
+ORANGE = COLOR_INDEX['orange']
+BROWN = COLOR_INDEX['brown']
+
+
+def three_player_state(hand, properties=None, cat_properties=None, edge_rules=None):
+    if properties is None:
+        properties = {"green": ["Green"] * 3, "brown": ["Brown"]}
+    if cat_properties is None:
+        cat_properties = {"dark-blue": ["Dark Blue"], "brown": ["Brown"]}
+    return make_game_state((
+        {"hand": list(hand), "bank": [1], "properties": properties},
+        {"bank": [5, 5], "properties": {"red": ["Red"] * 3, "orange": ["Orange"]}},
+        {"properties": cat_properties}
+    ), discard=(), deck_count=50, edge_rules=edge_rules)
+
+
+def moves_for(hand, rules=MoveRules(), **kwargs):
+    compact = CompactGameState.from_game_state(three_player_state(hand, **kwargs))
+    return compact, generate_moves(compact, 0, rules)
+
+
+class TestMoveGeneration:
+    """Test targets, rule switches and dominance pruning."""
+
+    def test_steal_targets(self):
+        _, moves = moves_for(["Sly Deal", "Deal Breaker"])
+
+        assert Move(SLY_DEAL, ORANGE, 1) in moves
+        assert Move(SLY_DEAL, DARK_BLUE, 2) in moves
+        # Complete sets can only be taken with a Deal Breaker
+        assert Move(SLY_DEAL, RED, 1) not in moves
+        assert [move for move in moves if move.kind == DEAL_BREAKER and move.color >= 0] == \
+            [Move(DEAL_BREAKER, RED, 1)]
+        assert moves[-1] == END_TURN
+
+    def test_forced_deal_setup_rule(self):
+        _, allowed = moves_for(["Forced Deal"])
+        _, blocked = moves_for(["Forced Deal"], MoveRules(forced_deal_setup=False))
+
+        # Giving Cat a second brown completes Cat's brown set
+        setup = Move(FORCED_DEAL, DARK_BLUE, 2, BROWN)
+        assert setup in allowed
+        assert setup not in blocked
+        assert Move(FORCED_DEAL, ORANGE, 1, BROWN) in blocked
+
+    def test_quadruple_rent_allows_a_second_double(self):
+        hand = ["Green/Dark Blue Rent", "Double The Rent", "Double The Rent"]
+        _, normal = moves_for(hand)
+        _, quadruple = moves_for(hand, MoveRules(quadruple_rent=True))
+
+        assert max(move.doubles for move in normal) == 1
+        assert max(move.doubles for move in quadruple) == 2
+        # Rent is only offered on the best color the card allows
+        assert {move.color for move in quadruple if move.doubles >= 0} == {GREEN}
+
+    def test_doubling_past_what_targets_can_pay_is_pruned(self):
+        hand = ["Wild Rent", "Double The Rent", "Double The Rent"]
+        compact, moves = moves_for(hand, MoveRules(quadruple_rent=True))
+        against_cat = [move for move in moves if move.kind == RENT_ANY and move.target == 2]
+
+        # Green rent 7 already exceeds everything Cat could pay
+        assert compact.assets(2) < compact.rent(0, GREEN)
+        assert against_cat == [Move(RENT_ANY, GREEN, 2, doubles=0)]
+
+    def test_no_targets_without_anything_to_pay(self):
+        _, moves = moves_for(["Debt Collector", "Wild Rent"], cat_properties={})
+
+        assert all(move.target != 2 for move in moves)
+        assert {move.target for move in moves if move.color != -2} == {1, -1}
+
+    def test_wild_placement_under_extra_property_rules(self):
+        hand = ["Green/Dark Blue Wild"]
+        _, capped = moves_for(hand)
+        _, split = moves_for(hand, MoveRules(extra_properties=ExtraPropertiesRule.SPLIT_SETS))
+
+        wild = lookup_card("Green/Dark Blue Wild").kind
+        assert [move.color for move in capped if move.kind == wild] == [DARK_BLUE]
+        assert sorted(move.color for move in split if move.kind == wild) == sorted([GREEN, DARK_BLUE])
+
+    def test_hotel_moves_follow_the_edge_rule(self):
+        properties = {
+            "green": ["Green", "Green", "Green", "House", "Hotel"],
+            "dark-blue": ["Dark Blue", "Dark Blue", "House"],
+            "brown": ["Brown", "Brown", "House"]
+        }
+        compact, forbidden = moves_for([], properties=properties)
+        _, allowed = moves_for([], MoveRules(hotel_move=HotelMoveRule.COSTS_ACTION), properties=properties)
+
+        assert not [move for move in forbidden if move.is_building_move]
+        # Only moves up to a higher-rent set: green -> dark blue, never to brown
+        assert [move for move in allowed if move.is_building_move] == [Move(HOTEL, DARK_BLUE, give=GREEN)]
+
+
+class TestTargetedPlays:
+    """Test that rollouts and the engine honour generated targets."""
+
+    def make_rollout(self, hand, edge_rules=None):
+        state = three_player_state(hand, edge_rules=edge_rules)
+        simulator = GameSimulator(state.edgeRules)
+        return simulator.rollout(CompactGameState.from_game_state(state), [],
+                                 [CHARACTER_WEIGHTS['normal']] * 3, random.Random(0))
+
+    def test_explicit_sly_deal_target(self):
+        rollout = self.make_rollout(["Sly Deal"])
+        rollout.play(0, SLY_DEAL, DARK_BLUE, 3, target=2)
+
+        assert rollout.props[0][DARK_BLUE] == 1
+        assert rollout.props[2][DARK_BLUE] == 0
+        assert rollout.props[1][ORANGE] == 1
+
+    def test_explicit_rent_doubles(self):
+        rollout = self.make_rollout(["Wild Rent", "Double The Rent"])
+        bank = rollout.banks[0]
+        used = rollout.play(0, RENT_ANY, GREEN, 3, target=1, doubles=0)
+
+        assert used == 1
+        assert rollout.hands[0][DOUBLE_RENT] == 1
+        assert rollout.banks[0] == bank + 7
+
+    def test_free_building_move_costs_no_play(self):
+        rules = EdgeRules(hotelMove=HotelMoveRule.FREE_MOVE)
+        rollout = self.make_rollout([], rules)
+        rollout.hotels[0][GREEN] = rollout.houses[0][GREEN] = 1
+        rollout.props[0][DARK_BLUE], rollout.houses[0][DARK_BLUE] = 2, 1
+
+        assert rollout.play(0, HOTEL, DARK_BLUE, 3, give=GREEN) == 0
+        assert (rollout.hotels[0][GREEN], rollout.hotels[0][DARK_BLUE]) == (0, 1)
+
+    def test_engine_scores_every_action_target(self):
+        engine = MonopolyDealEngine()
+        state = three_player_state(["Wild Rent", "Birthday", "Deal Breaker", "Sly Deal"])
+        compact = CompactGameState.from_game_state(state)
+        options = [option for card in state.players[0].hand for option in engine._analyze_action_card(
+            {'name': card, 'type': 'action'}, compact, PlayerCharacter.NORMAL, AssetEvaluation.LOGICAL
+        )]
+        actions = {(option['action'], option.get('target_player')) for option in options}
+
+        assert ('play_rent', None) not in actions  # the wild rent card always names a target
+        assert {('play_rent', 'Bob'), ('play_rent', 'Cat'), ('play_birthday', None),
+                ('play_deal_breaker', 'Bob'), ('play_sly_deal', 'Bob'), ('play_sly_deal', 'Cat')} <= actions
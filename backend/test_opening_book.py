@@ -0,0 +1,115 @@
+"""
+Tests for the opening book: hand ranking, building and lookups.
+"""
+
+from collections import Counter
+
+import numpy as np
+import pytest
+from app.core import opening_book as book_module
+from app.core.analysis_cache import AnalysisCache, analyze_cached
+from app.core.cards import NUM_KINDS, PROPERTY_BASE, COLOR_INDEX, MONEY_1, MONEY_10, PASS_GO
+from app.core.opening_book import (
+    HAND_SIZE, RANK_LIMIT, OpeningBook, build_opening_book, deal_openings, opening_hand, opening_state,
+    rank_hand, sample_openings, unrank_hand
+)
+from app.core.parallel_simulation import shutdown_process_pool
+from app.models.configuration import OFFICIAL_PRESETS
+from app.models.game import AIStrategy
+
+
+class TestOpeningBook:
+    """Test ranks, opening detection, the book file and lookups."""
+
+    def setup_method(self):
+        self.rules = OFFICIAL_PRESETS['strict_official'].rules
+        self.ranks = sample_openings(3, seed=1)
+
+    def build(self, path, **kwargs):
+        options = dict(presets=['strict_official'], search_iterations=20, rollouts=8, seed=5, max_workers=1)
+        options.update(kwargs)
+        build_opening_book(str(path), self.ranks, **options)
+        return OpeningBook(str(path))
+
+    def test_rank_round_trip(self):
+        for rank in [0, 1, 12345, RANK_LIMIT - 1] + self.ranks:
+            counts = unrank_hand(rank)
+            assert sum(counts) == HAND_SIZE
+            assert rank_hand(counts) == rank
+        assert unrank_hand(0)[0] == HAND_SIZE
+        assert unrank_hand(RANK_LIMIT - 1)[-1] == HAND_SIZE
+        assert RANK_LIMIT < 2 ** 32
+
+    def test_rank_bounds(self):
+        with pytest.raises(ValueError):
+            unrank_hand(RANK_LIMIT)
+        with pytest.raises(ValueError):
+            rank_hand([1] * 6)
+
+    def test_hands_of_one_shape_keep_their_own_entries(self):
+        # $1M and two Browns versus $10M and two Dark Blues: same categories, different hands
+        brown, dark_blue = PROPERTY_BASE + COLOR_INDEX['brown'], PROPERTY_BASE + COLOR_INDEX['dark-blue']
+        cheap, rich = [0] * NUM_KINDS, [0] * NUM_KINDS
+        for kind in (MONEY_1, brown, brown, PASS_GO, PASS_GO, PASS_GO, PASS_GO):
+            cheap[kind] += 1
+        for kind in (MONEY_10, dark_blue, dark_blue, PASS_GO, PASS_GO, PASS_GO, PASS_GO):
+            rich[kind] += 1
+
+        assert rank_hand(cheap) != rank_hand(rich)
+        assert opening_hand(opening_state(rich, self.rules)) == rich
+
+    def test_most_frequent_openings_are_sampled(self):
+        ranks = sample_openings(50, seed=2, deals=20000)
+        frequency = Counter(deal_openings(20000, seed=2))
+        assert len(ranks) == 50
+        assert min(frequency[rank] for rank in ranks) >= max(
+            count for rank, count in frequency.items() if rank not in ranks)
+
+    def test_opening_detection(self):
+        counts = unrank_hand(self.ranks[0])
+        state = opening_state(counts, self.rules)
+        assert opening_hand(state) == counts
+
+        state.players[0].bank.append("$1M")
+        assert opening_hand(state) is None
+        state = opening_state(counts, self.rules)
+        state.deckCount -= 1
+        assert opening_hand(state) is None
+
+    def test_lookup_hits_and_misses(self, tmp_path):
+        book = self.build(tmp_path / "book.bin")
+        assert len(book) == 3
+        assert isinstance(book.ranks, np.memmap) or isinstance(book.ranks.base, np.memmap)
+
+        response = book.lookup(opening_state(unrank_hand(self.ranks[1]), self.rules), AIStrategy.NORMAL)
+        assert response is not None
+        assert response.debug['openingBook'] == {'preset': 'strict_official', 'rank': self.ranks[1]}
+        assert sum(response.winProbability.values()) == pytest.approx(1.0)
+
+        missing = next(rank for rank in range(RANK_LIMIT) if rank not in self.ranks)
+        assert book.lookup(opening_state(unrank_hand(missing), self.rules), AIStrategy.NORMAL) is None
+        # Rules that are not a preset in the book fall back to live analysis
+        house_rules = self.rules.model_copy(update={'quadrupleRent': not self.rules.quadrupleRent})
+        assert book.lookup(opening_state(unrank_hand(self.ranks[1]), house_rules), AIStrategy.NORMAL) is None
+
+    def test_analysis_uses_the_configured_book(self, tmp_path, monkeypatch):
+        book = self.build(tmp_path / "book.bin")
+        monkeypatch.setattr(book_module, '_book', book)
+        monkeypatch.setattr(book_module, '_book_loaded', True)
+        state = opening_state(unrank_hand(self.ranks[0]), self.rules)
+
+        cache = AnalysisCache()
+        response = analyze_cached(state, AIStrategy.AGGRESSIVE, cache=cache)
+        assert 'openingBook' in response.debug
+        assert len(cache) == 0
+
+    def test_serial_and_parallel_builds_match(self, tmp_path):
+        serial = self.build(tmp_path / "serial.bin", chunk_size=1)
+        parallel = self.build(tmp_path / "parallel.bin", chunk_size=1, max_workers=2)
+
+        assert np.array_equal(serial.lines, parallel.lines)
+        assert np.array_equal(serial.wins, parallel.wins)
+
+    @classmethod
+    def teardown_class(cls):
+        shutdown_process_pool()
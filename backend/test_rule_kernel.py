@@ -0,0 +1,88 @@
+"""
+Tests for compiling EdgeRules into rule kernels.
+"""
+
+import random
+
+from app.core.cards import COLOR_INDEX, HOUSE, HOTEL, WILD_ANY, RENT_ANY
+from app.core.compact_state import CompactGameState
+from app.core.moves import MoveRules, generate_moves
+from app.core.rule_kernel import compile_rules
+from app.core.rule_space import RULE_SPACE_SIZE, decode_rules
+from app.core.simulation import GameSimulator, CHARACTER_WEIGHTS
+from app.models.game import (
+    EdgeRules, BuildingForfeitureRule, ExtraPropertiesRule, HotelMoveRule, HousePaymentRule
+)
+from conftest import make_game_state
+
+GREEN = COLOR_INDEX['green']
+
+
+PLAYERS = (
+    {"hand": ["Wild Rent", "Double The Rent", "Double The Rent", "Forced Deal", "Property Wild Card",
+              "Green Property", "Hotel"],
+     "bank": [1], "properties": {"green": ["Green"] * 3, "dark-blue": ["Dark Blue"] * 2, "brown": ["Brown"]}},
+    {"bank": [5] * 8, "properties": {"red": ["Red"] * 2, "brown": ["Brown"]}}
+)
+
+
+class TestRuleKernel:
+    """Test kernel caching, dispatch choices and agreement with the rule enums."""
+
+    def test_kernels_are_shared_per_rule_set(self):
+        rules = EdgeRules(quadrupleRent=True)
+        kernel = compile_rules(rules)
+
+        assert compile_rules(rules.model_copy()) is kernel
+        assert compile_rules(None) is compile_rules(EdgeRules())
+        assert GameSimulator(rules).kernel is kernel
+        assert GameSimulator(rules).move_rules is kernel.moves
+
+    def test_constant_tables(self):
+        single = compile_rules(EdgeRules())
+        double = compile_rules(EdgeRules(quadrupleRent=True))
+
+        assert single.doubles_allowed == (0, 0, 1, 1)
+        assert double.doubles_allowed == (0, 0, 1, 2)
+        assert compile_rules(EdgeRules(hotelMove=HotelMoveRule.FREE_MOVE)).building_move_cost == 0
+        # housePayment never changes a rollout, so it compiles to the same kernel contents
+        floating = compile_rules(EdgeRules(housePayment=HousePaymentRule.FLOATING))
+        assert floating.forfeit_buildings is single.forfeit_buildings
+        assert floating.moves is single.moves
+
+    def test_forfeiture_dispatch(self):
+        results = {}
+        for rule in BuildingForfeitureRule:
+            state = make_game_state(PLAYERS, discard=(), deck_count=50,
+                                    edge_rules=EdgeRules(buildingForfeiture=rule))
+            simulator = GameSimulator(state.edgeRules)
+            rollout = simulator.rollout(CompactGameState.from_game_state(state), [],
+                                        [CHARACTER_WEIGHTS['normal']] * 2, random.Random(0))
+            rollout.houses[0][GREEN] = rollout.hotels[0][GREEN] = 1
+            bank = rollout.banks[0]
+            rollout.remove_property(0, GREEN)
+            results[rule] = (rollout.houses[0][GREEN], rollout.hotels[0][GREEN],
+                             rollout.banks[0] - bank, sorted(rollout.discard))
+
+        assert results[BuildingForfeitureRule.DISCARD] == (0, 0, 0, [HOUSE, HOTEL])
+        assert results[BuildingForfeitureRule.TO_BANK] == (0, 0, 7, [])
+        assert results[BuildingForfeitureRule.KEEP_FLOATING] == (1, 1, 0, [])
+
+    def test_moves_follow_the_rule_enums(self):
+        compact = CompactGameState.from_game_state(make_game_state(PLAYERS, discard=(), deck_count=50))
+        compact.houses[0][GREEN] = 1
+
+        for code in range(0, RULE_SPACE_SIZE, 7):
+            rules = decode_rules(code)
+            kernel = compile_rules(rules).moves
+            for plays_left in (1, 2, 3):
+                moves = generate_moves(compact, 0, kernel, plays_left)
+                assert moves == generate_moves(compact, 0, MoveRules.from_edge_rules(rules), plays_left)
+
+                relocations = [move for move in moves if move.is_building_move]
+                assert bool(relocations) == (rules.hotelMove != HotelMoveRule.NOT_ALLOWED)
+                doubles = max(move.doubles for move in moves if move.kind == RENT_ANY)
+                assert doubles == min(2, plays_left - 1, 2 if rules.quadrupleRent else 1)
+                wild_colors = [move.color for move in moves if move.kind == WILD_ANY]
+                capped = rules.extraProperties == ExtraPropertiesRule.CAP_RENT
+                assert len(wild_colors) == (1 if capped else 3)
@@ -0,0 +1,100 @@
+"""
+Tests for the EdgeRules sweep: chunked resumable runs, reports and measured validation.
+"""
+
+import numpy as np
+import pytest
+from app.core import rule_sweep as sweep_module
+from app.core.parallel_simulation import shutdown_process_pool
+from app.core.rule_space import encode_rules
+from app.core.rule_sweep import RuleSweep, run_sweep
+from app.core.validation import RuleValidationEngine, FIRST_PLAYER_TOLERANCE
+from app.models.game import (
+    EdgeRules, HousePaymentRule, HotelMoveRule, ExtraPropertiesRule, BuildingForfeitureRule,
+    PropertyMergingRule, DeckExhaustionRule
+)
+
+PERMISSIVE = EdgeRules(
+    housePayment=HousePaymentRule.FLOATING,
+    hotelMove=HotelMoveRule.FREE_MOVE,
+    extraProperties=ExtraPropertiesRule.SPLIT_SETS,
+    propertyMerging=PropertyMergingRule.AUTO_MERGE,
+    buildingForfeiture=BuildingForfeitureRule.KEEP_FLOATING,
+    quadrupleRent=True,
+    forcedDealToDealBreaker=True,
+    justSayNoEmptyHand=True,
+    justSayNoOnZero=True
+)
+
+
+class TestRuleSweep:
+    """Test chunking, resuming, reports and the sweep-backed balance check."""
+
+    def setup_method(self):
+        self.codes = [encode_rules(EdgeRules()), encode_rules(EdgeRules(quadrupleRent=True)),
+                      encode_rules(EdgeRules(deckExhaustion=DeckExhaustionRule.GAME_OVER)),
+                      encode_rules(PERMISSIVE), encode_rules(EdgeRules(justSayNoEmptyHand=False))]
+        self.options = dict(games=9, seed=4, codes=self.codes, chunk_size=2)
+
+    def test_resumed_sweep_matches_a_single_run(self, tmp_path):
+        partial = run_sweep(str(tmp_path / "resumed"), max_workers=1, max_chunks=1, **self.options)
+        assert partial['completedChunks'] == 1 and partial['chunks'] == 3
+        assert not RuleSweep(str(tmp_path / "resumed")).complete
+
+        resumed = run_sweep(str(tmp_path / "resumed"), max_workers=2, **self.options)
+        single = run_sweep(str(tmp_path / "single"), max_workers=1, **self.options)
+        assert resumed['completedChunks'] == single['completedChunks'] == 3
+
+        a, b = RuleSweep(str(tmp_path / "resumed")), RuleSweep(str(tmp_path / "single"))
+        assert a.complete and len(a) == len(self.codes)
+        assert np.array_equal(a.counts, b.counts)
+        assert a.counts[self.codes, 0].tolist() == [9] * len(self.codes)
+
+    def test_mismatched_settings_are_rejected(self, tmp_path):
+        run_sweep(str(tmp_path), max_workers=1, max_chunks=0, **self.options)
+        with pytest.raises(ValueError):
+            run_sweep(str(tmp_path), **dict(self.options, games=10))
+        with pytest.raises(ValueError):
+            run_sweep(str(tmp_path), **dict(self.options, seed=5))
+        with pytest.raises(ValueError):
+            run_sweep(str(tmp_path / "bad"), codes=[-1])
+
+    def test_report(self, tmp_path):
+        run_sweep(str(tmp_path), max_workers=1, **self.options)
+        sweep = RuleSweep(str(tmp_path))
+        report = sweep.report()
+
+        assert report.combinations == len(self.codes) and report.complete
+        assert report.overall.games == 9 * len(self.codes)
+        effects = {effect.rule: effect for effect in report.effects}
+        assert set(effects['deckExhaustion'].outcomes) == {'reshuffle', 'game_over'}
+        assert set(effects['housePayment'].outcomes) == {'bank', 'floating'}
+        default = sweep.outcome(EdgeRules())
+        assert default.games == 9 and 0 <= default.winRateSpread <= 1
+        assert sweep.outcome(EdgeRules(quadrupleRent=True, justSayNoOnZero=False)) is None
+        assert [effect.turnsEffect for effect in report.effects] == \
+            sorted((effect.turnsEffect for effect in report.effects), reverse=True)
+
+    def test_validation_uses_measured_balance(self, tmp_path, monkeypatch):
+        run_sweep(str(tmp_path), max_workers=1, **self.options)
+        sweep = RuleSweep(str(tmp_path))
+        monkeypatch.setattr(sweep_module, '_sweep', sweep)
+        monkeypatch.setattr(sweep_module, '_sweep_loaded', True)
+        validator = RuleValidationEngine()
+
+        # A swept rule set is judged on measured outcomes rather than the permissive-rule count
+        result = validator.validate_rules(PERMISSIVE)
+        assert not any("permissive rule set" in warning for warning in result.warnings)
+        measured = sweep.outcome(PERMISSIVE)
+        assert any("first player" in warning for warning in result.warnings) == \
+            (abs(measured.firstPlayerAdvantage) > FIRST_PLAYER_TOLERANCE)
+
+        # Rule sets outside the sweep fall back to the estimate
+        restrictive = EdgeRules(justSayNoEmptyHand=False, justSayNoOnZero=False, forcedDealToDealBreaker=False,
+                                propertyMerging=PropertyMergingRule.NO_MERGE)
+        result = validator.validate_rules(restrictive)
+        assert any("restrictive rule set" in warning for warning in result.warnings)
+
+    @classmethod
+    def teardown_class(cls):
+        shutdown_process_pool()
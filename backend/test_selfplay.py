@@ -0,0 +1,66 @@
+"""
+Tests for the self-play dataset generator.
+"""
+
+import numpy as np
+import pytest
+from app.core.parallel_simulation import shutdown_process_pool
+from app.core.selfplay import COLUMNS, generate_dataset, iter_shards, load_shard, read_manifest
+
+
+class TestSelfPlayDataset:
+    """Test shard layout, row contents, loading and determinism."""
+
+    def test_manifest_and_shards(self, tmp_path):
+        manifest = generate_dataset(str(tmp_path), 25, games_per_shard=10, seed=3, max_workers=1)
+
+        assert manifest == read_manifest(str(tmp_path))
+        assert [shard['games'] for shard in manifest['shards']] == [10, 10, 5]
+        assert manifest['rows'] == sum(shard['rows'] for shard in manifest['shards'])
+        assert set(manifest['presets']) == {'strict_official', 'flexible_house_rules',
+                                            'balanced_competitive', 'defensive_play'}
+
+    def test_rows_describe_turns(self, tmp_path):
+        generate_dataset(str(tmp_path), 12, presets=['strict_official'], characters=['aggressive', 'normal'],
+                         games_per_shard=12, seed=4, max_workers=1)
+        shard = next(iter_shards(str(tmp_path)))
+        rows = len(shard['game'])
+
+        assert isinstance(shard['props'], np.memmap)
+        assert {column: str(array.dtype) for column, array in shard.items()} == COLUMNS
+        assert shard['props'].shape == (rows, 2, 10)
+        assert shard['hand'].shape == (rows, 40) and shard['move_kinds'].shape == (rows, 3)
+        assert set(np.unique(shard['game'])) == set(range(12))
+        assert set(np.unique(shard['characters'])) <= {0, 1}
+        for game in range(12):
+            turns = shard['turn'][shard['game'] == game]
+            assert list(turns) == list(range(len(turns)))
+            assert len(set(shard['winner'][shard['game'] == game])) == 1
+        # The mover's hand after the draw holds at least the cards it played
+        played = (shard['move_kinds'] >= 0).sum(axis=1)
+        assert (shard['hand'].sum(axis=1) >= played).all()
+        assert (shard['hand_sizes'][np.arange(rows), shard['player']] == shard['hand'].sum(axis=1)).all()
+
+    def test_same_seed_same_files_for_any_worker_count(self, tmp_path):
+        generate_dataset(str(tmp_path / "serial"), 20, games_per_shard=5, seed=8, max_workers=1)
+        generate_dataset(str(tmp_path / "parallel"), 20, games_per_shard=5, seed=8, max_workers=2)
+
+        for serial, parallel in zip(iter_shards(str(tmp_path / "serial")), iter_shards(str(tmp_path / "parallel"))):
+            for column in COLUMNS:
+                assert np.array_equal(serial[column], parallel[column])
+
+    def test_in_memory_loading(self, tmp_path):
+        generate_dataset(str(tmp_path), 3, seed=1, max_workers=1)
+        shard = load_shard(str(tmp_path / "shard-00000"), mmap_mode=None)
+
+        assert not isinstance(shard['winner'], np.memmap)
+
+    def test_unknown_presets_and_characters_are_rejected(self, tmp_path):
+        with pytest.raises(ValueError):
+            generate_dataset(str(tmp_path), 1, presets=['house_special'])
+        with pytest.raises(ValueError):
+            generate_dataset(str(tmp_path), 1, characters=['reckless'])
+
+    @classmethod
+    def teardown_class(cls):
+        shutdown_process_pool()
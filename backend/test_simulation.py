@@ -0,0 +1,242 @@
+"""
+Tests for the Monte Carlo rollout engine.
+
+Covers card classification, rollout determinism, rule handling, the
+MonopolyDealEngine.simulate_game integration and the turn search.
+"""
+
+import random
+
+import pytest
+from app.core.cards import (
+    DECK_SIZE, classify_card, KIND_NAMES, RENT_DARK_BLUE_GREEN, PROPERTY_BASE,
+    COLOR_INDEX, MONEY_5, WILD_ANY, FORCED_DEAL, SLY_DEAL, PASS_GO, CARDS, CARD_CATALOG, lookup_card
+)
+from app.core.simulation import GameSimulator, SimulationSummary, CHARACTER_WEIGHTS
+from app.core.compact_state import CompactGameState
+from app.core.search import TurnSearch, legal_moves
+from app.core.parallel_simulation import ParallelSimulator, spawn_seeds, shutdown_process_pool
+from app.core.game_engine import MonopolyDealEngine
+from app.models.game import EdgeRules, AIStrategy, DeckExhaustionRule
+from conftest import make_game_state
+
+
+PLAYERS = (
+    {"hand": ["Pass Go", "Deal Breaker", "Green Property"], "bank": [5, 2],
+     "properties": {"green": ["Green Property", "Green Property"], "blue": []}},
+    {"hand": ["Rent Green/Blue", "House"], "bank": [1, 1],
+     "properties": {"blue": ["Blue Property", "Blue Property"], "red": ["Red Property"]}}
+)
+
+
+class TestCardClassification:
+    """Test card string parsing into card kinds."""
+
+    def test_standard_deck_size(self):
+        assert DECK_SIZE == 106
+
+    def test_classify_common_names(self):
+        assert classify_card("Green Property") == PROPERTY_BASE + COLOR_INDEX['green']
+        assert classify_card("Blue Property") == PROPERTY_BASE + COLOR_INDEX['dark-blue']
+        assert classify_card("Rent Green/Blue") == RENT_DARK_BLUE_GREEN
+        assert classify_card("$5M") == MONEY_5
+        assert classify_card("10-Color Wild") == WILD_ANY
+        assert KIND_NAMES[classify_card("Force Deal")] == "Forced Deal"
+
+    def test_catalog_interns_one_record_per_card(self):
+        assert lookup_card("Force Deal") is lookup_card("Forced Deal") is CARDS[FORCED_DEAL]
+        assert lookup_card("Force Deal").action == 'force_deal'
+        assert lookup_card("green property") is CARD_CATALOG["Green Property"]
+        assert lookup_card({"name": "Red & Yellow"}).colors == ('red', 'yellow')
+        assert lookup_card("Rent Green/Blue").effect == 'collect_rent'
+
+    def test_unknown_spelling_is_parsed_once(self):
+        assert "Sly Deal (promo)" not in CARD_CATALOG
+        assert lookup_card("Sly Deal (promo)") is CARDS[SLY_DEAL]
+        assert CARD_CATALOG["Sly Deal (promo)"] is CARDS[SLY_DEAL]
+
+    def test_classify_dict_and_unknown(self):
+        assert classify_card({"value": 5}) == MONEY_5
+        assert classify_card({"name": "Green Property", "color": "green", "value": 4}) == \
+            PROPERTY_BASE + COLOR_INDEX['green']
+        assert classify_card("Mystery Card") == -1
+
+    def test_any_color_words_match_whole_words(self):
+        assert classify_card("Water Works Company") != WILD_ANY
+        assert classify_card("Multicolor Wild") == WILD_ANY
+        assert classify_card("Property Wild (any)") == WILD_ANY
+
+    def test_non_numeric_money_value_is_unknown(self):
+        assert classify_card({"value": "lots"}) == -1
+
+
+class TestGameSimulator:
+    """Test rollout results and rule handling."""
+
+    def test_rollouts_produce_win_rates(self):
+        summary = GameSimulator().run(make_game_state(PLAYERS), ['aggressive', 'normal'], 200, seed=7)
+
+        assert isinstance(summary, SimulationSummary)
+        assert summary.games == 200
+        assert sum(summary.wins) == 200
+        rates = summary.win_rates()
+        assert set(rates) == {"Alice", "Bob"}
+        assert abs(sum(rates.values()) - 1.0) < 1e-9
+
+    def test_seed_is_reproducible(self):
+        simulator = GameSimulator()
+        first = simulator.run(make_game_state(PLAYERS), ['normal', 'normal'], 100, seed=42)
+        second = simulator.run(make_game_state(PLAYERS), ['normal', 'normal'], 100, seed=42)
+
+        assert first.wins == second.wins
+        assert first.totalTurns == second.totalTurns
+
+    def test_already_won_position(self):
+        state = make_game_state(PLAYERS)
+        state.players[1].properties = {
+            "brown": ["Brown Property", "Brown Property"],
+            "dark-blue": ["Dark Blue Property", "Dark Blue Property"],
+            "utility": ["Utility Property", "Utility Property"]
+        }
+        summary = GameSimulator().run(state, ['normal', 'normal'], 20, seed=1)
+
+        assert summary.win_rates()["Bob"] == 1.0
+        assert summary.average_turns() == 0
+
+    def test_game_over_on_deck_exhaustion(self):
+        rules = EdgeRules(deckExhaustion=DeckExhaustionRule.GAME_OVER)
+        state = make_game_state(PLAYERS, edge_rules=rules, deck_count=0)
+        summary = GameSimulator(rules).run(state, ['normal', 'normal'], 20, seed=3)
+
+        assert summary.games == 20
+        assert summary.unfinished == 0
+        assert summary.average_turns() == 1
+
+    def test_pass_go_on_an_empty_deck_ends_the_game(self):
+        rules = EdgeRules(deckExhaustion=DeckExhaustionRule.GAME_OVER)
+        state = CompactGameState.from_game_state(make_game_state(
+            ({"hand": ["Pass Go", "Green Property", "$5M"]}, {}), edge_rules=rules, discard=(), deck_count=0))
+        simulator = GameSimulator(rules)
+        rollout = simulator.rollout(state, [], simulator.seat_weights(['normal'], 2), random.Random(0))
+
+        rollout.play(0, PASS_GO, -1, 3)
+
+        # The rest of the turn is not played once the game is over
+        assert rollout.over
+        assert not rollout.finish_turn(0, 2)
+        assert rollout.hand_sizes[0] == 2
+
+    def test_summary_merge(self):
+        simulator = GameSimulator()
+        first = simulator.run(make_game_state(PLAYERS), ['normal', 'normal'], 30, seed=1)
+        second = simulator.run(make_game_state(PLAYERS), ['normal', 'normal'], 30, seed=2)
+        merged = first.merge(second)
+
+        assert merged.games == 60
+        assert merged.wins == [a + b for a, b in zip(first.wins, second.wins)]
+
+
+class TestEngineSimulation:
+    """Test MonopolyDealEngine.simulate_game uses real rollouts."""
+
+    def test_simulate_game_returns_empirical_rates(self):
+        state = make_game_state(PLAYERS)
+        engine = MonopolyDealEngine(state.edgeRules)
+        results = engine.simulate_game(state, AIStrategy.AGGRESSIVE, 300, seed=5)
+
+        assert len(results) == 1
+        probabilities = results[0].winProbability
+        assert set(probabilities) == {"Alice", "Bob"}
+        assert abs(sum(probabilities.values()) - 1.0) < 1e-9
+        assert results[0].strongestPlayer == max(probabilities, key=probabilities.get)
+
+    def test_simulate_game_is_deterministic_with_seed(self):
+        state = make_game_state(PLAYERS)
+        engine = MonopolyDealEngine(state.edgeRules)
+        first = engine.simulate_game(state, AIStrategy.NORMAL, 100, seed=11)
+        second = engine.simulate_game(state, AIStrategy.NORMAL, 100, seed=11)
+
+        assert first[0].winProbability == second[0].winProbability
+
+
+class TestParallelSimulation:
+    """Test sharded simulation is reproducible for any worker count."""
+
+    def test_spawned_seeds_are_distinct_and_stable(self):
+        seeds = spawn_seeds(123, 8)
+
+        assert len(set(seeds)) == 8
+        assert seeds == spawn_seeds(123, 8)
+        assert seeds[:4] == spawn_seeds(123, 4)
+
+    def test_shard_plan_covers_all_rollouts(self):
+        plan = ParallelSimulator(shard_size=64).shard_plan(1000, seed=9)
+
+        assert len(plan) == 16
+        assert sum(count for count, _ in plan) == 1000
+
+    def test_results_independent_of_worker_count(self):
+        state = make_game_state(PLAYERS)
+        serial = ParallelSimulator(max_workers=1, shard_size=25).run(state, ['normal', 'normal'], 100, seed=21)
+        parallel = ParallelSimulator(max_workers=2, shard_size=25).run(state, ['normal', 'normal'], 100, seed=21)
+
+        assert serial.games == parallel.games == 100
+        assert serial.wins == parallel.wins
+        assert serial.totalTurns == parallel.totalTurns
+
+    @classmethod
+    def teardown_class(cls):
+        shutdown_process_pool()
+
+
+class TestTurnSearch:
+    """Test time-budgeted forward search of the current turn."""
+
+    def setup_method(self):
+        self.engine = MonopolyDealEngine()
+        self.state = make_game_state(PLAYERS)
+
+    def test_search_visits_every_root_move(self):
+        result = self.engine.search_turn(self.state, AIStrategy.AGGRESSIVE, 1, seed=3)
+
+        assert result.iterations >= len(result.moves)
+        assert all(stat.visits >= 1 for stat in result.moves)
+        assert result.bestLine[0] == result.moves[0].move
+        assert 0.0 <= result.expectedValue <= 1.0
+
+    def test_search_is_reproducible_with_iteration_cap(self):
+        first = self.engine.search_turn(self.state, AIStrategy.NORMAL, 10000, seed=8, max_iterations=200)
+        second = self.engine.search_turn(self.state, AIStrategy.NORMAL, 10000, seed=8, max_iterations=200)
+
+        assert first.iterations == 200
+        assert first.bestLine == second.bestLine
+        assert [stat.visits for stat in first.moves] == [stat.visits for stat in second.moves]
+
+    def test_best_line_stops_at_a_draw(self):
+        compact = CompactGameState.from_game_state(make_game_state((dict(PLAYERS[0], hand=["Pass Go"]), PLAYERS[1])))
+        search = TurnSearch(lambda state, player: float(state.banks[player] + 1))
+        result = search.search(compact, 10000, seed=2, max_iterations=300)
+
+        pass_go = [stat for stat in result.moves if stat.move == "Play Pass Go"][0]
+        assert pass_go.visits > 1
+        # The cards drawn differ between determinizations, so the line ends at the draw
+        assert "Play Pass Go" not in result.bestLine[:-1]
+
+    def test_legal_moves_cover_hand(self):
+        rollout = GameSimulator().rollout(
+            CompactGameState.from_game_state(self.state), [], [CHARACTER_WEIGHTS['normal']] * 2, random.Random(0)
+        )
+        labels = [move.label for move in legal_moves(rollout, 0)]
+
+        assert "Play Green Property on green" in labels
+        assert "Bank Deal Breaker ($5M)" in labels
+        assert "Play Pass Go" in labels
+        assert labels[-1] == "End turn"
+
+    def test_analysis_uses_search_with_time_budget(self):
+        analysis = self.engine.analyze_game_state(self.state, AIStrategy.AGGRESSIVE, time_budget_ms=50)
+
+        assert "Forward search:" in analysis.reasoning
+        assert analysis.recommendedMove.split(':')[0] in (
+            'play_property', 'play_action', 'bank_money', 'build', 'end_turn'
+        )
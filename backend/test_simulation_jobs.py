@@ -0,0 +1,178 @@
+"""
+Tests for the background simulation job queue.
+"""
+
+import time
+
+import pytest
+from app.core.game_engine import MonopolyDealEngine
+from app.core.parallel_simulation import shutdown_process_pool
+from app.core.simulation_jobs import Job, JobQueue, JobQueueFull, SQLiteJobStore
+from app.models.game import (
+    GameState, PlayerState, EdgeRules, AIStrategy, JobStatus, SimulationRequest, SimulationJobRequest
+)
+
+
+def make_request(num_simulations=100, seed=3):
+    state = GameState(
+        players=[
+            PlayerState(
+                id=1,
+                name="Alice",
+                hand=["Pass Go", "Sly Deal", "Green Property"],
+                bank=[5, 2],
+                properties={"green": ["Green Property", "Green Property"]}
+            ),
+            PlayerState(
+                id=2,
+                name="Bob",
+                hand=["House"],
+                bank=[1, 1],
+                properties={"red": ["Red Property", "Red Property"]}
+            )
+        ],
+        discard=[],
+        deckCount=60,
+        edgeRules=EdgeRules()
+    )
+    return SimulationJobRequest(gameState=state, strategy=AIStrategy.NORMAL,
+                                numSimulations=num_simulations, seed=seed)
+
+
+def wait_finished(jobs: JobQueue, job: Job, timeout: float = 60.0) -> Job:
+    end = time.monotonic() + timeout
+    while not job.finished and time.monotonic() < end:
+        jobs.wait(job, job.version, timeout=1.0)
+    assert job.finished
+    return job
+
+
+def wait_running(jobs: JobQueue, job: Job, timeout: float = 60.0) -> None:
+    end = time.monotonic() + timeout
+    while job.games == 0 and time.monotonic() < end:
+        jobs.wait(job, job.version, timeout=1.0)
+    assert job.status == JobStatus.RUNNING
+
+
+class TestJobQueue:
+    """Test job execution, progress and cancellation."""
+
+    def setup_method(self):
+        self.jobs = JobQueue(workers=1, max_queued=2)
+
+    def teardown_method(self):
+        self.jobs.shutdown(wait=False)
+
+    def test_job_result_matches_a_direct_simulation(self):
+        finished = []
+        job = wait_finished(self.jobs, self.jobs.submit(make_request(), user_id=7, on_finish=finished.append))
+        direct = MonopolyDealEngine().simulate_game(make_request().gameState, AIStrategy.NORMAL, 100, seed=3)
+
+        assert job.status == JobStatus.COMPLETED
+        assert job.games == 100
+        assert job.result.results[0].winProbability == direct[0].winProbability
+        assert job.snapshot().latest is None and job.snapshot().result.gamesPlayed == 100
+        assert finished == [job]
+
+    def test_failing_callback_is_logged(self, caplog):
+        def fail(job):
+            raise RuntimeError("store unavailable")
+
+        job = wait_finished(self.jobs, self.jobs.submit(make_request(num_simulations=10), on_finish=fail))
+
+        assert job.status == JobStatus.COMPLETED
+        # The callback runs after the job is marked finished
+        deadline = time.monotonic() + 5
+        while not caplog.records and time.monotonic() < deadline:
+            time.sleep(0.01)
+        record, = [record for record in caplog.records if record.name == "app.core.simulation_jobs"]
+        assert record.exc_info and "callback failed" in record.getMessage()
+
+    def test_queued_job_is_dropped_on_cancel(self):
+        running = self.jobs.submit(make_request(20000))
+        queued = self.jobs.submit(make_request())
+
+        self.jobs.cancel(queued.id)
+        assert queued.status == JobStatus.CANCELLED
+
+        wait_running(self.jobs, running)
+        self.jobs.cancel(running.id)
+        wait_finished(self.jobs, running)
+        assert running.status == JobStatus.CANCELLED
+        assert 0 < running.games < 20000
+        assert running.result is None
+
+    def test_full_queue_rejects_submissions(self):
+        running = self.jobs.submit(make_request(20000))
+        with pytest.raises(JobQueueFull):
+            for _ in range(4):
+                self.jobs.submit(make_request())
+        self.jobs.cancel(running.id)
+
+    def test_history_forgets_oldest_finished_jobs(self):
+        jobs = JobQueue(workers=1, history=1)
+        try:
+            first = wait_finished(jobs, jobs.submit(make_request(10)))
+            second = wait_finished(jobs, jobs.submit(make_request(10)))
+
+            assert jobs.get(first.id) is None
+            assert jobs.get(second.id) is second
+        finally:
+            jobs.shutdown(wait=False)
+
+    def test_job_requests_allow_large_runs(self):
+        assert make_request(50000).numSimulations == 50000
+        with pytest.raises(ValueError):
+            SimulationRequest(**make_request(50000).model_dump())
+
+    @classmethod
+    def teardown_class(cls):
+        shutdown_process_pool()
+
+
+class TestJobPersistence:
+    """Test SQLite-backed jobs survive a restart."""
+
+    def test_finished_jobs_reload(self, tmp_path):
+        path = str(tmp_path / "jobs.db")
+        jobs = JobQueue(workers=1, store=SQLiteJobStore(path))
+        job = wait_finished(jobs, jobs.submit(make_request(30), user_id=4))
+        jobs.shutdown()
+
+        restored = JobQueue(workers=1, store=SQLiteJobStore(path)).get(job.id)
+        assert restored.status == JobStatus.COMPLETED
+        assert restored.user_id == 4
+        assert restored.result == job.result
+
+    def test_unfinished_jobs_run_again(self, tmp_path):
+        store = SQLiteJobStore(str(tmp_path / "jobs.db"))
+        interrupted = Job("interrupted", make_request(30), seed=3)
+        interrupted.status, interrupted.games = JobStatus.RUNNING, 10
+        store.save(interrupted)
+
+        finished = []
+        jobs = JobQueue(workers=1, store=store, on_restore=finished.append)
+        try:
+            job = wait_finished(jobs, jobs.get("interrupted"))
+            reference = JobQueue(workers=1)
+            fresh = wait_finished(reference, reference.submit(make_request(30)))
+            reference.shutdown(wait=False)
+
+            assert job.status == JobStatus.COMPLETED and job.games == 30
+            assert job.result.results[0].winProbability == fresh.result.results[0].winProbability
+            assert finished == [job]
+        finally:
+            jobs.shutdown(wait=False)
+
+    def test_restore_beyond_capacity_does_not_block(self, tmp_path):
+        store = SQLiteJobStore(str(tmp_path / "jobs.db"))
+        for number in range(4):
+            store.save(Job(f"queued-{number}", make_request(30), seed=number))
+
+        jobs = JobQueue(workers=1, max_queued=1, store=store)
+        try:
+            statuses = [jobs.get(f"queued-{number}").status for number in range(4)]
+            assert statuses.count(JobStatus.FAILED) >= 2
+            assert "full" in jobs.get("queued-3").error
+        finally:
+            jobs.shutdown(wait=False)
@@ -0,0 +1,120 @@
+"""
+Tests for progressive analysis and simulation results and their stream encoding.
+"""
+
+import json
+
+from app.api.v1.endpoints.analysis import _stream_updates
+from app.core.analysis_cache import AnalysisCache, iter_analyze_cached
+from app.core.compact_state import CompactGameState
+from app.core.game_engine import MonopolyDealEngine
+from app.core.parallel_simulation import ParallelSimulator, shutdown_process_pool
+from app.models.game import AIStrategy, AnalysisResponse, StreamFormat
+from conftest import make_game_state
+
+
+PLAYERS = (
+    {"hand": ["Sly Deal", "Wild Rent", "Green Property", "$5M"], "bank": [5, 2],
+     "properties": {"green": ["Green Property", "Green Property"]}},
+    {"hand": ["House"], "bank": [1, 1], "properties": {"dark-blue": ["Blue Property"], "red": ["Red Property"] * 2}}
+)
+
+
+def is_interim(response: AnalysisResponse) -> bool:
+    return bool(response.debug) and 'progress' in response.debug
+
+
+class TestProgressiveAnalysis:
+    """Test interim answers from the one-ply analysis and the search."""
+
+    def setup_method(self):
+        self.engine = MonopolyDealEngine()
+        self.state = make_game_state(PLAYERS, discard=(), deck_count=60)
+
+    def test_one_ply_answer_comes_first(self):
+        updates = list(self.engine.iter_analysis(self.state, AIStrategy.NORMAL, time_budget_ms=120, report_ms=20))
+
+        assert updates[0].debug['progress']['phase'] == 'one_ply'
+        assert all(is_interim(update) and not update.completed for update in updates[:-1])
+        assert len(updates) >= 3
+        assert not is_interim(updates[-1]) and updates[-1].completed
+        assert updates[-1].debug['search']['iterations'] >= updates[-2].debug['search']['iterations']
+
+    def test_without_search_the_stream_is_the_plain_answer(self):
+        updates = list(self.engine.iter_analysis(self.state, AIStrategy.DEFENSIVE, report_ms=20))
+
+        assert updates == [self.engine.analyze_game_state(self.state, AIStrategy.DEFENSIVE)]
+
+    def test_search_snapshots_do_not_change_the_result(self):
+        compact = CompactGameState.from_game_state(self.state)
+        snapshots = list(self.engine.iter_search_turn(self.state, AIStrategy.NORMAL, 10000, compact, seed=4,
+                                                      max_iterations=150, report_ms=0.01))
+        plain = self.engine.search_turn(self.state, AIStrategy.NORMAL, 10000, compact, seed=4, max_iterations=150)
+
+        assert len(snapshots) > 1
+        assert snapshots[-1].bestLine == plain.bestLine
+        assert [stat.visits for stat in snapshots[-1].moves] == [stat.visits for stat in plain.moves]
+
+    def test_cached_stream_stores_only_the_final_answer(self):
+        cache = AnalysisCache()
+        updates = list(iter_analyze_cached(self.state, AIStrategy.NORMAL, 60, cache=cache, report_ms=10))
+
+        assert len(cache) == 1
+        assert list(iter_analyze_cached(self.state, AIStrategy.NORMAL, 60, cache=cache)) == [updates[-1]]
+
+
+class TestProgressiveSimulation:
+    """Test per-shard simulation updates."""
+
+    def test_summaries_accumulate_to_the_run_result(self):
+        simulator = ParallelSimulator(max_workers=1, shard_size=25)
+        state = make_game_state(PLAYERS, discard=(), deck_count=60)
+        summaries = list(simulator.iter_run(state, ['normal', 'normal'], 100, seed=2))
+        final = simulator.run(state, ['normal', 'normal'], 100, seed=2)
+
+        assert [summary.games for summary in summaries] == [25, 50, 75, 100]
+        assert summaries[-1].wins == final.wins
+
+    def test_simulation_updates_end_with_the_simulate_game_answer(self):
+        engine = MonopolyDealEngine()
+        state = make_game_state(PLAYERS, discard=(), deck_count=60)
+        updates = list(engine.iter_simulation(state, AIStrategy.AGGRESSIVE, 200, seed=6))
+        final = engine.simulate_game(state, AIStrategy.AGGRESSIVE, 200, seed=6)[0]
+
+        assert [update.debug['simulation']['games'] for update in updates] == [64, 128, 192, 200]
+        assert all(is_interim(update) and not update.completed for update in updates[:-1])
+        assert updates[-1] == final
+
+    @classmethod
+    def teardown_class(cls):
+        shutdown_process_pool()
+
+
+class TestStreamEncoding:
+    """Test SSE and NDJSON framing."""
+
+    def make_updates(self):
+        interim = AnalysisResponse(recommendedMove="a", reasoning="", strongestPlayer="Alice",
+                                   winProbability={"Alice": 0.5}, debug={'progress': {}}, completed=False)
+        return [interim, interim.model_copy(update={'debug': None, 'completed': True})]
+
+    def test_server_sent_events(self):
+        chunks = list(_stream_updates(iter(self.make_updates()), StreamFormat.SSE))
+
+        assert [chunk.split("\n")[0] for chunk in chunks] == ["event: update", "event: final"]
+        assert all(chunk.endswith("\n\n") for chunk in chunks)
+        assert json.loads(chunks[1].split("data: ", 1)[1])['completed']
+
+    def test_ndjson_lines(self):
+        lines = "".join(_stream_updates(iter(self.make_updates()), StreamFormat.NDJSON)).splitlines()
+
+        assert [json.loads(line)['completed'] for line in lines] == [False, True]
+
+    def test_failure_ends_the_stream_with_an_error(self):
+        def failing():
+            yield self.make_updates()[0]
+            raise RuntimeError("boom")
+
+        chunks = list(_stream_updates(failing(), StreamFormat.SSE))
+
+        assert chunks[-1].startswith("event: error") and "boom" in chunks[-1]
@@ -0,0 +1,96 @@
+"""
+Tests for round-robin strategy tournaments and Elo fitting.
+"""
+
+import pytest
+from app.core.parallel_simulation import shutdown_process_pool
+from app.core.simulation import CHARACTER_WEIGHTS
+from app.core.tournament import fit_elo, entrant_weights, opening_state, run_tournament
+from app.models.configuration import OFFICIAL_PRESETS
+
+
+class TestEloFit:
+    """Test Bradley-Terry ratings on known result matrices."""
+
+    def test_even_results_rate_everyone_equally(self):
+        wins = [[0, 50, 50], [50, 0, 50], [50, 50, 0]]
+        games = [[0, 100, 100], [100, 0, 100], [100, 100, 0]]
+        elo, errors = fit_elo(wins, games)
+
+        assert elo == pytest.approx([1500.0] * 3)
+        assert errors[0] == pytest.approx(errors[1])
+
+    def test_ratings_follow_the_win_rate(self):
+        # A beats B 76% of the time: about 200 Elo points
+        elo, _ = fit_elo([[0, 760], [240, 0]], [[0, 1000], [1000, 0]])
+
+        assert elo[0] - elo[1] == pytest.approx(200, abs=5)
+        assert sum(elo) / 2 == pytest.approx(1500.0)
+
+    def test_unbeaten_entrant_stays_finite(self):
+        elo, errors = fit_elo([[0, 20], [0, 0]], [[0, 20], [20, 0]])
+
+        assert elo[0] > elo[1] and all(error < float('inf') for error in errors)
+
+
+class TestTournament:
+    """Test the round-robin runner."""
+
+    def test_entrants_and_seatings(self):
+        result = run_tournament(characters=["aggressive", "defensive"], asset_evaluations=["logical"],
+                                games_per_pairing=30, seed=5, max_workers=1)
+
+        assert result.gamesPlayed == 30
+        assert [entrant.games for entrant in result.entrants] == [30, 30]
+        assert sum(entrant.wins for entrant in result.entrants) == 30
+        assert result.entrants[0].elo >= result.entrants[1].elo
+        for entrant in result.entrants:
+            low, high = entrant.confidenceInterval
+            assert low <= entrant.winRate <= high
+            assert entrant.eloInterval[0] < entrant.elo < entrant.eloInterval[1]
+        assert result.headToHead["aggressive/logical"]["defensive/logical"] + \
+            result.headToHead["defensive/logical"]["aggressive/logical"] == pytest.approx(1.0)
+
+    def test_full_round_robin_size(self):
+        result = run_tournament(games_per_pairing=2, seed=1, max_workers=1)
+
+        assert len(result.entrants) == 9
+        assert result.gamesPlayed == 36 * 2
+        assert all(entrant.games == 16 for entrant in result.entrants)
+
+    def test_results_do_not_depend_on_workers(self):
+        kwargs = dict(edge_rules=OFFICIAL_PRESETS["strict_official"].rules, characters=["normal", "aggressive"],
+                      asset_evaluations=["value"], games_per_pairing=40, seed=9, shard_size=10)
+        serial = run_tournament(max_workers=1, **kwargs)
+        parallel = run_tournament(max_workers=2, **kwargs)
+
+        assert serial.entrants == parallel.entrants
+
+    def test_unknown_entrants_are_rejected(self):
+        with pytest.raises(ValueError):
+            run_tournament(characters=["reckless"], games_per_pairing=2, max_workers=1)
+        with pytest.raises(ValueError):
+            run_tournament(characters=["normal"], asset_evaluations=["logical"], games_per_pairing=2)
+
+    def test_oversized_tournaments_are_rejected(self):
+        # Nine entrants play 36 pairings
+        with pytest.raises(ValueError, match="1440 games"):
+            run_tournament(games_per_pairing=40, max_games=1000, max_workers=1)
+
+    def test_asset_evaluation_tilts_character_weights(self):
+        logical = entrant_weights("normal", "logical")
+        value = entrant_weights("normal", "value")
+
+        assert entrant_weights("normal", "logical_value") == CHARACTER_WEIGHTS["normal"]
+        assert logical['property_acquisition'] > value['property_acquisition']
+        assert logical['money_hoarding'] < value['money_hoarding']
+
+    def test_opening_state_is_a_fresh_deal(self):
+        state = opening_state()
+
+        assert state.hidden == [5, 5]
+        assert state.deck_count == 96 and sum(state.unseen) == 106
+
+    @classmethod
+    def teardown_class(cls):
+        shutdown_process_pool()
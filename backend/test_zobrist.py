@@ -0,0 +1,102 @@
+"""
+Tests for Zobrist hashing and the transposition table used by the turn search.
+"""
+
+import random
+
+import pytest
+from app.core import zobrist
+from app.core.zobrist import TranspositionTable
+from app.core.compact_state import CompactGameState
+from app.core.simulation import GameSimulator, CHARACTER_WEIGHTS
+from app.core.search import TurnSearch, Move, legal_moves
+from app.core.cards import COLOR_INDEX, PROPERTY_BASE, MONEY_5
+from app.core.game_engine import MonopolyDealEngine
+from app.models.game import AIStrategy
+from conftest import make_game_state
+
+
+PLAYERS = (
+    {"hand": ["Green Property", "$5M", "Pass Go", "Deal Breaker"], "bank": [2],
+     "properties": {"green": ["Green Property"]}},
+    {"hand": ["House"], "bank": [1, 3], "properties": {"red": ["Red Property", "Red Property"]}}
+)
+
+
+def make_rollout(seed=0):
+    compact = CompactGameState.from_game_state(make_game_state(PLAYERS, discard=(), deck_count=60))
+    return GameSimulator().rollout(
+        compact, compact.unseen_cards(), [CHARACTER_WEIGHTS['normal']] * 2, random.Random(seed)
+    )
+
+
+class TestZobristHash:
+    """Test full and incremental hashing agree."""
+
+    def test_hash_is_stable_and_position_sensitive(self):
+        compact = CompactGameState.from_game_state(make_game_state(PLAYERS, discard=(), deck_count=60))
+        clone = compact.copy()
+
+        assert zobrist.hash_state(compact, 3) == zobrist.hash_state(clone, 3)
+        assert zobrist.hash_state(compact, 3) != zobrist.hash_state(compact, 2)
+        clone.banks[1] += 1
+        assert zobrist.hash_state(compact, 3) != zobrist.hash_state(clone, 3)
+
+    def test_incremental_updates_match_full_hash(self):
+        for seed in range(50):
+            rng = random.Random(seed)
+            rollout = make_rollout(seed)
+            h, plays_left = zobrist.hash_state(rollout, 3, viewer=0), 3
+            while plays_left > 0 and rollout.winner < 0:
+                move = rng.choice(legal_moves(rollout, 0))
+                h, plays_left = TurnSearch.apply(rollout, move, h, plays_left)
+                assert h == zobrist.hash_state(rollout, plays_left, viewer=0)
+
+    def test_viewer_hash_ignores_hidden_cards(self):
+        players = (PLAYERS[0], dict(PLAYERS[1], handCount=5))
+        compact = CompactGameState.from_game_state(make_game_state(players, discard=(), deck_count=60))
+        first, second = (GameSimulator().rollout(compact, compact.unseen_cards(), [CHARACTER_WEIGHTS['normal']] * 2,
+                                                 random.Random(seed)) for seed in (1, 2))
+
+        assert first.hands[1] != second.hands[1]
+        assert zobrist.hash_state(first, 3) != zobrist.hash_state(second, 3)
+        assert zobrist.hash_state(first, 3, viewer=0) == zobrist.hash_state(second, 3, viewer=0) == \
+            zobrist.hash_state(compact, 3, viewer=0)
+        assert zobrist.hash_state(first, 3, viewer=1) != zobrist.hash_state(second, 3, viewer=1)
+
+    def test_play_orders_transpose(self):
+        property_move = Move(PROPERTY_BASE + COLOR_INDEX['green'], COLOR_INDEX['green'])
+        money_move = Move(MONEY_5)
+        first, second = make_rollout(), make_rollout()
+        h = zobrist.hash_state(first, 3)
+
+        h1, left1 = TurnSearch.apply(first, property_move, h, 3)
+        h1, left1 = TurnSearch.apply(first, money_move, h1, left1)
+        h2, left2 = TurnSearch.apply(second, money_move, h, 3)
+        h2, left2 = TurnSearch.apply(second, property_move, h2, left2)
+
+        assert (h1, left1) == (h2, left2)
+
+
+class TestTranspositionTable:
+    """Test bounded table bookkeeping."""
+
+    def test_hits_misses_and_lru_eviction(self):
+        table = TranspositionTable(capacity=2)
+        table.put(1, 'a')
+        table.put(2, 'b')
+        assert table.get(1) == 'a'
+        table.put(3, 'c')
+
+        assert table.get(2) is None
+        assert table.get(3) == 'c'
+        assert table.stats() == {'hits': 2, 'misses': 1, 'entries': 2, 'evictions': 1, 'capacity': 2}
+
+    def test_search_reports_table_in_debug_output(self):
+        engine = MonopolyDealEngine()
+        state = make_game_state(PLAYERS, discard=(), deck_count=60)
+        analysis = engine.analyze_game_state(state, AIStrategy.NORMAL, time_budget_ms=50)
+
+        table = analysis.debug['transpositionTable']
+        assert table['hits'] > 0
+        assert table['entries'] == table['misses'] + 1  # root is stored without a lookup